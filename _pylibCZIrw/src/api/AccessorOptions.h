@@ -0,0 +1,103 @@
+#pragma once
+#include "inc_libCzi.h"
+#include <algorithm>
+#include <memory>
+#include <utility>
+#include <vector>
+
+/// This POD ("plain-old-data") structure represents the options of the accessor
+/// which can be chosen for each read.
+struct AccessorOptions {
+  /// Draw the subblocks in the order of their M-index (the highest on top),
+  /// otherwise in the order of the subblock directory
+  bool sortByM = true;
+
+  /// Skip the subblocks entirely hidden by the subblocks drawn after them
+  bool useVisibilityCheck = true;
+
+  /// Fill the bitmap with the background color before drawing the subblocks
+  /// (otherwise the pixels not covered by any subblock are undefined)
+  bool fillBackground = true;
+
+  /// Draw only the subblocks in subBlockIndices
+  bool filterSubBlocks = false;
+
+  /// The indices of the subblocks drawn if filterSubBlocks is set (sorted in
+  /// ascending order)
+  std::vector<int> subBlockIndices;
+
+  void Clear() {
+    this->sortByM = true;
+    this->useVisibilityCheck = true;
+    this->fillBackground = true;
+    this->filterSubBlocks = false;
+    this->subBlockIndices.clear();
+  }
+
+  /// Returns whether the subblock is drawn according to the filter.
+  bool IsSelected(int index) const {
+    return !this->filterSubBlocks ||
+           std::binary_search(this->subBlockIndices.begin(),
+                              this->subBlockIndices.end(), index);
+  }
+};
+
+/// A subblock repository forwarding to another repository and enumerating only
+/// the subblocks selected by the filter of the accessor options, so that an
+/// accessor on it composes only those subblocks (libCZI's accessor has no
+/// filter of its own).
+class FilteredSubBlockRepository : public libCZI::ISubBlockRepository {
+public:
+  FilteredSubBlockRepository(
+      std::shared_ptr<libCZI::ISubBlockRepository> repository,
+      const AccessorOptions &options)
+      : repository(std::move(repository)), options(options) {}
+
+  void EnumerateSubBlocks(
+      const std::function<bool(int index, const libCZI::SubBlockInfo &info)>
+          &funcEnum) override {
+    this->repository->EnumerateSubBlocks(
+        [&](int index, const libCZI::SubBlockInfo &info) {
+          return !this->options.IsSelected(index) || funcEnum(index, info);
+        });
+  }
+
+  void EnumSubset(
+      const libCZI::IDimCoordinate *planeCoordinate, const libCZI::IntRect *roi,
+      bool onlyLayer0,
+      const std::function<bool(int index, const libCZI::SubBlockInfo &info)>
+          &funcEnum) override {
+    this->repository->EnumSubset(
+        planeCoordinate, roi, onlyLayer0,
+        [&](int index, const libCZI::SubBlockInfo &info) {
+          return !this->options.IsSelected(index) || funcEnum(index, info);
+        });
+  }
+
+  std::shared_ptr<libCZI::ISubBlock> ReadSubBlock(int index) override {
+    return this->repository->ReadSubBlock(index);
+  }
+
+  bool TryGetSubBlockInfoOfArbitrarySubBlockInChannel(
+      int channelIndex, libCZI::SubBlockInfo &info) override {
+    return this->repository->TryGetSubBlockInfoOfArbitrarySubBlockInChannel(
+        channelIndex, info);
+  }
+
+  bool TryGetSubBlockInfo(int index,
+                          libCZI::SubBlockInfo *info) const override {
+    return this->repository->TryGetSubBlockInfo(index, info);
+  }
+
+  libCZI::SubBlockStatistics GetStatistics() override {
+    return this->repository->GetStatistics();
+  }
+
+  libCZI::PyramidStatistics GetPyramidStatistics() override {
+    return this->repository->GetPyramidStatistics();
+  }
+
+private:
+  std::shared_ptr<libCZI::ISubBlockRepository> repository;
+  AccessorOptions options;
+};
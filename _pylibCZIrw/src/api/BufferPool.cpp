@@ -0,0 +1,123 @@
+#include "BufferPool.h"
+
+#include <algorithm>
+#include <atomic>
+#include <iterator>
+
+using namespace libCZI;
+using namespace std;
+
+/// A bitmap on a buffer of a pool, which returns the buffer to the pool when
+/// it is destroyed (if the pool still exists).
+class PooledBitmap : public IBitmapData {
+public:
+  PooledBitmap(PixelType pixelType, std::uint32_t width, std::uint32_t height,
+               std::uint32_t stride, BufferPool::Buffer buffer,
+               std::weak_ptr<BufferPool> pool)
+      : pixelType(pixelType), size{width, height}, stride(stride),
+        buffer(std::move(buffer)), pool(std::move(pool)) {}
+
+  PooledBitmap(const PooledBitmap &) = delete;
+  PooledBitmap &operator=(const PooledBitmap &) = delete;
+
+  ~PooledBitmap() override {
+    if (const auto spPool = this->pool.lock()) {
+      spPool->Return(std::move(this->buffer), this->GetBufferSize());
+    }
+  }
+
+  PixelType GetPixelType() const override { return this->pixelType; }
+
+  IntSize GetSize() const override { return this->size; }
+
+  BitmapLockInfo Lock() override {
+    ++this->lockCount;
+    BitmapLockInfo lockInfo;
+    lockInfo.ptrData = this->buffer.get();
+    lockInfo.ptrDataRoi = this->buffer.get();
+    lockInfo.stride = this->stride;
+    lockInfo.size = this->GetBufferSize();
+    return lockInfo;
+  }
+
+  void Unlock() override { --this->lockCount; }
+
+private:
+  std::uint64_t GetBufferSize() const {
+    return static_cast<std::uint64_t>(this->stride) * this->size.h;
+  }
+
+  PixelType pixelType;
+  IntSize size;
+  std::uint32_t stride;
+  BufferPool::Buffer buffer;
+  std::weak_ptr<BufferPool> pool;
+  std::atomic<int> lockCount{0};
+};
+
+std::shared_ptr<IBitmapData> BufferPool::CreateBitmap(PixelType pixelType,
+                                                      std::uint32_t width,
+                                                      std::uint32_t height) {
+  const auto stride =
+      (Utils::GetBytesPerPixel(pixelType) * static_cast<std::uint32_t>(width) +
+       3) /
+      4 * 4;
+  const auto size = static_cast<std::uint64_t>(stride) * height;
+  Buffer buffer;
+  {
+    std::lock_guard<std::mutex> lock(this->mutex);
+    // the most recently returned buffer of the size is reused, as it is the
+    // most likely to still be cached
+    for (auto it = this->idle.rbegin(); it != this->idle.rend(); ++it) {
+      if (it->first == size) {
+        buffer = std::move(it->second);
+        this->idle.erase(std::next(it).base());
+        this->statistics.idleBytes -= size;
+        ++this->statistics.hits;
+        break;
+      }
+    }
+
+    if (!buffer) {
+      ++this->statistics.misses;
+    }
+  }
+
+  if (!buffer) {
+    // the buffer is not initialized, like the buffers of libCZI's bitmaps
+    buffer.reset(new std::uint8_t[std::max<std::uint64_t>(size, 1)]);
+  }
+
+  return std::make_shared<PooledBitmap>(pixelType, width, height, stride,
+                                        std::move(buffer), weak_from_this());
+}
+
+void BufferPool::Return(Buffer buffer, std::uint64_t size) {
+  std::lock_guard<std::mutex> lock(this->mutex);
+  if (size > this->maxBytes) {
+    return;
+  }
+
+  while (this->statistics.idleBytes + size > this->maxBytes) {
+    this->statistics.idleBytes -= this->idle.front().first;
+    this->idle.pop_front();
+    ++this->statistics.evictions;
+  }
+
+  this->idle.emplace_back(size, std::move(buffer));
+  this->statistics.idleBytes += size;
+}
+
+BufferPoolStatistics BufferPool::GetStatistics() const {
+  std::lock_guard<std::mutex> lock(this->mutex);
+  auto statistics = this->statistics;
+  statistics.maxBytes = this->maxBytes;
+  statistics.idleBuffers = this->idle.size();
+  return statistics;
+}
+
+void BufferPool::Clear() {
+  std::lock_guard<std::mutex> lock(this->mutex);
+  this->idle.clear();
+  this->statistics.idleBytes = 0;
+}
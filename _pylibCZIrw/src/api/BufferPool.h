@@ -0,0 +1,65 @@
+#pragma once
+
+#include "inc_libCzi.h"
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <utility>
+
+/// The usage counters and the state of a buffer pool.
+struct BufferPoolStatistics {
+  std::uint64_t maxBytes = 0;    ///< The maximum size of the idle buffers kept.
+  std::uint64_t idleBytes = 0;   ///< The size of the idle buffers kept.
+  std::uint64_t idleBuffers = 0; ///< The number of idle buffers kept.
+  std::uint64_t hits = 0; ///< The number of bitmaps created on a reused buffer.
+  std::uint64_t misses = 0;    ///< The number of buffers allocated.
+  std::uint64_t evictions = 0; ///< The number of idle buffers freed to stay
+                               ///< within maxBytes.
+};
+
+/// A pool of the buffers of bitmaps. The buffer of a bitmap created by the pool
+/// is returned to the pool when the bitmap is destroyed, and reused for the
+/// next bitmap of the same size in bytes, so that repeated reads of the same
+/// size (e.g. the tiles of a viewer) do not allocate and free their bitmaps
+/// every time. The least recently returned idle buffers are freed to keep the
+/// idle buffers within the maximum size. The pool may be shared by several
+/// readers and threads, and its bitmaps may outlive it.
+class BufferPool : public std::enable_shared_from_this<BufferPool> {
+public:
+  /// Constructor.
+  /// \param  maxBytes    The maximum size (in bytes) of the idle buffers kept.
+  explicit BufferPool(std::uint64_t maxBytes) : maxBytes(maxBytes) {}
+
+  BufferPool(const BufferPool &) = delete;
+  BufferPool &operator=(const BufferPool &) = delete;
+
+  /// Creates a bitmap (with the stride libCZI uses, i.e. rows padded to 4
+  /// bytes) on an idle buffer of the same size, or on a newly allocated one.
+  /// The content of the bitmap is undefined.
+  std::shared_ptr<libCZI::IBitmapData> CreateBitmap(libCZI::PixelType pixelType,
+                                                    std::uint32_t width,
+                                                    std::uint32_t height);
+
+  /// Returns the usage counters and the state of the pool.
+  BufferPoolStatistics GetStatistics() const;
+
+  /// Frees all idle buffers.
+  void Clear();
+
+private:
+  friend class PooledBitmap;
+
+  using Buffer = std::unique_ptr<std::uint8_t[]>;
+
+  /// Takes back the buffer of a destroyed bitmap, freeing the least recently
+  /// returned idle buffers if the idle buffers exceed the maximum size.
+  void Return(Buffer buffer, std::uint64_t size);
+
+  const std::uint64_t maxBytes; ///< The maximum size of the idle buffers kept.
+  mutable std::mutex mutex;     ///< Guards the idle buffers and the counters.
+  std::deque<std::pair<std::uint64_t, Buffer>>
+      idle; ///< The idle buffers and their sizes, least recently returned
+            ///< first.
+  BufferPoolStatistics statistics; ///< The counters and the idle size.
+};
@@ -1,13 +1,129 @@
 #include "CZIreadAPI.h"
+#include "ExternalBitmap.h"
+#include "Resampling.h"
 #include "StaticContext.h"
+#include "site.h"
 
+#include <algorithm>
+#include <atomic>
 #include <codecvt>
+#include <cstring>
+#include <exception>
+#include <limits>
 #include <locale>
+#include <mutex>
+#include <numeric>
 #include <sstream>
+#include <thread>
+#include <unordered_map>
 
 using namespace libCZI;
 using namespace std;
 
+namespace {
+/// Returns for each of the rectangles (in the order they are drawn) whether
+/// it covers pixels of the ROI not covered by the rectangles drawn after it,
+/// c.f. the visibility check optimization of the accessor. The coverage is
+/// computed on the grid of the (distinct) edges of the rectangles.
+std::vector<bool> FindVisible(const IntRect &roi,
+                              const std::vector<IntRect> &rects) {
+  std::vector<bool> visible(rects.size(), false);
+  if (!roi.IsNonEmpty()) {
+    return visible;
+  }
+
+  std::vector<int> xs{roi.x, roi.x + roi.w};
+  std::vector<int> ys{roi.y, roi.y + roi.h};
+  for (const auto &rect : rects) {
+    xs.push_back(std::clamp(rect.x, roi.x, roi.x + roi.w));
+    xs.push_back(std::clamp(rect.x + rect.w, roi.x, roi.x + roi.w));
+    ys.push_back(std::clamp(rect.y, roi.y, roi.y + roi.h));
+    ys.push_back(std::clamp(rect.y + rect.h, roi.y, roi.y + roi.h));
+  }
+
+  for (auto *edges : {&xs, &ys}) {
+    std::sort(edges->begin(), edges->end());
+    edges->erase(std::unique(edges->begin(), edges->end()), edges->end());
+  }
+
+  const auto cellIndex = [](const std::vector<int> &edges, int value) {
+    return static_cast<size_t>(
+        std::lower_bound(edges.begin(), edges.end(), value) - edges.begin());
+  };
+  const auto columns = xs.size() - 1;
+  std::vector<char> covered(columns * (ys.size() - 1), 0);
+  size_t coveredCells = 0;
+  // the last rectangle is drawn on top, so the rectangles are added from the
+  // last one until the ROI is covered
+  for (size_t i = rects.size(); i-- > 0 && coveredCells < covered.size();) {
+    const auto &rect = rects[i];
+    const auto x0 = cellIndex(xs, std::clamp(rect.x, roi.x, roi.x + roi.w));
+    const auto x1 =
+        cellIndex(xs, std::clamp(rect.x + rect.w, roi.x, roi.x + roi.w));
+    const auto y0 = cellIndex(ys, std::clamp(rect.y, roi.y, roi.y + roi.h));
+    const auto y1 =
+        cellIndex(ys, std::clamp(rect.y + rect.h, roi.y, roi.y + roi.h));
+    for (auto y = y0; y < y1; ++y) {
+      for (auto x = x0; x < x1; ++x) {
+        if (!covered[y * columns + x]) {
+          covered[y * columns + x] = 1;
+          ++coveredCells;
+          visible[i] = true;
+        }
+      }
+    }
+  }
+
+  return visible;
+}
+
+/// A subblock cache for the duration of a batch of reads: every subblock read
+/// is kept in a temporary cache, in front of the cache of the reader (if any),
+/// which only gets the subblocks the accessor would add to it.
+class BatchSubBlockCache : public ISubBlockCacheOperation {
+public:
+  BatchSubBlockCache(std::shared_ptr<ISubBlockCache> batchCache,
+                     std::shared_ptr<ISubBlockCacheOperation> readerCache,
+                     bool readerCacheOnlyCompressed,
+                     std::shared_ptr<ISubBlockRepository> repository)
+      : batchCache(std::move(batchCache)), readerCache(std::move(readerCache)),
+        readerCacheOnlyCompressed(readerCacheOnlyCompressed),
+        repository(std::move(repository)) {}
+
+  std::shared_ptr<IBitmapData> Get(int subblock_index) override {
+    auto bitmap = this->batchCache->Get(subblock_index);
+    if (!bitmap && this->readerCache) {
+      bitmap = this->readerCache->Get(subblock_index);
+    }
+
+    return bitmap;
+  }
+
+  void Add(int subblock_index, std::shared_ptr<IBitmapData> pBitmap) override {
+    SubBlockInfo info;
+    if (this->readerCache &&
+        (!this->readerCacheOnlyCompressed ||
+         (this->repository->TryGetSubBlockInfo(subblock_index, &info) &&
+          info.GetCompressionMode() != CompressionMode::UnCompressed))) {
+      this->readerCache->Add(subblock_index, pBitmap);
+    }
+
+    this->batchCache->Add(subblock_index, std::move(pBitmap));
+  }
+
+private:
+  std::shared_ptr<ISubBlockCache> batchCache;
+  std::shared_ptr<ISubBlockCacheOperation> readerCache;
+  bool readerCacheOnlyCompressed;
+  std::shared_ptr<ISubBlockRepository> repository;
+};
+
+/// Returns the largest integer not greater than value / divisor (divisor > 0).
+std::int64_t FloorDivide(std::int64_t value, std::int64_t divisor) {
+  return value >= 0 ? value / divisor : -((-value + divisor - 1) / divisor);
+}
+} // namespace
+
 CZIreadAPI::CZIreadAPI(const std::wstring &fileName)
     : CZIreadAPI("", fileName, SubBlockCacheOptions()) {}
 
@@ -21,11 +137,13 @@ CZIreadAPI::CZIreadAPI(const std::string &stream_class_name,
 
 CZIreadAPI::CZIreadAPI(const std::string &stream_class_name,
                        const std::wstring &fileName,
-                       const SubBlockCacheOptions &subBlockCacheOptions) {
+                       const SubBlockCacheOptions &subBlockCacheOptions)
+    : spProfiler(make_shared<ReadProfiler>()) {
   shared_ptr<IStream> stream;
   if (stream_class_name.empty() || stream_class_name == "standard") {
     stream = StreamsFactory::CreateDefaultStreamForFile(fileName.c_str());
   } else if (stream_class_name == "curl") {
+    InitializeStreams();
     StreamsFactory::CreateStreamInfo create_info;
     create_info.class_name = kStaticContext.GetStreamClassNameForCurlReader();
 
@@ -44,9 +162,21 @@ CZIreadAPI::CZIreadAPI(const std::string &stream_class_name,
     }
   }
 
+  if (!stream) {
+    stringstream string_stream;
+    string_stream << "The specified stream class is not supported: "
+                  << stream_class_name << '.';
+    throw std::invalid_argument(string_stream.str());
+  }
+
+  this->spStream = make_shared<ProfilingInputStream>(stream, this->spProfiler);
   const auto reader = libCZI::CreateCZIReader();
-  reader->Open(stream);
-  this->spAccessor = reader->CreateSingleChannelScalingTileAccessor();
+  reader->Open(this->spStream);
+  this->spRepository =
+      make_shared<ProfilingSubBlockRepository>(reader, this->spProfiler);
+  this->spAccessor =
+      dynamic_pointer_cast<ISingleChannelScalingTileAccessor>(CreateAccesor(
+          this->spRepository, AccessorType::SingleChannelScalingTileAccessor));
   this->spReader = reader;
   this->subBlockCacheOptions = subBlockCacheOptions;
   if (subBlockCacheOptions.cacheType == CacheType::Standard) {
@@ -104,10 +234,8 @@ libCZI::SubBlockStatistics CZIreadAPI::GetSubBlockStats() {
   return this->spReader->GetStatistics();
 }
 
-std::unique_ptr<PImage> CZIreadAPI::GetSingleChannelScalingTileAccessorData(
-    libCZI::PixelType pixeltype, libCZI::IntRect roi,
-    libCZI::RgbFloatColor bgColor, float zoom,
-    const std::string &coordinateString, const std::wstring &SceneIndexes) {
+libCZI::CDimCoordinate
+CZIreadAPI::ParsePlaneCoordinate(const std::string &coordinateString) {
   libCZI::CDimCoordinate planeCoordinate;
   try {
     planeCoordinate = CDimCoordinate::Parse(coordinateString.c_str());
@@ -115,13 +243,35 @@ std::unique_ptr<PImage> CZIreadAPI::GetSingleChannelScalingTileAccessorData(
     // TODO Error handling
   }
 
+  return planeCoordinate;
+}
+
+void CZIreadAPI::PruneSubBlockCache() {
+  if (this->spSubBlockCache) {
+    ReadProfiler::ScopedTimer timer(this->spProfiler->pruneNanoseconds);
+    this->spSubBlockCache->Prune(this->subBlockCacheOptions.pruneOptions);
+  }
+}
+
+libCZI::ISingleChannelScalingTileAccessor::Options
+CZIreadAPI::CreateAccessorOptions(libCZI::RgbFloatColor bgColor,
+                                  const std::wstring &SceneIndexes,
+                                  const AccessorOptions &accessorOptions) {
   libCZI::ISingleChannelScalingTileAccessor::Options scstaOptions;
   scstaOptions.Clear();
+  scstaOptions.sortByM = accessorOptions.sortByM;
   scstaOptions.useVisibilityCheckOptimization =
-      true; // enable the "visibility check optimization"
-  scstaOptions.backGroundColor = bgColor;
+      accessorOptions.useVisibilityCheck;
+  // a NaN background color makes the accessor skip filling the bitmap
+  scstaOptions.backGroundColor =
+      accessorOptions.fillBackground
+          ? bgColor
+          : RgbFloatColor{numeric_limits<float>::quiet_NaN(),
+                          numeric_limits<float>::quiet_NaN(),
+                          numeric_limits<float>::quiet_NaN()};
   if (this->spSubBlockCache) {
-    scstaOptions.subBlockCache = this->spSubBlockCache;
+    scstaOptions.subBlockCache = make_shared<ProfilingSubBlockCache>(
+        this->spSubBlockCache, this->spProfiler);
     scstaOptions.onlyUseSubBlockCacheForCompressedData =
         this->subBlockCacheOptions.cacheOnlyCompressed;
   }
@@ -130,17 +280,622 @@ std::unique_ptr<PImage> CZIreadAPI::GetSingleChannelScalingTileAccessorData(
     scstaOptions.sceneFilter = libCZI::Utils::IndexSetFromString(SceneIndexes);
   }
 
-  std::shared_ptr<libCZI::IBitmapData> Data = this->spAccessor->Get(
-      pixeltype, roi, &planeCoordinate, zoom, &scstaOptions);
+  return scstaOptions;
+}
 
-  if (this->spSubBlockCache) {
-    this->spSubBlockCache->Prune(this->subBlockCacheOptions.pruneOptions);
+std::shared_ptr<libCZI::ISingleChannelScalingTileAccessor>
+CZIreadAPI::GetAccessor(const AccessorOptions &accessorOptions) {
+  if (!accessorOptions.filterSubBlocks) {
+    return this->spAccessor;
   }
 
+  // the accessor is cheap to create, it holds no state besides its repository
+  return dynamic_pointer_cast<ISingleChannelScalingTileAccessor>(
+      CreateAccesor(make_shared<FilteredSubBlockRepository>(this->spRepository,
+                                                            accessorOptions),
+                    AccessorType::SingleChannelScalingTileAccessor));
+}
+
+std::shared_ptr<libCZI::IBitmapData>
+CZIreadAPI::CreateBitmap(libCZI::PixelType pixeltype, std::uint32_t width,
+                         std::uint32_t height) {
+  if (this->spBufferPool) {
+    return this->spBufferPool->CreateBitmap(pixeltype, width, height);
+  }
+
+  return libCZI::GetDefaultSiteObject(libCZI::SiteObjectType::Default)
+      ->CreateBitmap(pixeltype, width, height);
+}
+
+std::shared_ptr<libCZI::IBitmapData> CZIreadAPI::Compose(
+    libCZI::ISingleChannelScalingTileAccessor *accessor,
+    libCZI::PixelType pixeltype, const libCZI::IntRect &roi,
+    const libCZI::IDimCoordinate *planeCoordinate, float zoom,
+    const libCZI::ISingleChannelScalingTileAccessor::Options &scstaOptions) {
+  const auto size = accessor->CalcSize(roi, zoom);
+  auto bitmap = this->CreateBitmap(pixeltype, size.w, size.h);
+  accessor->Get(bitmap.get(), roi, planeCoordinate, zoom, &scstaOptions);
+  return bitmap;
+}
+
+std::unique_ptr<PImage> CZIreadAPI::GetSingleChannelScalingTileAccessorData(
+    libCZI::PixelType pixeltype, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom,
+    const std::string &coordinateString, const std::wstring &SceneIndexes,
+    const AccessorOptions &accessorOptions) {
+  const auto planeCoordinate = ParsePlaneCoordinate(coordinateString);
+  const auto scstaOptions =
+      this->CreateAccessorOptions(bgColor, SceneIndexes, accessorOptions);
+  const auto accessor = this->GetAccessor(accessorOptions);
+
+  std::shared_ptr<libCZI::IBitmapData> Data = this->Compose(
+      accessor.get(), pixeltype, roi, &planeCoordinate, zoom, scstaOptions);
+
+  this->PruneSubBlockCache();
+
   std::unique_ptr<PImage> ptr_Bitmap(new PImage(Data));
   return ptr_Bitmap;
 }
 
+std::unique_ptr<PImage> CZIreadAPI::GetAreaResampledData(
+    libCZI::PixelType pixeltype, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom,
+    const std::string &coordinateString, const std::wstring &SceneIndexes,
+    const AccessorOptions &accessorOptions) {
+  const auto planeCoordinate = ParsePlaneCoordinate(coordinateString);
+  const auto scstaOptions =
+      this->CreateAccessorOptions(bgColor, SceneIndexes, accessorOptions);
+  const auto accessor = this->GetAccessor(accessorOptions);
+  const auto destSize = accessor->CalcSize(roi, zoom);
+  const auto Data = this->CreateBitmap(pixeltype, destSize.w, destSize.h);
+  this->ComposeAreaResampled(accessor.get(), pixeltype, roi, &planeCoordinate,
+                             scstaOptions, Data.get());
+  std::unique_ptr<PImage> ptr_Bitmap(new PImage(Data));
+  return ptr_Bitmap;
+}
+
+void CZIreadAPI::ComposeAreaResampled(
+    libCZI::ISingleChannelScalingTileAccessor *accessor,
+    libCZI::PixelType pixeltype, const libCZI::IntRect &roi,
+    const libCZI::IDimCoordinate *planeCoordinate,
+    const libCZI::ISingleChannelScalingTileAccessor::Options &scstaOptions,
+    libCZI::IBitmapData *dest) {
+  AreaResampler resampler(
+      pixeltype,
+      IntSize{static_cast<uint32_t>(roi.w), static_cast<uint32_t>(roi.h)},
+      dest->GetSize());
+
+  // the ROI is composed at full resolution band by band, so that no more than
+  // one band of the source (plus the destination) is held in memory at a time
+  const auto bytesPerRow =
+      static_cast<size_t>(roi.w) * libCZI::Utils::GetBytesPerPixel(pixeltype);
+  const auto bandHeight = static_cast<int>(std::clamp<size_t>(
+      kMaxResamplingBandSize / std::max<size_t>(bytesPerRow, 1), 1,
+      static_cast<size_t>(roi.h)));
+  for (int y = 0; y < roi.h; y += bandHeight) {
+    const IntRect band{roi.x, roi.y + y, roi.w,
+                       std::min(bandHeight, roi.h - y)};
+    const auto bandData = this->Compose(accessor, pixeltype, band,
+                                        planeCoordinate, 1.0f, scstaOptions);
+    resampler.Add(bandData.get(), static_cast<uint32_t>(y));
+
+    this->PruneSubBlockCache();
+  }
+
+  resampler.WriteTo(dest);
+}
+
+void CZIreadAPI::ReadMany(libCZI::PixelType pixeltype,
+                          const std::vector<libCZI::IntRect> &rois,
+                          libCZI::RgbFloatColor bgColor,
+                          const std::string &coordinateString,
+                          const std::wstring &SceneIndexes,
+                          const std::vector<libCZI::IBitmapData *> &dest) {
+  if (rois.size() != dest.size()) {
+    throw std::invalid_argument(
+        "The number of ROIs and destination bitmaps must be the same.");
+  }
+
+  const auto planeCoordinate = ParsePlaneCoordinate(coordinateString);
+  auto scstaOptions = this->CreateAccessorOptions(bgColor, SceneIndexes);
+
+  // a cache for the duration of this call makes sure that subblocks shared by
+  // several ROIs are read and decoded only once, also those the cache of the
+  // reader does not keep (e.g. uncompressed ones)
+  const auto batchCache = libCZI::CreateSubBlockCache();
+  scstaOptions.subBlockCache = make_shared<ProfilingSubBlockCache>(
+      make_shared<BatchSubBlockCache>(
+          batchCache, this->spSubBlockCache,
+          this->subBlockCacheOptions.cacheOnlyCompressed, this->spRepository),
+      this->spProfiler);
+  scstaOptions.onlyUseSubBlockCacheForCompressedData = false;
+
+  libCZI::ISubBlockCacheControl::PruneOptions batchCachePruneOptions;
+  batchCachePruneOptions.maxMemoryUsage = kMaxReadManyCacheSize;
+  for (const auto index : this->GetReadOrder(rois, planeCoordinate)) {
+    this->spAccessor->Get(dest[index], rois[index], &planeCoordinate, 1.0f,
+                          &scstaOptions);
+    ReadProfiler::ScopedTimer timer(this->spProfiler->pruneNanoseconds);
+    batchCache->Prune(batchCachePruneOptions);
+  }
+
+  this->PruneSubBlockCache();
+}
+
+std::vector<size_t>
+CZIreadAPI::GetReadOrder(const std::vector<libCZI::IntRect> &rois,
+                         const libCZI::CDimCoordinate &planeCoordinate) {
+  // the layer-0 subblocks of the plane are put into the cells of a grid as
+  // large as the largest of them, so that each ROI is only compared with the
+  // subblocks in the cells it overlaps
+  std::vector<const Layer0SubBlock *> subBlocks;
+  std::int64_t cellWidth = 1;
+  std::int64_t cellHeight = 1;
+  for (const auto &subBlock : this->GetLayer0SubBlocks()) {
+    if (subBlock.logicalRect.IsNonEmpty() &&
+        IsOnPlane(planeCoordinate, subBlock.coordinate)) {
+      subBlocks.push_back(&subBlock);
+      cellWidth = std::max<std::int64_t>(cellWidth, subBlock.logicalRect.w);
+      cellHeight = std::max<std::int64_t>(cellHeight, subBlock.logicalRect.h);
+    }
+  }
+
+  const auto cellKey = [](std::int64_t column, std::int64_t row) {
+    return (static_cast<std::uint64_t>(row) << 32) ^
+           static_cast<std::uint32_t>(column);
+  };
+  const auto forEachCell = [&](const libCZI::IntRect &rect,
+                               const std::function<void(std::uint64_t)> &f) {
+    const auto column1 =
+        FloorDivide(std::int64_t{rect.x} + rect.w - 1, cellWidth);
+    const auto row1 =
+        FloorDivide(std::int64_t{rect.y} + rect.h - 1, cellHeight);
+    for (auto row = FloorDivide(rect.y, cellHeight); row <= row1; ++row) {
+      for (auto column = FloorDivide(rect.x, cellWidth); column <= column1;
+           ++column) {
+        f(cellKey(column, row));
+      }
+    }
+  };
+  std::unordered_map<std::uint64_t, std::vector<const Layer0SubBlock *>> cells;
+  for (const auto *subBlock : subBlocks) {
+    forEachCell(subBlock->logicalRect,
+                [&](std::uint64_t key) { cells[key].push_back(subBlock); });
+  }
+
+  // each ROI is keyed by the first (in the file) subblock it touches, ROIs
+  // without any subblocks go last
+  std::vector<std::uint64_t> keys(rois.size(),
+                                  numeric_limits<std::uint64_t>::max());
+  for (size_t i = 0; i < rois.size(); ++i) {
+    const auto &roi = rois[i];
+    if (!roi.IsNonEmpty()) {
+      continue;
+    }
+
+    const auto compare = [&](const Layer0SubBlock *subBlock) {
+      if (roi.IntersectsWith(subBlock->logicalRect)) {
+        keys[i] = std::min(keys[i], subBlock->filePosition);
+      }
+    };
+    const auto cellCount =
+        (FloorDivide(std::int64_t{roi.x} + roi.w - 1, cellWidth) -
+         FloorDivide(roi.x, cellWidth) + 1) *
+        (FloorDivide(std::int64_t{roi.y} + roi.h - 1, cellHeight) -
+         FloorDivide(roi.y, cellHeight) + 1);
+    if (static_cast<std::uint64_t>(cellCount) > subBlocks.size()) {
+      // a ROI spanning more cells than there are subblocks
+      std::for_each(subBlocks.begin(), subBlocks.end(), compare);
+      continue;
+    }
+
+    forEachCell(roi, [&](std::uint64_t cell) {
+      const auto found = cells.find(cell);
+      if (found != cells.end()) {
+        std::for_each(found->second.begin(), found->second.end(), compare);
+      }
+    });
+  }
+
+  std::vector<size_t> order(rois.size());
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(),
+                   [&](size_t a, size_t b) { return keys[a] < keys[b]; });
+  return order;
+}
+
+const std::vector<CZIreadAPI::Layer0SubBlock> &
+CZIreadAPI::GetLayer0SubBlocks() {
+  std::call_once(this->layer0SubBlocksFlag, [this]() {
+    this->spReader->EnumerateSubBlocksEx(
+        [&](int, const libCZI::DirectorySubBlockInfo &info) {
+          if (info.physicalSize.w == info.logicalRect.w &&
+              info.physicalSize.h == info.logicalRect.h) {
+            this->layer0SubBlocks.push_back(
+                {info.logicalRect, info.coordinate, info.filePosition});
+          }
+
+          return true;
+        });
+  });
+
+  return this->layer0SubBlocks;
+}
+
+bool CZIreadAPI::IsOnPlane(const libCZI::CDimCoordinate &planeCoordinate,
+                           const libCZI::CDimCoordinate &coordinate) {
+  bool isOnPlane = true;
+  planeCoordinate.EnumValidDimensions([&](libCZI::DimensionIndex dimension,
+                                          int value) {
+    int position;
+    isOnPlane =
+        coordinate.TryGetPosition(dimension, &position) && position == value;
+    return isOnPlane;
+  });
+  return isOnPlane;
+}
+
+std::vector<SubBlockDirectoryEntry>
+CZIreadAPI::GetSubBlockDirectory(const std::string &coordinateString,
+                                 const std::optional<libCZI::IntRect> &roi,
+                                 bool onlyLayer0,
+                                 const std::wstring &SceneIndexes) {
+  const auto planeCoordinate = ParsePlaneCoordinate(coordinateString);
+  std::shared_ptr<libCZI::IIndexSet> sceneFilter;
+  if (!SceneIndexes.empty()) {
+    sceneFilter = libCZI::Utils::IndexSetFromString(SceneIndexes);
+  }
+
+  std::vector<SubBlockDirectoryEntry> entries;
+  this->spReader->EnumerateSubBlocksEx(
+      [&](int index, const libCZI::DirectorySubBlockInfo &info) {
+        if (onlyLayer0 && (info.physicalSize.w != info.logicalRect.w ||
+                           info.physicalSize.h != info.logicalRect.h)) {
+          return true;
+        }
+
+        if (roi && !roi->IntersectsWith(info.logicalRect)) {
+          return true;
+        }
+
+        if (!IsOnPlane(planeCoordinate, info.coordinate)) {
+          return true;
+        }
+
+        int sceneIndex = -1;
+        const bool hasScene =
+            info.coordinate.TryGetPosition(DimensionIndex::S, &sceneIndex);
+        if (sceneFilter && hasScene && !sceneFilter->IsContained(sceneIndex)) {
+          return true;
+        }
+
+        SubBlockDirectoryEntry entry;
+        entry.index = index;
+        entry.logicalRect = info.logicalRect;
+        entry.physicalSize = info.physicalSize;
+        entry.pixelType = info.pixelType;
+        entry.compressionModeRaw = info.compressionModeRaw;
+        entry.hasMIndex = info.IsMindexValid();
+        entry.mIndex = entry.hasMIndex ? info.mIndex : 0;
+        entry.sceneIndex = hasScene ? sceneIndex : -1;
+        entry.coordinate =
+            libCZI::Utils::DimCoordinateToString(&info.coordinate);
+        entry.filePosition = info.filePosition;
+        entries.push_back(std::move(entry));
+        return true;
+      });
+
+  return entries;
+}
+
+const std::vector<std::uint64_t> &CZIreadAPI::GetSegmentSizes() {
+  std::call_once(this->segmentSizesFlag, [this]() {
+    std::vector<std::pair<std::uint64_t, int>> positions;
+    this->spReader->EnumerateSubBlocksEx(
+        [&](int index, const libCZI::DirectorySubBlockInfo &info) {
+          positions.emplace_back(info.filePosition, index);
+          return true;
+        });
+    std::sort(positions.begin(), positions.end());
+
+    std::vector<std::uint64_t> sizes;
+    for (size_t i = 0; i < positions.size(); ++i) {
+      const auto index = static_cast<size_t>(positions[i].second);
+      sizes.resize(std::max(sizes.size(), index + 1));
+      if (i + 1 < positions.size()) {
+        sizes[index] = positions[i + 1].first - positions[i].first;
+        continue;
+      }
+
+      // the segment header is the id (16 bytes), the allocated size of the
+      // segment data (8 bytes) and the used size (8 bytes)
+      std::uint8_t header[32] = {};
+      std::uint64_t bytesRead = 0;
+      this->spStream->Read(positions[i].first, header, sizeof(header),
+                           &bytesRead);
+      std::int64_t allocatedSize = 0;
+      if (bytesRead == sizeof(header)) {
+        std::memcpy(&allocatedSize, header + 16, sizeof(allocatedSize));
+      }
+
+      sizes[index] = sizeof(header) + std::max<std::int64_t>(allocatedSize, 0);
+    }
+
+    this->segmentSizes = std::move(sizes);
+  });
+
+  return this->segmentSizes;
+}
+
+std::vector<ReadPlanEntry> CZIreadAPI::GetReadPlan(
+    libCZI::IntRect roi, float zoom, const std::string &coordinateString,
+    const std::wstring &SceneIndexes, const AccessorOptions &accessorOptions) {
+  auto subBlocks =
+      this->GetSubBlockDirectory(coordinateString, roi, false, L"");
+  subBlocks.erase(std::remove_if(subBlocks.begin(), subBlocks.end(),
+                                 [&](const SubBlockDirectoryEntry &subBlock) {
+                                   return !accessorOptions.IsSelected(
+                                       subBlock.index);
+                                 }),
+                  subBlocks.end());
+  const auto &segmentSizes = this->GetSegmentSizes();
+
+  // like the accessor, the scenes involved are those whose bounding box
+  // intersects with the ROI, and the subblocks are grouped by scene only if
+  // there are several of them
+  std::shared_ptr<libCZI::IIndexSet> sceneFilter;
+  if (!SceneIndexes.empty()) {
+    sceneFilter = libCZI::Utils::IndexSetFromString(SceneIndexes);
+  }
+
+  std::vector<int> scenes;
+  for (const auto &scene : this->spReader->GetStatistics().sceneBoundingBoxes) {
+    if ((!sceneFilter || sceneFilter->IsContained(scene.first)) &&
+        scene.second.boundingBox.IntersectsWith(roi)) {
+      scenes.push_back(scene.first);
+    }
+  }
+
+  std::vector<std::vector<const SubBlockDirectoryEntry *>> groups;
+  if (scenes.size() <= 1) {
+    groups.emplace_back();
+    for (const auto &subBlock : subBlocks) {
+      if (subBlock.sceneIndex < 0 ||
+          std::find(scenes.begin(), scenes.end(), subBlock.sceneIndex) !=
+              scenes.end()) {
+        groups.back().push_back(&subBlock);
+      }
+    }
+  } else {
+    for (const auto scene : scenes) {
+      groups.emplace_back();
+      for (const auto &subBlock : subBlocks) {
+        if (subBlock.sceneIndex == scene) {
+          groups.back().push_back(&subBlock);
+        }
+      }
+    }
+  }
+
+  const auto zoomOf = [](const SubBlockDirectoryEntry *subBlock) {
+    return libCZI::Utils::CalcZoom(subBlock->logicalRect,
+                                   subBlock->physicalSize);
+  };
+  const auto isOnLayer0 = [](const SubBlockDirectoryEntry *subBlock) {
+    return subBlock->logicalRect.w ==
+               static_cast<int>(subBlock->physicalSize.w) &&
+           subBlock->logicalRect.h ==
+               static_cast<int>(subBlock->physicalSize.h);
+  };
+
+  std::vector<ReadPlanEntry> plan;
+  for (auto &group : groups) {
+    // sorted by zoom and, on pyramid layer 0, by M-index (drawn last, i.e. on
+    // top, is the subblock with the highest M-index) unless disabled
+    std::stable_sort(group.begin(), group.end(), [&](auto a, auto b) {
+      if (zoomOf(a) != zoomOf(b)) {
+        return zoomOf(a) < zoomOf(b);
+      }
+
+      if (!accessorOptions.sortByM || !isOnLayer0(a) || !isOnLayer0(b)) {
+        return false;
+      }
+
+      const int mIndexA = a->hasMIndex ? a->mIndex : numeric_limits<int>::min();
+      const int mIndexB = b->hasMIndex ? b->mIndex : numeric_limits<int>::min();
+      return mIndexA < mIndexB;
+    });
+
+    // the layer drawn starts at the first subblock with a zoom not smaller
+    // than the requested one, and ends at about twice its zoom
+    const auto start = std::find_if(group.begin(), group.end(),
+                                    [&](auto a) { return zoomOf(a) >= zoom; });
+    if (start == group.end()) {
+      continue;
+    }
+
+    const auto end = std::find_if(start + 1, group.end(), [&](auto a) {
+      return zoomOf(a) >= zoomOf(*start) * 1.9f;
+    });
+
+    std::vector<IntRect> rects;
+    for (auto it = start; it != end; ++it) {
+      rects.push_back((*it)->logicalRect);
+    }
+
+    // without the visibility check, the accessor draws every subblock
+    const auto visible = accessorOptions.useVisibilityCheck
+                             ? FindVisible(roi, rects)
+                             : std::vector<bool>(rects.size(), true);
+    for (auto it = start; it != end; ++it) {
+      ReadPlanEntry entry;
+      entry.subBlock = **it;
+      const auto index = static_cast<size_t>(entry.subBlock.index);
+      entry.segmentSize = index < segmentSizes.size() ? segmentSizes[index] : 0;
+      entry.visible = visible[static_cast<size_t>(it - start)];
+      entry.cached = this->spSubBlockCache &&
+                     this->spSubBlockCache->Get(entry.subBlock.index);
+      plan.push_back(std::move(entry));
+    }
+  }
+
+  return plan;
+}
+
+PixelStatistics
+CZIreadAPI::GetSubBlockPixelStatistics(const std::vector<int> &subBlockIndices,
+                                       std::uint32_t bins, double rangeMin,
+                                       double rangeMax) {
+  StatisticsAccumulator accumulator(bins, rangeMin, rangeMax);
+  for (const auto index : subBlockIndices) {
+    const auto subBlock = this->spRepository->ReadSubBlock(index);
+    if (!subBlock) {
+      stringstream string_stream;
+      string_stream << "There is no subblock with index " << index << '.';
+      throw std::invalid_argument(string_stream.str());
+    }
+
+    accumulator.Add(subBlock->CreateBitmap().get());
+  }
+
+  return accumulator.GetStatistics();
+}
+
+libCZI::IntSize CZIreadAPI::CalcSize(const libCZI::IntRect &roi, float zoom) {
+  return this->spAccessor->CalcSize(roi, zoom);
+}
+
+void CZIreadAPI::ForEachConcurrently(
+    size_t count, std::uint32_t maxThreads,
+    const std::function<void(size_t)> &function) {
+  std::atomic<size_t> next{0};
+  std::mutex errorMutex;
+  std::exception_ptr error;
+  const auto callFunction = [&]() {
+    for (size_t i = next++; i < count; i = next++) {
+      try {
+        function(i);
+      } catch (...) {
+        std::lock_guard<std::mutex> lock(errorMutex);
+        if (!error) {
+          error = std::current_exception();
+        }
+
+        next = count; // let the other threads stop early
+        return;
+      }
+    }
+  };
+
+  const auto threadCount =
+      std::max<size_t>(1, std::min<size_t>(maxThreads, count));
+  std::vector<std::thread> threads;
+  for (size_t i = 1; i < threadCount; ++i) {
+    threads.emplace_back(callFunction);
+  }
+
+  callFunction();
+  for (auto &thread : threads) {
+    thread.join();
+  }
+
+  if (error) {
+    std::rethrow_exception(error);
+  }
+}
+
+void CZIreadAPI::Project(libCZI::PixelType pixeltype, libCZI::IntRect roi,
+                         libCZI::RgbFloatColor bgColor, float zoom,
+                         const std::vector<std::string> &coordinateStrings,
+                         const std::wstring &SceneIndexes,
+                         ProjectionAccumulator &accumulator,
+                         std::uint32_t maxThreads) {
+  const auto scstaOptions = this->CreateAccessorOptions(bgColor, SceneIndexes);
+  try {
+    ForEachConcurrently(coordinateStrings.size(), maxThreads, [&](size_t i) {
+      const auto planeCoordinate = ParsePlaneCoordinate(coordinateStrings[i]);
+      const auto bitmap = this->Compose(this->spAccessor.get(), pixeltype, roi,
+                                        &planeCoordinate, zoom, scstaOptions);
+      accumulator.Add(bitmap.get());
+    });
+  } catch (...) {
+    this->PruneSubBlockCache();
+    throw;
+  }
+
+  this->PruneSubBlockCache();
+}
+
+void CZIreadAPI::ReadPlanes(
+    libCZI::PixelType pixeltype, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom, bool areaResample,
+    const std::vector<std::string> &coordinateStrings,
+    const std::wstring &SceneIndexes,
+    const std::vector<StridedView3D<std::uint8_t>> &dest,
+    std::uint32_t maxThreads, const AccessorOptions &accessorOptions) {
+  if (coordinateStrings.size() != dest.size()) {
+    throw std::invalid_argument(
+        "The number of planes and destinations must be the same.");
+  }
+
+  const auto scstaOptions =
+      this->CreateAccessorOptions(bgColor, SceneIndexes, accessorOptions);
+  const auto accessor = this->GetAccessor(accessorOptions);
+  const auto destSize = accessor->CalcSize(roi, zoom);
+  const auto bytesPerPixel = libCZI::Utils::GetBytesPerPixel(pixeltype);
+  const auto composePlane = [&](size_t i) {
+    const auto planeCoordinate = ParsePlaneCoordinate(coordinateStrings[i]);
+    const auto &view = dest[i];
+    const auto itemSize = static_cast<std::ptrdiff_t>(
+        bytesPerPixel / std::max<size_t>(view.shape[2], 1));
+    const bool rowsContiguous =
+        view.strides[1] == static_cast<std::ptrdiff_t>(bytesPerPixel) &&
+        view.strides[0] >= 0 && view.strides[0] <= UINT32_MAX;
+    // the samples of a pixel in the order of the pixel type, or reversed
+    // (i.e. RGB instead of BGR)
+    const bool samplesReversed =
+        view.shape[2] == 3 && view.strides[2] == -itemSize;
+    if (rowsContiguous && (view.shape[2] == 1 || view.strides[2] == itemSize ||
+                           samplesReversed)) {
+      // the pixels within a row are contiguous, so the plane is composed
+      // directly into the destination (with reversed samples, the first
+      // sample of a pixel in memory is its last sample in the view)
+      ExternalBitmap bitmap(pixeltype, destSize.w, destSize.h,
+                            samplesReversed ? view.ptr + 2 * view.strides[2]
+                                            : view.ptr,
+                            static_cast<std::uint32_t>(view.strides[0]));
+      if (areaResample) {
+        this->ComposeAreaResampled(accessor.get(), pixeltype, roi,
+                                   &planeCoordinate, scstaOptions, &bitmap);
+      } else {
+        accessor->Get(&bitmap, roi, &planeCoordinate, zoom, &scstaOptions);
+      }
+
+      if (samplesReversed) {
+        ReverseSamples(&bitmap);
+      }
+    } else if (areaResample) {
+      const auto bitmap = this->CreateBitmap(pixeltype, destSize.w, destSize.h);
+      this->ComposeAreaResampled(accessor.get(), pixeltype, roi,
+                                 &planeCoordinate, scstaOptions, bitmap.get());
+      CopyToStridedView(bitmap.get(), view);
+    } else {
+      const auto bitmap = this->Compose(accessor.get(), pixeltype, roi,
+                                        &planeCoordinate, zoom, scstaOptions);
+      CopyToStridedView(bitmap.get(), view);
+    }
+  };
+
+  try {
+    ForEachConcurrently(coordinateStrings.size(), maxThreads, composePlane);
+  } catch (...) {
+    this->PruneSubBlockCache();
+    throw;
+  }
+
+  this->PruneSubBlockCache();
+}
+
 /// Returns an info struct on the subblock cache
 SubBlockCacheInfo CZIreadAPI::GetCacheInfo() {
   auto cacheInfo = SubBlockCacheInfo();
@@ -1,10 +1,20 @@
 #pragma once
 
+#include "AccessorOptions.h"
+#include "BufferPool.h"
+#include "Normalization.h"
 #include "PImage.h"
+#include "Profiling.h"
+#include "Projection.h"
+#include "Statistics.h"
 #include "SubBlockCache.h"
+#include "SubBlockDirectory.h"
 #include "inc_libCzi.h"
+#include <functional>
 #include <iostream>
+#include <mutex>
 #include <optional>
+#include <vector>
 
 /// Class used to represent a CZI reader object in pylibCZIrw.
 /// It gathers the libCZI features needed for reading in the pylibCZIrw project.
@@ -14,6 +24,10 @@ class CZIreadAPI {
 private:
   std::shared_ptr<libCZI::ICZIReader>
       spReader; ///< The pointer to the spReader.
+  std::shared_ptr<ProfilingInputStream>
+      spStream; ///< The stream, counting and optionally tracing the reads.
+  std::shared_ptr<libCZI::ISubBlockRepository>
+      spRepository; ///< The reader, counting the subblocks read and decoded.
   std::shared_ptr<libCZI::ISingleChannelScalingTileAccessor>
       spAccessor; ///< The pointer to the spAccessor object.
   std::shared_ptr<libCZI::ISubBlockCache>
@@ -21,6 +35,104 @@ private:
                        ///< null (in which case no caching is done)
   SubBlockCacheOptions
       subBlockCacheOptions; ///< Options for using the subblock cache
+  std::shared_ptr<ReadProfiler>
+      spProfiler; ///< The counters of the stream, subblocks and cache.
+  std::shared_ptr<BufferPool>
+      spBufferPool; ///< The pool the bitmaps composed are created from, may be
+                    ///< null (in which case they are allocated by libCZI)
+  std::vector<std::uint64_t>
+      segmentSizes; ///< The size of the segment of each subblock in the file
+                    ///< (by subblock index), c.f. GetSegmentSizes.
+  std::once_flag segmentSizesFlag; ///< Guards the computation of segmentSizes.
+
+  /// A subblock on pyramid layer 0, as listed in the subblock directory.
+  struct Layer0SubBlock {
+    libCZI::IntRect logicalRect;       ///< The rectangle the subblock covers.
+    libCZI::CDimCoordinate coordinate; ///< The plane coordinate.
+    std::uint64_t filePosition;        ///< The position in the file.
+  };
+  std::vector<Layer0SubBlock>
+      layer0SubBlocks; ///< The subblocks on pyramid layer 0, in the order of
+                       ///< the subblock directory, c.f. GetLayer0SubBlocks.
+  std::once_flag
+      layer0SubBlocksFlag; ///< Guards the computation of layer0SubBlocks.
+
+  /// The maximum size (in bytes) of a band of the source composed at once when
+  /// resampling (the band is at least one row high).
+  static constexpr size_t kMaxResamplingBandSize = 64 * 1024 * 1024;
+
+  /// The maximum memory usage (in bytes) of the temporary subblock cache used
+  /// by ReadMany (in front of the cache of the reader, if any).
+  static constexpr std::uint64_t kMaxReadManyCacheSize = 256 * 1024 * 1024;
+
+  /// Returns the order in which ReadMany processes the ROIs, which is the
+  /// order of the file positions of the subblocks they touch (so that
+  /// neighboring ROIs are read one after another).
+  std::vector<size_t>
+  GetReadOrder(const std::vector<libCZI::IntRect> &rois,
+               const libCZI::CDimCoordinate &planeCoordinate);
+
+  /// Returns the subblocks on pyramid layer 0, listed once from the subblock
+  /// directory.
+  const std::vector<Layer0SubBlock> &GetLayer0SubBlocks();
+
+  /// Returns whether the coordinate is on the plane, i.e. has the same value
+  /// in all dimensions given in the plane coordinate.
+  static bool IsOnPlane(const libCZI::CDimCoordinate &planeCoordinate,
+                        const libCZI::CDimCoordinate &coordinate);
+
+  /// Returns the size of the segment of each subblock in the file (by subblock
+  /// index), computed once from the subblock directory: a segment extends to
+  /// the next subblock in the file, and the size of the last one is read from
+  /// its segment header.
+  const std::vector<std::uint64_t> &GetSegmentSizes();
+
+  /// Parses the plane coordinate string (an unparsable string gives an empty
+  /// coordinate).
+  static libCZI::CDimCoordinate
+  ParsePlaneCoordinate(const std::string &coordinateString);
+
+  /// Prunes the subblock cache (if any) according to the prune options.
+  void PruneSubBlockCache();
+
+  /// Calls the function for the indices 0 to count - 1, concurrently by up to
+  /// maxThreads threads (including the calling thread). After an exception,
+  /// the remaining indices are skipped and the first exception is rethrown.
+  static void ForEachConcurrently(size_t count, std::uint32_t maxThreads,
+                                  const std::function<void(size_t)> &function);
+
+  /// Composes the ROI at full resolution band by band and downscales it by
+  /// area-averaging into dest, c.f. GetAreaResampledData.
+  void ComposeAreaResampled(
+      libCZI::ISingleChannelScalingTileAccessor *accessor,
+      libCZI::PixelType pixeltype, const libCZI::IntRect &roi,
+      const libCZI::IDimCoordinate *planeCoordinate,
+      const libCZI::ISingleChannelScalingTileAccessor::Options &scstaOptions,
+      libCZI::IBitmapData *dest);
+
+  /// Creates a bitmap, from the buffer pool (if any).
+  std::shared_ptr<libCZI::IBitmapData> CreateBitmap(libCZI::PixelType pixeltype,
+                                                    std::uint32_t width,
+                                                    std::uint32_t height);
+
+  /// Composes the ROI of the plane into a new bitmap (created by
+  /// CreateBitmap) with the accessor.
+  std::shared_ptr<libCZI::IBitmapData> Compose(
+      libCZI::ISingleChannelScalingTileAccessor *accessor,
+      libCZI::PixelType pixeltype, const libCZI::IntRect &roi,
+      const libCZI::IDimCoordinate *planeCoordinate, float zoom,
+      const libCZI::ISingleChannelScalingTileAccessor::Options &scstaOptions);
+
+  /// Creates the options for the accessor, using the subblock cache (if any).
+  libCZI::ISingleChannelScalingTileAccessor::Options
+  CreateAccessorOptions(libCZI::RgbFloatColor bgColor,
+                        const std::wstring &SceneIndexes,
+                        const AccessorOptions &accessorOptions = {});
+
+  /// Returns the accessor of the reader, or (if the options filter the
+  /// subblocks) an accessor on the subblocks selected by the filter.
+  std::shared_ptr<libCZI::ISingleChannelScalingTileAccessor>
+  GetAccessor(const AccessorOptions &accessorOptions);
 
 public:
   /// Constructor which constructs a CZIrwAPI object from the given wstring.
@@ -71,6 +183,13 @@ public:
   CZIreadAPI(const std::string &stream_class_name, const std::wstring &fileName,
              const SubBlockCacheOptions &subBlockCacheOptions);
 
+  /// Sets the pool the bitmaps composed by the reader (returned or
+  /// intermediate) are created from, or null to let libCZI allocate them.
+  /// Must not be called while the reader is used by other threads.
+  void SetBufferPool(std::shared_ptr<BufferPool> bufferPool) {
+    this->spBufferPool = std::move(bufferPool);
+  }
+
   /// Close the Opened czi document
   void close() { this->spReader->Close(); }
 
@@ -94,11 +213,174 @@ public:
   /// <param name="zoom">The zoom factor</param>
   /// <param name="coordinateString">The plane coordinate</param>
   /// <param name="SceneIndexes">String specifying </param>
+  /// <param name="accessorOptions">The options of the accessor</param>
   /// <returns>ptr to the the bitmap stored as a PImage object</returns>
   std::unique_ptr<PImage> GetSingleChannelScalingTileAccessorData(
       libCZI::PixelType pixeltype, libCZI::IntRect roi,
       libCZI::RgbFloatColor bgColor, float zoom,
-      const std::string &coordinateString, const std::wstring &SceneIndexes);
+      const std::string &coordinateString, const std::wstring &SceneIndexes,
+      const AccessorOptions &accessorOptions = {});
+
+  /// <summary>
+  /// Returns the bitmap (as a PImage object) downscaled by area-averaging.
+  /// Other than GetSingleChannelScalingTileAccessorData, which picks the
+  /// nearest pixel from the best fitting pyramid layer, the ROI is composed at
+  /// full resolution in bands and each destination pixel is the average of the
+  /// source pixels it covers. The size of the bitmap is the same as for
+  /// GetSingleChannelScalingTileAccessorData.
+  /// </summary>
+  /// <param name="roi">The ROI</param>
+  /// <param name="bgColor">The background color</param>
+  /// <param name="zoom">The zoom factor (must not be larger than 1)</param>
+  /// <param name="coordinateString">The plane coordinate</param>
+  /// <param name="SceneIndexes">String specifying </param>
+  /// <param name="accessorOptions">The options of the accessor</param>
+  /// <returns>ptr to the the bitmap stored as a PImage object</returns>
+  std::unique_ptr<PImage>
+  GetAreaResampledData(libCZI::PixelType pixeltype, libCZI::IntRect roi,
+                       libCZI::RgbFloatColor bgColor, float zoom,
+                       const std::string &coordinateString,
+                       const std::wstring &SceneIndexes,
+                       const AccessorOptions &accessorOptions = {});
+
+  /// Returns the entries of the subblock directory (without reading any
+  /// subblock) matching all of the given criteria.
+  /// \param  coordinateString    The plane coordinate, only the dimensions
+  ///                             given are compared (an empty string matches
+  ///                             all planes).
+  /// \param  roi                 If given, only subblocks intersecting with
+  ///                             the ROI are returned.
+  /// \param  onlyLayer0          If true, only subblocks on pyramid layer 0
+  ///                             are returned.
+  /// \param  SceneIndexes        String specifying the scenes to consider
+  ///                             (an empty string matches all scenes).
+  std::vector<SubBlockDirectoryEntry>
+  GetSubBlockDirectory(const std::string &coordinateString,
+                       const std::optional<libCZI::IntRect> &roi,
+                       bool onlyLayer0, const std::wstring &SceneIndexes);
+
+  /// Returns the subblocks the accessor considers when composing the ROI of a
+  /// plane at the given zoom (without reading any subblock), in the order
+  /// they are drawn. Like the accessor, the subblocks are grouped by scene
+  /// (if the ROI intersects several scenes), and each group is restricted to
+  /// the pyramid layer best fitting the zoom. The subblocks hidden by the
+  /// subblocks drawn after them are skipped by the accessor (the visibility
+  /// check optimization), and are marked as not visible. Looking up whether a
+  /// subblock is cached marks it as recently used in the subblock cache.
+  /// \param  roi                 The ROI.
+  /// \param  zoom                The zoom factor.
+  /// \param  coordinateString    The plane coordinate.
+  /// \param  SceneIndexes        String specifying the scenes to consider.
+  /// \param  accessorOptions     The options of the accessor (the subblocks
+  ///                             not selected by the filter are left out).
+  std::vector<ReadPlanEntry>
+  GetReadPlan(libCZI::IntRect roi, float zoom,
+              const std::string &coordinateString,
+              const std::wstring &SceneIndexes,
+              const AccessorOptions &accessorOptions = {});
+
+  /// Reads and decodes the specified subblocks one after another and returns
+  /// the statistics of their pixels, c.f. StatisticsAccumulator.
+  /// \param  subBlockIndices     The indices of the subblocks.
+  /// \param  bins                The number of bins of the histogram.
+  /// \param  rangeMin            The lower edge of the first bin.
+  /// \param  rangeMax            The upper edge of the last bin.
+  PixelStatistics
+  GetSubBlockPixelStatistics(const std::vector<int> &subBlockIndices,
+                             std::uint32_t bins, double rangeMin,
+                             double rangeMax);
+
+  /// Composes many ROIs of the same plane into the given bitmaps. The ROIs are
+  /// processed in the order of the file positions of the subblocks they touch,
+  /// and subblocks shared by several ROIs are read and decoded only once.
+  /// \param  pixeltype           The pixel type of the bitmaps.
+  /// \param  rois                The ROIs.
+  /// \param  bgColor             The background color.
+  /// \param  coordinateString    The plane coordinate.
+  /// \param  SceneIndexes        String specifying the scenes to consider.
+  /// \param  dest                One bitmap per ROI (with the size of the ROI).
+  void ReadMany(libCZI::PixelType pixeltype,
+                const std::vector<libCZI::IntRect> &rois,
+                libCZI::RgbFloatColor bgColor,
+                const std::string &coordinateString,
+                const std::wstring &SceneIndexes,
+                const std::vector<libCZI::IBitmapData *> &dest);
+
+  /// Returns the size of the bitmap composed for the ROI at the given zoom,
+  /// c.f. GetSingleChannelScalingTileAccessorData.
+  libCZI::IntSize CalcSize(const libCZI::IntRect &roi, float zoom);
+
+  /// Composes the ROI of each of the specified planes and adds it to the
+  /// projection. Planes are composed concurrently by up to maxThreads threads
+  /// (including the calling thread), each of them holding one composed plane
+  /// at a time.
+  /// \param  pixeltype           The pixel type of the planes.
+  /// \param  roi                 The ROI.
+  /// \param  bgColor             The background color.
+  /// \param  zoom                The zoom factor.
+  /// \param  coordinateStrings   The plane coordinates.
+  /// \param  SceneIndexes        String specifying the scenes to consider.
+  /// \param  accumulator         The projection the planes are added to.
+  /// \param  maxThreads          The maximum number of threads.
+  void Project(libCZI::PixelType pixeltype, libCZI::IntRect roi,
+               libCZI::RgbFloatColor bgColor, float zoom,
+               const std::vector<std::string> &coordinateStrings,
+               const std::wstring &SceneIndexes,
+               ProjectionAccumulator &accumulator, std::uint32_t maxThreads);
+
+  /// Composes the ROI of each of the specified planes (e.g. the channels of a
+  /// multi-channel image) into its destination. Planes are composed
+  /// concurrently by up to maxThreads threads (including the calling thread).
+  /// A plane is composed directly into its destination if the pixels within a
+  /// row of the destination are contiguous, otherwise it is composed into a
+  /// temporary bitmap which is then copied.
+  /// \param  pixeltype           The pixel type of the planes.
+  /// \param  roi                 The ROI.
+  /// \param  bgColor             The background color.
+  /// \param  zoom                The zoom factor.
+  /// \param  areaResample        If true, the planes are downscaled by
+  ///                             area-averaging (c.f. GetAreaResampledData).
+  /// \param  coordinateStrings   The plane coordinates.
+  /// \param  SceneIndexes        String specifying the scenes to consider.
+  /// \param  dest                One (y, x, sample) view per plane, with the
+  ///                             size given by CalcSize and the samples of the
+  ///                             pixel type.
+  /// \param  maxThreads          The maximum number of threads.
+  /// \param  accessorOptions     The options of the accessor.
+  void ReadPlanes(libCZI::PixelType pixeltype, libCZI::IntRect roi,
+                  libCZI::RgbFloatColor bgColor, float zoom, bool areaResample,
+                  const std::vector<std::string> &coordinateStrings,
+                  const std::wstring &SceneIndexes,
+                  const std::vector<StridedView3D<std::uint8_t>> &dest,
+                  std::uint32_t maxThreads,
+                  const AccessorOptions &accessorOptions = {});
+
+  /// Returns the counters of the reader accumulated since it was opened, c.f.
+  /// ReadProfile.
+  ReadProfile GetProfile() const { return this->spProfiler->GetProfile(); }
+
+  /// Returns the statistics of the reads from the stream since the document
+  /// was opened, c.f. StreamStatistics.
+  StreamStatistics GetStreamStatistics() const {
+    return this->spStream->GetStatistics();
+  }
+
+  /// Starts recording a trace of the reads from the stream.
+  /// \param  maxEntries  The maximum number of reads recorded.
+  void StartStreamTrace(size_t maxEntries) {
+    this->spStream->StartTrace(maxEntries);
+  }
+
+  /// Stops recording the trace of the reads from the stream and returns it.
+  std::vector<StreamTraceEntry> StopStreamTrace() {
+    return this->spStream->StopTrace();
+  }
+
+  /// Returns the number of reads not recorded by the last trace because it
+  /// was full.
+  std::uint64_t GetDroppedStreamTraceEntries() const {
+    return this->spStream->GetDroppedTraceEntries();
+  }
 
   /// Returns information about the current state of the subblock cache. If
   /// caching is not active, the returned struct will contain zeros.
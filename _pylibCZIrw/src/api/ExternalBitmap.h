@@ -0,0 +1,51 @@
+#pragma once
+
+#include "inc_libCzi.h"
+#include <atomic>
+#include <cstdint>
+
+/// A bitmap on memory owned by somebody else (e.g. a numpy array), allowing
+/// libCZI to compose directly into that memory. The memory must outlive the
+/// bitmap object, pixels within a row must be contiguous.
+class ExternalBitmap : public libCZI::IBitmapData {
+private:
+  libCZI::PixelType pixelType;   ///< The pixel type of the bitmap.
+  libCZI::IntSize size;          ///< The size of the bitmap (in pixels).
+  void *ptrData;                 ///< The pointer to the first (top-left) pixel.
+  std::uint32_t stride;          ///< The stride of the bitmap data (in bytes).
+  std::atomic<int> lockCount{0}; ///< The number of outstanding Lock-calls.
+
+public:
+  /// Constructor.
+  /// \param  pixelType   The pixel type.
+  /// \param  width       The width (in pixels).
+  /// \param  height      The height (in pixels).
+  /// \param  ptrData     The pointer to the first (top-left) pixel.
+  /// \param  stride      The stride (in bytes).
+  ExternalBitmap(libCZI::PixelType pixelType, std::uint32_t width,
+                 std::uint32_t height, void *ptrData, std::uint32_t stride)
+      : pixelType(pixelType), size{width, height}, ptrData(ptrData),
+        stride(stride) {}
+
+  ExternalBitmap(const ExternalBitmap &) = delete;
+  ExternalBitmap &operator=(const ExternalBitmap &) = delete;
+
+  libCZI::PixelType GetPixelType() const override { return this->pixelType; }
+
+  libCZI::IntSize GetSize() const override { return this->size; }
+
+  libCZI::BitmapLockInfo Lock() override {
+    ++this->lockCount;
+    libCZI::BitmapLockInfo lockInfo;
+    lockInfo.ptrData = this->ptrData;
+    lockInfo.ptrDataRoi = this->ptrData;
+    lockInfo.stride = this->stride;
+    lockInfo.size = static_cast<std::uint64_t>(this->stride) * this->size.h;
+    return lockInfo;
+  }
+
+  void Unlock() override { --this->lockCount; }
+
+  /// Returns the number of outstanding Lock-calls.
+  int GetLockCount() const { return this->lockCount; }
+};
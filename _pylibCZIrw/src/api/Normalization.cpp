@@ -0,0 +1,215 @@
+#include "Normalization.h"
+
+#include <cstdint>
+#include <sstream>
+#include <stdexcept>
+#include <utility>
+
+using namespace libCZI;
+using namespace std;
+
+namespace {
+template <typename TSrc, typename TDest>
+void ConvertAndNormalizeTyped(const PImage &source,
+                              const std::vector<double> &scale,
+                              const std::vector<double> &offset,
+                              const StridedView3D<const float> *flatfield,
+                              const StridedView3D<TDest> &dest) {
+  const auto shape = source.get_shape();
+  const auto height = static_cast<std::ptrdiff_t>(shape[0]);
+  const auto width = static_cast<std::ptrdiff_t>(shape[1]);
+  const auto channels = static_cast<std::ptrdiff_t>(shape[2]);
+  const auto *sourceData = static_cast<const std::uint8_t *>(source.get_data());
+
+  // scale and offset are converted once to the destination type, so that the
+  // arithmetic in the loop is done in the (usually single) destination
+  // precision
+  std::vector<TDest> channelScale(scale.cbegin(), scale.cend());
+  std::vector<TDest> channelOffset(offset.cbegin(), offset.cend());
+
+  for (std::ptrdiff_t y = 0; y < height; ++y) {
+    const auto *sourceRow = reinterpret_cast<const TSrc *>(
+        sourceData + y * static_cast<std::ptrdiff_t>(source.get_stride()));
+    for (std::ptrdiff_t x = 0; x < width; ++x) {
+      for (std::ptrdiff_t c = 0; c < channels; ++c) {
+        TDest value =
+            static_cast<TDest>(sourceRow[x * channels + c]) * channelScale[c] +
+            channelOffset[c];
+        if (flatfield != nullptr) {
+          value /= static_cast<TDest>(flatfield->at(y, x, c));
+        }
+
+        dest.at(y, x, c) = value;
+      }
+    }
+  }
+}
+
+template <typename T, std::ptrdiff_t Samples>
+void CopyToStridedViewTyped(const libCZI::BitmapLockInfo &lockInfo,
+                            const StridedView3D<std::uint8_t> &dest) {
+  const auto height = static_cast<std::ptrdiff_t>(dest.shape[0]);
+  const auto width = static_cast<std::ptrdiff_t>(dest.shape[1]);
+  const auto pixelStride = dest.strides[1];
+  const auto sampleStride = dest.strides[2];
+  const auto *sourceData =
+      static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi);
+  for (std::ptrdiff_t y = 0; y < height; ++y) {
+    const auto *sourcePixel = reinterpret_cast<const T *>(
+        sourceData + y * static_cast<std::ptrdiff_t>(lockInfo.stride));
+    auto *destPixel = dest.ptr + y * dest.strides[0];
+    for (std::ptrdiff_t x = 0; x < width; ++x) {
+      // the number of samples is known at compile time, so that this loop is
+      // unrolled and each pixel is read once
+      for (std::ptrdiff_t c = 0; c < Samples; ++c) {
+        *reinterpret_cast<T *>(destPixel + c * sampleStride) = sourcePixel[c];
+      }
+
+      sourcePixel += Samples;
+      destPixel += pixelStride;
+    }
+  }
+}
+
+template <typename T>
+void CopyToStridedViewTyped(const libCZI::BitmapLockInfo &lockInfo,
+                            const StridedView3D<std::uint8_t> &dest) {
+  if (dest.shape[2] == 3) {
+    CopyToStridedViewTyped<T, 3>(lockInfo, dest);
+  } else {
+    CopyToStridedViewTyped<T, 1>(lockInfo, dest);
+  }
+}
+
+template <typename T>
+void ReverseSamplesTyped(const libCZI::BitmapLockInfo &lockInfo,
+                         const libCZI::IntSize &size) {
+  auto *data = static_cast<std::uint8_t *>(lockInfo.ptrDataRoi);
+  for (std::uint32_t y = 0; y < size.h; ++y) {
+    auto *pixel = reinterpret_cast<T *>(data + y * lockInfo.stride);
+    for (std::uint32_t x = 0; x < size.w; ++x, pixel += 3) {
+      std::swap(pixel[0], pixel[2]);
+    }
+  }
+}
+
+void CheckShape(const PImage &source, const std::size_t *shape,
+                const char *name) {
+  const auto sourceShape = source.get_shape();
+  for (int i = 0; i < 3; ++i) {
+    if (sourceShape[i] != shape[i]) {
+      stringstream string_stream;
+      string_stream << "The shape of the " << name << " (" << shape[0] << ", "
+                    << shape[1] << ", " << shape[2]
+                    << ") does not match the shape of the bitmap ("
+                    << sourceShape[0] << ", " << sourceShape[1] << ", "
+                    << sourceShape[2] << ").";
+      throw std::invalid_argument(string_stream.str());
+    }
+  }
+}
+} // namespace
+
+template <typename TDest>
+void ConvertAndNormalize(const PImage &source, const std::vector<double> &scale,
+                         const std::vector<double> &offset,
+                         const StridedView3D<const float> *flatfield,
+                         const StridedView3D<TDest> &dest) {
+  const auto channels = source.get_shape()[2];
+  if (scale.size() != channels || offset.size() != channels) {
+    throw std::invalid_argument(
+        "scale and offset must have one value per channel of the bitmap.");
+  }
+
+  CheckShape(source, dest.shape, "destination");
+  if (flatfield != nullptr) {
+    CheckShape(source, flatfield->shape, "flat-field");
+  }
+
+  switch (source.get_pixelType()) {
+  case PixelType::Gray8:
+  case PixelType::Bgr24:
+    ConvertAndNormalizeTyped<std::uint8_t, TDest>(source, scale, offset,
+                                                  flatfield, dest);
+    break;
+  case PixelType::Gray16:
+  case PixelType::Bgr48:
+    ConvertAndNormalizeTyped<std::uint16_t, TDest>(source, scale, offset,
+                                                   flatfield, dest);
+    break;
+  case PixelType::Gray32Float:
+  case PixelType::Bgr96Float:
+    ConvertAndNormalizeTyped<float, TDest>(source, scale, offset, flatfield,
+                                           dest);
+    break;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+}
+
+void CopyToStridedView(libCZI::IBitmapData *source,
+                       const StridedView3D<std::uint8_t> &dest) {
+  const auto size = source->GetSize();
+  const auto pixelType = source->GetPixelType();
+  const std::size_t samples =
+      (pixelType == PixelType::Bgr24 || pixelType == PixelType::Bgr48 ||
+       pixelType == PixelType::Bgr96Float)
+          ? 3
+          : 1;
+  if (dest.shape[0] != size.h || dest.shape[1] != size.w ||
+      dest.shape[2] != samples) {
+    stringstream string_stream;
+    string_stream << "The shape of the destination (" << dest.shape[0] << ", "
+                  << dest.shape[1] << ", " << dest.shape[2]
+                  << ") does not match the shape of the bitmap (" << size.h
+                  << ", " << size.w << ", " << samples << ").";
+    throw std::invalid_argument(string_stream.str());
+  }
+
+  ScopedBitmapLockerP lockedSource{source};
+  switch (pixelType) {
+  case PixelType::Gray8:
+  case PixelType::Bgr24:
+    CopyToStridedViewTyped<std::uint8_t>(lockedSource, dest);
+    break;
+  case PixelType::Gray16:
+  case PixelType::Bgr48:
+    CopyToStridedViewTyped<std::uint16_t>(lockedSource, dest);
+    break;
+  case PixelType::Gray32Float:
+  case PixelType::Bgr96Float:
+    CopyToStridedViewTyped<float>(lockedSource, dest);
+    break;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+}
+
+void ReverseSamples(libCZI::IBitmapData *bitmap) {
+  const auto size = bitmap->GetSize();
+  ScopedBitmapLockerP lockedBitmap{bitmap};
+  switch (bitmap->GetPixelType()) {
+  case PixelType::Bgr24:
+    ReverseSamplesTyped<std::uint8_t>(lockedBitmap, size);
+    break;
+  case PixelType::Bgr48:
+    ReverseSamplesTyped<std::uint16_t>(lockedBitmap, size);
+    break;
+  case PixelType::Bgr96Float:
+    ReverseSamplesTyped<float>(lockedBitmap, size);
+    break;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+}
+
+template void ConvertAndNormalize<float>(const PImage &,
+                                         const std::vector<double> &,
+                                         const std::vector<double> &,
+                                         const StridedView3D<const float> *,
+                                         const StridedView3D<float> &);
+template void ConvertAndNormalize<double>(const PImage &,
+                                          const std::vector<double> &,
+                                          const std::vector<double> &,
+                                          const StridedView3D<const float> *,
+                                          const StridedView3D<double> &);
@@ -0,0 +1,55 @@
+#pragma once
+
+#include "PImage.h"
+#include <cstddef>
+#include <cstdint>
+#include <type_traits>
+#include <vector>
+
+/// A strided 3-dimensional view (y, x, channel) on memory owned by somebody
+/// else. Strides are given in bytes and may be zero (broadcasting) or negative
+/// (reversed order).
+template <typename T> struct StridedView3D {
+  T *ptr = nullptr;                 ///< The pointer to the element (0, 0, 0).
+  std::size_t shape[3] = {0, 0, 0}; ///< The extent in y, x and channel.
+  std::ptrdiff_t strides[3] = {0, 0, 0}; ///< The strides (in bytes).
+
+  /// Returns the element at the given position.
+  T &at(std::ptrdiff_t y, std::ptrdiff_t x, std::ptrdiff_t c) const {
+    using Byte = typename std::conditional<std::is_const<T>::value, const char,
+                                           char>::type;
+    return *reinterpret_cast<T *>(reinterpret_cast<Byte *>(this->ptr) +
+                                  y * this->strides[0] + x * this->strides[1] +
+                                  c * this->strides[2]);
+  }
+};
+
+/// Converts the pixels of a bitmap to floating point in a single pass, applying
+/// an affine normalization and an optional flat-field division on the way:
+///   dest(y, x, c) = (source(y, x, c) * scale[c] + offset[c]) / flatfield(y, x,
+///   c)
+/// \param  source      The bitmap to convert.
+/// \param  scale       The scale factor for each channel of the bitmap.
+/// \param  offset      The offset for each channel of the bitmap.
+/// \param  flatfield   The flat-field, with the same shape as the bitmap, or
+///                     nullptr if no flat-field division is to be done.
+/// \param  dest        The destination, with the same shape as the bitmap.
+template <typename TDest>
+void ConvertAndNormalize(const PImage &source, const std::vector<double> &scale,
+                         const std::vector<double> &offset,
+                         const StridedView3D<const float> *flatfield,
+                         const StridedView3D<TDest> &dest);
+
+/// Copies the pixels of a bitmap into a strided view on the samples of its
+/// pixel type (e.g. one channel of an interleaved multi-channel array, or a
+/// planar array) without conversion.
+/// \param  source  The bitmap to copy.
+/// \param  dest    The destination, with the shape (height, width, samples) of
+///                 the bitmap.
+void CopyToStridedView(libCZI::IBitmapData *source,
+                       const StridedView3D<std::uint8_t> &dest);
+
+/// Reverses the order of the samples of each pixel of a bitmap of a BGR pixel
+/// type in place (i.e. converts BGR to RGB).
+/// \param  bitmap  The bitmap.
+void ReverseSamples(libCZI::IBitmapData *bitmap);
@@ -0,0 +1,183 @@
+#include "Profiling.h"
+
+#include <stdexcept>
+
+using namespace libCZI;
+using namespace std;
+
+namespace {
+/// A subblock forwarding to another subblock, which times the decoding.
+class ProfilingSubBlock : public ISubBlock {
+public:
+  ProfilingSubBlock(std::shared_ptr<ISubBlock> subBlock,
+                    std::shared_ptr<ReadProfiler> profiler)
+      : subBlock(std::move(subBlock)), profiler(std::move(profiler)) {}
+
+  const SubBlockInfo &GetSubBlockInfo() const override {
+    return this->subBlock->GetSubBlockInfo();
+  }
+
+  void DangerousGetRawData(MemBlkType type, const void *&ptr,
+                           size_t &size) const override {
+    this->subBlock->DangerousGetRawData(type, ptr, size);
+  }
+
+  std::shared_ptr<const void> GetRawData(MemBlkType type,
+                                         size_t *ptrSize) override {
+    return this->subBlock->GetRawData(type, ptrSize);
+  }
+
+  std::shared_ptr<IBitmapData> CreateBitmap() override {
+    ReadProfiler::ScopedTimer timer(this->profiler->decodeNanoseconds);
+    auto bitmap = this->subBlock->CreateBitmap();
+    ++this->profiler->subBlocksDecoded;
+    return bitmap;
+  }
+
+private:
+  std::shared_ptr<ISubBlock> subBlock;
+  std::shared_ptr<ReadProfiler> profiler;
+};
+} // namespace
+
+ReadProfile ReadProfiler::GetProfile() const {
+  ReadProfile profile;
+  profile.ioOperations = this->ioOperations;
+  profile.bytesRead = this->bytesRead;
+  profile.ioNanoseconds = this->ioNanoseconds;
+  profile.subBlocksRead = this->subBlocksRead;
+  profile.subBlocksDecoded = this->subBlocksDecoded;
+  profile.decodeNanoseconds = this->decodeNanoseconds;
+  profile.cacheLookups = this->cacheLookups;
+  profile.cacheHits = this->cacheHits;
+  profile.pruneNanoseconds = this->pruneNanoseconds;
+  return profile;
+}
+
+void ProfilingInputStream::Read(std::uint64_t offset, void *pv,
+                                std::uint64_t size,
+                                std::uint64_t *ptrBytesRead) {
+  std::uint64_t bytesRead = 0;
+  const auto start = std::chrono::steady_clock::now();
+  this->stream->Read(offset, pv, size, &bytesRead);
+  const auto end = std::chrono::steady_clock::now();
+  const auto nanoseconds = static_cast<std::uint64_t>(
+      std::chrono::duration_cast<std::chrono::nanoseconds>(end - start)
+          .count());
+
+  this->profiler->ioNanoseconds += nanoseconds;
+  ++this->profiler->ioOperations;
+  this->profiler->bytesRead += bytesRead;
+  if (this->nextOffset.exchange(offset + size) == offset) {
+    ++this->sequentialReads;
+  }
+
+  auto previousMinOffset = this->minOffset.load();
+  while (offset < previousMinOffset &&
+         !this->minOffset.compare_exchange_weak(previousMinOffset, offset)) {
+  }
+
+  auto previousMaxEnd = this->maxEnd.load();
+  while (
+      offset + bytesRead > previousMaxEnd &&
+      !this->maxEnd.compare_exchange_weak(previousMaxEnd, offset + bytesRead)) {
+  }
+
+  ++this->latencyHistogram[GetBucket(nanoseconds / 1000, kLatencyBuckets)];
+  ++this->sizeHistogram[GetBucket(size, kSizeBuckets)];
+
+  if (this->tracing) {
+    std::lock_guard<std::mutex> lock(this->traceMutex);
+    if (this->tracing && this->trace.size() < this->maxTraceEntries) {
+      StreamTraceEntry entry;
+      entry.offset = offset;
+      entry.size = size;
+      entry.bytesRead = bytesRead;
+      entry.startNanoseconds =
+          start > this->traceStart
+              ? static_cast<std::uint64_t>(
+                    std::chrono::duration_cast<std::chrono::nanoseconds>(
+                        start - this->traceStart)
+                        .count())
+              : 0;
+      entry.durationNanoseconds = nanoseconds;
+      this->trace.push_back(entry);
+    } else if (this->tracing) {
+      ++this->droppedTraceEntries;
+    }
+  }
+
+  if (ptrBytesRead != nullptr) {
+    *ptrBytesRead = bytesRead;
+  }
+}
+
+size_t ProfilingInputStream::GetBucket(std::uint64_t value,
+                                       size_t bucketCount) {
+  size_t bucket = 0;
+  for (; value > 0 && bucket + 1 < bucketCount; value >>= 1) {
+    ++bucket;
+  }
+
+  return bucket;
+}
+
+StreamStatistics ProfilingInputStream::GetStatistics() const {
+  StreamStatistics statistics;
+  statistics.readCount = this->profiler->ioOperations;
+  statistics.bytesRead = this->profiler->bytesRead;
+  statistics.sequentialReads = this->sequentialReads;
+  statistics.maxEnd = this->maxEnd;
+  statistics.minOffset = statistics.readCount > 0 ? this->minOffset.load() : 0;
+  for (const auto &count : this->latencyHistogram) {
+    statistics.latencyHistogram.push_back(count);
+  }
+
+  for (const auto &count : this->sizeHistogram) {
+    statistics.sizeHistogram.push_back(count);
+  }
+
+  return statistics;
+}
+
+void ProfilingInputStream::StartTrace(size_t maxEntries) {
+  std::lock_guard<std::mutex> lock(this->traceMutex);
+  if (this->tracing) {
+    throw std::invalid_argument("A trace of the stream is already recorded.");
+  }
+
+  this->trace.clear();
+  this->maxTraceEntries = maxEntries;
+  this->droppedTraceEntries = 0;
+  this->traceStart = std::chrono::steady_clock::now();
+  this->tracing = true;
+}
+
+std::vector<StreamTraceEntry> ProfilingInputStream::StopTrace() {
+  std::lock_guard<std::mutex> lock(this->traceMutex);
+  this->tracing = false;
+  std::vector<StreamTraceEntry> trace;
+  trace.swap(this->trace);
+  return trace;
+}
+
+std::shared_ptr<ISubBlock>
+ProfilingSubBlockRepository::ReadSubBlock(int index) {
+  auto subBlock = this->repository->ReadSubBlock(index);
+  if (!subBlock) {
+    return subBlock;
+  }
+
+  ++this->profiler->subBlocksRead;
+  return make_shared<ProfilingSubBlock>(std::move(subBlock), this->profiler);
+}
+
+std::shared_ptr<IBitmapData> ProfilingSubBlockCache::Get(int subblock_index) {
+  auto bitmap = this->cache->Get(subblock_index);
+  ++this->profiler->cacheLookups;
+  if (bitmap) {
+    ++this->profiler->cacheHits;
+  }
+
+  return bitmap;
+}
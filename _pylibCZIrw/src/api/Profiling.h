@@ -0,0 +1,228 @@
+#pragma once
+
+#include "inc_libCzi.h"
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <limits>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+/// This POD ("plain-old-data") structure represents the counters of a reader,
+/// accumulated since the reader was opened. Times are summed over all threads.
+struct ReadProfile {
+  std::uint64_t ioOperations = 0; ///< The number of reads from the stream.
+  std::uint64_t bytesRead = 0;    ///< The number of bytes read from the stream.
+  std::uint64_t ioNanoseconds = 0; ///< The time spent reading from the stream.
+  std::uint64_t subBlocksRead = 0; ///< The number of subblocks read.
+  std::uint64_t subBlocksDecoded =
+      0; ///< The number of subblocks decoded into a bitmap.
+  std::uint64_t decodeNanoseconds = 0; ///< The time spent decoding subblocks.
+  std::uint64_t cacheLookups =
+      0; ///< The number of subblocks looked up in the subblock cache.
+  std::uint64_t cacheHits =
+      0; ///< The number of subblocks found in the subblock cache.
+  std::uint64_t pruneNanoseconds =
+      0; ///< The time spent pruning the subblock cache.
+};
+
+/// Thread-safe counters of a reader, which the instrumented stream, subblock
+/// repository and subblock cache below add to. The counters are atomic, so
+/// that maintaining them costs next to nothing compared to reading and
+/// decoding.
+class ReadProfiler {
+public:
+  /// Measures the time from construction to destruction and adds it to the
+  /// given counter.
+  class ScopedTimer {
+  public:
+    explicit ScopedTimer(std::atomic<std::uint64_t> &nanoseconds)
+        : nanoseconds(nanoseconds), start(std::chrono::steady_clock::now()) {}
+    ~ScopedTimer() {
+      this->nanoseconds += static_cast<std::uint64_t>(
+          std::chrono::duration_cast<std::chrono::nanoseconds>(
+              std::chrono::steady_clock::now() - this->start)
+              .count());
+    }
+
+    ScopedTimer(const ScopedTimer &) = delete;
+    ScopedTimer &operator=(const ScopedTimer &) = delete;
+
+  private:
+    std::atomic<std::uint64_t> &nanoseconds;
+    std::chrono::steady_clock::time_point start;
+  };
+
+  std::atomic<std::uint64_t> ioOperations{0};
+  std::atomic<std::uint64_t> bytesRead{0};
+  std::atomic<std::uint64_t> ioNanoseconds{0};
+  std::atomic<std::uint64_t> subBlocksRead{0};
+  std::atomic<std::uint64_t> subBlocksDecoded{0};
+  std::atomic<std::uint64_t> decodeNanoseconds{0};
+  std::atomic<std::uint64_t> cacheLookups{0};
+  std::atomic<std::uint64_t> cacheHits{0};
+  std::atomic<std::uint64_t> pruneNanoseconds{0};
+
+  /// Returns a snapshot of the counters.
+  ReadProfile GetProfile() const;
+};
+
+/// This POD ("plain-old-data") structure represents the statistics of the
+/// reads from a stream. Bucket i of the histograms counts the reads with a
+/// value in [2^(i-1), 2^i), bucket 0 the reads with a value of 0 and the last
+/// bucket all reads with larger values.
+struct StreamStatistics {
+  std::uint64_t readCount = 0; ///< The number of reads.
+  std::uint64_t bytesRead = 0; ///< The number of bytes read.
+  std::uint64_t sequentialReads =
+      0; ///< The number of reads starting where the previous read ended.
+  std::uint64_t minOffset = 0; ///< The smallest offset read from.
+  std::uint64_t maxEnd = 0;    ///< The largest offset read up to.
+  std::vector<std::uint64_t>
+      latencyHistogram; ///< The histogram of the latencies (in microseconds).
+  std::vector<std::uint64_t>
+      sizeHistogram; ///< The histogram of the requested sizes (in bytes).
+};
+
+/// This POD ("plain-old-data") structure represents one read from a stream.
+struct StreamTraceEntry {
+  std::uint64_t offset = 0;    ///< The offset read from.
+  std::uint64_t size = 0;      ///< The number of bytes requested.
+  std::uint64_t bytesRead = 0; ///< The number of bytes actually read.
+  std::uint64_t startNanoseconds =
+      0; ///< The start of the read, relative to the start of the trace.
+  std::uint64_t durationNanoseconds = 0; ///< The latency of the read.
+};
+
+/// A stream forwarding to another stream and counting the reads, which keeps
+/// histograms of their latencies and sizes and optionally records a trace of
+/// all reads.
+class ProfilingInputStream : public libCZI::IStream {
+public:
+  /// The number of buckets of the latency histogram (the last bucket starts at
+  /// 2^30 microseconds, i.e. about 18 minutes).
+  static constexpr size_t kLatencyBuckets = 32;
+
+  /// The number of buckets of the size histogram (the last bucket starts at
+  /// 2^39 bytes, i.e. 512 GiB).
+  static constexpr size_t kSizeBuckets = 41;
+
+  ProfilingInputStream(std::shared_ptr<libCZI::IStream> stream,
+                       std::shared_ptr<ReadProfiler> profiler)
+      : stream(std::move(stream)), profiler(std::move(profiler)) {}
+
+  void Read(std::uint64_t offset, void *pv, std::uint64_t size,
+            std::uint64_t *ptrBytesRead) override;
+
+  /// Returns the statistics of the reads since the stream was created.
+  StreamStatistics GetStatistics() const;
+
+  /// Starts recording a trace of the reads.
+  /// \param  maxEntries  The maximum number of reads recorded, further reads
+  ///                     are only counted (c.f. GetDroppedTraceEntries).
+  void StartTrace(size_t maxEntries);
+
+  /// Stops recording the trace and returns it.
+  std::vector<StreamTraceEntry> StopTrace();
+
+  /// Returns the number of reads not recorded by the last trace because it
+  /// was full.
+  std::uint64_t GetDroppedTraceEntries() const {
+    return this->droppedTraceEntries;
+  }
+
+private:
+  /// Returns the index of the histogram bucket of the value.
+  static size_t GetBucket(std::uint64_t value, size_t bucketCount);
+
+  std::shared_ptr<libCZI::IStream> stream;
+  std::shared_ptr<ReadProfiler> profiler;
+
+  std::atomic<std::uint64_t> sequentialReads{0};
+  std::atomic<std::uint64_t> nextOffset{
+      std::numeric_limits<std::uint64_t>::max()};
+  std::atomic<std::uint64_t> minOffset{
+      std::numeric_limits<std::uint64_t>::max()};
+  std::atomic<std::uint64_t> maxEnd{0};
+  std::array<std::atomic<std::uint64_t>, kLatencyBuckets> latencyHistogram{};
+  std::array<std::atomic<std::uint64_t>, kSizeBuckets> sizeHistogram{};
+
+  std::atomic<bool> tracing{false};
+  std::mutex traceMutex;
+  std::vector<StreamTraceEntry> trace;
+  size_t maxTraceEntries = 0;
+  std::atomic<std::uint64_t> droppedTraceEntries{0};
+  std::chrono::steady_clock::time_point traceStart;
+};
+
+/// A subblock repository forwarding to another repository (i.e. the reader),
+/// which counts the subblocks read and hands out subblocks timing their
+/// decoding.
+class ProfilingSubBlockRepository : public libCZI::ISubBlockRepository {
+public:
+  ProfilingSubBlockRepository(
+      std::shared_ptr<libCZI::ISubBlockRepository> repository,
+      std::shared_ptr<ReadProfiler> profiler)
+      : repository(std::move(repository)), profiler(std::move(profiler)) {}
+
+  void EnumerateSubBlocks(
+      const std::function<bool(int index, const libCZI::SubBlockInfo &info)>
+          &funcEnum) override {
+    this->repository->EnumerateSubBlocks(funcEnum);
+  }
+
+  void EnumSubset(
+      const libCZI::IDimCoordinate *planeCoordinate, const libCZI::IntRect *roi,
+      bool onlyLayer0,
+      const std::function<bool(int index, const libCZI::SubBlockInfo &info)>
+          &funcEnum) override {
+    this->repository->EnumSubset(planeCoordinate, roi, onlyLayer0, funcEnum);
+  }
+
+  std::shared_ptr<libCZI::ISubBlock> ReadSubBlock(int index) override;
+
+  bool TryGetSubBlockInfoOfArbitrarySubBlockInChannel(
+      int channelIndex, libCZI::SubBlockInfo &info) override {
+    return this->repository->TryGetSubBlockInfoOfArbitrarySubBlockInChannel(
+        channelIndex, info);
+  }
+
+  bool TryGetSubBlockInfo(int index,
+                          libCZI::SubBlockInfo *info) const override {
+    return this->repository->TryGetSubBlockInfo(index, info);
+  }
+
+  libCZI::SubBlockStatistics GetStatistics() override {
+    return this->repository->GetStatistics();
+  }
+
+  libCZI::PyramidStatistics GetPyramidStatistics() override {
+    return this->repository->GetPyramidStatistics();
+  }
+
+private:
+  std::shared_ptr<libCZI::ISubBlockRepository> repository;
+  std::shared_ptr<ReadProfiler> profiler;
+};
+
+/// A subblock cache forwarding to another cache and counting the lookups and
+/// hits.
+class ProfilingSubBlockCache : public libCZI::ISubBlockCacheOperation {
+public:
+  ProfilingSubBlockCache(std::shared_ptr<libCZI::ISubBlockCacheOperation> cache,
+                         std::shared_ptr<ReadProfiler> profiler)
+      : cache(std::move(cache)), profiler(std::move(profiler)) {}
+
+  std::shared_ptr<libCZI::IBitmapData> Get(int subblock_index) override;
+
+  void Add(int subblock_index,
+           std::shared_ptr<libCZI::IBitmapData> pBitmap) override {
+    this->cache->Add(subblock_index, std::move(pBitmap));
+  }
+
+private:
+  std::shared_ptr<libCZI::ISubBlockCacheOperation> cache;
+  std::shared_ptr<ReadProfiler> profiler;
+};
@@ -0,0 +1,107 @@
+#include "Projection.h"
+
+#include <sstream>
+#include <stdexcept>
+
+using namespace libCZI;
+using namespace std;
+
+ProjectionAccumulator::ProjectionAccumulator(IBitmapData *maxDest)
+    : maxDest(maxDest) {}
+
+ProjectionAccumulator::ProjectionAccumulator(
+    const StridedView3D<double> &sumDest)
+    : sumDest(sumDest) {}
+
+void ProjectionAccumulator::Add(IBitmapData *bitmap) {
+  const auto size = bitmap->GetSize();
+  const auto destSize =
+      this->maxDest != nullptr
+          ? this->maxDest->GetSize()
+          : IntSize{static_cast<std::uint32_t>(this->sumDest.shape[1]),
+                    static_cast<std::uint32_t>(this->sumDest.shape[0])};
+  if (size.w != destSize.w || size.h != destSize.h) {
+    stringstream string_stream;
+    string_stream << "The size of the bitmap (" << size.w << "x" << size.h
+                  << ") does not match the destination (" << destSize.w << "x"
+                  << destSize.h << ").";
+    throw std::invalid_argument(string_stream.str());
+  }
+
+  if (this->maxDest != nullptr &&
+      this->maxDest->GetPixelType() != bitmap->GetPixelType()) {
+    throw std::invalid_argument(
+        "The pixel type of the bitmap does not match the destination.");
+  }
+
+  ScopedBitmapLockerP lockInfo{bitmap};
+  std::lock_guard<std::mutex> lock(this->mutex);
+  switch (bitmap->GetPixelType()) {
+  case PixelType::Gray8:
+    this->AddTyped<std::uint8_t>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr24:
+    this->AddTyped<std::uint8_t>(lockInfo, size, 3);
+    break;
+  case PixelType::Gray16:
+    this->AddTyped<std::uint16_t>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr48:
+    this->AddTyped<std::uint16_t>(lockInfo, size, 3);
+    break;
+  case PixelType::Gray32Float:
+    this->AddTyped<float>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr96Float:
+    this->AddTyped<float>(lockInfo, size, 3);
+    break;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+
+  ++this->count;
+}
+
+template <typename T>
+void ProjectionAccumulator::AddTyped(const BitmapLockInfo &lockInfo,
+                                     const IntSize &size,
+                                     std::uint32_t channels) {
+  const auto rowLength = static_cast<size_t>(size.w) * channels;
+  if (this->maxDest != nullptr) {
+    ScopedBitmapLockerP destLockInfo{this->maxDest};
+    const bool first = this->count == 0;
+    for (std::uint32_t y = 0; y < size.h; ++y) {
+      const auto *row = reinterpret_cast<const T *>(
+          static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi) +
+          static_cast<size_t>(y) * lockInfo.stride);
+      auto *destRow = reinterpret_cast<T *>(
+          static_cast<std::uint8_t *>(destLockInfo.ptrDataRoi) +
+          static_cast<size_t>(y) * destLockInfo.stride);
+      for (size_t i = 0; i < rowLength; ++i) {
+        // NaN values in the bitmap are skipped (the comparison is false), NaN
+        // values in the destination are replaced
+        if (first || row[i] > destRow[i] || destRow[i] != destRow[i]) {
+          destRow[i] = row[i];
+        }
+      }
+    }
+
+    return;
+  }
+
+  if (this->sumDest.shape[2] != channels) {
+    throw std::invalid_argument(
+        "The number of channels of the bitmap does not match the destination.");
+  }
+
+  for (std::uint32_t y = 0; y < size.h; ++y) {
+    const auto *row = reinterpret_cast<const T *>(
+        static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi) +
+        static_cast<size_t>(y) * lockInfo.stride);
+    for (std::uint32_t x = 0; x < size.w; ++x) {
+      for (std::uint32_t c = 0; c < channels; ++c) {
+        this->sumDest.at(y, x, c) += row[x * channels + c];
+      }
+    }
+  }
+}
@@ -0,0 +1,44 @@
+#pragma once
+
+#include "Normalization.h"
+#include "inc_libCzi.h"
+#include <cstdint>
+#include <mutex>
+
+/// Accumulates a projection of many bitmaps of the same size and pixel type
+/// (e.g. the planes of a z-stack) pixel by pixel into one destination, so that
+/// only the destination and the bitmap being added are kept in memory.
+/// Bitmaps may be added concurrently from several threads.
+class ProjectionAccumulator {
+public:
+  /// Constructor for a maximum intensity projection.
+  /// \param  maxDest The destination, with the size and pixel type of the
+  ///                 bitmaps (it is overwritten by the first bitmap). NaN
+  ///                 values are ignored unless all values of a pixel are NaN.
+  explicit ProjectionAccumulator(libCZI::IBitmapData *maxDest);
+
+  /// Constructor for a sum projection.
+  /// \param  sumDest The destination, with the shape (height, width, channels)
+  ///                 of the bitmaps, which the pixel values are added to (i.e.
+  ///                 it must be initialized, usually with zeros).
+  explicit ProjectionAccumulator(const StridedView3D<double> &sumDest);
+
+  ProjectionAccumulator(const ProjectionAccumulator &) = delete;
+  ProjectionAccumulator &operator=(const ProjectionAccumulator &) = delete;
+
+  /// Adds the pixels of the specified bitmap to the projection.
+  void Add(libCZI::IBitmapData *bitmap);
+
+  /// Returns the number of bitmaps added so far.
+  std::uint32_t GetCount() const { return this->count; }
+
+private:
+  template <typename T>
+  void AddTyped(const libCZI::BitmapLockInfo &lockInfo,
+                const libCZI::IntSize &size, std::uint32_t channels);
+
+  libCZI::IBitmapData *maxDest = nullptr;
+  StridedView3D<double> sumDest;
+  std::uint32_t count = 0;
+  std::mutex mutex; ///< Serializes the accumulation into the destination.
+};
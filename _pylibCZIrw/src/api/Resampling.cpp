@@ -0,0 +1,187 @@
+#include "Resampling.h"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <sstream>
+#include <stdexcept>
+#include <type_traits>
+
+using namespace libCZI;
+using namespace std;
+
+namespace {
+std::uint32_t GetNumberOfChannels(PixelType pixelType) {
+  switch (pixelType) {
+  case PixelType::Gray8:
+  case PixelType::Gray16:
+  case PixelType::Gray32Float:
+    return 1;
+  case PixelType::Bgr24:
+  case PixelType::Bgr48:
+  case PixelType::Bgr96Float:
+    return 3;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+}
+
+template <typename T> T ConvertFromAccumulator(double value) {
+  if constexpr (std::is_integral<T>::value) {
+    value = std::round(value);
+    value = std::min(value, static_cast<double>(numeric_limits<T>::max()));
+    value = std::max(value, static_cast<double>(numeric_limits<T>::min()));
+  }
+
+  return static_cast<T>(value);
+}
+} // namespace
+
+AreaResampler::AreaResampler(PixelType pixelType, const IntSize &sourceSize,
+                             const IntSize &destSize)
+    : pixelType(pixelType), channels(GetNumberOfChannels(pixelType)),
+      sourceSize(sourceSize), destSize(destSize) {
+  if (destSize.w == 0 || destSize.h == 0 || destSize.w > sourceSize.w ||
+      destSize.h > sourceSize.h) {
+    stringstream string_stream;
+    string_stream << "Cannot resample from " << sourceSize.w << "x"
+                  << sourceSize.h << " to " << destSize.w << "x" << destSize.h
+                  << ", only downscaling is supported.";
+    throw std::invalid_argument(string_stream.str());
+  }
+
+  this->columns = CalcContributions(sourceSize.w, destSize.w);
+  this->rows = CalcContributions(sourceSize.h, destSize.h);
+  this->accumulator.assign(
+      static_cast<size_t>(destSize.w) * destSize.h * this->channels, 0.0);
+  this->rowBuffer.resize(static_cast<size_t>(destSize.w) * this->channels);
+}
+
+/*static*/ std::vector<AreaResampler::Contribution>
+AreaResampler::CalcContributions(std::uint32_t sourceExtent,
+                                 std::uint32_t destExtent) {
+  // source pixel i covers the interval [i * scale, (i + 1) * scale) in
+  // destination coordinates - since scale <= 1, this interval overlaps with at
+  // most two destination pixels
+  const double scale = static_cast<double>(destExtent) / sourceExtent;
+  std::vector<Contribution> contributions(sourceExtent);
+  for (std::uint32_t i = 0; i < sourceExtent; ++i) {
+    const double start = i * scale;
+    const double end = (i + 1) * scale;
+    const auto index = std::min(static_cast<std::uint32_t>(start),
+                                static_cast<std::uint32_t>(destExtent - 1));
+    const double boundary = index + 1.0;
+    if (end <= boundary || index + 1 >= destExtent) {
+      contributions[i] = Contribution{index, end - start, 0.0};
+    } else {
+      contributions[i] = Contribution{index, boundary - start, end - boundary};
+    }
+  }
+
+  return contributions;
+}
+
+void AreaResampler::Add(IBitmapData *band, std::uint32_t y) {
+  const auto bandSize = band->GetSize();
+  if (band->GetPixelType() != this->pixelType ||
+      bandSize.w != this->sourceSize.w || y + bandSize.h > this->sourceSize.h) {
+    throw std::invalid_argument(
+        "The band does not match the source of the resampling.");
+  }
+
+  ScopedBitmapLockerP lockInfo{band};
+  switch (this->pixelType) {
+  case PixelType::Gray8:
+  case PixelType::Bgr24:
+    this->AddTyped<std::uint8_t>(lockInfo, bandSize.h, y);
+    break;
+  case PixelType::Gray16:
+  case PixelType::Bgr48:
+    this->AddTyped<std::uint16_t>(lockInfo, bandSize.h, y);
+    break;
+  default:
+    this->AddTyped<float>(lockInfo, bandSize.h, y);
+    break;
+  }
+}
+
+template <typename T>
+void AreaResampler::AddTyped(const BitmapLockInfo &lockInfo,
+                             std::uint32_t height, std::uint32_t y) {
+  const size_t destRowLength = static_cast<size_t>(this->destSize.w) * channels;
+  for (std::uint32_t r = 0; r < height; ++r) {
+    const auto *sourceRow = reinterpret_cast<const T *>(
+        static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi) +
+        static_cast<size_t>(r) * lockInfo.stride);
+
+    // resample the row horizontally ...
+    std::fill(this->rowBuffer.begin(), this->rowBuffer.end(), 0.0);
+    for (std::uint32_t x = 0; x < this->sourceSize.w; ++x) {
+      const Contribution &column = this->columns[x];
+      double *dest = this->rowBuffer.data() +
+                     static_cast<size_t>(column.index) * this->channels;
+      for (std::uint32_t c = 0; c < this->channels; ++c) {
+        const double value = sourceRow[x * this->channels + c];
+        dest[c] += value * column.weight;
+        if (column.weightNext > 0) {
+          dest[this->channels + c] += value * column.weightNext;
+        }
+      }
+    }
+
+    // ... and add it to the destination row(s) it overlaps with
+    const Contribution &row = this->rows[y + r];
+    double *dest = this->accumulator.data() + row.index * destRowLength;
+    for (size_t i = 0; i < destRowLength; ++i) {
+      dest[i] += this->rowBuffer[i] * row.weight;
+    }
+
+    if (row.weightNext > 0) {
+      dest += destRowLength;
+      for (size_t i = 0; i < destRowLength; ++i) {
+        dest[i] += this->rowBuffer[i] * row.weightNext;
+      }
+    }
+  }
+}
+
+void AreaResampler::WriteTo(IBitmapData *dest) const {
+  const auto destBitmapSize = dest->GetSize();
+  if (dest->GetPixelType() != this->pixelType ||
+      destBitmapSize.w != this->destSize.w ||
+      destBitmapSize.h != this->destSize.h) {
+    throw std::invalid_argument(
+        "The bitmap does not match the destination of the resampling.");
+  }
+
+  ScopedBitmapLockerP lockInfo{dest};
+  switch (this->pixelType) {
+  case PixelType::Gray8:
+  case PixelType::Bgr24:
+    this->WriteToTyped<std::uint8_t>(lockInfo);
+    break;
+  case PixelType::Gray16:
+  case PixelType::Bgr48:
+    this->WriteToTyped<std::uint16_t>(lockInfo);
+    break;
+  default:
+    this->WriteToTyped<float>(lockInfo);
+    break;
+  }
+}
+
+template <typename T>
+void AreaResampler::WriteToTyped(const BitmapLockInfo &lockInfo) const {
+  // the weights of every destination pixel add up to one (the area of a
+  // destination pixel), so the accumulated values already are the averages
+  const size_t destRowLength = static_cast<size_t>(this->destSize.w) * channels;
+  for (std::uint32_t y = 0; y < this->destSize.h; ++y) {
+    auto *destRow =
+        reinterpret_cast<T *>(static_cast<std::uint8_t *>(lockInfo.ptrDataRoi) +
+                              static_cast<size_t>(y) * lockInfo.stride);
+    const double *sourceRow = this->accumulator.data() + y * destRowLength;
+    for (size_t i = 0; i < destRowLength; ++i) {
+      destRow[i] = ConvertFromAccumulator<T>(sourceRow[i]);
+    }
+  }
+}
@@ -0,0 +1,62 @@
+#pragma once
+
+#include "inc_libCzi.h"
+#include <cstdint>
+#include <vector>
+
+/// Downscales an image by area-averaging (box filtering). The source image is
+/// fed in as consecutive bands of rows, and only the (smaller) destination
+/// image is kept in memory, so the memory usage is proportional to the size of
+/// the destination and not to the size of the source.
+/// Each source pixel contributes to the destination pixels it overlaps with,
+/// weighted by the size of the overlap.
+class AreaResampler {
+public:
+  /// Constructor.
+  /// \param  pixelType   The pixel type of the source bands and of the
+  ///                     destination.
+  /// \param  sourceSize  The size of the source image.
+  /// \param  destSize    The size of the destination image, which must not be
+  ///                     larger than the source in any dimension.
+  AreaResampler(libCZI::PixelType pixelType, const libCZI::IntSize &sourceSize,
+                const libCZI::IntSize &destSize);
+
+  /// Adds a band of source rows.
+  /// \param  band    The band, with the width of the source image and the pixel
+  ///                 type given in the constructor.
+  /// \param  y       The index of the first row of the band (in the
+  ///                 source image).
+  void Add(libCZI::IBitmapData *band, std::uint32_t y);
+
+  /// Writes the averaged pixels into the specified bitmap, which must have the
+  /// size of the destination image and the pixel type given in the constructor.
+  void WriteTo(libCZI::IBitmapData *dest) const;
+
+private:
+  /// The destination pixel(s) a source row or column contributes to: "weight"
+  /// goes to "index" and "weightNext" to "index + 1".
+  struct Contribution {
+    std::uint32_t index;
+    double weight;
+    double weightNext;
+  };
+
+  static std::vector<Contribution> CalcContributions(std::uint32_t sourceExtent,
+                                                     std::uint32_t destExtent);
+
+  template <typename T>
+  void AddTyped(const libCZI::BitmapLockInfo &lockInfo, std::uint32_t height,
+                std::uint32_t y);
+
+  template <typename T>
+  void WriteToTyped(const libCZI::BitmapLockInfo &lockInfo) const;
+
+  libCZI::PixelType pixelType;
+  std::uint32_t channels;
+  libCZI::IntSize sourceSize;
+  libCZI::IntSize destSize;
+  std::vector<Contribution> columns; ///< One entry per source column.
+  std::vector<Contribution> rows;    ///< One entry per source row.
+  std::vector<double> accumulator;   ///< The destination, being accumulated.
+  std::vector<double> rowBuffer;     ///< One horizontally resampled source row.
+};
@@ -14,7 +14,7 @@ protected:
   /// any calls to other methods of the class.
   void Initialize();
 
-  friend void OneTimeSiteInitialization();
+  friend void InitializeStreams();
 
 public:
   /// Gets stream class name (as used with libCZI) for the reader class "curl"
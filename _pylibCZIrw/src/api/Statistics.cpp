@@ -0,0 +1,135 @@
+#include "Statistics.h"
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <stdexcept>
+
+using namespace libCZI;
+using namespace std;
+
+StatisticsAccumulator::StatisticsAccumulator(std::uint32_t bins,
+                                             double rangeMin, double rangeMax)
+    : bins(bins), rangeMin(rangeMin), rangeMax(rangeMax) {
+  if (bins > 0 && !(rangeMin < rangeMax)) {
+    throw std::invalid_argument(
+        "The range of the histogram must not be empty.");
+  }
+}
+
+void StatisticsAccumulator::Initialize(std::uint32_t channels) {
+  if (!this->statistics.count.empty()) {
+    if (this->statistics.count.size() != channels) {
+      throw std::invalid_argument(
+          "All bitmaps must have the same number of channels.");
+    }
+
+    return;
+  }
+
+  this->statistics.count.assign(channels, 0);
+  this->statistics.min.assign(channels, numeric_limits<double>::infinity());
+  this->statistics.max.assign(channels, -numeric_limits<double>::infinity());
+  this->statistics.mean.assign(channels, 0.0);
+  this->statistics.m2.assign(channels, 0.0);
+  this->statistics.histogram.assign(channels,
+                                    std::vector<std::uint64_t>(this->bins, 0));
+}
+
+void StatisticsAccumulator::Add(IBitmapData *bitmap) {
+  ScopedBitmapLockerP lockInfo{bitmap};
+  const auto size = bitmap->GetSize();
+  switch (bitmap->GetPixelType()) {
+  case PixelType::Gray8:
+    this->AddTyped<std::uint8_t>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr24:
+    this->AddTyped<std::uint8_t>(lockInfo, size, 3);
+    break;
+  case PixelType::Gray16:
+    this->AddTyped<std::uint16_t>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr48:
+    this->AddTyped<std::uint16_t>(lockInfo, size, 3);
+    break;
+  case PixelType::Gray32Float:
+    this->AddTyped<float>(lockInfo, size, 1);
+    break;
+  case PixelType::Bgr96Float:
+    this->AddTyped<float>(lockInfo, size, 3);
+    break;
+  default:
+    throw std::invalid_argument("illegal pixeltype");
+  }
+}
+
+template <typename T>
+void StatisticsAccumulator::AddTyped(const BitmapLockInfo &lockInfo,
+                                     const IntSize &size,
+                                     std::uint32_t channels) {
+  this->Initialize(channels);
+  const double binScale = this->bins / (this->rangeMax - this->rangeMin);
+  for (std::uint32_t c = 0; c < channels; ++c) {
+    // statistics of this bitmap (two passes over the bitmap, which is in
+    // memory anyway) ...
+    std::uint64_t count = 0;
+    double sum = 0;
+    double min = numeric_limits<double>::infinity();
+    double max = -numeric_limits<double>::infinity();
+    auto &histogram = this->statistics.histogram[c];
+    for (std::uint32_t y = 0; y < size.h; ++y) {
+      const auto *row = reinterpret_cast<const T *>(
+          static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi) +
+          static_cast<size_t>(y) * lockInfo.stride);
+      for (std::uint32_t x = 0; x < size.w; ++x) {
+        const double value = row[x * channels + c];
+        if (std::isnan(value)) {
+          continue;
+        }
+
+        ++count;
+        sum += value;
+        min = std::min(min, value);
+        max = std::max(max, value);
+        if (this->bins > 0 && value >= this->rangeMin &&
+            value <= this->rangeMax) {
+          const auto bin = std::min(
+              static_cast<std::uint32_t>((value - this->rangeMin) * binScale),
+              this->bins - 1);
+          ++histogram[bin];
+        }
+      }
+    }
+
+    if (count == 0) {
+      continue;
+    }
+
+    const double mean = sum / count;
+    double m2 = 0;
+    for (std::uint32_t y = 0; y < size.h; ++y) {
+      const auto *row = reinterpret_cast<const T *>(
+          static_cast<const std::uint8_t *>(lockInfo.ptrDataRoi) +
+          static_cast<size_t>(y) * lockInfo.stride);
+      for (std::uint32_t x = 0; x < size.w; ++x) {
+        const double value = row[x * channels + c];
+        if (!std::isnan(value)) {
+          m2 += (value - mean) * (value - mean);
+        }
+      }
+    }
+
+    // ... merged into the accumulated statistics
+    const auto totalCount = this->statistics.count[c] + count;
+    const double delta = mean - this->statistics.mean[c];
+    this->statistics.mean[c] +=
+        delta * static_cast<double>(count) / static_cast<double>(totalCount);
+    this->statistics.m2[c] +=
+        m2 + delta * delta * static_cast<double>(count) *
+                 static_cast<double>(this->statistics.count[c]) /
+                 static_cast<double>(totalCount);
+    this->statistics.count[c] = totalCount;
+    this->statistics.min[c] = std::min(this->statistics.min[c], min);
+    this->statistics.max[c] = std::max(this->statistics.max[c], max);
+  }
+}
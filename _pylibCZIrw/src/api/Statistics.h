@@ -0,0 +1,51 @@
+#pragma once
+
+#include "inc_libCzi.h"
+#include <cstdint>
+#include <vector>
+
+/// This POD ("plain-old-data") structure represents pixel statistics, with one
+/// element per channel of the pixel type (in memory order, i.e. B, G, R for
+/// the BGR pixel types). NaN values are not taken into account.
+struct PixelStatistics {
+  std::vector<std::uint64_t> count; ///< The number of pixels.
+  std::vector<double> min;          ///< The minimum value.
+  std::vector<double> max;          ///< The maximum value.
+  std::vector<double> mean;         ///< The mean value.
+  std::vector<double> m2; ///< The sum of squared differences from the mean.
+  std::vector<std::vector<std::uint64_t>>
+      histogram; ///< The histogram (empty if no bins were requested).
+};
+
+/// Accumulates pixel statistics over many bitmaps (e.g. the subblocks of a
+/// plane), keeping only the statistics in memory. Means and variances are
+/// computed per bitmap and merged (Chan et al.), which keeps them accurate
+/// over billions of pixels.
+class StatisticsAccumulator {
+public:
+  /// Constructor.
+  /// \param  bins        The number of bins of the histogram (0 for no
+  ///                     histogram).
+  /// \param  rangeMin    The lower edge of the first bin.
+  /// \param  rangeMax    The upper edge of the last bin, values outside of
+  ///                     [rangeMin, rangeMax] are not counted in the histogram.
+  StatisticsAccumulator(std::uint32_t bins, double rangeMin, double rangeMax);
+
+  /// Adds the pixels of the specified bitmap to the statistics.
+  void Add(libCZI::IBitmapData *bitmap);
+
+  /// Returns the statistics accumulated so far.
+  const PixelStatistics &GetStatistics() const { return this->statistics; }
+
+private:
+  template <typename T>
+  void AddTyped(const libCZI::BitmapLockInfo &lockInfo,
+                const libCZI::IntSize &size, std::uint32_t channels);
+
+  void Initialize(std::uint32_t channels);
+
+  std::uint32_t bins;
+  double rangeMin;
+  double rangeMax;
+  PixelStatistics statistics;
+};
@@ -0,0 +1,33 @@
+#pragma once
+#include "inc_libCzi.h"
+#include <string>
+
+/// This POD ("plain-old-data") structure represents the information about a
+/// subblock which is available from the subblock directory, i.e. without
+/// reading or decoding the subblock itself.
+struct SubBlockDirectoryEntry {
+  int index = 0; ///< The index of the subblock (in the subblock directory).
+  libCZI::IntRect logicalRect{0, 0, 0, 0}; ///< The rectangle the subblock
+                                           ///< covers (on pyramid layer 0).
+  libCZI::IntSize physicalSize{0, 0};      ///< The size of the stored bitmap.
+  libCZI::PixelType pixelType = libCZI::PixelType::Invalid; ///< Pixel type.
+  std::int32_t compressionModeRaw = 0; ///< The (raw) compression mode.
+  int mIndex = 0;         ///< The M-index (only valid if hasMIndex is true).
+  bool hasMIndex = false; ///< Whether the subblock has a (valid) M-index.
+  int sceneIndex = -1;    ///< The scene index, or -1 if the subblock has none.
+  std::string coordinate; ///< The plane coordinate, e.g. "C0T1".
+  std::uint64_t filePosition = 0; ///< The position of the subblock in the file.
+};
+
+/// A subblock the accessor considers when composing a ROI (c.f.
+/// CZIreadAPI::GetReadPlan), i.e. a subblock of the pyramid layer chosen for
+/// the zoom which intersects with the ROI.
+struct ReadPlanEntry {
+  SubBlockDirectoryEntry subBlock; ///< The directory entry of the subblock.
+  std::uint64_t segmentSize = 0;   ///< The size of the subblock segment in the
+                                   ///< file, i.e. the bytes read to decode it.
+  bool visible = false; ///< Whether the subblock is drawn, i.e. not entirely
+                        ///< hidden by the subblocks drawn after it.
+  bool cached = false;  ///< Whether the decoded subblock is in the subblock
+                        ///< cache of the reader.
+};
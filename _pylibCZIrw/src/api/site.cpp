@@ -2,6 +2,8 @@
 #include "StaticContext.h"
 #include "inc_libCzi.h"
 
+#include <mutex>
+
 void OneTimeSiteInitialization() {
 #ifdef _WIN32
   // In a Windows-environment, we can safely use the JPGXR-WIC-codec - which
@@ -12,8 +14,12 @@ void OneTimeSiteInitialization() {
   libCZI::SetSiteObject(
       libCZI::GetDefaultSiteObject(libCZI::SiteObjectType::WithWICDecoder));
 #endif
+}
 
-  libCZI::StreamsFactory::Initialize();
-
-  kStaticContext.Initialize();
+void InitializeStreams() {
+  static std::once_flag streams_initialized;
+  std::call_once(streams_initialized, []() {
+    libCZI::StreamsFactory::Initialize();
+    kStaticContext.Initialize();
+  });
 }
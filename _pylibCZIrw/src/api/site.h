@@ -2,6 +2,13 @@
 
 /// Perform some one-time initialization/configuration for the site (with
 /// libCZI). This includes selecting the WIC-provided JPEGXR decoder as the
-/// default JPEG decoder on the Windows platform, and setting up libcURL. This
-/// should be called at "load time", before any other libCZI function is called.
+/// default JPEG decoder on the Windows platform. This should be called at "load
+/// time", before any other libCZI function is called.
 void OneTimeSiteInitialization();
+
+/// Perform the one-time initialization of the stream classes, i.e. setting up
+/// libcURL and figuring out the location of the CA info file (c.f.
+/// StaticContext). This is deferred until the first stream other than a file
+/// stream is created, so that loading the module stays cheap. It is safe to
+/// call this function concurrently and any number of times.
+void InitializeStreams();
@@ -42,7 +42,8 @@ PYBIND11_MODULE(_pylibCZIrw, m) {
            [](CZIreadAPI &self, libCZI::PixelType pixeltype,
               libCZI::IntRect roi, libCZI::RgbFloatColor bgColor, float zoom,
               const std::string &coordinateString,
-              const std::wstring &SceneIndexes) {
+              const std::wstring &SceneIndexes,
+              const AccessorOptions &accessorOptions) {
              // We release the GIL to make data access parallelizable via python
              // threads. Note: Whenever the executed C++ code tries to access
              // python objects,
@@ -53,10 +54,46 @@ PYBIND11_MODULE(_pylibCZIrw, m) {
              // https://pybind11.readthedocs.io/en/stable/advanced/misc.html#global-interpreter-lock-gil
              py::gil_scoped_release release;
              auto result = self.GetSingleChannelScalingTileAccessorData(
-                 pixeltype, roi, bgColor, zoom, coordinateString, SceneIndexes);
+                 pixeltype, roi, bgColor, zoom, coordinateString, SceneIndexes,
+                 accessorOptions);
              return result;
            })
-      .def("GetCacheInfo", &CZIreadAPI::GetCacheInfo);
+      .def("GetAreaResampledData",
+           [](CZIreadAPI &self, libCZI::PixelType pixeltype,
+              libCZI::IntRect roi, libCZI::RgbFloatColor bgColor, float zoom,
+              const std::string &coordinateString,
+              const std::wstring &SceneIndexes,
+              const AccessorOptions &accessorOptions) {
+             py::gil_scoped_release release;
+             return self.GetAreaResampledData(pixeltype, roi, bgColor, zoom,
+                                              coordinateString, SceneIndexes,
+                                              accessorOptions);
+           })
+      .def("ReadMany", &PbHelper::ReadManyToBuffer)
+      .def("GetSubBlockPixelStatistics",
+           [](CZIreadAPI &self, const std::vector<int> &subBlockIndices,
+              std::uint32_t bins, double rangeMin, double rangeMax) {
+             py::gil_scoped_release release;
+             return self.GetSubBlockPixelStatistics(subBlockIndices, bins,
+                                                    rangeMin, rangeMax);
+           })
+      .def("GetSubBlockDirectory", &CZIreadAPI::GetSubBlockDirectory,
+           py::arg("coordinateString"), py::arg("roi"), py::arg("onlyLayer0"),
+           py::arg("SceneIndexes"))
+      .def("GetReadPlan", &CZIreadAPI::GetReadPlan,
+           py::call_guard<py::gil_scoped_release>())
+      .def("CalcSize", &CZIreadAPI::CalcSize)
+      .def("ProjectMax", &PbHelper::ProjectMaxToBuffer)
+      .def("ProjectSum", &PbHelper::ProjectSumToArray)
+      .def("ReadPlanes", &PbHelper::ReadPlanesToBuffers)
+      .def("SetBufferPool", &CZIreadAPI::SetBufferPool)
+      .def("GetCacheInfo", &CZIreadAPI::GetCacheInfo)
+      .def("GetProfile", &CZIreadAPI::GetProfile)
+      .def("GetStreamStatistics", &CZIreadAPI::GetStreamStatistics)
+      .def("StartStreamTrace", &CZIreadAPI::StartStreamTrace)
+      .def("StopStreamTrace", &PbHelper::StopStreamTraceToArray)
+      .def("GetDroppedStreamTraceEntries",
+           &CZIreadAPI::GetDroppedStreamTraceEntries);
 
   py::class_<CZIwriteAPI>(m, "czi_writer", py::module_local())
       .def(py::init<const std::wstring &, const std::string &>())
@@ -114,6 +151,59 @@ PYBIND11_MODULE(_pylibCZIrw, m) {
       .def_readwrite("boundingBoxLayer0",
                      &libCZI::BoundingBoxes::boundingBoxLayer0);
 
+  py::class_<SubBlockDirectoryEntry>(m, "SubBlockDirectoryEntry",
+                                     py::module_local())
+      .def(py::init<>())
+      .def_readonly("index", &SubBlockDirectoryEntry::index)
+      .def_readonly("logicalRect", &SubBlockDirectoryEntry::logicalRect)
+      .def_readonly("physicalSize", &SubBlockDirectoryEntry::physicalSize)
+      .def_readonly("pixelType", &SubBlockDirectoryEntry::pixelType)
+      .def_readonly("compressionModeRaw",
+                    &SubBlockDirectoryEntry::compressionModeRaw)
+      .def_readonly("mIndex", &SubBlockDirectoryEntry::mIndex)
+      .def_readonly("hasMIndex", &SubBlockDirectoryEntry::hasMIndex)
+      .def_readonly("sceneIndex", &SubBlockDirectoryEntry::sceneIndex)
+      .def_readonly("coordinate", &SubBlockDirectoryEntry::coordinate)
+      .def_readonly("filePosition", &SubBlockDirectoryEntry::filePosition);
+
+  py::class_<ReadPlanEntry>(m, "ReadPlanEntry", py::module_local())
+      .def(py::init<>())
+      .def_readonly("subBlock", &ReadPlanEntry::subBlock)
+      .def_readonly("segmentSize", &ReadPlanEntry::segmentSize)
+      .def_readonly("visible", &ReadPlanEntry::visible)
+      .def_readonly("cached", &ReadPlanEntry::cached);
+
+  py::class_<PixelStatistics>(m, "PixelStatistics", py::module_local())
+      .def(py::init<>())
+      .def_readonly("count", &PixelStatistics::count)
+      .def_readonly("min", &PixelStatistics::min)
+      .def_readonly("max", &PixelStatistics::max)
+      .def_readonly("mean", &PixelStatistics::mean)
+      .def_readonly("m2", &PixelStatistics::m2)
+      .def_readonly("histogram", &PixelStatistics::histogram);
+
+  py::class_<ReadProfile>(m, "ReadProfile", py::module_local())
+      .def(py::init<>())
+      .def_readonly("ioOperations", &ReadProfile::ioOperations)
+      .def_readonly("bytesRead", &ReadProfile::bytesRead)
+      .def_readonly("ioNanoseconds", &ReadProfile::ioNanoseconds)
+      .def_readonly("subBlocksRead", &ReadProfile::subBlocksRead)
+      .def_readonly("subBlocksDecoded", &ReadProfile::subBlocksDecoded)
+      .def_readonly("decodeNanoseconds", &ReadProfile::decodeNanoseconds)
+      .def_readonly("cacheLookups", &ReadProfile::cacheLookups)
+      .def_readonly("cacheHits", &ReadProfile::cacheHits)
+      .def_readonly("pruneNanoseconds", &ReadProfile::pruneNanoseconds);
+
+  py::class_<StreamStatistics>(m, "StreamStatistics", py::module_local())
+      .def(py::init<>())
+      .def_readonly("readCount", &StreamStatistics::readCount)
+      .def_readonly("bytesRead", &StreamStatistics::bytesRead)
+      .def_readonly("sequentialReads", &StreamStatistics::sequentialReads)
+      .def_readonly("minOffset", &StreamStatistics::minOffset)
+      .def_readonly("maxEnd", &StreamStatistics::maxEnd)
+      .def_readonly("latencyHistogram", &StreamStatistics::latencyHistogram)
+      .def_readonly("sizeHistogram", &StreamStatistics::sizeHistogram);
+
   py::class_<libCZI::RgbFloatColor>(m, "RgbFloatColor", py::module_local())
       .def(py::init<>())
       .def_readwrite("b", &libCZI::RgbFloatColor::b)
@@ -127,6 +217,11 @@ PYBIND11_MODULE(_pylibCZIrw, m) {
       .def_readwrite("w", &libCZI::IntRect::w)
       .def_readwrite("h", &libCZI::IntRect::h);
 
+  py::class_<libCZI::IntSize>(m, "IntSize", py::module_local())
+      .def(py::init<>())
+      .def_readwrite("w", &libCZI::IntSize::w)
+      .def_readwrite("h", &libCZI::IntSize::h);
+
   py::enum_<libCZI::DimensionIndex>(m, "DimensionIndex", py::module_local())
       .value("Z", libCZI::DimensionIndex::Z)
       .value("C", libCZI::DimensionIndex::C)
@@ -214,11 +309,45 @@ PYBIND11_MODULE(_pylibCZIrw, m) {
       .def_readwrite("pruneOptions", &SubBlockCacheOptions::pruneOptions)
       .def("Clear", &SubBlockCacheOptions::Clear);
 
+  py::class_<AccessorOptions>(m, "AccessorOptions", py::module_local())
+      .def(py::init<>())
+      .def_readwrite("sortByM", &AccessorOptions::sortByM)
+      .def_readwrite("useVisibilityCheck", &AccessorOptions::useVisibilityCheck)
+      .def_readwrite("fillBackground", &AccessorOptions::fillBackground)
+      .def_readwrite("filterSubBlocks", &AccessorOptions::filterSubBlocks)
+      .def_readwrite("subBlockIndices", &AccessorOptions::subBlockIndices)
+      .def("Clear", &AccessorOptions::Clear);
+
+  py::class_<BufferPoolStatistics>(m, "BufferPoolStatistics",
+                                   py::module_local())
+      .def(py::init<>())
+      .def_readonly("maxBytes", &BufferPoolStatistics::maxBytes)
+      .def_readonly("idleBytes", &BufferPoolStatistics::idleBytes)
+      .def_readonly("idleBuffers", &BufferPoolStatistics::idleBuffers)
+      .def_readonly("hits", &BufferPoolStatistics::hits)
+      .def_readonly("misses", &BufferPoolStatistics::misses)
+      .def_readonly("evictions", &BufferPoolStatistics::evictions);
+
+  py::class_<BufferPool, std::shared_ptr<BufferPool>>(m, "BufferPool",
+                                                      py::module_local())
+      .def(py::init<std::uint64_t>(), py::arg("maxBytes"))
+      .def("GetStatistics", &BufferPool::GetStatistics)
+      .def("Clear", &BufferPool::Clear);
+
   py::class_<SubBlockCacheInfo>(m, "SubBlockCacheInfo", py::module_local())
       .def(py::init<>())
       .def_readwrite("elements_count", &SubBlockCacheInfo::elementsCount)
       .def_readwrite("memory_usage", &SubBlockCacheInfo::memoryUsage);
 
+  // the overloads only accept destination arrays of exactly the given type
+  // (no implicit conversion, which would write into a temporary copy)
+  m.def("ConvertAndNormalize", &PbHelper::ConvertAndNormalizeToArray<float>,
+        py::arg("source"), py::arg("dest"), py::arg("scale"), py::arg("offset"),
+        py::arg("flatfield") = py::none());
+  m.def("ConvertAndNormalize", &PbHelper::ConvertAndNormalizeToArray<double>,
+        py::arg("source"), py::arg("dest"), py::arg("scale"), py::arg("offset"),
+        py::arg("flatfield") = py::none());
+
   // perform one-time-initialization of libCZI
   OneTimeSiteInitialization();
 }
@@ -1,5 +1,8 @@
 #include "PbHelper.h"
 
+#include <limits>
+#include <sstream>
+
 std::string PbHelper::get_format(libCZI::PixelType pixelType) {
   switch (pixelType) {
   case libCZI::PixelType::Gray8:
@@ -40,3 +43,176 @@ PbHelper::BufferToBitmap(const py::buffer &buffer,
 
   return bm;
 }
+
+void PbHelper::ReadManyToBuffer(
+    CZIreadAPI &reader, libCZI::PixelType pixelType,
+    const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>
+        &roiArray,
+    libCZI::RgbFloatColor bgColor, const std::string &coordinateString,
+    const std::wstring &SceneIndexes, const py::buffer &dest) {
+  if (roiArray.ndim() != 2 || roiArray.shape(1) != 4) {
+    throw std::invalid_argument(
+        "The ROIs must be an array of shape (N, 4) with rows (x, y, w, h).");
+  }
+
+  const auto roiValues = roiArray.unchecked<2>();
+  std::vector<libCZI::IntRect> rois(static_cast<size_t>(roiArray.shape(0)));
+  for (size_t i = 0; i < rois.size(); ++i) {
+    for (py::ssize_t j = 0; j < 4; ++j) {
+      if (roiValues(i, j) < std::numeric_limits<int>::min() ||
+          roiValues(i, j) > std::numeric_limits<int>::max()) {
+        throw std::invalid_argument("The ROIs are out of range.");
+      }
+    }
+
+    rois[i] = libCZI::IntRect{
+        static_cast<int>(roiValues(i, 0)), static_cast<int>(roiValues(i, 1)),
+        static_cast<int>(roiValues(i, 2)), static_cast<int>(roiValues(i, 3))};
+  }
+
+  py::buffer_info info = dest.request(true); // throws if not writeable
+  const auto bytesPerPixel = libCZI::Utils::GetBytesPerPixel(pixelType);
+  const auto channels = (pixelType == libCZI::PixelType::Bgr24 ||
+                         pixelType == libCZI::PixelType::Bgr48 ||
+                         pixelType == libCZI::PixelType::Bgr96Float)
+                            ? 3
+                            : 1;
+  if (info.ndim != 4 || info.format != get_format(pixelType) ||
+      static_cast<size_t>(info.shape[0]) != rois.size() ||
+      info.shape[3] != channels) {
+    throw std::invalid_argument(
+        "The destination does not match the pixel type and the ROIs.");
+  }
+
+  if (info.strides[3] != info.itemsize || info.strides[2] != bytesPerPixel ||
+      info.strides[1] < 0 || info.strides[1] > UINT32_MAX) {
+    throw std::invalid_argument(
+        "The pixels within a row of the destination must be contiguous.");
+  }
+
+  std::vector<std::unique_ptr<ExternalBitmap>> bitmaps;
+  std::vector<libCZI::IBitmapData *> bitmapPointers;
+  for (size_t i = 0; i < rois.size(); ++i) {
+    if (rois[i].w != info.shape[2] || rois[i].h != info.shape[1]) {
+      std::stringstream string_stream;
+      string_stream << "The size of the ROI " << i << " (" << rois[i].w << "x"
+                    << rois[i].h << ") does not match the destination ("
+                    << info.shape[2] << "x" << info.shape[1] << ").";
+      throw std::invalid_argument(string_stream.str());
+    }
+
+    bitmaps.push_back(std::make_unique<ExternalBitmap>(
+        pixelType, static_cast<std::uint32_t>(info.shape[2]),
+        static_cast<std::uint32_t>(info.shape[1]),
+        static_cast<std::uint8_t *>(info.ptr) + i * info.strides[0],
+        static_cast<std::uint32_t>(info.strides[1])));
+    bitmapPointers.push_back(bitmaps.back().get());
+  }
+
+  py::gil_scoped_release release;
+  reader.ReadMany(pixelType, rois, bgColor, coordinateString, SceneIndexes,
+                  bitmapPointers);
+}
+
+void PbHelper::ProjectMaxToBuffer(
+    CZIreadAPI &reader, libCZI::PixelType pixelType, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom,
+    const std::vector<std::string> &coordinateStrings,
+    const std::wstring &SceneIndexes, const py::buffer &dest,
+    std::uint32_t maxThreads) {
+  py::buffer_info info = dest.request(true); // throws if not writeable
+  const auto bytesPerPixel = libCZI::Utils::GetBytesPerPixel(pixelType);
+  const auto channels = (pixelType == libCZI::PixelType::Bgr24 ||
+                         pixelType == libCZI::PixelType::Bgr48 ||
+                         pixelType == libCZI::PixelType::Bgr96Float)
+                            ? 3
+                            : 1;
+  if (info.ndim != 3 || info.format != get_format(pixelType) ||
+      info.shape[2] != channels) {
+    throw std::invalid_argument(
+        "The destination does not match the pixel type.");
+  }
+
+  if (info.strides[2] != info.itemsize || info.strides[1] != bytesPerPixel ||
+      info.strides[0] < 0 || info.strides[0] > UINT32_MAX) {
+    throw std::invalid_argument(
+        "The pixels within a row of the destination must be contiguous.");
+  }
+
+  ExternalBitmap bitmap(pixelType, static_cast<std::uint32_t>(info.shape[1]),
+                        static_cast<std::uint32_t>(info.shape[0]), info.ptr,
+                        static_cast<std::uint32_t>(info.strides[0]));
+  ProjectionAccumulator accumulator(&bitmap);
+  py::gil_scoped_release release;
+  reader.Project(pixelType, roi, bgColor, zoom, coordinateStrings, SceneIndexes,
+                 accumulator, maxThreads);
+}
+
+void PbHelper::ProjectSumToArray(
+    CZIreadAPI &reader, libCZI::PixelType pixelType, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom,
+    const std::vector<std::string> &coordinateStrings,
+    const std::wstring &SceneIndexes, py::array_t<double, 0> dest,
+    std::uint32_t maxThreads) {
+  ProjectionAccumulator accumulator(ArrayToStridedView3D<double>(dest));
+  py::gil_scoped_release release;
+  reader.Project(pixelType, roi, bgColor, zoom, coordinateStrings, SceneIndexes,
+                 accumulator, maxThreads);
+}
+
+void PbHelper::ReadPlanesToBuffers(
+    CZIreadAPI &reader, libCZI::PixelType pixelType, libCZI::IntRect roi,
+    libCZI::RgbFloatColor bgColor, float zoom, bool areaResample,
+    const std::vector<std::string> &coordinateStrings,
+    const std::wstring &SceneIndexes, const std::vector<py::buffer> &dest,
+    std::uint32_t maxThreads, const AccessorOptions &accessorOptions) {
+  const auto size = reader.CalcSize(roi, zoom);
+  const auto channels = (pixelType == libCZI::PixelType::Bgr24 ||
+                         pixelType == libCZI::PixelType::Bgr48 ||
+                         pixelType == libCZI::PixelType::Bgr96Float)
+                            ? 3
+                            : 1;
+  std::vector<StridedView3D<std::uint8_t>> views;
+  for (const auto &buffer : dest) {
+    py::buffer_info info = buffer.request(true); // throws if not writeable
+    if (info.ndim != 3 || info.format != get_format(pixelType) ||
+        info.shape[0] != size.h || info.shape[1] != size.w ||
+        info.shape[2] != channels) {
+      std::stringstream string_stream;
+      string_stream << "The destination does not match the pixel type and the "
+                       "size of the composed ROI ("
+                    << size.w << "x" << size.h << ").";
+      throw std::invalid_argument(string_stream.str());
+    }
+
+    StridedView3D<std::uint8_t> view;
+    view.ptr = static_cast<std::uint8_t *>(info.ptr);
+    for (int i = 0; i < 3; ++i) {
+      view.shape[i] = info.shape[i];
+      view.strides[i] = info.strides[i];
+    }
+
+    views.push_back(view);
+  }
+
+  py::gil_scoped_release release;
+  reader.ReadPlanes(pixelType, roi, bgColor, zoom, areaResample,
+                    coordinateStrings, SceneIndexes, views, maxThreads,
+                    accessorOptions);
+}
+
+py::array_t<std::uint64_t>
+PbHelper::StopStreamTraceToArray(CZIreadAPI &reader) {
+  const auto trace = reader.StopStreamTrace();
+  py::array_t<std::uint64_t> array({trace.size(), static_cast<size_t>(5)});
+  auto entries = array.mutable_unchecked<2>();
+  for (size_t i = 0; i < trace.size(); ++i) {
+    entries(i, 0) = trace[i].offset;
+    entries(i, 1) = trace[i].size;
+    entries(i, 2) = trace[i].bytesRead;
+    entries(i, 3) = trace[i].startNanoseconds;
+    entries(i, 4) = trace[i].durationNanoseconds;
+  }
+
+  return array;
+}
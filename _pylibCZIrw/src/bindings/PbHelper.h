@@ -1,10 +1,15 @@
 #include "../api/CZIreadAPI.h"
+#include "../api/ExternalBitmap.h"
+#include "../api/Normalization.h"
 #include "include_python.h"
+#include <optional>
 #include <pybind11/chrono.h>
 #include <pybind11/complex.h>
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <type_traits>
 
 namespace py = pybind11;
 
@@ -55,4 +60,102 @@ std::string get_format(libCZI::PixelType pixelType);
 std::shared_ptr<libCZI::IBitmapData>
 BufferToBitmap(const py::buffer &buffer, libCZI::PixelType pixelType);
 
+/// Composes the ROIs, given as an (N, 4) array with rows (x, y, w, h), into
+/// the 4-dimensional (ROI, y, x, channel) writeable buffer dest, c.f.
+/// CZIreadAPI::ReadMany. The format and shape of the buffer must match the
+/// pixel type and the ROIs, pixels within a row must be contiguous. The GIL is
+/// released while reading.
+void ReadManyToBuffer(
+    CZIreadAPI &reader, libCZI::PixelType pixelType,
+    const py::array_t<std::int64_t, py::array::c_style | py::array::forcecast>
+        &roiArray,
+    libCZI::RgbFloatColor bgColor, const std::string &coordinateString,
+    const std::wstring &SceneIndexes, const py::buffer &dest);
+
+/// Composes the ROI of each plane and writes their maximum into the
+/// 3-dimensional (y, x, channel) writeable buffer dest, c.f.
+/// CZIreadAPI::Project. The format and shape of the buffer must match the pixel
+/// type and the size of the composed ROI, pixels within a row must be
+/// contiguous. The GIL is released while reading.
+void ProjectMaxToBuffer(CZIreadAPI &reader, libCZI::PixelType pixelType,
+                        libCZI::IntRect roi, libCZI::RgbFloatColor bgColor,
+                        float zoom,
+                        const std::vector<std::string> &coordinateStrings,
+                        const std::wstring &SceneIndexes,
+                        const py::buffer &dest, std::uint32_t maxThreads);
+
+/// Composes the ROI of each plane and adds it to the 3-dimensional (y, x,
+/// channel) numpy array dest, c.f. CZIreadAPI::Project. The GIL is released
+/// while reading.
+void ProjectSumToArray(CZIreadAPI &reader, libCZI::PixelType pixelType,
+                       libCZI::IntRect roi, libCZI::RgbFloatColor bgColor,
+                       float zoom,
+                       const std::vector<std::string> &coordinateStrings,
+                       const std::wstring &SceneIndexes,
+                       py::array_t<double, 0> dest, std::uint32_t maxThreads);
+
+/// Composes the ROI of each plane into the 3-dimensional (y, x, sample)
+/// writeable buffer of the plane, c.f. CZIreadAPI::ReadPlanes. The format and
+/// shape of the buffers must match the pixel type and the size of the composed
+/// ROI, their strides are arbitrary (e.g. views on the channels of an
+/// interleaved or a planar array). The GIL is released while reading.
+void ReadPlanesToBuffers(CZIreadAPI &reader, libCZI::PixelType pixelType,
+                         libCZI::IntRect roi, libCZI::RgbFloatColor bgColor,
+                         float zoom, bool areaResample,
+                         const std::vector<std::string> &coordinateStrings,
+                         const std::wstring &SceneIndexes,
+                         const std::vector<py::buffer> &dest,
+                         std::uint32_t maxThreads,
+                         const AccessorOptions &accessorOptions);
+
+/// Stops recording the trace of the reads from the stream of the reader and
+/// returns it as a numpy array of shape (reads, 5), with the columns offset,
+/// size, bytes read, start and duration (in nanoseconds) of each read, c.f.
+/// StreamTraceEntry.
+py::array_t<std::uint64_t> StopStreamTraceToArray(CZIreadAPI &reader);
+
+/// Returns a strided view on the data of a 3-dimensional numpy array. The
+/// array must outlive the view.
+template <typename T>
+StridedView3D<T>
+ArrayToStridedView3D(py::array_t<std::remove_const_t<T>, 0> &array) {
+  if (array.ndim() != 3) {
+    throw std::runtime_error("Incompatible buffer dimension!");
+  }
+
+  StridedView3D<T> view;
+  if constexpr (std::is_const<T>::value) {
+    view.ptr = array.data();
+  } else {
+    view.ptr = array.mutable_data(); // throws if the array is not writeable
+  }
+
+  for (int i = 0; i < 3; ++i) {
+    view.shape[i] = array.shape(i);
+    view.strides[i] = array.strides(i);
+  }
+
+  return view;
+}
+
+/// Converts and normalizes the bitmap into the (already allocated) numpy
+/// array dest, c.f. ConvertAndNormalize. The GIL is released during the
+/// conversion.
+template <typename TDest>
+void ConvertAndNormalizeToArray(
+    const PImage &source, py::array_t<TDest, 0> dest,
+    const std::vector<double> &scale, const std::vector<double> &offset,
+    std::optional<py::array_t<float, 0>> flatfield) {
+  const auto destView = ArrayToStridedView3D<TDest>(dest);
+  std::optional<StridedView3D<const float>> flatfieldView;
+  if (flatfield) {
+    flatfieldView = ArrayToStridedView3D<const float>(*flatfield);
+  }
+
+  py::gil_scoped_release release;
+  ConvertAndNormalize<TDest>(source, scale, offset,
+                             flatfieldView ? &*flatfieldView : nullptr,
+                             destView);
+}
+
 } // namespace PbHelper
@@ -0,0 +1 @@
+"""Contains the benchmark suite of pylibCZIrw."""
@@ -0,0 +1,77 @@
+"""Options and fixtures of the benchmark suite
+
+The benchmarks run on synthetic czi documents written with CziWriter: square mosaics of tiles, one document per
+combination of pixel type and compression. Size, tile size, pixel types and compressions are configurable from the
+command line, e.g. pytest benchmarks --czi-size 8192 --czi-pixel-types Gray16,Bgr48.
+
+Besides the timings, the benchmarks record the peak RSS and the throughput in the extra info of the results. Results
+are compared across commits with pytest-benchmark, e.g. tox -e benchmark (which saves the results of each run in
+.benchmarks) followed by tox -e benchmark -- --benchmark-compare --benchmark-compare-fail=mean:10%.
+"""
+
+import os
+from typing import Any, Dict, Generator, Tuple
+
+import pytest
+
+from benchmarks.synthetic import PeakRssSampler, SyntheticCzi, create_mosaic, write_mosaic
+from pylibCZIrw.czi import CziReader
+
+
+def pytest_addoption(parser: Any) -> None:
+    """Adds the options configuring the synthetic documents."""
+    group = parser.getgroup("czi benchmarks")
+    group.addoption("--czi-size", type=int, default=4096, help="width and height of the documents (default: 4096)")
+    group.addoption("--czi-tile", type=int, default=512, help="width and height of the tiles (default: 512)")
+    group.addoption(
+        "--czi-pixel-types",
+        default="Gray8,Gray16,Bgr24",
+        help=f"comma separated pixel types out of {', '.join(CziReader.PIXEL_TYPES)} (default: Gray8,Gray16,Bgr24)",
+    )
+    group.addoption(
+        "--czi-compressions",
+        default="uncompressed:;zstd1:",
+        help='semicolon separated compression options (default: "uncompressed:;zstd1:")',
+    )
+
+
+def pytest_generate_tests(metafunc: Any) -> None:
+    """Parametrizes the benchmarks with the configured pixel types and compressions."""
+    if "pixel_type" in metafunc.fixturenames:
+        metafunc.parametrize("pixel_type", metafunc.config.getoption("czi_pixel_types").split(","))
+    if "compression" in metafunc.fixturenames:
+        metafunc.parametrize("compression", metafunc.config.getoption("czi_compressions").split(";"))
+
+
+@pytest.fixture(scope="session")
+def _synthetic_czis() -> Dict[Tuple[str, str], SyntheticCzi]:
+    """The synthetic documents created so far, by pixel type and compression."""
+    return {}
+
+
+@pytest.fixture
+def synthetic_czi(
+    request: Any,
+    _synthetic_czis: Dict[Tuple[str, str], SyntheticCzi],
+    tmp_path_factory: Any,
+    pixel_type: str,
+    compression: str,
+) -> SyntheticCzi:
+    """The synthetic document of the pixel type and compression, written once per session."""
+    key = (pixel_type, compression)
+    if key not in _synthetic_czis:
+        size = request.config.getoption("czi_size")
+        tile = request.config.getoption("czi_tile")
+        path = os.path.join(str(tmp_path_factory.mktemp("czi")), f"{pixel_type}.czi")
+        write_mosaic(path, create_mosaic(size, tile, pixel_type), compression)
+        _synthetic_czis[key] = SyntheticCzi(path, size, tile, pixel_type, compression)
+    return _synthetic_czis[key]
+
+
+@pytest.fixture
+def peak_rss(benchmark: Any) -> Generator[PeakRssSampler, None, None]:
+    """Records the peak RSS during the benchmark (and its increase over the RSS before) in the extra info."""
+    with PeakRssSampler() as sampler:
+        yield sampler
+    benchmark.extra_info["peak_rss_mib"] = sampler.peak / 1024**2
+    benchmark.extra_info["peak_rss_increase_mib"] = (sampler.peak - sampler.baseline) / 1024**2
@@ -0,0 +1,81 @@
+"""Module implementing the synthetic documents and the measurements of the benchmark suite"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from pylibCZIrw.czi import CziReader, create_czi
+
+
+@dataclass
+class SyntheticCzi:
+    """Synthetic czi document data structure."""
+
+    path: str  # File path of the document.
+    size: int  # Width and height of the document (in pixels).
+    tile: int  # Width and height of the tiles (in pixels).
+    pixel_type: str  # Pixel type of the document.
+    compression: str  # Compression options the tiles were written with.
+
+
+def create_tile(pixel_type: str, size: int, seed: int) -> np.ndarray:
+    """Creates a tile of a smooth gradient with noise, which is compressible like a typical microscopy image."""
+    rng = np.random.default_rng(seed)
+    dtype = CziReader.PIXEL_TYPE_DTYPES[pixel_type]
+    channels = 3 if CziReader._is_rgb(pixel_type) else 1
+    maximum = 1.0 if np.issubdtype(dtype, np.floating) else float(np.iinfo(dtype).max)
+    gradient = np.linspace(0.2, 0.6, size)[:, np.newaxis, np.newaxis] * np.ones((size, size, channels))
+    noise = rng.normal(0, 0.05, (size, size, channels))
+    return (np.clip(gradient + noise, 0, 1) * maximum).astype(dtype)
+
+
+def create_mosaic(size: int, tile: int, pixel_type: str) -> List[Tuple[Tuple[int, int], np.ndarray]]:
+    """Creates the tiles (location and data) of a mosaic of size x size pixels with tiles of tile x tile pixels."""
+    return [
+        ((x, y), create_tile(pixel_type, tile, seed=y * size + x)[: size - y, : size - x])
+        for y in range(0, size, tile)
+        for x in range(0, size, tile)
+    ]
+
+
+def write_mosaic(path: str, mosaic: List[Tuple[Tuple[int, int], np.ndarray]], compression: str) -> None:
+    """Writes the tiles of a mosaic to a new document."""
+    with create_czi(path, compression_options=compression) as czi_document:
+        for location, data in mosaic:
+            czi_document.write(data, location=location)
+
+
+class PeakRssSampler:
+    """Samples the resident set size (RSS) of the process in a background thread and keeps the peak."""
+
+    def __init__(self, interval: float = 0.002) -> None:
+        import psutil  # pylint: disable=import-outside-toplevel
+
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self.baseline = self.peak = self._process.memory_info().rss
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, self._process.memory_info().rss)
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+
+def record_throughput(benchmark: Any, pixels: int, nbytes: int) -> None:
+    """Records the throughput of the benchmarked function (processing pixels and nbytes per call) in the extra
+    info, based on the mean duration of a call."""
+    mean = benchmark.stats.stats.mean
+    benchmark.extra_info["megapixels_per_second"] = pixels / mean / 1e6
+    benchmark.extra_info["mib_per_second"] = nbytes / mean / 1024**2
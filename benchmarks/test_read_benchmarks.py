@@ -0,0 +1,71 @@
+"""Module implementing benchmarks of reading"""
+
+import os
+from typing import Any
+
+import numpy as np
+import pytest
+
+from pylibCZIrw.czi import CacheOptions, CacheType, open_czi
+
+from benchmarks.synthetic import PeakRssSampler, SyntheticCzi, record_throughput
+
+pytest.importorskip("pytest_benchmark")
+
+ROI_SIZE = 256
+ROI_COUNT = 50
+
+
+def test_open(benchmark: Any, synthetic_czi: SyntheticCzi) -> None:
+    """Latency of opening a document (stream creation, subblock directory and statistics)"""
+
+    def open_and_close() -> None:
+        with open_czi(synthetic_czi.path):
+            pass
+
+    benchmark(open_and_close)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+def test_random_roi_reads(benchmark: Any, synthetic_czi: SyntheticCzi, peak_rss: PeakRssSampler, cached: bool) -> None:
+    """Latency and throughput of small random ROI reads, with and without a subblock cache"""
+    rng = np.random.default_rng(0)
+    origins = rng.integers(0, synthetic_czi.size - ROI_SIZE, (ROI_COUNT, 2))
+    cache_options = CacheOptions(CacheType.Standard, max_memory_usage=512 * 1024**2) if cached else None
+    with open_czi(synthetic_czi.path, cache_options=cache_options) as czi_document:
+
+        def read_rois() -> int:
+            return sum(czi_document.read(roi=(int(x), int(y), ROI_SIZE, ROI_SIZE)).nbytes for x, y in origins)
+
+        nbytes = benchmark(read_rois)
+    record_throughput(benchmark, ROI_COUNT * ROI_SIZE**2, nbytes)
+
+
+@pytest.mark.parametrize("prepared", [False, True], ids=["plain", "prepared"])
+def test_small_tile_reads(benchmark: Any, synthetic_czi: SyntheticCzi, prepared: bool) -> None:
+    """Per-call overhead of reading the same small tile repeatedly, with and without a prepared request"""
+    with open_czi(synthetic_czi.path) as czi_document:
+        if prepared:
+            request = czi_document.prepare_read(roi=(0, 0, 16, 16), plane={"C": 0})
+            benchmark(lambda: czi_document.read(request=request))
+        else:
+            benchmark(lambda: czi_document.read(roi=(0, 0, 16, 16), plane={"C": 0}))
+
+
+def test_full_read(benchmark: Any, synthetic_czi: SyntheticCzi, peak_rss: PeakRssSampler) -> None:
+    """Throughput of reading a whole plane"""
+    with open_czi(synthetic_czi.path) as czi_document:
+        nbytes = benchmark(lambda: czi_document.read().nbytes)
+    record_throughput(benchmark, synthetic_czi.size**2, nbytes)
+    benchmark.extra_info["file_size_mib"] = os.path.getsize(synthetic_czi.path) / 1024**2
+
+
+@pytest.mark.parametrize("zoom", [0.5, 0.1])
+@pytest.mark.parametrize("resample", ["nearest", "area"])
+def test_zoomed_read(
+    benchmark: Any, synthetic_czi: SyntheticCzi, peak_rss: PeakRssSampler, zoom: float, resample: str
+) -> None:
+    """Throughput of reading a whole plane downscaled, in source pixels per second"""
+    with open_czi(synthetic_czi.path) as czi_document:
+        benchmark(lambda: czi_document.read(zoom=zoom, resample=resample))
+    record_throughput(benchmark, synthetic_czi.size**2, synthetic_czi.size**2)
@@ -0,0 +1,25 @@
+"""Module implementing benchmarks of writing"""
+
+import os
+from typing import Any, Dict, Tuple
+
+import pytest
+
+from benchmarks.synthetic import PeakRssSampler, create_mosaic, record_throughput, write_mosaic
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_write(
+    benchmark: Any, tmp_path: Any, peak_rss: PeakRssSampler, pixel_type: str, compression: str, request: Any
+) -> None:
+    """Throughput of writing (and compressing) a mosaic to a new document"""
+    size = request.config.getoption("czi_size")
+    mosaic = create_mosaic(size, request.config.getoption("czi_tile"), pixel_type)
+    paths = [os.path.join(str(tmp_path), f"{index}.czi") for index in range(3)]
+
+    def setup() -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        return (paths.pop(), mosaic, compression), {}
+
+    benchmark.pedantic(write_mosaic, setup=setup, rounds=len(paths))
+    record_throughput(benchmark, size**2, sum(data.nbytes for _, data in mosaic))
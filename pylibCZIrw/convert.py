@@ -0,0 +1,547 @@
+"""Module implementing the conversion of czi documents to other formats
+
+to_zarr converts a czi document to OME-Zarr (version 0.4 of the NGFF specification, stored in the zarr v2 format).
+The module can also be used from the command line, see main().
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from pylibCZIrw.czi import CacheOptions, CacheType, CziReader, Rectangle, open_czi
+
+# The axes of the OME-Zarr images, the arrays of all resolution levels are 5-dimensional.
+OME_ZARR_AXES: List[Dict[str, str]] = [
+    {"name": "t", "type": "time"},
+    {"name": "c", "type": "channel"},
+    {"name": "z", "type": "space", "unit": "micrometer"},
+    {"name": "y", "type": "space", "unit": "micrometer"},
+    {"name": "x", "type": "space", "unit": "micrometer"},
+]
+
+
+@dataclass
+class ZarrImageLayout:
+    """Zarr image layout data structure.
+
+    Data structure to represent how (one scene of) a czi document is laid out as an OME-Zarr multiscale image.
+    The c axis has one element per sample of each channel of the document (i.e. three per channel for rgb pixel
+    types, in the order R, G, B), and the samples of a channel are stored in the same chunk.
+    """
+
+    rectangle: Rectangle  # The region of the image (on pyramid layer 0).
+    sizes: Tuple[int, int, int]  # The number of planes in T, C and Z.
+    pixel_type: str  # The pixel type all channels are read with.
+    samples: int  # The number of samples per pixel (1 for gray, 3 for rgb pixel types).
+    chunks: Tuple[int, int]  # The chunk size in y and x.
+    levels: int  # The number of resolution levels, each one half the size of the previous one.
+    scene: Optional[int]  # The scene index, or None for the whole document.
+    physical_sizes: Dict[str, float]  # The size of a pixel on level 0 in micrometer (per axis, if known).
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The data type of the arrays."""
+        return CziReader.PIXEL_TYPE_DTYPES[self.pixel_type]
+
+    def shape(self, level: int) -> Tuple[int, int, int, int, int]:
+        """The shape (t, c, z, y, x) of the array of the specified resolution level."""
+        factor = 2**level
+        return (
+            self.sizes[0],
+            self.sizes[1] * self.samples,
+            self.sizes[2],
+            -(-self.rectangle.h // factor),
+            -(-self.rectangle.w // factor),
+        )
+
+    def chunk_shape(self) -> Tuple[int, int, int, int, int]:
+        """The chunk shape (t, c, z, y, x) of the arrays of all resolution levels."""
+        return (1, self.samples, 1) + self.chunks
+
+    def chunk_grid(self, level: int) -> Tuple[int, int, int, int, int]:
+        """The number of chunks (t, c, z, y, x) of the array of the specified resolution level."""
+        return tuple(-(-size // chunk) for size, chunk in zip(self.shape(level), self.chunk_shape()))  # type: ignore
+
+    def chunk_rectangle(self, level: int, y: int, x: int) -> Rectangle:
+        """The region (on pyramid layer 0) covered by the specified chunk of a resolution level."""
+        factor = 2**level
+        height, width = self.chunks
+        return Rectangle(
+            self.rectangle.x + x * width * factor,
+            self.rectangle.y + y * height * factor,
+            width * factor,
+            height * factor,
+        )
+
+
+def create_zarr_image_layout(
+    reader: CziReader,
+    scene: Optional[int] = None,
+    chunks: Tuple[int, int] = (1024, 1024),
+    pixel_type: Optional[str] = None,
+) -> ZarrImageLayout:
+    """Creates the layout of (one scene of) a czi document as an OME-Zarr multiscale image. Resolution levels are
+    added until the image fits into one chunk.
+
+    Parameters
+    ----------
+    reader : CziReader
+        The czi document.
+    scene : Optional[int]
+        Scene index, or None for the whole document.
+    chunks : Tuple[int, int]
+        The chunk size in y and x.
+    pixel_type : Optional[str]
+        The pixel type all channels are read with, defaults to the widest pixel type of the channels (see
+        _get_widest_pixel_type).
+
+    Returns
+    ----------
+    : ZarrImageLayout
+        The layout of the image.
+    :raises ValueError: if the chunk size is not positive, the scene does not exist or no pixel_type is specified for
+        channels mixing gray and rgb pixel types
+    """
+    if len(chunks) != 2 or min(chunks) <= 0:
+        raise ValueError("chunks must be two positive numbers of pixels.")
+    if scene is None:
+        rectangle = reader.total_bounding_rectangle_no_pyramid
+    else:
+        try:
+            rectangle = reader.scenes_bounding_rectangle_no_pyramid[scene]
+        except KeyError:
+            raise ValueError("The scene index provided does not mach existing scenes in the czi document") from KeyError
+    bounding_box = reader.total_bounding_box
+    if pixel_type is None:
+        pixel_type = _get_widest_pixel_type(
+            [reader.get_channel_pixel_type(channel) for channel in range(*bounding_box["C"])]
+        )
+    levels = 1
+    while rectangle.h > chunks[0] * 2 ** (levels - 1) or rectangle.w > chunks[1] * 2 ** (levels - 1):
+        levels += 1
+    return ZarrImageLayout(
+        rectangle=Rectangle(*rectangle),
+        sizes=(bounding_box["T"][1], bounding_box["C"][1], bounding_box["Z"][1]),
+        pixel_type=pixel_type,
+        samples=3 if CziReader._is_rgb(pixel_type) else 1,
+        chunks=(int(chunks[0]), int(chunks[1])),
+        levels=levels,
+        scene=scene,
+        physical_sizes=_get_physical_sizes(reader),
+    )
+
+
+def _get_widest_pixel_type(pixel_types: Sequence[str]) -> str:
+    """Returns the pixel type holding the values of all the pixel types without loss: floating point types before
+    integer types, then the type with the most bytes per sample.
+
+    Parameters
+    ----------
+    pixel_types : Sequence[str]
+        The pixel types of the channels.
+
+    Returns
+    ----------
+    : str
+        The widest pixel type.
+    :raises ValueError: if gray and rgb pixel types are mixed
+    """
+    distinct_pixel_types = sorted(set(pixel_types))
+    if len({CziReader._is_rgb(pixel_type) for pixel_type in distinct_pixel_types}) > 1:
+        raise ValueError(
+            f"The channels mix gray and rgb pixel types ({', '.join(distinct_pixel_types)}), which cannot be stored "
+            "in one array."
+        )
+    return max(
+        distinct_pixel_types,
+        key=lambda pixel_type: (
+            CziReader.PIXEL_TYPE_DTYPES[pixel_type].kind == "f",
+            CziReader.PIXEL_TYPE_DTYPES[pixel_type].itemsize,
+        ),
+    )
+
+
+def _get_physical_sizes(reader: CziReader) -> Dict[str, float]:
+    """Returns the size of a pixel in micrometer per axis (x, y, z) as far as specified in the metadata.
+
+    Parameters
+    ----------
+    reader : CziReader
+        The czi document.
+
+    Returns
+    ----------
+    : Dict[str, float]
+        The sizes, for example {"x": 0.1, "y": 0.1}.
+    """
+    try:
+        distances = reader.metadata["ImageDocument"]["Metadata"]["Scaling"]["Items"]["Distance"]
+    except (KeyError, TypeError):
+        return {}
+    if isinstance(distances, dict):
+        distances = [distances]
+    physical_sizes = {}
+    for distance in distances:
+        try:
+            # The metadata specifies the distances in meter.
+            physical_size = float(distance["Value"]) * 1e6
+            if physical_size > 0:
+                physical_sizes[distance["@Id"].lower()] = physical_size
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+    return physical_sizes
+
+
+def create_multiscales_attributes(layout: ZarrImageLayout, name: str) -> Dict[str, Any]:
+    """Creates the OME-Zarr attributes (.zattrs) of a multiscale image.
+
+    Parameters
+    ----------
+    layout : ZarrImageLayout
+        The layout of the image.
+    name : str
+        The name of the image.
+
+    Returns
+    ----------
+    : Dict[str, Any]
+        The attributes.
+    """
+    datasets = []
+    for level in range(layout.levels):
+        factor = 2**level
+        scale = [
+            1.0,
+            1.0,
+            layout.physical_sizes.get("z", 1.0),
+            layout.physical_sizes.get("y", 1.0) * factor,
+            layout.physical_sizes.get("x", 1.0) * factor,
+        ]
+        datasets.append({"path": str(level), "coordinateTransformations": [{"type": "scale", "scale": scale}]})
+    return {
+        "multiscales": [
+            {
+                "version": "0.4",
+                "name": name,
+                "axes": OME_ZARR_AXES,
+                "datasets": datasets,
+                "type": "mean",
+            }
+        ]
+    }
+
+
+def create_array_metadata(
+    layout: ZarrImageLayout, level: int, compression_level: Optional[int] = None, dimension_separator: str = "/"
+) -> Dict[str, Any]:
+    """Creates the zarr array metadata (.zarray) of a resolution level.
+
+    Parameters
+    ----------
+    layout : ZarrImageLayout
+        The layout of the image.
+    level : int
+        The resolution level.
+    compression_level : Optional[int]
+        The zlib compression level of the chunks, or None for uncompressed chunks.
+    dimension_separator : str
+        The separator of the chunk indices in the chunk keys, "/" (as required by OME-Zarr 0.4) or ".".
+
+    Returns
+    ----------
+    : Dict[str, Any]
+        The metadata.
+    """
+    return {
+        "zarr_format": 2,
+        "shape": list(layout.shape(level)),
+        "chunks": list(layout.chunk_shape()),
+        "dtype": layout.dtype.str,
+        "compressor": None if compression_level is None else {"id": "zlib", "level": compression_level},
+        "fill_value": 0,
+        "order": "C",
+        "filters": None,
+        "dimension_separator": dimension_separator,
+    }
+
+
+def read_chunk(
+    reader: CziReader, layout: ZarrImageLayout, level: int, t: int, c: int, z: int, y: int, x: int
+) -> np.ndarray:
+    """Reads a chunk of a resolution level from the czi document. Resolution levels other than 0 are read from the
+    best fitting pyramid layer of the document (or from layer 0 if the document has no pyramid).
+
+    Parameters
+    ----------
+    reader : CziReader
+        The czi document.
+    layout : ZarrImageLayout
+        The layout of the image.
+    level : int
+        The resolution level.
+    t, c, z, y, x : int
+        The chunk indices (c being the channel of the document).
+
+    Returns
+    ----------
+    : np.ndarray
+        The chunk, of the chunk shape without the t and z axes, i.e. (samples, y, x).
+    """
+    pixel_data = reader.read(
+        roi=layout.chunk_rectangle(level, y, x),
+        plane={"T": t, "C": c, "Z": z},
+        scene=layout.scene,
+        zoom=None if level == 0 else 1 / 2**level,
+        pixel_type=layout.pixel_type,
+    )
+    height, width = layout.chunks
+    chunk = np.zeros((layout.samples, height, width), dtype=layout.dtype)
+    pixel_data = pixel_data[:height, :width]
+    # The samples of rgb pixel types are stored in the order B, G, R.
+    chunk[:, : pixel_data.shape[0], : pixel_data.shape[1]] = np.moveaxis(pixel_data[..., ::-1], 2, 0)
+    return chunk
+
+
+def _downsample_chunk(data: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Halves the size of the chunk data (samples, 2 * y, 2 * x) by averaging each 2x2 block of pixels."""
+    samples, height, width = data.shape
+    mean = data.reshape(samples, height // 2, 2, width // 2, 2).mean(axis=(2, 4))
+    if np.issubdtype(dtype, np.integer):
+        mean = np.rint(mean)
+    return mean.astype(dtype)
+
+
+class _ZarrImageWriter:
+    """Writes the chunks of an OME-Zarr multiscale image into a directory.
+
+    _path : str
+        The directory of the image.
+    _layout : ZarrImageLayout
+        The layout of the image.
+    _compression_level : Optional[int]
+        The zlib compression level of the chunks, or None for uncompressed chunks.
+    """
+
+    def __init__(self, path: str, layout: ZarrImageLayout, compression_level: Optional[int]) -> None:
+        self._path = path
+        self._layout = layout
+        self._compression_level = compression_level
+
+    def write_metadata(self, name: str) -> None:
+        """Writes the group and array metadata of the image."""
+        _write_json(os.path.join(self._path, ".zgroup"), {"zarr_format": 2})
+        _write_json(os.path.join(self._path, ".zattrs"), create_multiscales_attributes(self._layout, name))
+        for level in range(self._layout.levels):
+            _write_json(
+                os.path.join(self._path, str(level), ".zarray"),
+                create_array_metadata(self._layout, level, self._compression_level),
+            )
+
+    def _chunk_path(self, level: int, t: int, c: int, z: int, y: int, x: int) -> str:
+        return os.path.join(self._path, str(level), str(t), str(c), str(z), str(y), str(x))
+
+    def write_chunk(self, level: int, t: int, c: int, z: int, y: int, x: int, chunk: np.ndarray) -> None:
+        """Writes a chunk, chunks without any non-zero value are not written (they are filled with the fill value
+        by the readers). The file of such a chunk is removed if it exists, e.g. from an earlier conversion into the same
+        directory, as readers would return its data instead of the fill value."""
+        path = self._chunk_path(level, t, c, z, y, x)
+        if not chunk.any():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            return
+        data = np.ascontiguousarray(chunk, dtype=self._layout.dtype).tobytes()
+        if self._compression_level is not None:
+            data = zlib.compress(data, self._compression_level)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as chunk_file:
+            chunk_file.write(data)
+
+    def load_chunk(self, level: int, t: int, c: int, z: int, y: int, x: int) -> np.ndarray:
+        """Loads a chunk written before (of shape (samples, y, x)), chunks not written are filled with zeros."""
+        shape = (self._layout.samples,) + self._layout.chunks
+        try:
+            with open(self._chunk_path(level, t, c, z, y, x), "rb") as chunk_file:
+                data = chunk_file.read()
+        except FileNotFoundError:
+            return np.zeros(shape, dtype=self._layout.dtype)
+        if self._compression_level is not None:
+            data = zlib.decompress(data)
+        return np.frombuffer(data, dtype=self._layout.dtype).reshape(shape)
+
+    def downsample_chunk(self, level: int, t: int, c: int, z: int, y: int, x: int) -> np.ndarray:
+        """Computes a chunk of a resolution level from the 2x2 chunks of the previous level covering it."""
+        height, width = self._layout.chunks
+        data = np.empty((self._layout.samples, 2 * height, 2 * width), dtype=self._layout.dtype)
+        for dy in range(2):
+            for dx in range(2):
+                data[:, dy * height : (dy + 1) * height, dx * width : (dx + 1) * width] = self.load_chunk(
+                    level - 1, t, c, z, 2 * y + dy, 2 * x + dx
+                )
+        return _downsample_chunk(data, self._layout.dtype)
+
+
+def _write_json(path: str, content: Dict[str, Any]) -> None:
+    """Writes the content as a json file, creating the directory if needed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as json_file:
+        json.dump(content, json_file, indent=4)
+
+
+def _has_pyramid(reader: CziReader, scene: Optional[int]) -> bool:
+    """Returns whether the (scene of the) czi document contains subblocks on pyramid layers other than 0."""
+    return any(
+        subblock.size[0] < subblock.rect.w or subblock.size[1] < subblock.rect.h
+        for subblock in reader.subblock_directory(scene)
+    )
+
+
+def _run_bounded(executor: ThreadPoolExecutor, tasks: Iterable[Callable[[], None]], max_pending: int) -> None:
+    """Runs the tasks on the executor with at most max_pending tasks submitted at a time, so that only a bounded
+    number of chunks are held in memory. Exceptions of the tasks are re-raised."""
+    pending: Set[Future] = set()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        pending.add(executor.submit(task))
+    for future in pending:
+        future.result()
+
+
+def to_zarr(
+    src: str,
+    dst: str,
+    chunks: Tuple[int, int] = (1024, 1024),
+    workers: Optional[int] = None,
+    scene: Optional[int] = None,
+    max_memory: int = 1024**3,
+    compression_level: Optional[int] = 1,
+    exist_ok: bool = False,
+) -> None:
+    """Converts a czi document to OME-Zarr (NGFF 0.4, zarr v2 format with "/" as dimension separator).
+
+    The chunks are read and written by a pool of worker threads, each chunk being read with exactly the region it
+    covers. Resolution levels halving the size of the previous one are added until the image fits into one chunk;
+    they are read from the pyramid of the document if it has one, and computed from the previous level otherwise.
+    Chunks without any non-zero value (e.g. outside of the tiles of a mosaic) are not written.
+
+    If scene is None and the document has several scenes, each scene is written as an image to the group
+    dst/<scene index>, with the "bioformats2raw.layout" attribute on dst. Otherwise, dst is the image.
+
+    Parameters
+    ----------
+    src : str
+        File path of the czi document.
+    dst : str
+        Directory the OME-Zarr is written to.
+    chunks : Tuple[int, int]
+        The chunk size in y and x.
+    workers : Optional[int]
+        The number of worker threads (defaults to the default of ThreadPoolExecutor).
+    scene : Optional[int]
+        Scene index, if None all scenes are converted.
+    max_memory : int
+        The memory budget (in bytes) for the chunks in flight and the subblock cache, each getting one half. At least
+        one chunk per worker is processed at a time.
+    compression_level : Optional[int]
+        The zlib compression level (0-9) of the chunks, or None for uncompressed chunks.
+    exist_ok : bool
+        If False, a FileExistsError is raised if dst already exists.
+
+    :raises FileExistsError: if dst exists and exist_ok is False
+    :raises ValueError: if the chunk size is not positive or the scene does not exist
+    """
+    if os.path.exists(dst) and not exist_ok:
+        raise FileExistsError(f"{dst} already exists.")
+    # Same default as ThreadPoolExecutor.
+    workers = min(32, (os.cpu_count() or 1) + 4) if workers is None else workers
+    cache_options = CacheOptions(type=CacheType.Standard, max_memory_usage=max_memory // 2)
+    with open_czi(src, cache_options=cache_options) as reader, ThreadPoolExecutor(max_workers=workers) as executor:
+        if scene is None and len(reader.scenes_bounding_rectangle) > 1:
+            scenes: Sequence[Optional[int]] = sorted(reader.scenes_bounding_rectangle)
+            _write_json(os.path.join(dst, ".zgroup"), {"zarr_format": 2})
+            _write_json(os.path.join(dst, ".zattrs"), {"bioformats2raw.layout": 3})
+            paths = [os.path.join(dst, str(scene_index)) for scene_index in scenes]
+        else:
+            scenes = [scene]
+            paths = [dst]
+        name = os.path.splitext(os.path.basename(src))[0]
+        for scene_index, path in zip(scenes, paths):
+            layout = create_zarr_image_layout(reader, scene_index, chunks)
+            writer = _ZarrImageWriter(path, layout, compression_level)
+            writer.write_metadata(name if scene_index is None else f"{name} #{scene_index}")
+            # A task holds the chunk it writes and, when downsampling, the 2x2 chunks of the previous level.
+            chunk_bytes = layout.samples * chunks[0] * chunks[1] * layout.dtype.itemsize
+            max_pending = max(workers, max_memory // 2 // (5 * chunk_bytes))
+            use_pyramid = _has_pyramid(reader, scene_index)
+            for level in range(layout.levels):
+                # Levels are written one after another, as downsampling reads back the previous level.
+                _run_bounded(executor, _chunk_tasks(reader, layout, writer, level, use_pyramid), max_pending)
+
+
+def _chunk_tasks(
+    reader: CziReader, layout: ZarrImageLayout, writer: _ZarrImageWriter, level: int, use_pyramid: bool
+) -> Iterable[Callable[[], None]]:
+    """Yields one task per chunk of a resolution level, row by row so that neighboring chunks (which usually share
+    subblocks) are processed one after another."""
+
+    def write_chunk(t: int, c: int, z: int, y: int, x: int) -> None:
+        if level == 0 or use_pyramid:
+            chunk = read_chunk(reader, layout, level, t, c, z, y, x)
+        else:
+            chunk = writer.downsample_chunk(level, t, c, z, y, x)
+        writer.write_chunk(level, t, c, z, y, x, chunk)
+
+    chunk_grid = layout.chunk_grid(level)
+    for t in range(chunk_grid[0]):
+        for c in range(chunk_grid[1]):
+            for z in range(chunk_grid[2]):
+                for y in range(chunk_grid[3]):
+                    for x in range(chunk_grid[4]):
+                        yield lambda t=t, c=c, z=z, y=y, x=x: write_chunk(t, c, z, y, x)  # type: ignore[misc]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command line interface of to_zarr, e.g. czi2zarr image.czi image.ome.zarr --chunks 512 512 --workers 8
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]]
+        The command line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(prog="czi2zarr", description="Converts a czi document to OME-Zarr.")
+    parser.add_argument("src", help="file path of the czi document")
+    parser.add_argument("dst", help="directory the OME-Zarr is written to")
+    parser.add_argument("--chunks", type=int, nargs=2, default=(1024, 1024), metavar=("Y", "X"), help="chunk size")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker threads")
+    parser.add_argument("--scene", type=int, default=None, help="convert only this scene")
+    parser.add_argument(
+        "--max-memory", type=int, default=1024, metavar="MIB", help="memory budget in MiB (default: 1024)"
+    )
+    parser.add_argument(
+        "--compression-level", type=int, default=1, help="zlib compression level, -1 for no compression (default: 1)"
+    )
+    parser.add_argument("--exist-ok", action="store_true", help="do not fail if the destination already exists")
+    args = parser.parse_args(argv)
+    to_zarr(
+        args.src,
+        args.dst,
+        chunks=tuple(args.chunks),
+        workers=args.workers,
+        scene=args.scene,
+        max_memory=args.max_memory * 1024**2,
+        compression_level=None if args.compression_level < 0 else args.compression_level,
+        exist_ok=args.exist_ok,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,62 @@ This czi document can be use to read and write czi.
 """
 
 import contextlib
+import math
+import os
+import re
+import threading
 import uuid
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from enum import Enum
-from os import makedirs
+from os import PathLike, cpu_count, fspath, getpid, makedirs
 from os.path import abspath, dirname, isfile
-from typing import Any, Callable, Dict, Generator, NamedTuple, Optional, Tuple, Union
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
 import numpy as np
-import validators
-import xmltodict
 
 import _pylibCZIrw
+from pylibCZIrw.profiling import (
+    Profiler,
+    ReadProfile,
+    StreamStatistics,
+    StreamTrace,
+    get_active_profilers,
+    measure,
+)
+from pylibCZIrw.read_trace import ReadTrace
 
 Rectangle = NamedTuple("Rectangle", [("x", int), ("y", int), ("w", int), ("h", int)])
 Location = NamedTuple("Location", [("x", int), ("y", int)])
 Color = NamedTuple("Color", [("b", float), ("g", float), ("r", float)])
 
+# Guards the lazy (re-)opening of the c++ readers (see CziReader._czi_reader). Replaced in a forked child, as another
+# thread of the parent may hold it during fork().
+_open_lock = threading.Lock()
+
+
+def _reset_open_lock() -> None:
+    global _open_lock
+    _open_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_open_lock)
+
 
 class TintingMode(Enum):
     """TintingMode enum.
@@ -69,6 +108,87 @@ class CacheOptions:
     max_sub_block_count: Optional[int] = None
 
 
+@dataclass
+class BufferPoolStats:
+    """Buffer pool statistics data structure.
+
+    Data structure to represent the state and the usage counters of a BufferPool.
+    """
+
+    max_bytes: int = 0  # Maximum size of the idle buffers kept (in bytes).
+    idle_bytes: int = 0  # Size of the idle buffers currently kept (in bytes).
+    idle_buffers: int = 0  # Number of idle buffers currently kept.
+    hits: int = 0  # Number of bitmaps created on a reused buffer.
+    misses: int = 0  # Number of buffers allocated.
+    evictions: int = 0  # Number of idle buffers freed to stay within max_bytes.
+
+
+class BufferPool:
+    """BufferPool class.
+
+    Recycles the memory of the bitmaps composed by the readers it is attached to (see open_czi() and ReaderPool),
+    i.e. the bitmaps returned by read() and the intermediate bitmaps of resampling, projections and reads of several
+    channels. The buffer of a bitmap is returned to the pool when the bitmap (and every array viewing it) is freed, and
+    reused for the next bitmap of the same size in bytes, so that serving tiles of recurring sizes does not allocate
+    and free large blocks for every read. The least recently returned idle buffers are freed to keep at most max_bytes
+    of idle buffers. A pool may be shared by several readers and threads.
+
+    max_bytes : int
+        The maximum size (in bytes) of the idle buffers kept by the pool.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Creates a buffer pool.
+
+        Parameters
+        ----------
+        max_bytes : int
+            The maximum size (in bytes) of the idle buffers kept by the pool.
+
+        :raises ValueError: If max_bytes is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError("The maximum size of the pool must not be negative.")
+        self.max_bytes = max_bytes
+        self._pool_handle: Optional[_pylibCZIrw.BufferPool] = None
+        self._pid = getpid()
+
+    @property
+    def _pool(self) -> _pylibCZIrw.BufferPool:
+        """The c++ pool, created lazily and anew in a forked process (which does not reuse the parent's buffers)."""
+        if self._pool_handle is None or self._pid != getpid():
+            self._pool_handle = _pylibCZIrw.BufferPool(self.max_bytes)
+            self._pid = getpid()
+        return self._pool_handle
+
+    def __reduce__(self) -> Tuple[type, Tuple[int]]:
+        """Only the maximum size is pickled, the unpickled pool starts empty."""
+        return BufferPool, (self.max_bytes,)
+
+    @property
+    def stats(self) -> BufferPoolStats:
+        """Get the current state and the usage counters of the pool.
+
+        Returns
+        ----------
+        : BufferPoolStats
+            A snapshot of the pool statistics.
+        """
+        statistics = self._pool.GetStatistics()
+        return BufferPoolStats(
+            max_bytes=statistics.maxBytes,
+            idle_bytes=statistics.idleBytes,
+            idle_buffers=statistics.idleBuffers,
+            hits=statistics.hits,
+            misses=statistics.misses,
+            evictions=statistics.evictions,
+        )
+
+    def clear(self) -> None:
+        """Frees all idle buffers of the pool."""
+        self._pool.Clear()
+
+
 @dataclass
 class Rgb8Color:
     """Rgb8Color class.
@@ -105,19 +225,200 @@ class ChannelDisplaySettingsDataClass:
     white_point: float
 
 
+@dataclass
+class PlaneStatistics:
+    """Plane statistics data structure.
+
+    Data structure to represent the pixel statistics of a plane. Each array has one element per channel of the pixel
+    type (in memory order B, G, R for rgb pixel types).
+    """
+
+    count: np.ndarray  # Number of pixels.
+    min: np.ndarray  # Minimum value (nan if there are no pixels).
+    max: np.ndarray  # Maximum value (nan if there are no pixels).
+    mean: np.ndarray  # Mean value (nan if there are no pixels).
+    std: np.ndarray  # Standard deviation (nan if there are no pixels).
+    histogram: np.ndarray  # Histogram, of shape (channels, bins).
+    bin_edges: np.ndarray  # Edges of the histogram bins, of shape (bins + 1,).
+
+
+@dataclass(frozen=True)
+class PlaneSpec:
+    """Plane spec data structure.
+
+    Data structure to represent plane coordinates resolved and formatted for the c++ reader once (see
+    CziReader.plane_spec()), so that reading many regions of the same plane skips this work on every call. A plane
+    spec is only valid for the reader which created it.
+    """
+
+    plane: Dict[str, int]  # Plane coordinates, with all plane dimensions of the document.
+    pixel_type: str  # Pixel type of the channel of the plane.
+    plane_libczi: str  # Plane coordinates formatted for the c++ reader.
+
+
+# Plane coordinates as a dictionary (e.g. {"Z": 1, "C": 0}), as a tuple of indices in the order of
+# CziReader.plane_dimensions (e.g. (1, 0)) or as a PlaneSpec.
+PlaneCoordinates = Union[Dict[str, int], Tuple[int, ...], PlaneSpec]
+
+
+@dataclass
+class SubBlockInfo:
+    """Subblock info data structure.
+
+    Data structure to represent a subblock passed to the subblock filter of AccessorOptions.
+    """
+
+    index: int  # Index of the subblock in the subblock directory.
+    plane: Dict[str, int]  # Plane coordinates of the subblock (e.g. {"C": 0, "T": 1}).
+    rect: Rectangle  # Rectangle the subblock covers (on pyramid layer 0).
+    size: Tuple[int, int]  # Size (w, h) of the stored bitmap.
+    m_index: Optional[int]  # M-index, None if the subblock has none.
+    scene: Optional[int]  # Scene index, None if the subblock has none.
+
+
+@dataclass(frozen=True)
+class AccessorOptions:
+    """Accessor options data structure.
+
+    Data structure to represent how the subblocks of a roi are composed by a read (see CziReader.read()). The
+    defaults are those of a read without options.
+    """
+
+    # Whether the subblocks are drawn by M-index (the highest on top), otherwise in the order of the directory.
+    sort_by_m: bool = True
+    # Whether the subblocks entirely hidden by the subblocks drawn after them are skipped.
+    visibility_check: bool = True
+    # Whether the background pixel is filled in first, otherwise pixels covered by no subblock are undefined.
+    fill_background: bool = True
+    # Selects the subblocks drawn (called once per subblock intersecting the roi), defaults to all subblocks.
+    subblock_filter: Optional[Callable[[SubBlockInfo], bool]] = None
+
+
+@dataclass(frozen=True)
+class ReadRequest:
+    """Read request data structure.
+
+    Data structure to represent the parameters of a read() validated and formatted for the c++ reader once (see
+    CziReader.prepare_read()), so that repeating the read skips this work on every call. A read request is only valid
+    for the reader which created it.
+    """
+
+    roi: Rectangle  # Region of interest.
+    plane: PlaneSpec  # Plane coordinates.
+    scene: Optional[int]  # Scene index.
+    zoom: Optional[float]  # Zoom factor.
+    pixel_type: str  # Pixel type of the returned data.
+    background_pixel: Color  # Color of the background pixels.
+    resample: str  # Resample method.
+    accessor_options: Optional[AccessorOptions]  # How the subblocks are composed.
+    roi_libczi: _pylibCZIrw.IntRect  # Region of interest formatted for the c++ reader.
+    background_pixel_libczi: _pylibCZIrw.RgbFloatColor  # Background color formatted for the c++ reader.
+    pixel_type_libczi: _pylibCZIrw.PixelType  # Pixel type formatted for the c++ reader.
+    scene_libczi: str  # Scene index formatted for the c++ reader.
+    zoom_libczi: float  # Zoom factor formatted for the c++ reader.
+    accessor_options_libczi: _pylibCZIrw.AccessorOptions  # Accessor options formatted for the c++ reader.
+
+
+@dataclass
+class ReadEstimate:
+    """Read estimate data structure.
+
+    Data structure to represent the cost of a read() estimated from the subblock directory, without reading any pixel
+    data (see CziReader.estimate()).
+    """
+
+    output_bytes: int  # Size of the composed pixel data (in bytes).
+    subblocks: int  # Number of subblocks read and decoded (subblocks hidden by others are skipped).
+    compressed_bytes: int  # Size of the subblocks in the file, i.e. the bytes fetched (in bytes).
+    decode_bytes: int  # Worst-case memory of decoding one subblock: its compressed data and its bitmap (in bytes).
+    peak_bytes: int  # Worst-case memory of the read: output, intermediate bitmaps and decode_bytes (in bytes).
+
+
+@dataclass
+class PlannedSubBlock:
+    """Planned subblock data structure.
+
+    Data structure to represent a subblock considered by a read (see ReadPlan).
+    """
+
+    index: int  # Index of the subblock in the subblock directory.
+    rect: Rectangle  # Rectangle the subblock covers (on pyramid layer 0).
+    size: Tuple[int, int]  # Size (w, h) of the stored bitmap.
+    minification: float  # Minification of the pyramid layer of the subblock (1 for full resolution).
+    m_index: Optional[int]  # M-index, None if the subblock has none.
+    scene: Optional[int]  # Scene index, None if the subblock has none.
+    file_position: int  # Position of the subblock in the file.
+    file_bytes: int  # Size of the subblock in the file (in bytes), i.e. the bytes read to decode it.
+    compression: str  # Compression mode of the subblock data.
+    cached: bool  # Whether the decoded subblock is in the subblock cache of the reader.
+    visible: bool  # Whether the subblock is drawn, i.e. not entirely hidden by the subblocks drawn after it.
+
+
+@dataclass
+class ReadPlan:
+    """Read plan data structure.
+
+    Data structure to represent how a read() would be executed (see CziReader.explain()).
+    """
+
+    roi: Rectangle  # Region of interest.
+    zoom: float  # Zoom the subblocks are composed at (1 for resample="area", which downscales afterwards).
+    output_size: Tuple[int, int]  # Size (w, h) of the composed pixel data.
+    pyramid_layers: Tuple[float, ...]  # Minifications of the pyramid layers drawn (one per scene at most).
+    subblocks: List[PlannedSubBlock]  # Subblocks intersecting the roi on the pyramid layers drawn, in drawing order.
+
+    @property
+    def read_subblocks(self) -> List[PlannedSubBlock]:
+        """The subblocks which are read and decoded, i.e. visible and not cached."""
+        return [subblock for subblock in self.subblocks if subblock.visible and not subblock.cached]
+
+    @property
+    def skipped_subblocks(self) -> List[PlannedSubBlock]:
+        """The subblocks skipped by the visibility check, as they are entirely hidden by other subblocks."""
+        return [subblock for subblock in self.subblocks if not subblock.visible]
+
+    @property
+    def file_bytes(self) -> int:
+        """The bytes read from the file for the subblocks which are read and decoded."""
+        return sum(subblock.file_bytes for subblock in self.read_subblocks)
+
+    @property
+    def skipped_file_bytes(self) -> int:
+        """The bytes not read from the file thanks to the visibility check."""
+        return sum(subblock.file_bytes for subblock in self.skipped_subblocks)
+
+
 class CziReader:
     """CziReader class.
 
     _czi_reader : object
         c++ bonded object, corresponding to an instance of the CZIreadAPI class.
+        It is opened lazily after unpickling and reopened in forked child processes.
     _stats : object
          c++ bonded object, corresponding to an instance of the libCZI::SubBlockStatistics class.
+    profiler : Optional[Profiler]
+        Records the profiles of all read operations of the reader if it was opened with profile=True, otherwise
+        None (see also pylibCZIrw.profiling.profile()).
     CZI_DIMS : Dict[str, int]
         Dictionary matching a dimension with the c++ libCZI::DimensionIndex enum value.
         The Scene dimension was excluded on purpose to avoid confusion to the users of pylibCZIrw.
         In fact S is a filter and SHOULD NOT be considered as a plane dimension.
     PIXEL_TYPES : Dict[str, int]
         Dictionary matching a pixel type with the c++ libCZI::PixelType enum value.
+    PIXEL_TYPE_DTYPES : Dict[str, np.dtype]
+        Dictionary matching a pixel type with the np.dtype of its samples.
+    FLOAT_DTYPES : Tuple[np.dtype, ...]
+        Floating point types the pixel data can be converted to while reading.
+    RESAMPLE_METHODS : Tuple[str, ...]
+        Methods for downscaling the pixel data while reading.
+    LAYOUTS : Tuple[str, ...]
+        Axis orders of the pixel data returned by read().
+    CHANNEL_ORDERS : Tuple[str, ...]
+        Orders of the samples of rgb pixel types in the pixel data returned by read().
+    PROJECTION_OPERATIONS : Tuple[str, ...]
+        Operations for projecting the planes along a dimension.
+    COMPRESSION_MODES : Dict[int, str]
+        Dictionary matching the raw compression mode of a subblock with its name.
     """
 
     BLACK_COLOR = Color(0, 0, 0)
@@ -131,6 +432,22 @@ class CziReader:
         "Bgr96Float": 8,  # BGR-color 4 byte float triples (memory order B, G, R).
     }
 
+    PIXEL_TYPE_DTYPES: Dict[str, np.dtype] = {
+        "Gray8": np.dtype("uint8"),
+        "Gray16": np.dtype("uint16"),
+        "Gray32Float": np.dtype("float32"),
+        "Bgr24": np.dtype("uint8"),
+        "Bgr48": np.dtype("uint16"),
+        "Bgr96Float": np.dtype("float32"),
+    }
+
+    FLOAT_DTYPES: Tuple[np.dtype, ...] = (np.dtype("float32"), np.dtype("float64"))
+
+    RESAMPLE_METHODS: Tuple[str, ...] = ("nearest", "area")
+    LAYOUTS: Tuple[str, ...] = ("HWC", "CHW")
+    CHANNEL_ORDERS: Tuple[str, ...] = ("BGR", "RGB")
+    PROJECTION_OPERATIONS: Tuple[str, ...] = ("max", "mean", "sum")
+
     CZI_DIMS: Dict[str, int] = {
         "Z": 1,  # The Z-dimension.
         "C": 2,  # The C-dimension ("channel").
@@ -146,11 +463,27 @@ class CziReader:
         CacheType.Standard: _pylibCZIrw.CacheType.Standard,
     }
 
+    COMPRESSION_MODES: Dict[int, str] = {
+        0: "Uncompressed",
+        1: "Jpg",
+        4: "JpgXr",
+        5: "Zstd0",
+        6: "Zstd1",
+    }
+
+    # The maximum size (in bytes) of a band of the roi composed at once for resample="area", as in the c++ reader.
+    AREA_RESAMPLE_BAND_BYTES = 64 * 1024**2
+    # The maximum size (in bytes) of the temporary subblock cache of read_many(), as in the c++ reader.
+    READ_MANY_CACHE_BYTES = 256 * 1024**2
+
     def __init__(
         self,
         filepath: str,
         file_input_type: ReaderFileInputTypes = ReaderFileInputTypes.Standard,
         cache_options: Optional[CacheOptions] = None,
+        profile: bool = False,
+        buffer_pool: Optional[BufferPool] = None,
+        max_read_bytes: Optional[int] = None,
     ) -> None:
         """Creates a czi reader object, should only be called through the open_czi() function.
 
@@ -162,23 +495,123 @@ class CziReader:
             This is used to set if the filepath is to a local path or url. Defaults to local path.
         cache_options:
             The configuration of a subblock cache to be used.
+        profile : bool
+            If True, the profiles of all read operations are recorded by the profiler of the reader.
+        buffer_pool : Optional[BufferPool]
+            The pool the bitmaps composed by the reader are created from, None to allocate them for every read.
+        max_read_bytes : Optional[int]
+            The maximum memory (in bytes) a read() may need according to its estimate (see estimate()), None for no
+            limit.
+        """
+        self._filepath = filepath
+        self._file_input_type = file_input_type
+        self._cache_options = cache_options
+        self._buffer_pool = buffer_pool
+        self._max_read_bytes = max_read_bytes
+        self.profiler: Optional[Profiler] = Profiler() if profile else None
+        self._read_traces: Tuple[ReadTrace, ...] = ()
+        self._czi_reader_handle: Optional[_pylibCZIrw.czi_reader] = None
+        self._stats_handle: Optional[_pylibCZIrw.SubBlockStatistics] = None
+        self._plane_dimensions_handle: Optional[Tuple[str, ...]] = None
+        self._pid = getpid()
+        self._open()
+
+    def _open(self) -> None:
+        """Opens the underlying c++ reader for the source of this document and (re-)reads its subblock statistics.
+
+        :raises FileNotFoundError: If the file input type is curl and the filepath is not a valid URL.
         """
-        libczi_cache_options = self._create_default_cache_options(cache_options=cache_options)
-        if file_input_type is ReaderFileInputTypes.Curl:
-            if validators.url(filepath):
+        libczi_cache_options = self._create_default_cache_options(cache_options=self._cache_options)
+        if self._file_input_type is ReaderFileInputTypes.Curl:
+            # Imported here, as only needed for URLs (and slow to import).
+            import validators
+
+            if validators.url(self._filepath):
                 # When reading from CURL stream we assume that the connection is slow
                 # And therefore also cache uncompressed subblocks.
                 libczi_cache_options.cacheOnlyCompressed = False
-                self._czi_reader = _pylibCZIrw.czi_reader(
-                    ReaderFileInputTypes.Curl.value, filepath, libczi_cache_options
+                self._czi_reader_handle = _pylibCZIrw.czi_reader(
+                    ReaderFileInputTypes.Curl.value, self._filepath, libczi_cache_options
                 )
             else:
-                raise FileNotFoundError(f"{filepath} is not a valid URL.")
+                raise FileNotFoundError(f"{self._filepath} is not a valid URL.")
         else:
             # When reading from disk we only cache compressed subblocks.
             libczi_cache_options.cacheOnlyCompressed = True
-            self._czi_reader = _pylibCZIrw.czi_reader(filepath, libczi_cache_options)
-        self._stats = self._czi_reader.GetSubBlockStats()
+            self._czi_reader_handle = _pylibCZIrw.czi_reader(self._filepath, libczi_cache_options)
+        if self._buffer_pool is not None:
+            self._czi_reader_handle.SetBufferPool(self._buffer_pool._pool)
+        self._stats_handle = self._czi_reader_handle.GetSubBlockStats()
+        self._pid = getpid()
+
+    @property
+    def _czi_reader(self) -> _pylibCZIrw.czi_reader:
+        """The c++ reader, (re-)opened lazily after unpickling or when accessed from a forked process.
+
+        A handle inherited across fork() is not reused by the child: sharing it would mean sharing the
+        parent's stream state (file offsets, curl connections, caches), so the child opens its own.
+        """
+        if self._czi_reader_handle is None or self._pid != getpid():
+            self._reopen()
+        return self._czi_reader_handle
+
+    @property
+    def _stats(self) -> _pylibCZIrw.SubBlockStatistics:
+        """The subblock statistics of the document, read when the c++ reader is (re-)opened."""
+        if self._stats_handle is None or self._pid != getpid():
+            self._reopen()
+        return self._stats_handle
+
+    @_stats.setter
+    def _stats(self, stats: _pylibCZIrw.SubBlockStatistics) -> None:
+        self._stats_handle = stats
+
+    def _reopen(self) -> None:
+        """Opens the c++ reader unless another thread did so since the caller checked, so that threads sharing a
+        freshly unpickled or forked reader open a single c++ reader.
+        """
+        with _open_lock:
+            if self._czi_reader_handle is None or self._stats_handle is None or self._pid != getpid():
+                self._open()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Only the source of the document is pickled, the c++ reader is reopened on first use after unpickling.
+
+        Returns
+        ----------
+        : Dict[str, Any]
+            The picklable state: file path (or URL), file input type, cache options, buffer pool (an empty pool of
+            the same size after unpickling), read budget and whether the reader is profiled (the profiles recorded so
+            far are not pickled).
+        """
+        return {
+            "filepath": self._filepath,
+            "file_input_type": self._file_input_type,
+            "cache_options": self._cache_options,
+            "profile": self.profiler is not None,
+            "buffer_pool": self._buffer_pool,
+            "max_read_bytes": self._max_read_bytes,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restores a reader from its pickled source without opening the document yet.
+
+        Parameters
+        ----------
+        state : Dict[str, Any]
+            State as returned by __getstate__.
+        """
+        self._filepath = state["filepath"]
+        self._file_input_type = state["file_input_type"]
+        self._cache_options = state["cache_options"]
+        self._buffer_pool = state.get("buffer_pool")
+        self._max_read_bytes = state.get("max_read_bytes")
+        self.profiler = Profiler() if state.get("profile", False) else None
+        self._read_traces = ()
+        self._czi_reader_handle = None
+        self._stats_handle = None
+        self._plane_dimensions_handle = None
+        self._pid = getpid()
 
     @classmethod
     def _create_default_cache_options(cls, cache_options: Optional[CacheOptions]) -> _pylibCZIrw.SubBlockCacheOptions:
@@ -194,7 +627,9 @@ class CziReader:
 
     def close(self) -> None:
         """Close the document and finalize the reading"""
-        self._czi_reader.close()
+        # A reader which was never (re-)opened in this process has nothing to close.
+        if self._czi_reader_handle is not None and self._pid == getpid():
+            self._czi_reader_handle.close()
 
     @staticmethod
     def _compute_index_ranges(
@@ -427,6 +862,9 @@ class CziReader:
         :
             All available metadata in a dict
         """
+        # Imported here, as only needed for the metadata (and slow to import).
+        import xmltodict
+
         return xmltodict.parse(self.raw_metadata)
 
     @property
@@ -605,6 +1043,45 @@ class CziReader:
             ) from KeyError
         return _pylibCZIrw.PixelType(pixel_id)
 
+    @staticmethod
+    def _create_subblock_info(subblock: _pylibCZIrw.SubBlockDirectoryEntry) -> SubBlockInfo:
+        """Converts a subblock directory entry of the c++ reader to a SubBlockInfo."""
+        rect = subblock.logicalRect
+        return SubBlockInfo(
+            index=subblock.index,
+            plane={dimension: int(value) for dimension, value in re.findall(r"([A-Z])(-?\d+)", subblock.coordinate)},
+            rect=Rectangle(rect.x, rect.y, rect.w, rect.h),
+            size=(subblock.physicalSize.w, subblock.physicalSize.h),
+            m_index=subblock.mIndex if subblock.hasMIndex else None,
+            scene=subblock.sceneIndex if subblock.sceneIndex >= 0 else None,
+        )
+
+    def _format_accessor_options(
+        self,
+        accessor_options: Optional[AccessorOptions],
+        roi_libczi: _pylibCZIrw.IntRect,
+        planes_libczi: List[str],
+    ) -> _pylibCZIrw.AccessorOptions:
+        """Formats the accessor options for the c++ reader. The subblock filter is evaluated here, once for each
+        subblock of the planes intersecting the roi (on any pyramid layer), as the c++ reader only takes the indices
+        of the subblocks drawn.
+        """
+        accessor_options_libczi = _pylibCZIrw.AccessorOptions()
+        if accessor_options is None:
+            return accessor_options_libczi
+        accessor_options_libczi.sortByM = accessor_options.sort_by_m
+        accessor_options_libczi.useVisibilityCheck = accessor_options.visibility_check
+        accessor_options_libczi.fillBackground = accessor_options.fill_background
+        if accessor_options.subblock_filter is not None:
+            accessor_options_libczi.filterSubBlocks = True
+            accessor_options_libczi.subBlockIndices = sorted(
+                subblock.index
+                for plane_libczi in planes_libczi
+                for subblock in self._czi_reader.GetSubBlockDirectory(plane_libczi, roi_libczi, False, "")
+                if accessor_options.subblock_filter(self._create_subblock_info(subblock))
+            )
+        return accessor_options_libczi
+
     def _create_roi(
         self,
         roi: Optional[Rectangle],
@@ -642,6 +1119,24 @@ class CziReader:
         roi = Rectangle(roi.x, roi.y, roi.w, roi.h)
         return roi
 
+    @property
+    def plane_dimensions(self) -> Tuple[str, ...]:
+        """The dimensions of the plane coordinates of the document, i.e. the dimensions of CZI_DIMS with a size larger
+        than 1, in the order in which plane coordinates given as a tuple of indices are interpreted.
+
+        Returns
+        ----------
+        : Tuple[str, ...]
+            The dimensions, for example ("Z", "C") for a document with a z-stack of several channels.
+        """
+        if self._plane_dimensions_handle is None:
+            self._plane_dimensions_handle = tuple(
+                dim
+                for dim, dim_index in self.CZI_DIMS.items()
+                if self._czi_reader.GetDimensionSize(_pylibCZIrw.DimensionIndex(dim_index)) > 1
+            )
+        return self._plane_dimensions_handle
+
     def _create_default_plane_coords(self) -> Dict[str, int]:
         """Generates a default plane coordinates dictionary with all indexes to 0.
         This default plane coordinate contains all dimensions reported being used by
@@ -652,15 +1147,11 @@ class CziReader:
         : Dict [str, int]
             Example: If the czi contains T,Z,H will return {"T":0,"H":0,"Z":0}
         """
-        return {
-            dim: 0
-            for dim, dim_index in self.CZI_DIMS.items()
-            if self._czi_reader.GetDimensionSize(_pylibCZIrw.DimensionIndex(dim_index)) > 1
-        }
+        return {dim: 0 for dim in self.plane_dimensions}
 
     def _create_plane_coords(
         self,
-        plane: Optional[Dict[str, int]],
+        plane: Optional[Union[Dict[str, int], Tuple[int, ...]]],
     ) -> Dict[str, int]:
         """Generates valid plane coordinates from the one specified. if plane is None, plane coordinates will be
         generated with all first indexes of each dimension. Otherwise, will keep the valid coordinates specified in
@@ -671,20 +1162,53 @@ class CziReader:
 
         Parameters
         ----------
-        plane : Dict[str, int]
-            Plane coordinates
+        plane : Optional[Union[Dict[str, int], Tuple[int, ...]]]
+            Plane coordinates, or a tuple with the index of each dimension of plane_dimensions.
         Returns
         ----------
         : Dict[str, int]
             Plane coordinates.
             Example: {"T":0, "Z":1, "C":0}.
+        :raises ValueError: if a tuple does not have one index per dimension of plane_dimensions
         """
+        if isinstance(plane, tuple):
+            if len(plane) != len(self.plane_dimensions):
+                raise ValueError(
+                    f"Plane coordinates given as a tuple must have one index per plane dimension of the document: "
+                    f"({', '.join(self.plane_dimensions)})."
+                )
+            return dict(zip(self.plane_dimensions, map(int, plane)))
         default_plane = self._create_default_plane_coords()
         if plane:
             default_plane.update((k, v) for k, v in plane.items() if k in default_plane)
 
         return default_plane
 
+    def plane_spec(self, plane: Optional[PlaneCoordinates] = None) -> PlaneSpec:
+        """Resolves plane coordinates (see _create_plane_coords) and looks up the pixel type of their channel once, so
+        that the returned PlaneSpec can be passed to read(), prepare_read(), read_many(), project(), plane_statistics()
+        and coverage_mask() instead of the plane coordinates, e.g. when reading many regions of the same plane.
+
+        Parameters
+        ----------
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates, as a dictionary or a tuple of indices in the order of plane_dimensions.
+
+        Returns
+        ----------
+        : PlaneSpec
+            The resolved plane coordinates, plane itself if it is a PlaneSpec.
+        :raises ValueError: if a tuple does not have one index per dimension of plane_dimensions
+        """
+        if isinstance(plane, PlaneSpec):
+            return plane
+        plane = self._create_plane_coords(plane)
+        return PlaneSpec(
+            plane=plane,
+            pixel_type=self._get_pixel_type(None, plane),
+            plane_libczi=self._format_plane(plane),
+        )
+
     def _get_pixel_type(
         self,
         pixel_type: Optional[str],
@@ -710,6 +1234,108 @@ class CziReader:
             # document
         return pixel_type
 
+    def _create_channel_planes(
+        self,
+        plane: Dict[str, int],
+        channels: Union[str, Sequence[int]],
+    ) -> List[Dict[str, int]]:
+        """Returns the plane coordinates of each of the specified channels of a plane.
+
+        Parameters
+        ----------
+        plane : Dict[str, int]
+            Plane coordinates
+        channels : Union[str, Sequence[int]]
+            "all" or the indices of the channels.
+        Returns
+        ----------
+        : List[Dict[str, int]]
+            The plane coordinates of each channel.
+        :raises ValueError: if channels is neither "all" nor a non-empty sequence of existing channel indices
+        """
+        channel_count = self.total_bounding_box["C"][1]
+        if isinstance(channels, str):
+            if channels != "all":
+                raise ValueError('channels must be "all" or a sequence of channel indices.')
+            channel_indices = list(range(channel_count))
+        else:
+            channel_indices = [int(channel) for channel in channels]
+        if not channel_indices or any(not 0 <= channel < channel_count for channel in channel_indices):
+            raise ValueError(f"The channels provided do not exist, the document has {channel_count} channels.")
+        # Without a C dimension, the document has a single channel which is not part of the plane coordinates.
+        return [{**plane, "C": channel} if "C" in plane else dict(plane) for channel in channel_indices]
+
+    def _get_common_pixel_type(self, planes: List[Dict[str, int]]) -> str:
+        """Get the pixel type shared by the channels of the specified planes.
+
+        Parameters
+        ----------
+        planes : List[Dict[str, int]]
+            Plane coordinates
+        Returns
+        ----------
+        pixel_type: str
+            Pixel type
+        :raises ValueError: if the channels have different pixel types
+        """
+        pixel_types = sorted({self._get_pixel_type(None, plane) for plane in planes})
+        if len(pixel_types) > 1:
+            raise ValueError(
+                f"The channels have different pixel types ({', '.join(pixel_types)}), a pixel_type must be specified."
+            )
+        return pixel_types[0]
+
+    def _read_planes(
+        self,
+        request: ReadRequest,
+        planes: List[Dict[str, int]],
+        layout: str,
+        channel_order: str = "BGR",
+    ) -> np.ndarray:
+        """Composes the roi of each of the planes (e.g. the channels of a multi-channel image) in parallel in native
+        code, directly into one array with the specified layout.
+
+        Parameters
+        ----------
+        request : ReadRequest
+            The parameters of the read, except for the plane coordinates.
+        planes : List[Dict[str, int]]
+            Plane coordinates
+        layout : str
+            "HWC" for an array of shape (m,n,planes*samples), "CHW" for (planes*samples,m,n).
+        channel_order : str
+            "BGR" or "RGB", the order of the samples of each plane for rgb pixel types.
+        Returns
+        ----------
+        : np.ndarray
+            The pixel data, with the samples of each plane one after another.
+        """
+        size = self._czi_reader.CalcSize(request.roi_libczi, request.zoom_libczi)
+        samples = 3 if self._is_rgb(request.pixel_type) else 1
+        dtype = self.PIXEL_TYPE_DTYPES[request.pixel_type]
+        if layout == "HWC":
+            np_pixel_data = np.empty((size.h, size.w, len(planes) * samples), dtype=dtype)
+            views = [np_pixel_data[:, :, i * samples : (i + 1) * samples] for i in range(len(planes))]
+        else:
+            np_pixel_data = np.empty((len(planes) * samples, size.h, size.w), dtype=dtype)
+            views = [np_pixel_data[i * samples : (i + 1) * samples].transpose(1, 2, 0) for i in range(len(planes))]
+        if channel_order == "RGB":
+            # The native copy writes the samples through the negative strides of the reversed views.
+            views = [view[:, :, ::-1] for view in views]
+        self._czi_reader.ReadPlanes(
+            request.pixel_type_libczi,
+            request.roi_libczi,
+            request.background_pixel_libczi,
+            request.zoom_libczi,
+            request.resample == "area" and request.zoom_libczi < 1.0,
+            [self._format_plane(plane) for plane in planes],
+            request.scene_libczi,
+            views,
+            min(len(planes), cpu_count() or 1),
+            request.accessor_options_libczi,
+        )
+        return np_pixel_data
+
     @classmethod
     def _get_array_from_bitmap(
         cls,
@@ -729,9 +1355,104 @@ class CziReader:
         : np.ndarray
             The bitmap converted to a numpy array and reshaped by splitting the color channel
         """
-        if len(np.array(pixel_data).shape) == 2:
+        np_pixel_data = np.array(pixel_data, copy=False)
+        if np_pixel_data.ndim == 2:
             raise ValueError("Incorrect shape")
-        return np.array(pixel_data, copy=False)
+        return np_pixel_data
+
+    @classmethod
+    def _convert_bitmap(
+        cls,
+        pixel_data: _pylibCZIrw.PImage,
+        dtype: Optional[Union[str, type, np.dtype]],
+        scale: Optional[Union[float, Sequence[float]]],
+        offset: Optional[Union[float, Sequence[float]]],
+        flatfield: Optional[np.ndarray],
+        layout: str = "HWC",
+        channel_order: str = "BGR",
+    ) -> np.ndarray:
+        """Converts the bitmap stored in pixel_data to a floating point np.array, computing
+        (value * scale + offset) / flatfield for each pixel value in a single pass over the bitmap.
+
+        Parameters
+        ----------
+        pixel_data : _pylibCZIrw.PImage
+            bitmap object containing pixel data
+        dtype : Optional[Union[str, type, np.dtype]]
+            Floating point type of the returned array, float32 if None.
+        scale : Optional[Union[float, Sequence[float]]]
+            One factor, or one factor per channel of the bitmap, 1 if None.
+        offset : Optional[Union[float, Sequence[float]]]
+            One offset, or one offset per channel of the bitmap, 0 if None.
+        flatfield : Optional[np.ndarray]
+            Flat-field broadcastable to the shape of the bitmap, or None.
+        layout : str
+            "HWC" for an array of shape (m,n,channels), "CHW" for (channels,m,n).
+        channel_order : str
+            "BGR" or "RGB", the order of the channels of rgb bitmaps in the returned array, scale, offset and
+            flatfield.
+        Returns
+        ----------
+        : np.ndarray
+            The converted bitmap
+        :raises ValueError: if dtype is not a supported floating point type
+        """
+        dtype = np.dtype(np.float32 if dtype is None else dtype)
+        if dtype not in cls.FLOAT_DTYPES:
+            raise ValueError(
+                f"The dtype provided does not mach any supported floating point types, possible values are: "
+                f"{', '.join(str(float_dtype) for float_dtype in cls.FLOAT_DTYPES)}"
+            )
+        shape = cls._get_array_from_bitmap(pixel_data).shape
+        n_channels = shape[2]
+        scale_libczi = np.broadcast_to(np.asarray(1.0 if scale is None else scale, dtype=np.float64), (n_channels,))
+        offset_libczi = np.broadcast_to(np.asarray(0.0 if offset is None else offset, dtype=np.float64), (n_channels,))
+        flatfield_libczi = None
+        if flatfield is not None:
+            flatfield_libczi = np.asarray(flatfield, dtype=np.float32)
+            if flatfield_libczi.ndim == 2:
+                flatfield_libczi = flatfield_libczi[..., np.newaxis]
+            # Broadcasting only creates a view with zero strides, the native conversion handles arbitrary strides.
+            flatfield_libczi = np.broadcast_to(flatfield_libczi, shape)
+
+        if layout == "HWC":
+            np_pixel_data = np.empty(shape, dtype=dtype)
+            dest = np_pixel_data
+        else:
+            np_pixel_data = np.empty((n_channels,) + shape[:2], dtype=dtype)
+            dest = np_pixel_data.transpose(1, 2, 0)
+        if channel_order == "RGB" and n_channels == 3:
+            # The native conversion writes through the negative strides of the reversed view, in the order of the
+            # bitmap.
+            dest = dest[:, :, ::-1]
+            scale_libczi = scale_libczi[::-1]
+            offset_libczi = offset_libczi[::-1]
+            if flatfield_libczi is not None:
+                flatfield_libczi = flatfield_libczi[:, :, ::-1]
+        _pylibCZIrw.ConvertAndNormalize(
+            pixel_data,
+            dest,
+            scale_libczi.tolist(),
+            offset_libczi.tolist(),
+            flatfield_libczi,
+        )
+        return np_pixel_data
+
+    def _profile(self, method: str) -> ContextManager[Optional[ReadProfile]]:
+        """Returns a context measuring a read operation if it is profiled (by the profiler of the reader or an
+        active pylibCZIrw.profiling.profile() context), which yields its profile, otherwise a context yielding None.
+
+        Parameters
+        ----------
+        method : str
+            The name of the read operation.
+        """
+        profilers = get_active_profilers()
+        if self.profiler is not None:
+            profilers += (self.profiler,)
+        if not profilers:
+            return contextlib.nullcontext()
+        return measure(self._czi_reader, method, profilers)
 
     def get_cache_info(self) -> _pylibCZIrw.SubBlockCacheInfo:
         """Provide information on the subblock cache
@@ -742,71 +1463,1319 @@ class CziReader:
         """
         return self._czi_reader.GetCacheInfo()
 
-    def read(
-        self,
-        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
-        plane: Optional[Dict[str, int]] = None,
-        scene: Optional[int] = None,
-        zoom: Optional[float] = None,
-        pixel_type: Optional[str] = None,
-        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
-    ) -> np.ndarray:
-        """Access Pixel data of the CziReader document and returns it as a np.ndarray
-
-        Parameters
-        ----------
-        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
-            Region of Interest
-        plane : Optional[Dict[str, int]]
-            Plane coordinates
-        scene : Optional[int]
-            Scene index
-        zoom : float
-            A float between 0 (excluded) and 1 that specifies the zoom factor
-        pixel_type : Optional[str]
-            The pixel type of the returned data.
-        background_pixel : Union[Tuple[float, float, float], Color]
-            Specifies the color of the background pixels (pixels with no data)
-            This value should always be an rgb float (range 0-1) and will be automatically converted to the bitmap data
-            type.
+    def stream_statistics(self) -> StreamStatistics:
+        """Returns the statistics (counts and histograms of the latencies and sizes) of the reads from the stream of the
+        document since it was opened.
 
         Returns
         ----------
-        pixel_data : np.ndarray
-            The pixel data as a numpy array.
+        : StreamStatistics
+            The statistics of the reads from the stream.
         """
-        # Casting possible tuples to namedtuple
-        if roi:
-            roi = Rectangle(*roi)
-        if not isinstance(background_pixel, Color):
-            background_pixel = Color(*background_pixel)
+        return StreamStatistics.from_native(self._czi_reader.GetStreamStatistics())
 
-        # Generating possibly non specified values
-        plane = self._create_plane_coords(plane)
-        pixel_type = self._get_pixel_type(pixel_type, plane)
-        roi = self._create_roi(roi, scene)
+    def read_counters(self) -> ReadProfile:
+        """Returns the counters (reads from the stream, subblocks read and decoded, cache lookups and hits) and the
+        native io, decode and prune times of all read operations of the document since it was opened. Unlike the
+        profiles of single operations (see ReadProfile), the difference of two snapshots counts operations running
+        concurrently only once.
 
-        # Formatting parameters for the low level call
-        roi_libczi = self._format_roi(roi)
-        background_pixel_libczi = self._format_background_pixel(background_pixel)
-        plane_libczi = self._format_plane(plane)
-        pixel_type_libczi = self._format_pixel_type(pixel_type)
-        scene_libczi = "" if scene is None else str(scene)
-        zoom_libczi = 1.0 if zoom is None else float(zoom)
+        Returns
+        ----------
+        : ReadProfile
+            The counters, without the Python side timings (convert_seconds, compose_seconds and total_seconds).
+        """
+        return ReadProfile.from_native(self._czi_reader.GetProfile())
 
-        # Getting the bitmap
-        pixel_data = self._czi_reader.GetSingleChannelScalingTileAccessorData(
-            pixel_type_libczi,
-            roi_libczi,
-            background_pixel_libczi,
-            zoom_libczi,
-            plane_libczi,
-            scene_libczi,
-        )
-        # Converting to numpy array
-        np_pixel_data = self._get_array_from_bitmap(pixel_data)
+    @contextlib.contextmanager
+    def trace_stream(self, path: Optional[str] = None, max_reads: int = 1000000) -> Generator:
+        """Records a trace of the reads (offset, size, start and duration) from the stream of the document within the
+        context, e.g. to look at the I/O pattern of a workload for tuning block sizes, readahead and caches.
 
-        return np_pixel_data
+        Parameters
+        ----------
+        path : Optional[str]
+            The path of a CSV file the trace is written to when leaving the context (see StreamTrace.save()).
+        max_reads : int
+            The maximum number of reads recorded, further reads are only counted in StreamTrace.dropped.
+
+        Returns
+        ----------
+        : StreamTrace
+            The trace, whose entries are filled in when leaving the context.
+        :raises ValueError: if a trace of the stream is already being recorded
+        """
+        trace = StreamTrace(np.empty(0, dtype=StreamTrace.DTYPE))
+        czi_reader = self._czi_reader
+        czi_reader.StartStreamTrace(max_reads)
+        try:
+            yield trace
+        finally:
+            recorded = StreamTrace.from_native(czi_reader.StopStreamTrace(), czi_reader.GetDroppedStreamTraceEntries())
+            trace.entries, trace.dropped = recorded.entries, recorded.dropped
+            if path is not None:
+                trace.save(path)
+
+    @contextlib.contextmanager
+    def record_reads(self, path: Optional[str] = None) -> Generator:
+        """Records the read() calls (roi, plane, scene, zoom, pixel type and resample method) of all threads within the
+        context, e.g. to replay the workload of a viewer or an inference service with pylibCZIrw.replay.
+
+        Parameters
+        ----------
+        path : Optional[str]
+            The path of a file the trace is written to when leaving the context (see ReadTrace.save()).
+
+        Returns
+        ----------
+        : ReadTrace
+            The trace, to which the reads are added as they finish.
+        """
+        trace = ReadTrace()
+        self._read_traces += (trace,)
+        try:
+            yield trace
+        finally:
+            self._read_traces = tuple(read_trace for read_trace in self._read_traces if read_trace is not trace)
+            if path is not None:
+                trace.save(path)
+
+    def prepare_read(
+        self,
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        zoom: Optional[float] = None,
+        pixel_type: Optional[str] = None,
+        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
+        resample: str = "nearest",
+        accessor_options: Optional[AccessorOptions] = None,
+    ) -> ReadRequest:
+        """Validates and formats the parameters of a read() once, so that the returned ReadRequest can be passed to
+        read() any number of times, e.g. in the hot loop of a viewer or a data loader. See read() for the parameters.
+
+        Returns
+        ----------
+        : ReadRequest
+            The validated and formatted parameters.
+        :raises ValueError: if a parameter is not valid
+        """
+        if resample not in self.RESAMPLE_METHODS:
+            raise ValueError(
+                f"The resample method provided does not mach any supported methods, possible values are: "
+                f"{', '.join(self.RESAMPLE_METHODS)}"
+            )
+        # Casting possible tuples to namedtuple
+        if roi:
+            roi = Rectangle(*roi)
+        if not isinstance(background_pixel, Color):
+            background_pixel = Color(*background_pixel)
+
+        # Generating possibly non specified values
+        plane_spec = self.plane_spec(plane)
+        pixel_type = pixel_type or plane_spec.pixel_type
+        roi = self._create_roi(roi, scene)
+
+        # Formatting parameters for the low level call
+        roi_libczi = self._format_roi(roi)
+        return ReadRequest(
+            roi=roi,
+            plane=plane_spec,
+            scene=scene,
+            zoom=zoom,
+            pixel_type=pixel_type,
+            background_pixel=background_pixel,
+            resample=resample,
+            accessor_options=accessor_options,
+            roi_libczi=roi_libczi,
+            background_pixel_libczi=self._format_background_pixel(background_pixel),
+            pixel_type_libczi=self._format_pixel_type(pixel_type),
+            scene_libczi="" if scene is None else str(scene),
+            zoom_libczi=1.0 if zoom is None else float(zoom),
+            accessor_options_libczi=self._format_accessor_options(
+                accessor_options, roi_libczi, [plane_spec.plane_libczi]
+            ),
+        )
+
+    def read(
+        self,
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        zoom: Optional[float] = None,
+        pixel_type: Optional[str] = None,
+        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
+        dtype: Optional[Union[str, type, np.dtype]] = None,
+        scale: Optional[Union[float, Sequence[float]]] = None,
+        offset: Optional[Union[float, Sequence[float]]] = None,
+        flatfield: Optional[np.ndarray] = None,
+        resample: str = "nearest",
+        request: Optional[ReadRequest] = None,
+        channels: Optional[Union[str, Sequence[int]]] = None,
+        layout: str = "HWC",
+        channel_order: str = "BGR",
+        accessor_options: Optional[AccessorOptions] = None,
+        target_shape: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """Access Pixel data of the CziReader document and returns it as a np.ndarray
+
+        Parameters
+        ----------
+        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
+            Region of Interest
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates, as a dictionary, a tuple of indices in the order of plane_dimensions or a PlaneSpec
+            (see plane_spec()).
+        scene : Optional[int]
+            Scene index
+        zoom : float
+            A float between 0 (excluded) and 1 that specifies the zoom factor
+        pixel_type : Optional[str]
+            The pixel type of the returned data.
+        background_pixel : Union[Tuple[float, float, float], Color]
+            Specifies the color of the background pixels (pixels with no data)
+            This value should always be an rgb float (range 0-1) and will be automatically converted to the bitmap data
+            type.
+        dtype : Optional[Union[str, type, np.dtype]]
+            Floating point type (float32 or float64) the pixel data is converted to. Defaults to float32 if scale,
+            offset or flatfield are specified, otherwise the data is returned as read (see pixel_type).
+        scale : Optional[Union[float, Sequence[float]]]
+            Factor applied to each pixel value while converting to dtype, either one value or one value per
+            channel of the bitmap (for rgb pixel types in memory order B, G, R). Defaults to 1.
+        offset : Optional[Union[float, Sequence[float]]]
+            Offset added to each scaled pixel value while converting to dtype, either one value or one value per
+            channel of the bitmap. Defaults to 0.
+        flatfield : Optional[np.ndarray]
+            Flat-field the normalized pixel values are divided by, of shape (m,n) or (m,n,1) or (m,n,3) matching
+            the shape of the returned data. Defaults to no flat-field correction.
+        resample : str
+            How the data is downscaled for a zoom smaller than 1. "nearest" picks the nearest pixel from the best
+            fitting pyramid layer, "area" averages all pixels of the full resolution layer covered by a pixel of the
+            returned data (streaming over the roi, so that the memory used is proportional to the returned data).
+            Defaults to "nearest".
+        request : Optional[ReadRequest]
+            The roi, plane, scene, zoom, pixel type, background pixel, resample method and accessor options prepared
+            by prepare_read(), which must then not be specified.
+        channels : Optional[Union[str, Sequence[int]]]
+            "all" or the indices of the channels to read into one array (the channel of plane is then ignored). The
+            channels are composed in parallel in native code. If pixel_type is not specified, all channels must have
+            the same pixel type. Defaults to the channel of plane only.
+        layout : str
+            The axis order of the returned data, "HWC" for (m,n,channels) or "CHW" for (channels,m,n), where channels
+            are the samples of the pixel type (1 for grayscale, 3 for rgb pixel types) of each channel read.
+            The data is composed (or converted) directly in this layout. Defaults to "HWC".
+        channel_order : str
+            The order of the samples of rgb pixel types, "BGR" as stored in the document or "RGB", produced while
+            composing (or converting) the data. scale and offset are then given in this order as well. Ignored for
+            grayscale pixel types. Defaults to "BGR".
+        accessor_options : Optional[AccessorOptions]
+            How the subblocks are composed: their drawing order, the visibility check, the background fill and a
+            filter selecting the subblocks drawn. Defaults to AccessorOptions().
+        target_shape : Optional[Tuple[int, int]]
+            The (height, width) of the returned data, instead of a zoom. The roi is read at the native resolution of
+            the coarsest pyramid layer with at least this resolution, and then resized to target_shape with the
+            resample method. If this layer is more than twice as large as target_shape (e.g. without a pyramid), the
+            roi is read at the zoom of target_shape with the resample method instead. Not supported together with a
+            zoom or a conversion (dtype, scale, offset, flatfield).
+
+        Returns
+        ----------
+        pixel_data : np.ndarray
+            The pixel data as a numpy array, a view on the composed bitmap (no copy) which can be handed over to
+            other frameworks with DLPack (e.g. torch.from_dlpack) without copying it either.
+        :raises ValueError: if a request is specified together with the parameters it replaces, if the channels do not
+            exist or have different pixel types, if the layout or the channel order is not supported, if target_shape
+            is not valid or specified together with a zoom or a conversion, or if the read may need more memory than
+            the max_read_bytes of the reader
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(
+                f"The layout provided does not mach any supported layouts, possible values are: "
+                f"{', '.join(self.LAYOUTS)}"
+            )
+        if channel_order not in self.CHANNEL_ORDERS:
+            raise ValueError(
+                f"The channel order provided does not mach any supported channel orders, possible values are: "
+                f"{', '.join(self.CHANNEL_ORDERS)}"
+            )
+        convert = not (dtype is None and scale is None and offset is None and flatfield is None)
+        if channels is not None and convert:
+            raise ValueError("dtype, scale, offset and flatfield are only supported for reads of a single channel.")
+        if target_shape is not None:
+            if len(target_shape) != 2 or any(int(extent) != extent or extent <= 0 for extent in target_shape):
+                raise ValueError("target_shape must be a (height, width) tuple of positive integers.")
+            if zoom is not None:
+                raise ValueError("zoom must not be specified together with target_shape.")
+            if convert:
+                raise ValueError("dtype, scale, offset and flatfield are not supported together with target_shape.")
+        if channels is not None:
+            if request is not None:
+                raise ValueError("channels must not be specified together with a request.")
+            plane = self.plane_spec(plane)
+            channel_planes = self._create_channel_planes(plane.plane, channels)
+            if not pixel_type:
+                pixel_type = self._get_common_pixel_type(channel_planes)
+        if request is None:
+            read_accessor_options = accessor_options
+            if channels is not None and accessor_options is not None and accessor_options.subblock_filter is not None:
+                read_accessor_options = replace(accessor_options, subblock_filter=None)
+            request = self.prepare_read(
+                roi, plane, scene, zoom, pixel_type, background_pixel, resample, read_accessor_options
+            )
+            if read_accessor_options is not accessor_options:
+                # The subblocks are selected among those of all the channels read, not only of the channel of plane.
+                request = replace(
+                    request,
+                    accessor_options=accessor_options,
+                    accessor_options_libczi=self._format_accessor_options(
+                        accessor_options,
+                        request.roi_libczi,
+                        [self._format_plane(channel_plane) for channel_plane in channel_planes],
+                    ),
+                )
+        elif (
+            any(value is not None for value in (roi, plane, scene, zoom, pixel_type, accessor_options, target_shape))
+            or background_pixel != self.BLACK_COLOR
+            or resample != "nearest"
+        ):
+            raise ValueError(
+                "roi, plane, scene, zoom, pixel_type, background_pixel, resample, accessor_options and target_shape "
+                "must not be specified together with a request."
+            )
+        if target_shape is not None:
+            layer_zoom = self._select_pyramid_zoom(request, target_shape)
+            target_zoom = min(1.0, max(target_shape[0] / request.roi.h, target_shape[1] / request.roi.w))
+            if layer_zoom > 2 * target_zoom:
+                # No pyramid layer close to the target: the roi is read at about target_shape with the resample method
+                # rather than composing a much larger layer which is resized afterwards.
+                request = replace(request, zoom=target_zoom, zoom_libczi=target_zoom)
+            else:
+                # The pyramid layer is read as is, and the resample method only applies to the final resize.
+                request = replace(request, zoom=layer_zoom, zoom_libczi=layer_zoom, resample="nearest")
+
+        read_planes = channels is not None or (
+            not convert and (layout != "HWC" or (channel_order != "BGR" and self._is_rgb(request.pixel_type)))
+        )
+        if self._max_read_bytes is not None:
+            self._check_read_budget(
+                self._read_bytes(
+                    request,
+                    len(channel_planes) if channels is not None else 1,
+                    read_planes,
+                    np.float32 if convert and dtype is None else dtype,
+                ),
+                "Read a smaller roi or at a smaller zoom, or use read_to_file() to read the roi tile by tile.",
+            )
+
+        start = perf_counter()
+        with self._profile("read") as profile:
+            if read_planes:
+                np_pixel_data = self._read_planes(
+                    request, channel_planes if channels is not None else [request.plane.plane], layout, channel_order
+                )
+            else:
+                # Getting the bitmap
+                if request.resample == "area" and request.zoom_libczi < 1.0:
+                    get_bitmap = self._czi_reader.GetAreaResampledData
+                else:
+                    get_bitmap = self._czi_reader.GetSingleChannelScalingTileAccessorData
+                pixel_data = get_bitmap(
+                    request.pixel_type_libczi,
+                    request.roi_libczi,
+                    request.background_pixel_libczi,
+                    request.zoom_libczi,
+                    request.plane.plane_libczi,
+                    request.scene_libczi,
+                    request.accessor_options_libczi,
+                )
+                convert_start = perf_counter()
+                # Converting to numpy array
+                if not convert:
+                    np_pixel_data = self._get_array_from_bitmap(pixel_data)
+                else:
+                    np_pixel_data = self._convert_bitmap(
+                        pixel_data, dtype, scale, offset, flatfield, layout, channel_order
+                    )
+                if profile is not None:
+                    profile.convert_seconds = perf_counter() - convert_start
+            if target_shape is not None:
+                resize_start = perf_counter()
+                np_pixel_data = self._resize(
+                    np_pixel_data, (int(target_shape[0]), int(target_shape[1])), layout, resample
+                )
+                if profile is not None:
+                    profile.convert_seconds += perf_counter() - resize_start
+
+        for trace in self._read_traces:
+            for traced_plane in channel_planes if channels is not None else [request.plane.plane]:
+                trace.add(
+                    start,
+                    request.roi,
+                    traced_plane,
+                    request.scene,
+                    request.zoom,
+                    request.pixel_type,
+                    request.resample,
+                )
+        return np_pixel_data
+
+    def _select_pyramid_zoom(self, request: ReadRequest, target_shape: Tuple[int, int]) -> float:
+        """Returns the zoom reading the roi of the request at the native resolution of the coarsest pyramid layer with
+        at least the resolution of target_shape (h, w), which is the full resolution layer if no other layer has.
+
+        Parameters
+        ----------
+        request : ReadRequest
+            The parameters of the read, except for the zoom.
+        target_shape : Tuple[int, int]
+            The (height, width) of the data.
+        Returns
+        ----------
+        : float
+            The zoom, the smallest zoom of the subblocks of the layer (so that the accessor draws this layer).
+        """
+        height, width = target_shape
+        roi = request.roi
+        selected = (
+            set(request.accessor_options_libczi.subBlockIndices)
+            if request.accessor_options_libczi.filterSubBlocks
+            else None
+        )
+        layer_zooms: Dict[float, float] = {}
+        for subblock in self._czi_reader.GetSubBlockDirectory(
+            request.plane.plane_libczi, request.roi_libczi, False, request.scene_libczi
+        ):
+            rect, size = subblock.logicalRect, subblock.physicalSize
+            if (selected is not None and subblock.index not in selected) or min(rect.w, rect.h, size.w, size.h) <= 0:
+                continue
+            # The zoom of the subblock as computed by the accessor (in single precision).
+            zoom = float(
+                np.float32(size.w) / np.float32(rect.w) if size.w > size.h else np.float32(size.h) / np.float32(rect.h)
+            )
+            layer = round(math.log2(1 / zoom), 1)
+            layer_zooms[layer] = min(zoom, layer_zooms.get(layer, zoom))
+        if not layer_zooms:
+            return min(1.0, max(height / roi.h, width / roi.w))
+        zooms = sorted(layer_zooms.values())
+        # A layer missing one pixel (as subblock sizes are rounded) is resized rather than reading the next layer.
+        return next((zoom for zoom in zooms if roi.w * zoom + 1 >= width and roi.h * zoom + 1 >= height), zooms[-1])
+
+    @staticmethod
+    def _resize(data: np.ndarray, shape: Tuple[int, int], layout: str, resample: str) -> np.ndarray:
+        """Resizes the pixel data to shape (h, w), one axis after another. Each pixel is the average of the pixels it
+        covers if resample is "area" and the axis is downscaled, otherwise the pixel at its center.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The pixel data.
+        shape : Tuple[int, int]
+            The (height, width) of the resized data.
+        layout : str
+            "HWC" for data of shape (m,n,channels), "CHW" for (channels,m,n).
+        resample : str
+            "nearest" or "area".
+        Returns
+        ----------
+        : np.ndarray
+            The resized data, with the dtype of data.
+        """
+        resized = data
+        for axis, extent in zip((0, 1) if layout == "HWC" else (1, 2), shape):
+            source_extent = resized.shape[axis]
+            if source_extent == extent:
+                continue
+            if resample == "area" and extent < source_extent:
+                # The integral of the data along the axis, interpolated linearly at the edges of the resized pixels.
+                integral = np.cumsum(resized, axis=axis, dtype=np.float64)
+                integral = np.concatenate([np.zeros_like(np.take(integral, [0], axis=axis)), integral], axis=axis)
+                edges = np.arange(extent + 1) * (source_extent / extent)
+                lower = np.minimum(edges.astype(np.intp), source_extent - 1)
+                fraction = (edges - lower).reshape([-1 if i == axis else 1 for i in range(resized.ndim)])
+                edge_integral = np.take(integral, lower, axis=axis) + fraction * np.take(resized, lower, axis=axis)
+                resized = np.diff(edge_integral, axis=axis) * (extent / source_extent)
+            else:
+                centers = ((np.arange(extent) + 0.5) * (source_extent / extent)).astype(np.intp)
+                resized = np.take(resized, np.minimum(centers, source_extent - 1), axis=axis)
+        if resized.dtype != data.dtype:
+            resized = (np.rint(resized) if np.issubdtype(data.dtype, np.integer) else resized).astype(data.dtype)
+        return resized
+
+    def _estimate(self, request: ReadRequest) -> ReadEstimate:
+        """Estimates the cost of reading a prepared request, see estimate()."""
+        bytes_per_pixel = (3 if self._is_rgb(request.pixel_type) else 1) * self.PIXEL_TYPE_DTYPES[
+            request.pixel_type
+        ].itemsize
+        size = self._czi_reader.CalcSize(request.roi_libczi, request.zoom_libczi)
+        output_bytes = size.w * size.h * bytes_per_pixel
+        intermediate_bytes = 0
+        zoom = request.zoom_libczi
+        if request.resample == "area" and zoom < 1.0:
+            # The roi is composed at full resolution, one band at a time.
+            row_bytes = request.roi.w * bytes_per_pixel
+            intermediate_bytes = row_bytes * min(
+                request.roi.h, max(1, self.AREA_RESAMPLE_BAND_BYTES // max(row_bytes, 1))
+            )
+            zoom = 1.0
+
+        plan = [
+            entry
+            for entry in self._czi_reader.GetReadPlan(
+                request.roi_libczi,
+                zoom,
+                request.plane.plane_libczi,
+                request.scene_libczi,
+                request.accessor_options_libczi,
+            )
+            if entry.visible
+        ]
+        subblock_pixel_bytes = {
+            value: (3 if self._is_rgb(name) else 1) * self.PIXEL_TYPE_DTYPES[name].itemsize
+            for name, value in self.PIXEL_TYPES.items()
+        }
+        decode_bytes = max(
+            (
+                entry.segmentSize
+                + entry.subBlock.physicalSize.w
+                * entry.subBlock.physicalSize.h
+                * subblock_pixel_bytes.get(int(entry.subBlock.pixelType), bytes_per_pixel)
+                for entry in plan
+            ),
+            default=0,
+        )
+        return ReadEstimate(
+            output_bytes=output_bytes,
+            subblocks=len(plan),
+            compressed_bytes=sum(entry.segmentSize for entry in plan),
+            decode_bytes=decode_bytes,
+            peak_bytes=output_bytes + intermediate_bytes + decode_bytes,
+        )
+
+    def estimate(
+        self,
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        zoom: Optional[float] = None,
+        pixel_type: Optional[str] = None,
+        resample: str = "nearest",
+        accessor_options: Optional[AccessorOptions] = None,
+    ) -> ReadEstimate:
+        """Estimates what a read() with the same parameters costs, from the subblock directory only (without reading
+        any pixel data). The subblocks are those the reader would compose: the subblocks of the pyramid layer best
+        fitting the zoom which are not entirely hidden by other subblocks. The subblock cache is not taken into
+        account, i.e. all subblocks are assumed to be read and decoded.
+
+        Parameters
+        ----------
+        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
+            Region of interest
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates
+        scene : Optional[int]
+            Scene index
+        zoom : Optional[float]
+            Zoom factor
+        pixel_type : Optional[str]
+            The pixel type of the returned data.
+        resample : str
+            Resample method, see read().
+        accessor_options : Optional[AccessorOptions]
+            How the subblocks are composed, see read().
+
+        Returns
+        ----------
+        : ReadEstimate
+            The size of the output, the subblocks read and decoded, and the worst-case memory of the read.
+        :raises ValueError: if a parameter is not valid
+        """
+        return self._estimate(
+            self.prepare_read(roi, plane, scene, zoom, pixel_type, resample=resample, accessor_options=accessor_options)
+        )
+
+    def explain(
+        self,
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        zoom: Optional[float] = None,
+        resample: str = "nearest",
+        accessor_options: Optional[AccessorOptions] = None,
+    ) -> ReadPlan:
+        """Returns how a read() with the same parameters would be executed, without executing it: the pyramid layers
+        chosen for the zoom and the subblocks intersecting the roi on them, with their position, size and compression
+        in the file, whether they are already in the subblock cache (which marks them as recently used), and whether
+        they are skipped by the visibility check as other subblocks hide them entirely.
+
+        Parameters
+        ----------
+        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
+            Region of interest
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates
+        scene : Optional[int]
+            Scene index
+        zoom : Optional[float]
+            Zoom factor
+        resample : str
+            Resample method, see read().
+        accessor_options : Optional[AccessorOptions]
+            How the subblocks are composed, see read(). The subblocks not selected by the subblock filter are left
+            out of the plan, and without the visibility check all subblocks are visible.
+
+        Returns
+        ----------
+        : ReadPlan
+            The read plan.
+        :raises ValueError: if a parameter is not valid
+        """
+        request = self.prepare_read(roi, plane, scene, zoom, resample=resample, accessor_options=accessor_options)
+        size = self._czi_reader.CalcSize(request.roi_libczi, request.zoom_libczi)
+        zoom = 1.0 if request.resample == "area" and request.zoom_libczi < 1.0 else request.zoom_libczi
+        subblocks = []
+        for entry in self._czi_reader.GetReadPlan(
+            request.roi_libczi, zoom, request.plane.plane_libczi, request.scene_libczi, request.accessor_options_libczi
+        ):
+            subblock = entry.subBlock
+            rect = subblock.logicalRect
+            subblocks.append(
+                PlannedSubBlock(
+                    index=subblock.index,
+                    rect=Rectangle(rect.x, rect.y, rect.w, rect.h),
+                    size=(subblock.physicalSize.w, subblock.physicalSize.h),
+                    minification=round(rect.w / max(subblock.physicalSize.w, 1), 2),
+                    m_index=subblock.mIndex if subblock.hasMIndex else None,
+                    scene=subblock.sceneIndex if subblock.sceneIndex >= 0 else None,
+                    file_position=subblock.filePosition,
+                    file_bytes=entry.segmentSize,
+                    compression=self.COMPRESSION_MODES.get(
+                        subblock.compressionModeRaw, f"Unknown ({subblock.compressionModeRaw})"
+                    ),
+                    cached=entry.cached,
+                    visible=entry.visible,
+                )
+            )
+        return ReadPlan(
+            roi=request.roi,
+            zoom=zoom,
+            output_size=(size.w, size.h),
+            pyramid_layers=tuple(sorted({subblock.minification for subblock in subblocks})),
+            subblocks=subblocks,
+        )
+
+    def _read_bytes(
+        self, request: ReadRequest, planes: int, into_array: bool, dtype: Optional[Union[str, type, np.dtype]] = None
+    ) -> int:
+        """Returns the memory (in bytes) a read of the request for the given number of planes may need: the planes
+        composed concurrently (see estimate()), the array they are copied into if into_array (see _read_planes()) and
+        the converted data if dtype is specified.
+        """
+        estimate = self._estimate(request)
+        needed_bytes = estimate.peak_bytes * min(planes, cpu_count() or 1)
+        if into_array:
+            needed_bytes += estimate.output_bytes * planes
+        if dtype is not None:
+            needed_bytes += (
+                estimate.output_bytes
+                * planes
+                // self.PIXEL_TYPE_DTYPES[request.pixel_type].itemsize
+                * np.dtype(dtype).itemsize
+            )
+        return needed_bytes
+
+    def _check_read_budget(self, needed_bytes: int, advice: str) -> None:
+        """Checks that an operation needing needed_bytes of memory stays within the max_read_bytes of the reader.
+
+        :raises ValueError: if needed_bytes is more than max_read_bytes
+        """
+        max_read_bytes = self._max_read_bytes
+        if max_read_bytes is not None and needed_bytes > max_read_bytes:
+            raise ValueError(
+                f"The read may need {needed_bytes} bytes, more than max_read_bytes ({max_read_bytes}). {advice}"
+            )
+
+    def read_many(
+        self,
+        rois: Union[np.ndarray, Sequence[Tuple[int, int, int, int]]],
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        pixel_type: Optional[str] = None,
+        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Reads many regions of interest of the same size from one plane at once and returns them as a
+        np.ndarray of shape (N, h, w, channels).
+        The regions are read in the order of the subblocks they touch in the file, subblocks shared by several regions
+        are read and decoded only once, and the GIL is released for the whole operation.
+
+        Parameters
+        ----------
+        rois : Union[np.ndarray, Sequence[Tuple[int, int, int, int]]]
+            N regions of interest as an array of shape (N, 4) with rows (x, y, w, h), all of the same w and h.
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates, as a dictionary, a tuple of indices in the order of plane_dimensions or a PlaneSpec.
+        scene : Optional[int]
+            Scene index
+        pixel_type : Optional[str]
+            The pixel type of the returned data.
+        background_pixel : Union[Tuple[float, float, float], Color]
+            Specifies the color of the background pixels (pixels with no data)
+            This value should always be an rgb float (range 0-1) and will be automatically converted to the bitmap data
+            type.
+        out : Optional[np.ndarray]
+            Array of shape (N, h, w, channels) and the dtype of the pixel type the regions are read into, or None to
+            allocate a new one. Pixels within a row must be contiguous.
+
+        Returns
+        ----------
+        pixel_data : np.ndarray
+            The pixel data of the regions, out if specified.
+        :raises ValueError: if the rois do not have the same size or out does not match the rois
+        """
+        rois_array = np.asarray(rois, dtype=np.int64).reshape(-1, 4)
+        if len(rois_array) and (np.any(rois_array[:, 2:] != rois_array[0, 2:]) or np.any(rois_array[0, 2:] <= 0)):
+            raise ValueError("All rois must have the same positive width and height.")
+        if not isinstance(background_pixel, Color):
+            background_pixel = Color(*background_pixel)
+
+        plane_spec = self.plane_spec(plane)
+        pixel_type = pixel_type or plane_spec.pixel_type
+        height, width = (int(rois_array[0, 3]), int(rois_array[0, 2])) if len(rois_array) else (0, 0)
+        shape = (len(rois_array), height, width, 3 if self._is_rgb(pixel_type) else 1)
+        dtype = self.PIXEL_TYPE_DTYPES[pixel_type]
+        if out is not None and (out.shape != shape or out.dtype != dtype):
+            raise ValueError(f"out must be an array of shape {shape} and dtype {dtype}.")
+        if self._max_read_bytes is not None and len(rois_array):
+            self._check_read_budget(
+                self._read_many_bytes(
+                    rois_array,
+                    plane_spec,
+                    scene,
+                    pixel_type,
+                    0 if out is not None else int(np.prod(shape)) * dtype.itemsize,
+                ),
+                "Read fewer rois at once.",
+            )
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        if not len(rois_array):
+            return out
+
+        with self._profile("read_many"):
+            self._czi_reader.ReadMany(
+                self._format_pixel_type(pixel_type),
+                rois_array,
+                self._format_background_pixel(background_pixel),
+                plane_spec.plane_libczi,
+                "" if scene is None else str(scene),
+                out,
+            )
+        return out
+
+    def _read_many_bytes(
+        self,
+        rois_array: np.ndarray,
+        plane_spec: PlaneSpec,
+        scene: Optional[int],
+        pixel_type: str,
+        out_bytes: int,
+    ) -> int:
+        """Returns the memory (in bytes) read_many() may need: the output array allocated (out_bytes), the largest
+        subblock decoded and the temporary cache of the decoded subblocks (see READ_MANY_CACHE_BYTES). The subblocks
+        are those of the bounding rectangle of the rois.
+        """
+        x, y = rois_array[:, 0].min(), rois_array[:, 1].min()
+        width, height = rois_array[:, 0].max() + rois_array[0, 2] - x, rois_array[:, 1].max() + rois_array[0, 3] - y
+        estimate = self._estimate(
+            self.prepare_read(
+                roi=Rectangle(int(x), int(y), int(width), int(height)),
+                plane=plane_spec,
+                scene=scene,
+                pixel_type=pixel_type,
+            )
+        )
+        return (
+            out_bytes
+            + estimate.decode_bytes
+            + min(self.READ_MANY_CACHE_BYTES, estimate.subblocks * estimate.decode_bytes)
+        )
+
+    @staticmethod
+    def _create_tiles(roi: Rectangle, tile_width: int, tile_height: int) -> List[Rectangle]:
+        """Splits a region of interest into tiles of at most the given size, row by row.
+
+        Parameters
+        ----------
+        roi : Rectangle
+            Region of interest
+        tile_width : int
+            Maximum width of the tiles.
+        tile_height : int
+            Maximum height of the tiles.
+        Returns
+        ----------
+        : List[Rectangle]
+            The tiles, covering the region of interest without overlapping.
+        """
+        return [
+            Rectangle(x, y, min(tile_width, roi.x + roi.w - x), min(tile_height, roi.y + roi.h - y))
+            for y in range(roi.y, roi.y + roi.h, tile_height)
+            for x in range(roi.x, roi.x + roi.w, tile_width)
+        ]
+
+    def read_to_file(
+        self,
+        out: Union[str, "PathLike[str]", np.ndarray],
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        pixel_type: Optional[str] = None,
+        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
+        channel_order: str = "BGR",
+        max_memory: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        accessor_options: Optional[AccessorOptions] = None,
+    ) -> np.ndarray:
+        """Reads a region of interest at full resolution into a disk-backed array (e.g. a whole scene of a slide too
+        large for the memory). The roi is split into tiles, which are composed in parallel in native code directly into
+        the array, so that at most max_memory bytes of pixel data are composed at once.
+
+        Parameters
+        ----------
+        out : Union[str, PathLike[str], np.ndarray]
+            The path of the file to create (a .npy file if it ends with ".npy", otherwise a raw file), or a
+            (memory-mapped) array of shape (m,n,channels) and the dtype of the pixel type. Pixels within a row must be
+            contiguous.
+        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
+            Region of interest (x, y, w, h), defaults to the bounding box of the scene (or of all scenes).
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates, as a dictionary, a tuple of indices in the order of plane_dimensions or a PlaneSpec.
+        scene : Optional[int]
+            Scene index
+        pixel_type : Optional[str]
+            The pixel type of the data.
+        background_pixel : Union[Tuple[float, float, float], Color]
+            Specifies the color of the background pixels (pixels with no data), as an rgb float (range 0-1).
+        channel_order : str
+            "BGR" or "RGB", the order of the samples of rgb pixel types.
+        max_memory : Optional[int]
+            The maximum size (in bytes) of the tiles composed at once, which is split between the threads. Larger
+            tiles decode the subblocks on the tile borders less often. Defaults to the max_read_bytes of the reader,
+            or 256 MiB if it has none.
+        max_workers : Optional[int]
+            The number of threads composing tiles, defaults to the number of CPUs.
+        accessor_options : Optional[AccessorOptions]
+            How the subblocks are composed, see read().
+
+        Returns
+        ----------
+        : np.ndarray
+            The array the pixel data was written to, a np.memmap if a path was specified.
+        :raises ValueError: if out does not match the roi and the pixel type, or the channel order is not supported
+        """
+        if channel_order not in self.CHANNEL_ORDERS:
+            raise ValueError(
+                f"The channel order provided does not mach any supported channel orders, possible values are: "
+                f"{', '.join(self.CHANNEL_ORDERS)}"
+            )
+        request = self.prepare_read(
+            roi, plane, scene, None, pixel_type, background_pixel, accessor_options=accessor_options
+        )
+        samples = 3 if self._is_rgb(request.pixel_type) else 1
+        dtype = np.dtype(self.PIXEL_TYPE_DTYPES[request.pixel_type])
+        shape = (request.roi.h, request.roi.w, samples)
+        if isinstance(out, np.ndarray):
+            if out.shape != shape or out.dtype != dtype:
+                raise ValueError(f"out must be an array of shape {shape} and dtype {dtype}.")
+        elif fspath(out).endswith(".npy"):
+            out = np.lib.format.open_memmap(fspath(out), mode="w+", dtype=dtype, shape=shape)
+        else:
+            out = np.memmap(fspath(out), mode="w+", dtype=dtype, shape=shape)
+
+        if max_memory is None:
+            max_memory = 256 * 1024**2 if self._max_read_bytes is None else self._max_read_bytes
+        workers = max(1, max_workers or cpu_count() or 1)
+        tile_pixels = max(1, max_memory // (workers * samples * dtype.itemsize))
+        tile_width = min(request.roi.w, max(1, math.isqrt(tile_pixels)))
+        tile_height = min(request.roi.h, max(1, tile_pixels // max(tile_width, 1)))
+        tiles = self._create_tiles(request.roi, tile_width, tile_height)
+
+        def read_tile(tile: Rectangle) -> None:
+            x, y = tile.x - request.roi.x, tile.y - request.roi.y
+            view = out[y : y + tile.h, x : x + tile.w]
+            if channel_order == "RGB" and samples == 3:
+                view = view[:, :, ::-1]
+            self._czi_reader.ReadPlanes(
+                request.pixel_type_libczi,
+                self._format_roi(tile),
+                request.background_pixel_libczi,
+                1.0,
+                False,
+                [request.plane.plane_libczi],
+                request.scene_libczi,
+                [view],
+                1,
+                request.accessor_options_libczi,
+            )
+
+        with self._profile("read_to_file"):
+            if workers == 1 or len(tiles) <= 1:
+                for tile in tiles:
+                    read_tile(tile)
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(read_tile, tiles))
+            if isinstance(out, np.memmap):
+                out.flush()
+        return out
+
+    def project(
+        self,
+        roi: Optional[Union[Tuple[int, int, int, int], Rectangle]] = None,
+        axis: str = "Z",
+        op: str = "max",
+        plane: Optional[PlaneCoordinates] = None,
+        scene: Optional[int] = None,
+        zoom: Optional[float] = None,
+        pixel_type: Optional[str] = None,
+        background_pixel: Union[Tuple[float, float, float], Color] = BLACK_COLOR,
+        max_workers: Optional[int] = None,
+    ) -> np.ndarray:
+        """Projects the planes along a dimension (e.g. a maximum intensity projection of a z-stack) and returns the
+        projection as a np.ndarray.
+        The planes are composed in parallel in native code and accumulated into one output buffer, so that only the
+        output and one plane per thread are held in memory, and the GIL is released for the whole operation.
+
+        Parameters
+        ----------
+        roi : Optional[Union[Tuple[int, int, int, int], Rectangle]]
+            Region of Interest
+        axis : str
+            The dimension the planes are projected along (one of CZI_DIMS). If it does not exist in the document, the
+            projection consists of a single plane.
+        op : str
+            The projection operation: "max" returns the maximum of each pixel with the dtype of the pixel type,
+            "sum" and "mean" return the sum and the mean of each pixel as float64. Background pixels (pixels with no
+            data) are taken into account with the value of background_pixel.
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates of the other dimensions (as a dictionary, a tuple of indices in the order of
+            plane_dimensions or a PlaneSpec), the coordinate of axis is ignored.
+        scene : Optional[int]
+            Scene index
+        zoom : float
+            A float between 0 (excluded) and 1 that specifies the zoom factor
+        pixel_type : Optional[str]
+            The pixel type the planes are read with.
+        background_pixel : Union[Tuple[float, float, float], Color]
+            Specifies the color of the background pixels (pixels with no data)
+            This value should always be an rgb float (range 0-1) and will be automatically converted to the bitmap data
+            type.
+        max_workers : Optional[int]
+            The maximum number of planes composed in parallel (defaults to the number of processors).
+
+        Returns
+        ----------
+        : np.ndarray
+            The projection, of shape (m,n,1) if grayscale / (m,n,3) if rgb.
+        :raises ValueError: if the axis or the projection operation are not supported
+        """
+        if axis not in self.CZI_DIMS:
+            raise ValueError(
+                f"The axis provided does not mach any supported dimensions, possible values are: "
+                f"{', '.join(self.CZI_DIMS)}"
+            )
+        if op not in self.PROJECTION_OPERATIONS:
+            raise ValueError(
+                f"The projection operation provided does not mach any supported operations, possible values are: "
+                f"{', '.join(self.PROJECTION_OPERATIONS)}"
+            )
+        # Casting possible tuples to namedtuple
+        if roi:
+            roi = Rectangle(*roi)
+        if not isinstance(background_pixel, Color):
+            background_pixel = Color(*background_pixel)
+
+        plane = self.plane_spec(plane).plane
+        if axis in plane:
+            start, end = self.total_bounding_box[axis]
+            planes = [{**plane, axis: index} for index in range(start, end)]
+        else:
+            planes = [plane]
+        pixel_type = self._get_pixel_type(pixel_type, planes[0])
+        roi_libczi = self._format_roi(self._create_roi(roi, scene))
+        zoom_libczi = 1.0 if zoom is None else float(zoom)
+        size = self._czi_reader.CalcSize(roi_libczi, zoom_libczi)
+        shape = (size.h, size.w, 3 if self._is_rgb(pixel_type) else 1)
+        out_dtype = self.PIXEL_TYPE_DTYPES[pixel_type] if op == "max" else np.dtype(np.float64)
+        workers = max_workers or cpu_count() or 1
+        if self._max_read_bytes is not None:
+            # Each thread holds one composed plane, in addition to the output.
+            estimate = self._estimate(
+                self.prepare_read(
+                    roi=roi,
+                    plane=planes[0],
+                    scene=scene,
+                    zoom=zoom,
+                    pixel_type=pixel_type,
+                    background_pixel=background_pixel,
+                )
+            )
+            self._check_read_budget(
+                int(np.prod(shape)) * out_dtype.itemsize + estimate.peak_bytes * min(len(planes), workers),
+                "Project a smaller roi, at a smaller zoom or with fewer max_workers.",
+            )
+
+        if op == "max":
+            out = np.empty(shape, dtype=out_dtype)
+            project = self._czi_reader.ProjectMax
+        else:
+            out = np.zeros(shape, dtype=out_dtype)
+            project = self._czi_reader.ProjectSum
+        with self._profile("project"):
+            project(
+                self._format_pixel_type(pixel_type),
+                roi_libczi,
+                self._format_background_pixel(background_pixel),
+                zoom_libczi,
+                [self._format_plane(single_plane) for single_plane in planes],
+                "" if scene is None else str(scene),
+                out,
+                workers,
+            )
+            if op == "mean":
+                out /= len(planes)
+        return out
+
+    def plane_statistics(
+        self,
+        plane: Optional[Union[PlaneCoordinates, Sequence[PlaneCoordinates]]] = None,
+        scene: Optional[int] = None,
+        bins: int = 256,
+        pyramid_level: int = 0,
+        hist_range: Optional[Tuple[float, float]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Union[PlaneStatistics, List[PlaneStatistics]]:
+        """Computes the pixel statistics (min, max, mean, std and histogram per channel) of a plane, streaming over its
+        subblocks in native code, so that only one decoded subblock is held in memory at a time.
+        Pixels covered by several (overlapping) subblocks are counted once per subblock, background pixels (not
+        covered by any subblock) are not counted.
+
+        Parameters
+        ----------
+        plane : Optional[Union[PlaneCoordinates, Sequence[PlaneCoordinates]]]
+            Plane coordinates (as a dictionary, a tuple of indices in the order of plane_dimensions or a PlaneSpec),
+            or a sequence of plane coordinates to compute the statistics of several planes in parallel.
+        scene : Optional[int]
+            Scene index, if None the subblocks of all scenes are considered.
+        bins : int
+            Number of bins of the histogram.
+        pyramid_level : int
+            The pyramid layer whose subblocks are used, 0 being the full resolution layer, 1 the next smaller one
+            present in the document, etc. Higher levels are much faster, at the cost of approximate statistics.
+        hist_range : Optional[Tuple[float, float]]
+            The lower and upper edges of the histogram. Defaults to the range of the data type for integer pixel
+            types, and to the range of the pixel values for floating point pixel types (which requires decoding the
+            subblocks twice).
+        max_workers : Optional[int]
+            The maximum number of threads if statistics are computed for several planes (defaults to the default of
+            ThreadPoolExecutor).
+
+        Returns
+        ----------
+        : Union[PlaneStatistics, List[PlaneStatistics]]
+            The statistics of the plane, or a list with the statistics of each plane if a sequence was specified.
+        :raises ValueError: if bins is negative, the plane is empty or the pyramid level does not exist
+        """
+        with self._profile("plane_statistics"):
+            if self._is_single_plane(plane):
+                return self._plane_statistics(
+                    cast(Optional[PlaneCoordinates], plane), scene, bins, pyramid_level, hist_range
+                )
+
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(
+                    executor.map(
+                        lambda single_plane: self._plane_statistics(
+                            single_plane, scene, bins, pyramid_level, hist_range
+                        ),
+                        cast(Sequence[PlaneCoordinates], plane),
+                    )
+                )
+
+    @staticmethod
+    def _is_single_plane(plane: Any) -> bool:
+        """Test if plane are the coordinates of a single plane (rather than a sequence of plane coordinates).
+
+        Parameters
+        ----------
+        plane : Any
+            Plane coordinates or a sequence of plane coordinates
+        Returns
+        ----------
+        : bool
+            True if plane are the coordinates of a single plane False otherwise.
+        """
+        return (
+            plane is None
+            or isinstance(plane, (dict, PlaneSpec))
+            or (isinstance(plane, tuple) and all(isinstance(index, (int, np.integer)) for index in plane))
+        )
+
+    def _plane_statistics(
+        self,
+        plane: Optional[PlaneCoordinates],
+        scene: Optional[int],
+        bins: int,
+        pyramid_level: int,
+        hist_range: Optional[Tuple[float, float]],
+    ) -> PlaneStatistics:
+        """Computes the pixel statistics of a single plane, c.f. plane_statistics.
+
+        Parameters
+        ----------
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates
+        scene : Optional[int]
+            Scene index
+        bins : int
+            Number of bins of the histogram.
+        pyramid_level : int
+            The pyramid layer whose subblocks are used.
+        hist_range : Optional[Tuple[float, float]]
+            The lower and upper edges of the histogram.
+        Returns
+        ----------
+        : PlaneStatistics
+            The statistics of the plane.
+        :raises ValueError: if bins is negative, the plane is empty or the pyramid level does not exist
+        """
+        if bins < 0:
+            raise ValueError("bins must not be negative.")
+        plane_spec = self.plane_spec(plane)
+        pixel_type = plane_spec.pixel_type
+        if pixel_type not in self.PIXEL_TYPE_DTYPES:
+            raise ValueError("The plane provided does not contain any subblocks.")
+        dtype = self.PIXEL_TYPE_DTYPES[pixel_type]
+        subblock_indices = self._get_pyramid_level_subblocks(plane_spec.plane, scene, pyramid_level)
+
+        if hist_range is None and np.issubdtype(dtype, np.integer):
+            hist_range = (0.0, float(np.iinfo(dtype).max + 1))
+        elif hist_range is None:
+            value_range = self._czi_reader.GetSubBlockPixelStatistics(subblock_indices, 0, 0.0, 0.0)
+            minimum, maximum = min(value_range.min, default=0.0), max(value_range.max, default=0.0)
+            hist_range = (minimum, maximum) if minimum < maximum else (minimum - 0.5, maximum + 0.5)
+        statistics = self._czi_reader.GetSubBlockPixelStatistics(subblock_indices, bins, *hist_range)
+
+        n_channels = 3 if self._is_rgb(pixel_type) else 1
+        count = np.array(statistics.count or [0] * n_channels, dtype=np.uint64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return PlaneStatistics(
+                count=count,
+                min=np.where(count > 0, np.array(statistics.min or [np.nan] * n_channels), np.nan),
+                max=np.where(count > 0, np.array(statistics.max or [np.nan] * n_channels), np.nan),
+                mean=np.where(count > 0, np.array(statistics.mean or [np.nan] * n_channels), np.nan),
+                std=np.sqrt(np.array(statistics.m2 or [np.nan] * n_channels) / count),
+                histogram=np.array(statistics.histogram or [[0] * bins] * n_channels, dtype=np.uint64).reshape(
+                    n_channels, bins
+                ),
+                bin_edges=np.linspace(hist_range[0], hist_range[1], bins + 1),
+            )
+
+    def _get_pyramid_level_subblocks(
+        self,
+        plane: Dict[str, int],
+        scene: Optional[int],
+        pyramid_level: int,
+    ) -> List[int]:
+        """Returns the indices of the subblocks of the plane on the specified pyramid level.
+
+        Parameters
+        ----------
+        plane : Dict[str, int]
+            Plane coordinates
+        scene : Optional[int]
+            Scene index
+        pyramid_level : int
+            The index of the pyramid layer among the layers present, 0 being the full resolution layer.
+        Returns
+        ----------
+        : List[int]
+            The indices of the subblocks.
+        :raises ValueError: if the pyramid level does not exist
+        """
+        subblocks = self._czi_reader.GetSubBlockDirectory(
+            self._format_plane(plane), None, False, "" if scene is None else str(scene)
+        )
+        # Grouping the subblocks by (rounded) minification, which tolerates subblocks whose size is not exactly
+        # divisible by the minification factor.
+        levels = [
+            round(float(np.log2(max(subblock.logicalRect.w, 1) / max(subblock.physicalSize.w, 1))), 1)
+            for subblock in subblocks
+        ]
+        distinct_levels = sorted(set(levels))
+        if pyramid_level < 0 or pyramid_level >= max(len(distinct_levels), 1):
+            raise ValueError(
+                f"The pyramid level provided does not exist, the plane has {len(distinct_levels)} pyramid levels."
+            )
+        if not subblocks:
+            return []
+        return [subblock.index for subblock, level in zip(subblocks, levels) if level == distinct_levels[pyramid_level]]
+
+    def subblock_directory(self, scene: Optional[int] = None, only_layer0: bool = False) -> List[SubBlockInfo]:
+        """Returns the subblocks of the subblock directory (of all planes), without reading any of them.
+
+        Parameters
+        ----------
+        scene : Optional[int]
+            Scene index, if None the subblocks of all scenes are returned.
+        only_layer0 : bool
+            Whether to return only the subblocks on pyramid layer 0.
+
+        Returns
+        ----------
+        : List[SubBlockInfo]
+            The subblocks, in the order of the subblock directory.
+        """
+        return [
+            self._create_subblock_info(subblock)
+            for subblock in self._czi_reader.GetSubBlockDirectory(
+                "", None, only_layer0, "" if scene is None else str(scene)
+            )
+        ]
+
+    def coverage_mask(
+        self,
+        scene: Optional[int] = None,
+        cell_size: int = 256,
+        plane: Optional[PlaneCoordinates] = None,
+        threshold: Optional[float] = None,
+        bright_background: bool = False,
+    ) -> np.ndarray:
+        """Returns a boolean grid marking the cells of the scene (or of the whole document if scene is None) covered by
+        subblocks. Cell (i, j) covers the cell_size x cell_size pixels starting at x = roi.x + j * cell_size and
+        y = roi.y + i * cell_size, where roi is the bounding rectangle of the scene (see scenes_bounding_rectangle) or
+        total_bounding_rectangle if scene is None.
+        The coverage is determined from the subblock directory only, without reading any subblock. If threshold is
+        specified, covered cells are additionally checked against the intensities of the coarsest pyramid layer
+        (which is cheap to read), which allows to also skip background areas within subblocks.
+
+        Parameters
+        ----------
+        scene : Optional[int]
+            Scene index
+        cell_size : int
+            The size (in pixels of pyramid layer 0) of the square cells of the grid.
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates the subblocks must match, as a dictionary (e.g. {"C": 0}, only the dimensions given are
+            compared), a tuple of indices in the order of plane_dimensions or a PlaneSpec. If None, subblocks of all
+            planes are considered. For the threshold, missing coordinates default to 0.
+        threshold : Optional[float]
+            If specified, a covered cell is only marked if at least one pixel of the cell on the coarsest pyramid layer
+            has an intensity (averaged over the color channels) above (or below, for bright_background) threshold.
+            For documents without pyramid, the average intensity of the cell on pyramid layer 0 is compared instead.
+        bright_background : bool
+            Whether the background is bright (e.g. brightfield images) instead of dark (e.g. fluorescence images).
+
+        Returns
+        ----------
+        coverage_mask : np.ndarray
+            A boolean array of shape (ceil(roi.h / cell_size), ceil(roi.w / cell_size)).
+        :raises ValueError: if cell_size is not positive
+        """
+        if cell_size < 1:
+            raise ValueError("cell_size must be a positive number of pixels.")
+        roi = self._create_roi(None, scene)
+        scene_libczi = "" if scene is None else str(scene)
+        mask = np.zeros((-(-roi.h // cell_size), -(-roi.w // cell_size)), dtype=bool)
+        if plane is None:
+            plane_libczi = ""
+        elif isinstance(plane, dict):
+            plane_libczi = self._format_plane(plane)
+        else:
+            plane_libczi = self.plane_spec(plane).plane_libczi
+        subblocks = self._czi_reader.GetSubBlockDirectory(plane_libczi, None, True, scene_libczi)
+        for subblock in subblocks:
+            rect = subblock.logicalRect
+            x_start, x_end = max(rect.x - roi.x, 0), min(rect.x + rect.w - roi.x, roi.w)
+            y_start, y_end = max(rect.y - roi.y, 0), min(rect.y + rect.h - roi.y, roi.h)
+            if x_start < x_end and y_start < y_end:
+                mask[
+                    y_start // cell_size : -(-y_end // cell_size),
+                    x_start // cell_size : -(-x_end // cell_size),
+                ] = True
+
+        if threshold is not None and mask.any():
+            mask &= self._intensity_mask(roi, scene, cell_size, plane, threshold, bright_background, mask.shape)
+        return mask
+
+    def _intensity_mask(
+        self,
+        roi: Rectangle,
+        scene: Optional[int],
+        cell_size: int,
+        plane: Optional[PlaneCoordinates],
+        threshold: float,
+        bright_background: bool,
+        shape: Tuple[int, int],
+    ) -> np.ndarray:
+        """Returns a boolean grid marking the cells of roi with at least one pixel on the coarsest pyramid layer
+        (or an average over the cell on pyramid layer 0 if there is no pyramid) beyond threshold. Cells without any
+        pixel on that layer are marked as well.
+
+        Parameters
+        ----------
+        roi : Rectangle
+            The region covered by the grid
+        scene : Optional[int]
+            Scene index
+        cell_size : int
+            The size (in pixels of pyramid layer 0) of the cells of the grid.
+        plane : Optional[PlaneCoordinates]
+            Plane coordinates
+        threshold : float
+            Intensity threshold
+        bright_background : bool
+            Whether pixels have to be below (instead of above) the threshold.
+        shape : Tuple[int, int]
+            The shape of the grid.
+        Returns
+        ----------
+        : np.ndarray
+            The grid as a boolean array.
+        """
+        pyramid_subblocks = self._czi_reader.GetSubBlockDirectory("", None, False, "" if scene is None else str(scene))
+        coarsest_zoom = min(
+            (subblock.physicalSize.w / subblock.logicalRect.w for subblock in pyramid_subblocks),
+            default=1.0,
+        )
+        if coarsest_zoom < 1.0:
+            # Never read at a lower resolution than one pixel per cell.
+            zoom, resample = max(coarsest_zoom, 1 / cell_size), "nearest"
+        else:
+            # Without pyramid, streaming over the full resolution layer keeps the memory used bounded.
+            zoom, resample = 1 / cell_size, "area"
+        intensities = self.read(
+            roi=roi,
+            plane=plane,
+            scene=scene,
+            zoom=zoom,
+            background_pixel=Color(1, 1, 1) if bright_background else self.BLACK_COLOR,
+            resample=resample,
+        ).mean(axis=2)
+        if bright_background:
+            intensities = -intensities
+            threshold = -threshold
+
+        # Assigning each pixel of the coarse image to the cell it lies in.
+        rows = np.minimum(np.arange(intensities.shape[0]) * roi.h // intensities.shape[0] // cell_size, shape[0] - 1)
+        columns = np.minimum(np.arange(intensities.shape[1]) * roi.w // intensities.shape[1] // cell_size, shape[1] - 1)
+        cell_maximum = np.full(shape, -np.inf)
+        np.maximum.at(cell_maximum, (rows[:, np.newaxis], columns[np.newaxis, :]), intensities)
+        return np.logical_or(cell_maximum > threshold, cell_maximum == -np.inf)
 
 
 class CziWriter:
@@ -1102,6 +3071,7 @@ class CziWriter:
         """
         plane = self._create_plane(plane, scene)
         plane_libczi = self._format_plane(plane)
+
         curr_x, curr_y = location
         data_size = data.nbytes / 1000000
         retiling_id = str(uuid.uuid4())
@@ -1270,6 +3240,9 @@ def open_czi(
     filepath: str,
     file_input_type: ReaderFileInputTypes = ReaderFileInputTypes.Standard,
     cache_options: Optional[CacheOptions] = None,
+    profile: bool = False,
+    buffer_pool: Optional[BufferPool] = None,
+    max_read_bytes: Optional[int] = None,
 ) -> Generator:
     """Initialize a czi reader object and returns it.
     Opens the filepath and hands it over to the low-level function.
@@ -1282,19 +3255,289 @@ def open_czi(
         The type of file input, default is local file.
     cache_options : CacheOptions, optional
         The configuration of a subblock cache to be used. Per default no cache is used.
+    profile : bool, optional
+        If True, the profiles of all read operations are recorded by reader.profiler (see pylibCZIrw.profiling).
+        Per default read operations are only profiled within a pylibCZIrw.profiling.profile() context.
+    buffer_pool : BufferPool, optional
+        The pool recycling the memory of the bitmaps composed by the reader, which may be shared by several readers.
+        Per default the bitmaps are allocated for every read.
+    max_read_bytes : int, optional
+        The maximum memory (in bytes) a read() may need according to its estimate (see CziReader.estimate()), larger
+        reads raise a ValueError before reading anything. Also the default tile budget of read_to_file(). Per default
+        reads are not limited.
 
     Returns
     ----------
      : czi
         CziReader document as a czi object
     """
-    reader = CziReader(filepath, file_input_type, cache_options=cache_options)
+    reader = CziReader(
+        filepath,
+        file_input_type,
+        cache_options=cache_options,
+        profile=profile,
+        buffer_pool=buffer_pool,
+        max_read_bytes=max_read_bytes,
+    )
     try:
         yield reader
     finally:
         reader.close()
 
 
+@dataclass
+class ReaderPoolStats:
+    """Reader pool statistics data structure.
+
+    Data structure to represent the state and the usage counters of a ReaderPool.
+    """
+
+    open_readers: int = 0  # Number of readers currently kept open by the pool.
+    readers_in_use: int = 0  # Number of open readers currently handed out.
+    memory_usage: int = 0  # Memory used by the subblock caches of all open readers (in bytes).
+    hits: int = 0  # Number of requests served by an already open reader.
+    misses: int = 0  # Number of requests which required opening a document.
+    evictions: int = 0  # Number of readers closed to stay within the limits of the pool.
+
+
+class ReaderPool:
+    """ReaderPool class.
+
+    Keeps CziReader objects open across requests, so that the stream creation, the parsing of the subblock
+    directory and the subblock statistics are only paid once per document. Readers are keyed by file path (or URL)
+    and file input type. When the pool exceeds max_open readers or max_memory bytes of subblock cache memory,
+    the least-recently-used idle readers are closed. Readers currently handed out are never closed, the pool may
+    then temporarily exceed its limits. Closing the pool closes the idle readers right away and the readers handed
+    out once they are returned.
+
+    _readers : OrderedDict[Tuple[str, ReaderFileInputTypes], CziReader]
+        Open readers, ordered from least to most recently used.
+    _in_use : Dict[Tuple[str, ReaderFileInputTypes], int]
+        Number of times each reader is currently handed out.
+    _closed : bool
+        Whether the pool has been closed.
+    """
+
+    def __init__(
+        self,
+        max_open: int = 32,
+        max_memory: Optional[int] = None,
+        cache_options: Optional[CacheOptions] = None,
+        buffer_pool: Optional[BufferPool] = None,
+        max_read_bytes: Optional[int] = None,
+    ) -> None:
+        """Creates a pool of czi readers.
+
+        Parameters
+        ----------
+        max_open : int
+            Maximum number of documents kept open.
+        max_memory : Optional[int]
+            Maximum memory (in bytes) the subblock caches of the open readers may use together. Only the
+            subblock caches are accounted for. If not specified, the memory usage is not limited.
+        cache_options : Optional[CacheOptions]
+            The configuration of the subblock cache used by each reader of the pool. Per default no cache is used.
+        buffer_pool : Optional[BufferPool]
+            The buffer pool shared by all readers of the pool. Per default the readers do not use a buffer pool.
+        max_read_bytes : Optional[int]
+            The maximum memory (in bytes) a read() of a reader of the pool may need (see open_czi()). Per default
+            reads are not limited.
+
+        :raises ValueError: If max_open is smaller than 1.
+        """
+        if max_open < 1:
+            raise ValueError("The pool must be allowed to keep at least one reader open.")
+        self._max_open = max_open
+        self._max_memory = max_memory
+        self._cache_options = cache_options
+        self._buffer_pool = buffer_pool
+        self._max_read_bytes = max_read_bytes
+        self._readers: "OrderedDict[Tuple[str, ReaderFileInputTypes], CziReader]" = OrderedDict()
+        self._in_use: Dict[Tuple[str, ReaderFileInputTypes], int] = {}
+        self._lock = threading.Lock()
+        self._stats = ReaderPoolStats()
+        self._closed = False
+
+    @contextlib.contextmanager
+    def open_czi(
+        self,
+        filepath: str,
+        file_input_type: ReaderFileInputTypes = ReaderFileInputTypes.Standard,
+    ) -> Generator:
+        """Hands out a reader for the given document, opening it only if it is not already open in the pool.
+        Unlike the module level open_czi(), the reader is not closed on exit but returned to the pool.
+
+        Parameters
+        ----------
+        filepath : str
+            File path.
+        file_input_type : ReaderFileInputTypes, optional
+            The type of file input, default is local file.
+
+        Returns
+        ----------
+         : czi
+            CziReader document as a czi object
+
+        :raises ValueError: If the pool is closed.
+        """
+        key = (filepath, file_input_type)
+        reader = self._acquire(key)
+        try:
+            yield reader
+        finally:
+            self._release(key)
+
+    def _acquire(self, key: Tuple[str, ReaderFileInputTypes]) -> CziReader:
+        """Gets the open reader for key or opens it, and marks it as in use.
+
+        Parameters
+        ----------
+        key : Tuple[str, ReaderFileInputTypes]
+            File path and file input type of the document.
+        Returns
+        ----------
+        : CziReader
+            The reader of the document.
+        """
+        with self._lock:
+            self._check_open()
+            reader = self._readers.get(key)
+            if reader is not None:
+                self._readers.move_to_end(key)
+                self._in_use[key] = self._in_use.get(key, 0) + 1
+                self._stats.hits += 1
+                return reader
+
+        # Opening a document may take long (e.g. with curl), so this is done without holding the lock.
+        new_reader = CziReader(
+            key[0],
+            key[1],
+            cache_options=self._cache_options,
+            buffer_pool=self._buffer_pool,
+            max_read_bytes=self._max_read_bytes,
+        )
+        with self._lock:
+            try:
+                self._check_open()
+            except ValueError:
+                new_reader.close()
+                raise
+            reader = self._readers.get(key)
+            if reader is None:
+                reader = self._readers[key] = new_reader
+                self._stats.misses += 1
+            else:
+                # Another thread opened the same document in the meantime.
+                self._stats.hits += 1
+            self._readers.move_to_end(key)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+            evicted = self._evict()
+        if reader is not new_reader:
+            new_reader.close()
+        for evicted_reader in evicted:
+            evicted_reader.close()
+        return reader
+
+    def _check_open(self) -> None:
+        """Checks that the pool has not been closed, must be called with the lock held.
+
+        :raises ValueError: If the pool is closed.
+        """
+        if self._closed:
+            raise ValueError("The reader pool is closed.")
+
+    def _release(self, key: Tuple[str, ReaderFileInputTypes]) -> None:
+        """Marks the reader for key as no longer used by the caller and enforces the limits of the pool.
+
+        Parameters
+        ----------
+        key : Tuple[str, ReaderFileInputTypes]
+            File path and file input type of the document.
+        """
+        with self._lock:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+            if self._closed:
+                # The pool was closed while the reader was handed out, it is closed once no longer used.
+                evicted = [self._readers.pop(key)] if key not in self._in_use else []
+            else:
+                evicted = self._evict()
+        for evicted_reader in evicted:
+            evicted_reader.close()
+
+    def _memory_usage(self) -> int:
+        """Memory used by the subblock caches of all open readers (in bytes)."""
+        return sum(reader.get_cache_info().memory_usage for reader in self._readers.values())
+
+    def _evict(self) -> List[CziReader]:
+        """Removes the least-recently-used idle readers until the pool is within its limits.
+        Must be called with the lock held, the returned readers must be closed by the caller.
+
+        Returns
+        ----------
+        : List[CziReader]
+            The readers removed from the pool.
+        """
+        evicted: List[CziReader] = []
+        idle_keys = [key for key in self._readers if key not in self._in_use]
+        if not idle_keys:
+            return evicted
+        # The cache usage of each reader is queried once, only if there is a memory limit.
+        memory_usages = (
+            {key: reader.get_cache_info().memory_usage for key, reader in self._readers.items()}
+            if self._max_memory is not None
+            else {}
+        )
+        memory_usage = sum(memory_usages.values())
+        for key in idle_keys:
+            over_count = len(self._readers) > self._max_open
+            over_memory = self._max_memory is not None and memory_usage > self._max_memory
+            if not (over_count or over_memory):
+                break
+            evicted.append(self._readers.pop(key))
+            memory_usage -= memory_usages.get(key, 0)
+            self._stats.evictions += 1
+        return evicted
+
+    @property
+    def stats(self) -> ReaderPoolStats:
+        """Get the current state and the usage counters of the pool.
+
+        Returns
+        ----------
+        : ReaderPoolStats
+            A snapshot of the pool statistics.
+        """
+        with self._lock:
+            return ReaderPoolStats(
+                open_readers=len(self._readers),
+                readers_in_use=len(self._in_use),
+                memory_usage=self._memory_usage(),
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+            )
+
+    def close(self) -> None:
+        """Close all documents kept open by the pool. Readers currently handed out are closed once returned."""
+        with self._lock:
+            self._closed = True
+            idle_keys = [key for key in self._readers if key not in self._in_use]
+            readers = [self._readers.pop(key) for key in idle_keys]
+        for reader in readers:
+            reader.close()
+
+    def __enter__(self) -> "ReaderPool":
+        """Use the pool as a context manager, closing all its documents on exit."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close all documents kept open by the pool."""
+        self.close()
+
+
 @contextlib.contextmanager
 def create_czi(filepath: str, exist_ok: bool = False, compression_options: Optional[str] = None) -> Generator:
     """Initialize a czi writer object and returns it. Opens the filepath and hands it over to the low-level function.
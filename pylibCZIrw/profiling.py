@@ -0,0 +1,366 @@
+"""Module implementing the profiling of read operations
+
+Readers count the reads from their stream, the subblocks read and decoded and the lookups in their subblock cache
+(see ReadProfile). A Profiler records these counters and the time spent in each phase for every read operation,
+either for all read operations of one reader (open_czi(..., profile=True)) or for all read operations within a
+profile() context.
+At the stream level, readers keep histograms of the latencies and sizes of the reads from their stream (see
+StreamStatistics) and can record a trace of these reads (see StreamTrace).
+"""
+
+import contextlib
+import contextvars
+import json
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from time import perf_counter
+from typing import Any, Deque, Dict, Generator, List, Optional, Tuple
+
+import numpy as np
+
+import _pylibCZIrw
+
+
+@dataclass
+class ReadProfile:
+    """Read profile data structure.
+
+    Data structure to represent the counters and timings of one or more read operations. Times are in seconds; the
+    io, decode and prune times are summed over all threads reading in native code (and may therefore exceed the
+    total time of operations reading in parallel). With read operations running concurrently on the same reader,
+    the counters of an operation include those of the overlapping operations.
+    """
+
+    method: str = ""  # Name of the CziReader method, empty for a summary of several methods.
+    calls: int = 0  # Number of read operations.
+    io_operations: int = 0  # Number of reads from the stream.
+    bytes_read: int = 0  # Number of bytes read from the stream.
+    subblocks_touched: int = 0  # Number of subblocks composed (read from the stream or found in the cache).
+    subblocks_read: int = 0  # Number of subblocks read from the stream.
+    subblocks_decoded: int = 0  # Number of subblocks decoded into a bitmap.
+    cache_lookups: int = 0  # Number of subblocks looked up in the subblock cache.
+    cache_hits: int = 0  # Number of subblocks found in the subblock cache.
+    io_seconds: float = 0.0  # Time spent reading from the stream.
+    decode_seconds: float = 0.0  # Time spent decoding subblocks.
+    compose_seconds: float = 0.0  # Time spent in native code otherwise (composing, resampling, projecting, ...).
+    prune_seconds: float = 0.0  # Time spent pruning the subblock cache.
+    convert_seconds: float = 0.0  # Time spent converting the pixel data in Python.
+    total_seconds: float = 0.0  # Wall-clock time of the read operations.
+
+    def __add__(self, other: "ReadProfile") -> "ReadProfile":
+        """Sums the counters and timings, keeping the method only if both profiles are of the same method."""
+        summed = {
+            field.name: getattr(self, field.name) + getattr(other, field.name)
+            for field in fields(self)
+            if field.name != "method"
+        }
+        return ReadProfile(method=self.method if self.method == other.method else "", **summed)
+
+    def __sub__(self, other: "ReadProfile") -> "ReadProfile":
+        """Subtracts the counters and timings, e.g. of two snapshots of the counters of a reader (see from_native)."""
+        subtracted = {
+            field.name: getattr(self, field.name) - getattr(other, field.name)
+            for field in fields(self)
+            if field.name != "method"
+        }
+        return ReadProfile(method=self.method if self.method == other.method else "", **subtracted)
+
+    @classmethod
+    def from_native(cls, counters: _pylibCZIrw.ReadProfile) -> "ReadProfile":
+        """Creates a profile from the counters and native timings of the c++ reader since it was opened."""
+        return cls(
+            io_operations=counters.ioOperations,
+            bytes_read=counters.bytesRead,
+            # Every subblock composed is either found in the cache or read.
+            subblocks_touched=counters.subBlocksRead + counters.cacheHits,
+            subblocks_read=counters.subBlocksRead,
+            subblocks_decoded=counters.subBlocksDecoded,
+            cache_lookups=counters.cacheLookups,
+            cache_hits=counters.cacheHits,
+            io_seconds=counters.ioNanoseconds * 1e-9,
+            decode_seconds=counters.decodeNanoseconds * 1e-9,
+            prune_seconds=counters.pruneNanoseconds * 1e-9,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the profile as a dictionary."""
+        return asdict(self)
+
+
+class Profiler:
+    """Profiler class.
+
+    Records a ReadProfile for every read operation (read, read_many, project and plane_statistics) of the readers it
+    is attached to. Profilers may be shared by several readers and threads.
+
+    _calls : Deque[ReadProfile]
+        The profiles of the most recent read operations.
+    _total : ReadProfile
+        The sum of the profiles of all read operations recorded, including those no longer kept.
+    """
+
+    def __init__(self, max_calls: Optional[int] = 10000) -> None:
+        """Creates a profiler.
+
+        Parameters
+        ----------
+        max_calls : Optional[int]
+            The maximum number of read operations whose profiles are kept, or None for no limit. The totals
+            cover all read operations.
+        """
+        self._calls: Deque[ReadProfile] = deque(maxlen=max_calls)
+        self._total = ReadProfile()
+        self._totals_by_method: Dict[str, ReadProfile] = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile: ReadProfile) -> None:
+        """Records the profile of a read operation."""
+        with self._lock:
+            self._calls.append(profile)
+            self._total += profile
+            self._totals_by_method[profile.method] = (
+                self._totals_by_method.get(profile.method, ReadProfile(method=profile.method)) + profile
+            )
+
+    def clear(self) -> None:
+        """Discards all profiles recorded so far."""
+        with self._lock:
+            self._calls.clear()
+            self._total = ReadProfile()
+            self._totals_by_method = {}
+
+    @property
+    def calls(self) -> List[ReadProfile]:
+        """The profiles of the most recent read operations, in the order they finished."""
+        with self._lock:
+            return list(self._calls)
+
+    @property
+    def total(self) -> ReadProfile:
+        """The sum of the profiles of all read operations."""
+        with self._lock:
+            return self._total
+
+    @property
+    def by_method(self) -> Dict[str, ReadProfile]:
+        """The sum of the profiles of all read operations, by CziReader method."""
+        with self._lock:
+            return dict(self._totals_by_method)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the totals, the totals by method and the profiles of the most recent read operations as a
+        dictionary."""
+        with self._lock:
+            return {
+                "total": self._total.to_dict(),
+                "by_method": {method: total.to_dict() for method, total in self._totals_by_method.items()},
+                "calls": [profile.to_dict() for profile in self._calls],
+            }
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 4) -> str:
+        """Returns the profiles as JSON (see to_dict), and writes it to path if specified.
+
+        Parameters
+        ----------
+        path : Optional[str]
+            The path of the JSON file.
+        indent : Optional[int]
+            The indentation of the JSON document, None for a compact document.
+
+        Returns
+        ----------
+        : str
+            The JSON document.
+        """
+        document = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(document)
+        return document
+
+
+@dataclass
+class StreamStatistics:
+    """Stream statistics data structure.
+
+    Data structure to represent the statistics of the reads from the stream of a reader since it was opened. Bin i of
+    the histograms counts the reads with a value in [bin_edges[i], bin_edges[i + 1]), the edges being 0 and the
+    powers of 2 (of microseconds for the latencies and of bytes for the sizes) and the last edge being inf.
+    """
+
+    read_count: int  # Number of reads.
+    bytes_read: int  # Number of bytes read.
+    sequential_reads: int  # Number of reads starting where the previous read ended.
+    min_offset: int  # Smallest offset read from.
+    max_end: int  # Largest offset read up to.
+    latency_histogram: np.ndarray  # Number of reads by latency.
+    latency_bin_edges: np.ndarray  # Edges of the latency histogram bins (in seconds).
+    size_histogram: np.ndarray  # Number of reads by requested size.
+    size_bin_edges: np.ndarray  # Edges of the size histogram bins (in bytes).
+
+    @staticmethod
+    def _create_bin_edges(bins: int, unit: float) -> np.ndarray:
+        """Returns the edges 0, 1, 2, 4, ..., inf (times unit) of a histogram with the given number of bins."""
+        return np.concatenate(([0.0], 2.0 ** np.arange(bins - 1) * unit, [np.inf]))
+
+    @classmethod
+    def from_native(cls, statistics: _pylibCZIrw.StreamStatistics) -> "StreamStatistics":
+        """Creates the stream statistics from the statistics of the c++ reader."""
+        latency_histogram = np.asarray(statistics.latencyHistogram, dtype=np.uint64)
+        size_histogram = np.asarray(statistics.sizeHistogram, dtype=np.uint64)
+        return cls(
+            read_count=statistics.readCount,
+            bytes_read=statistics.bytesRead,
+            sequential_reads=statistics.sequentialReads,
+            min_offset=statistics.minOffset,
+            max_end=statistics.maxEnd,
+            latency_histogram=latency_histogram,
+            latency_bin_edges=cls._create_bin_edges(len(latency_histogram), 1e-6),
+            size_histogram=size_histogram,
+            size_bin_edges=cls._create_bin_edges(len(size_histogram), 1.0),
+        )
+
+
+# The columns of a stream trace: offset, requested size and bytes read, start (relative to the start of the trace)
+# and duration (in seconds) of each read.
+STREAM_TRACE_COLUMNS: Tuple[str, ...] = ("offset", "size", "bytes_read", "start", "duration")
+
+
+@dataclass
+class StreamTrace:
+    """Stream trace data structure.
+
+    Data structure to represent the reads from the stream of a reader while a trace was recorded, in the order they
+    finished (see CziReader.trace_stream()).
+    """
+
+    # The dtype of the entries, with one field per column of STREAM_TRACE_COLUMNS.
+    DTYPE = np.dtype(list(zip(STREAM_TRACE_COLUMNS, (np.uint64, np.uint64, np.uint64, np.float64, np.float64))))
+
+    entries: np.ndarray  # The reads, a structured array of dtype DTYPE.
+    dropped: int = 0  # Number of reads not recorded because the trace was full.
+
+    @classmethod
+    def from_native(cls, trace: np.ndarray, dropped: int) -> "StreamTrace":
+        """Creates the trace from the (reads, 5) array of the c++ reader, with times in nanoseconds."""
+        entries = np.empty(len(trace), dtype=cls.DTYPE)
+        for column, name in enumerate(STREAM_TRACE_COLUMNS):
+            entries[name] = trace[:, column] * 1e-9 if cls.DTYPE[name].kind == "f" else trace[:, column]
+        return cls(entries, dropped)
+
+    def save(self, path: str) -> None:
+        """Writes the trace to a CSV file with one line per read (and a header line with the column names).
+
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file.
+        """
+        np.savetxt(
+            path,
+            self.entries,
+            fmt=["%d", "%d", "%d", "%.9f", "%.9f"],
+            delimiter=",",
+            header=",".join(STREAM_TRACE_COLUMNS),
+            comments="",
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "StreamTrace":
+        """Reads a trace written by save().
+
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file.
+        """
+        entries = np.loadtxt(path, dtype=cls.DTYPE, delimiter=",", skiprows=1, ndmin=1)
+        return cls(entries)
+
+
+_active_profilers: "contextvars.ContextVar[Tuple[Profiler, ...]]" = contextvars.ContextVar(
+    "_active_profilers", default=()
+)
+
+
+@contextlib.contextmanager
+def profile(profiler: Optional[Profiler] = None) -> Generator:
+    """Profiles all read operations of any reader in the current thread (or asyncio task) within the context.
+    Contexts may be nested, the read operations are then recorded by all of their profilers.
+
+    Parameters
+    ----------
+    profiler : Optional[Profiler]
+        The profiler recording the read operations, defaults to a new one.
+
+    Returns
+    ----------
+     : Profiler
+        The profiler recording the read operations.
+    """
+    profiler = Profiler() if profiler is None else profiler
+    token = _active_profilers.set(_active_profilers.get() + (profiler,))
+    try:
+        yield profiler
+    finally:
+        _active_profilers.reset(token)
+
+
+def get_active_profilers() -> Tuple[Profiler, ...]:
+    """Returns the profilers of the profile() contexts active in the current thread (or asyncio task)."""
+    return _active_profilers.get()
+
+
+@contextlib.contextmanager
+def measure(
+    czi_reader: _pylibCZIrw.czi_reader, method: str, profilers: Tuple[Profiler, ...]
+) -> Generator[ReadProfile, None, None]:
+    """Measures a read operation and records its profile with the given profilers, if it succeeds.
+
+    Parameters
+    ----------
+    czi_reader : _pylibCZIrw.czi_reader
+        The c++ reader the operation reads from.
+    method : str
+        The name of the read operation.
+    profilers : Tuple[Profiler, ...]
+        The profilers recording the operation.
+
+    Returns
+    ----------
+     : ReadProfile
+        The profile of the operation, the caller adds the time spent converting the pixel data to its
+        convert_seconds.
+    """
+    profile = ReadProfile(method=method, calls=1)
+    start_counters = czi_reader.GetProfile()
+    start = perf_counter()
+    yield profile
+    profile.total_seconds = perf_counter() - start
+    end_counters = czi_reader.GetProfile()
+
+    def difference(name: str) -> int:
+        return getattr(end_counters, name) - getattr(start_counters, name)
+
+    profile.io_operations = difference("ioOperations")
+    profile.bytes_read = difference("bytesRead")
+    profile.subblocks_read = difference("subBlocksRead")
+    profile.subblocks_decoded = difference("subBlocksDecoded")
+    profile.cache_lookups = difference("cacheLookups")
+    profile.cache_hits = difference("cacheHits")
+    # Every subblock composed is either found in the cache or read.
+    profile.subblocks_touched = profile.subblocks_read + profile.cache_hits
+    profile.io_seconds = difference("ioNanoseconds") * 1e-9
+    profile.decode_seconds = difference("decodeNanoseconds") * 1e-9
+    profile.prune_seconds = difference("pruneNanoseconds") * 1e-9
+    profile.compose_seconds = max(
+        0.0,
+        profile.total_seconds
+        - profile.convert_seconds
+        - profile.io_seconds
+        - profile.decode_seconds
+        - profile.prune_seconds,
+    )
+    for profiler in profilers:
+        profiler.add(profile)
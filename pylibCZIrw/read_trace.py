@@ -0,0 +1,134 @@
+"""Module implementing the recording of read operations
+
+A ReadTrace records the read() calls of a reader (see CziReader.record_reads()) with all parameters determining which
+pixels are read, so that the workload can be replayed later (see pylibCZIrw.replay), e.g. to tune the subblock cache
+offline. Traces are stored as JSON lines, gzip-compressed if the file name ends with ".gz".
+"""
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import IO, Dict, List, Optional, Tuple
+
+# The version of the trace file format.
+READ_TRACE_VERSION = 1
+
+
+@dataclass
+class TracedRead:
+    """Traced read data structure.
+
+    Data structure to represent one read() call of a reader, with the roi, plane and pixel type as resolved by the
+    reader (so that replaying it does not depend on defaults).
+    """
+
+    start: float  # Start of the read (in seconds), relative to the start of the trace.
+    duration: float  # Duration of the read (in seconds).
+    roi: Tuple[int, int, int, int]  # Region of interest (x, y, w, h).
+    plane: Dict[str, int]  # Plane coordinates.
+    scene: Optional[int]  # Scene index.
+    zoom: Optional[float]  # Zoom factor.
+    pixel_type: str  # Pixel type the data was read with.
+    resample: str  # Resample method.
+
+
+class ReadTrace:
+    """ReadTrace class.
+
+    Records the read() calls of the readers it is attached to, in the order they finished. Reads may be added
+    concurrently from several threads.
+
+    reads : List[TracedRead]
+        The reads recorded so far.
+    """
+
+    def __init__(self, reads: Optional[List[TracedRead]] = None) -> None:
+        """Creates a trace.
+
+        Parameters
+        ----------
+        reads : Optional[List[TracedRead]]
+            The reads of the trace, defaults to no reads.
+        """
+        self.reads: List[TracedRead] = [] if reads is None else reads
+        self._start = perf_counter()
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        start: float,
+        roi: Tuple[int, int, int, int],
+        plane: Dict[str, int],
+        scene: Optional[int],
+        zoom: Optional[float],
+        pixel_type: str,
+        resample: str,
+    ) -> None:
+        """Records a read which started at start (a time.perf_counter() value) and finished now."""
+        end = perf_counter()
+        read = TracedRead(
+            start=max(0.0, start - self._start),
+            duration=end - start,
+            roi=tuple(int(value) for value in roi),  # type: ignore[arg-type]
+            plane=dict(plane),
+            scene=scene,
+            zoom=zoom,
+            pixel_type=pixel_type,
+            resample=resample,
+        )
+        with self._lock:
+            self.reads.append(read)
+
+    def __len__(self) -> int:
+        return len(self.reads)
+
+    @staticmethod
+    def _open(path: str, mode: str) -> IO[str]:
+        if path.endswith(".gz"):
+            import gzip
+
+            return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+        return open(path, mode, encoding="utf-8")
+
+    def save(self, path: str) -> None:
+        """Writes the trace as JSON lines, a header line followed by one line per read.
+
+        Parameters
+        ----------
+        path : str
+            The path of the trace file, which is gzip-compressed if it ends with ".gz".
+        """
+        with self._lock:
+            reads = list(self.reads)
+        with self._open(path, "w") as file:
+            file.write(json.dumps({"version": READ_TRACE_VERSION}) + "\n")
+            for read in reads:
+                file.write(json.dumps(asdict(read), separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ReadTrace":
+        """Reads a trace written by save().
+
+        Parameters
+        ----------
+        path : str
+            The path of the trace file.
+
+        Returns
+        ----------
+        : ReadTrace
+            The trace.
+        :raises ValueError: if the file is not a trace of a supported version
+        """
+        with cls._open(path, "r") as file:
+            header = json.loads(file.readline() or "{}")
+            if header.get("version") != READ_TRACE_VERSION:
+                raise ValueError(f"{path} is not a read trace of version {READ_TRACE_VERSION}.")
+            reads = []
+            for line in file:
+                if line.strip():
+                    values = json.loads(line)
+                    values["roi"] = tuple(values["roi"])
+                    reads.append(TracedRead(**values))
+        return cls(reads)
@@ -0,0 +1,229 @@
+"""Module implementing the replay of read traces
+
+Replays the reads recorded by CziReader.record_reads() against a czi document with different subblock cache
+configurations and numbers of threads, and reports the latencies, the throughput and the cache hit rates, so that
+cache sizes can be tuned offline against real workloads.
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from pylibCZIrw.czi import CacheOptions, CacheType, ReaderFileInputTypes, open_czi
+from pylibCZIrw.profiling import ReadProfile
+from pylibCZIrw.read_trace import ReadTrace, TracedRead
+
+
+@dataclass
+class ReplayResult:
+    """Replay result data structure.
+
+    Data structure to represent the outcome of replaying a trace with one configuration.
+    """
+
+    cache_options: Optional[CacheOptions]  # The configuration of the subblock cache, None for no cache.
+    threads: int  # Number of threads reading concurrently.
+    latencies: np.ndarray  # Duration of each read (in seconds), in the order of the trace.
+    total_seconds: float  # Wall-clock time of the replay.
+    profile: ReadProfile  # Counters of the reader over the replay, and timings summed over all reads.
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """The fraction of subblock cache lookups which were hits, nan if the cache was not used."""
+        return self.profile.cache_hits / self.profile.cache_lookups if self.profile.cache_lookups else float("nan")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a summary of the replay as a dictionary."""
+        latencies = self.latencies if len(self.latencies) else np.full(1, np.nan)
+        return {
+            "cache_max_memory_usage": None if self.cache_options is None else self.cache_options.max_memory_usage,
+            "cache_max_sub_block_count": None if self.cache_options is None else self.cache_options.max_sub_block_count,
+            "threads": self.threads,
+            "reads": len(self.latencies),
+            "total_seconds": self.total_seconds,
+            "reads_per_second": len(self.latencies) / self.total_seconds if self.total_seconds > 0 else float("nan"),
+            "mean_latency": float(np.mean(latencies)),
+            "p50_latency": float(np.percentile(latencies, 50)),
+            "p95_latency": float(np.percentile(latencies, 95)),
+            "p99_latency": float(np.percentile(latencies, 99)),
+            "max_latency": float(np.max(latencies)),
+            "cache_hit_rate": self.cache_hit_rate,
+            "bytes_read": self.profile.bytes_read,
+            "subblocks_read": self.profile.subblocks_read,
+            "subblocks_decoded": self.profile.subblocks_decoded,
+        }
+
+
+def replay(
+    filepath: str,
+    trace: ReadTrace,
+    cache_options: Optional[CacheOptions] = None,
+    threads: int = 1,
+    file_input_type: ReaderFileInputTypes = ReaderFileInputTypes.Standard,
+) -> ReplayResult:
+    """Replays the reads of a trace as fast as possible (the recorded start times are not reproduced) on a newly
+    opened reader, by the given number of threads sharing the reader.
+
+    Parameters
+    ----------
+    filepath : str
+        File path (or URL) of the czi document.
+    trace : ReadTrace
+        The reads.
+    cache_options : Optional[CacheOptions]
+        The configuration of the subblock cache of the reader, None for no cache.
+    threads : int
+        The number of threads reading concurrently.
+    file_input_type : ReaderFileInputTypes
+        The type of file input, default is local file.
+
+    Returns
+    ----------
+    : ReplayResult
+        The latencies of the reads and the counters of the reader.
+    :raises ValueError: if threads is smaller than 1
+    """
+    if threads < 1:
+        raise ValueError("At least one thread is required.")
+    with open_czi(filepath, file_input_type, cache_options=cache_options, profile=True) as reader:
+
+        def replay_read(read: TracedRead) -> float:
+            start = perf_counter()
+            reader.read(
+                roi=read.roi,
+                plane=read.plane,
+                scene=read.scene,
+                zoom=read.zoom,
+                pixel_type=read.pixel_type,
+                resample=read.resample,
+            )
+            return perf_counter() - start
+
+        start_counters = reader.read_counters()
+        start = perf_counter()
+        if threads == 1:
+            latencies = [replay_read(read) for read in trace.reads]
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                latencies = list(executor.map(replay_read, trace.reads))
+        total_seconds = perf_counter() - start
+        # The profiles of concurrent reads include each other's counters, so the counters are those of the reader over
+        # the replay, and only the timings of the reads are summed.
+        counters = reader.read_counters() - start_counters
+        reads = reader.profiler.total
+        profile = replace(
+            counters,
+            calls=reads.calls,
+            convert_seconds=reads.convert_seconds,
+            total_seconds=reads.total_seconds,
+            compose_seconds=max(
+                0.0,
+                reads.total_seconds
+                - reads.convert_seconds
+                - counters.io_seconds
+                - counters.decode_seconds
+                - counters.prune_seconds,
+            ),
+        )
+
+    return ReplayResult(
+        cache_options=cache_options,
+        threads=threads,
+        latencies=np.asarray(latencies, dtype=np.float64),
+        total_seconds=total_seconds,
+        profile=profile,
+    )
+
+
+def replay_all(
+    filepath: str,
+    trace: ReadTrace,
+    cache_options: Sequence[Optional[CacheOptions]] = (None,),
+    threads: Sequence[int] = (1,),
+    file_input_type: ReaderFileInputTypes = ReaderFileInputTypes.Standard,
+) -> List[ReplayResult]:
+    """Replays the reads of a trace with every combination of the given cache configurations and thread counts (see
+    replay()).
+
+    Returns
+    ----------
+    : List[ReplayResult]
+        The results, by cache configuration and then by number of threads.
+    """
+    return [
+        replay(filepath, trace, options, thread_count, file_input_type)
+        for options in cache_options
+        for thread_count in threads
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command line interface of replay_all, e.g. czireplay trace.jsonl.gz image.czi --cache-memory 0 256 1024
+    --threads 1 8
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]]
+        The command line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        prog="czireplay", description="Replays a read trace against a czi document with different caches."
+    )
+    parser.add_argument("trace", help="file path of the read trace")
+    parser.add_argument("src", help="file path (or URL with --curl) of the czi document")
+    parser.add_argument(
+        "--cache-memory",
+        type=int,
+        nargs="+",
+        default=[0],
+        metavar="MIB",
+        help="maximum memory usages of the subblock cache in MiB, 0 for no cache or, with --cache-subblocks, for a "
+        "cache limited by the number of subblocks only (default: 0)",
+    )
+    parser.add_argument(
+        "--cache-subblocks", type=int, default=None, help="maximum number of subblocks in the subblock cache"
+    )
+    parser.add_argument("--threads", type=int, nargs="+", default=[1], help="numbers of threads (default: 1)")
+    parser.add_argument("--curl", action="store_true", help="read the document from a URL")
+    parser.add_argument("--json", default=None, help="file path the results are written to as JSON")
+    args = parser.parse_args(argv)
+
+    cache_options = [
+        (
+            None
+            if memory == 0 and args.cache_subblocks is None
+            else CacheOptions(
+                type=CacheType.Standard,
+                max_memory_usage=memory * 1024**2 if memory else None,
+                max_sub_block_count=args.cache_subblocks,
+            )
+        )
+        for memory in args.cache_memory
+    ]
+    results = replay_all(
+        args.src,
+        ReadTrace.load(args.trace),
+        cache_options,
+        args.threads,
+        ReaderFileInputTypes.Curl if args.curl else ReaderFileInputTypes.Standard,
+    )
+    summaries = [result.to_dict() for result in results]
+    print(f"{'cache MiB':>10} {'threads':>8} {'reads/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hit rate':>9}")
+    for memory, summary in zip([memory for memory in args.cache_memory for _ in args.threads], summaries):
+        print(
+            f"{memory:>10} {summary['threads']:>8} {summary['reads_per_second']:>10.1f} "
+            f"{summary['p50_latency'] * 1e3:>8.2f} {summary['p95_latency'] * 1e3:>8.2f} "
+            f"{summary['p99_latency'] * 1e3:>8.2f} {summary['cache_hit_rate']:>9.2%}"
+        )
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(summaries, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Contains integration tests for the conversion functions."""
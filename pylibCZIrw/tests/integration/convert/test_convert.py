@@ -0,0 +1,116 @@
+"""Module implementing integration tests for the conversion to OME-Zarr"""
+
+import json
+import os
+import tempfile
+import zlib
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from pylibCZIrw.convert import main, to_zarr
+from pylibCZIrw.czi import create_czi
+
+
+def load_zarr_array(path: str) -> np.ndarray:
+    """Loads a zarr array (v2 format, "/" dimension separator, zlib or no compression) into memory"""
+    with open(os.path.join(path, ".zarray"), encoding="utf-8") as zarray_file:
+        metadata = json.load(zarray_file)
+    shape, chunks = metadata["shape"], metadata["chunks"]
+    data = np.zeros([-(-size // chunk) * chunk for size, chunk in zip(shape, chunks)], dtype=metadata["dtype"])
+    for directory, _, files in os.walk(path):
+        for file_name in files:
+            if file_name.startswith("."):
+                continue
+            with open(os.path.join(directory, file_name), "rb") as chunk_file:
+                chunk_data = chunk_file.read()
+            if metadata["compressor"] is not None:
+                chunk_data = zlib.decompress(chunk_data)
+            indices = map(int, os.path.relpath(os.path.join(directory, file_name), path).split(os.sep))
+            data[tuple(slice(index * chunk, (index + 1) * chunk) for index, chunk in zip(indices, chunks))] = (
+                np.frombuffer(chunk_data, dtype=metadata["dtype"]).reshape(chunks)
+            )
+    return data[tuple(slice(0, size) for size in shape)]
+
+
+@pytest.mark.parametrize("compression_level", [None, 1])
+def test_to_zarr(compression_level: Optional[int]) -> None:
+    """Integration tests for converting a multi-channel document"""
+    data = np.random.default_rng(0).integers(0, 65536, (2, 300, 500, 1), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "image.czi")
+        zarr_path = os.path.join(temp_directory, "image.ome.zarr")
+        with create_czi(czi_path) as czi_document:
+            for channel, channel_data in enumerate(data):
+                czi_document.write(channel_data, location=(-20, 10), plane={"C": channel})
+        to_zarr(czi_path, zarr_path, chunks=(128, 128), workers=3, compression_level=compression_level)
+
+        with open(os.path.join(zarr_path, ".zattrs"), encoding="utf-8") as zattrs_file:
+            multiscales = json.load(zattrs_file)["multiscales"][0]
+        level0 = load_zarr_array(os.path.join(zarr_path, "0"))
+        level1 = load_zarr_array(os.path.join(zarr_path, "1"))
+        with pytest.raises(FileExistsError):
+            to_zarr(czi_path, zarr_path)
+
+    assert [dataset["path"] for dataset in multiscales["datasets"]] == ["0", "1", "2"]
+    np.testing.assert_array_equal(level0, data[np.newaxis, :, np.newaxis, :, :, 0])
+    expected_level1 = data[:, :, :, 0].reshape(2, 150, 2, 250, 2).mean(axis=(2, 4))
+    np.testing.assert_allclose(level1[0, :, 0], expected_level1, atol=0.5)
+
+
+def test_to_zarr_mixed_pixel_types() -> None:
+    """Integration tests for converting channels of different pixel types with the widest one"""
+    gray8 = np.random.default_rng(0).integers(0, 256, (100, 200, 1), dtype=np.uint8)
+    gray16 = np.random.default_rng(1).integers(0, 65536, (100, 200, 1), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mixed.czi")
+        zarr_path = os.path.join(temp_directory, "mixed.ome.zarr")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(gray8, location=(0, 0), plane={"C": 0})
+            czi_document.write(gray16, location=(0, 0), plane={"C": 1})
+        to_zarr(czi_path, zarr_path, chunks=(64, 64))
+        level0 = load_zarr_array(os.path.join(zarr_path, "0"))
+
+    assert level0.dtype == np.uint16
+    np.testing.assert_array_equal(level0[0, 0, 0], gray8[..., 0])
+    np.testing.assert_array_equal(level0[0, 1, 0], gray16[..., 0])
+
+
+def test_to_zarr_over_earlier_conversion() -> None:
+    """Integration tests for converting into the directory of an earlier conversion, chunks left empty are removed"""
+    data = np.random.default_rng(0).integers(1, 256, (100, 200, 1), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "image.czi")
+        other_czi_path = os.path.join(temp_directory, "other.czi")
+        zarr_path = os.path.join(temp_directory, "image.ome.zarr")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(data, location=(0, 0))
+        with create_czi(other_czi_path) as czi_document:
+            czi_document.write(np.zeros_like(data), location=(0, 0))
+        to_zarr(czi_path, zarr_path, chunks=(64, 64))
+        to_zarr(other_czi_path, zarr_path, chunks=(64, 64), exist_ok=True)
+        level0 = load_zarr_array(os.path.join(zarr_path, "0"))
+
+    assert not level0.any()
+
+
+def test_to_zarr_scenes() -> None:
+    """Integration tests for converting a document with several rgb scenes from the command line"""
+    data = np.random.default_rng(0).integers(0, 256, (100, 200, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "scenes.czi")
+        zarr_path = os.path.join(temp_directory, "scenes.ome.zarr")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(data, location=(0, 0), scene=0)
+            czi_document.write(data[:50], location=(500, 500), scene=1)
+        main([czi_path, zarr_path, "--chunks", "64", "64", "--workers", "2"])
+
+        with open(os.path.join(zarr_path, ".zattrs"), encoding="utf-8") as zattrs_file:
+            assert json.load(zattrs_file) == {"bioformats2raw.layout": 3}
+        scene0 = load_zarr_array(os.path.join(zarr_path, "0", "0"))
+        scene1 = load_zarr_array(os.path.join(zarr_path, "1", "0"))
+
+    # rgb pixel types are stored as three channels in the order R, G, B
+    np.testing.assert_array_equal(scene0[0, :, 0], np.moveaxis(data[..., ::-1], 2, 0))
+    np.testing.assert_array_equal(scene1[0, :, 0], np.moveaxis(data[:50, :, ::-1], 2, 0))
@@ -0,0 +1,45 @@
+"""Module implementing integration tests for the CziZarrStore class"""
+
+import json
+import os
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pylibCZIrw.czi import create_czi, open_czi
+from pylibCZIrw.zarr_store import CziZarrStore
+
+
+def test_zarr_store() -> None:
+    """Integration tests for serving a mosaic as OME-Zarr, with chunks aligned to the tiles"""
+    data = np.random.default_rng(0).integers(0, 65536, (2, 400, 600, 1), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mosaic.czi")
+        with create_czi(czi_path) as czi_document:
+            for channel, channel_data in enumerate(data):
+                for y in range(0, 400, 200):
+                    for x in range(0, 600, 300):
+                        czi_document.write(
+                            channel_data[y : y + 200, x : x + 300], location=(x, y), plane={"C": channel}
+                        )
+        with open_czi(czi_path) as czi_document:
+            store = CziZarrStore(czi_document, compression_level=1)
+            zarray = json.loads(store["0/.zarray"])
+            chunk_keys = [key for key in store if key.startswith("0/") and not key.endswith(".zarray")]
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                chunks = dict(zip(chunk_keys, executor.map(store.__getitem__, chunk_keys)))
+            downscaled = np.frombuffer(zlib.decompress(store["1/0/1/0/0/0"]), dtype=np.uint16)
+            expected_downscaled = czi_document.read((0, 0, 600, 400), plane={"C": 1}, zoom=0.5)
+
+    assert zarray["shape"] == [1, 2, 1, 400, 600]
+    assert zarray["chunks"] == [1, 1, 1, 200, 300]
+    assert len(chunks) == 2 * 2 * 2
+    for key, chunk in chunks.items():
+        _, t, c, z, y, x = map(int, key.split("/"))
+        np.testing.assert_array_equal(
+            np.frombuffer(zlib.decompress(chunk), dtype=np.uint16).reshape(200, 300),
+            data[c, y * 200 : (y + 1) * 200, x * 300 : (x + 1) * 300, 0],
+        )
+    np.testing.assert_array_equal(downscaled.reshape(200, 300), expected_downscaled[..., 0])
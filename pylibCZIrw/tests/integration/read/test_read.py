@@ -1,14 +1,26 @@
 """Module implementing integration tests for the read function of the CziReader class"""
 
 import os
-from concurrent.futures import ThreadPoolExecutor
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import partial
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pytest
 
-from pylibCZIrw.czi import CacheOptions, CacheType, ReaderFileInputTypes, open_czi
+from pylibCZIrw.czi import (
+    AccessorOptions,
+    BufferPool,
+    CacheOptions,
+    CacheType,
+    ReaderFileInputTypes,
+    create_czi,
+    open_czi,
+)
+from pylibCZIrw.read_trace import ReadTrace
+from pylibCZIrw.replay import replay_all
 
 working_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -561,3 +573,545 @@ def test_read_raises_error_on_Gray32Float() -> None:
     with pytest.raises(RuntimeError, match=expected_error_message):
         with open_czi(CZI_DOCUMENT_TEST_ERROR2) as czi_document:
             czi_document.read()
+
+
+def _read_pickled_reader(pickled_reader: bytes, roi: Tuple[int, int, int, int]) -> np.ndarray:
+    """Unpickles a reader in a worker process and reads the given roi"""
+    reader = pickle.loads(pickled_reader)
+    try:
+        return reader.read(roi=roi)
+    finally:
+        reader.close()
+
+
+def test_read_with_pickled_reader_in_worker_processes() -> None:
+    """Integration tests for sending a reader to worker processes"""
+    rois = [(0, 0, 100, 100), (100, 100, 100, 100)]
+    with open_czi(CZI_DOCUMENT_TEST1) as czi_document:
+        pickled_reader = pickle.dumps(czi_document)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            plane_arrays = list(executor.map(partial(_read_pickled_reader, pickled_reader), rois))
+        # the reader of the parent process is not affected by the workers
+        np.testing.assert_array_equal(czi_document.read(roi=rois[0]), EXPECTED_PLANE_TEST1[:100, :100])
+
+    np.testing.assert_array_equal(plane_arrays[0], EXPECTED_PLANE_TEST1[:100, :100])
+    np.testing.assert_array_equal(plane_arrays[1], EXPECTED_PLANE_TEST1[100:200, 100:200])
+
+
+@pytest.mark.parametrize(
+    "czi_path, expected_plane, dtype, scale, offset",
+    [
+        (CZI_DOCUMENT_TEST1, EXPECTED_PLANE_TEST1, np.float32, 1 / 255, 0.0),
+        (CZI_DOCUMENT_TEST1, EXPECTED_PLANE_TEST1, np.float64, [1.0, 2.0, 3.0], [0.0, -1.0, 1.0]),
+        (CZI_DOCUMENT_TEST2, EXPECTED_PLANE_TEST2, np.float32, 1 / 65535, -0.5),
+        (CZI_DOCUMENT_TEST3, EXPECTED_PLANE_TEST3, None, 2.0, 1.0),
+    ],
+)
+def test_read_normalized(
+    czi_path: str,
+    expected_plane: np.ndarray,
+    dtype: Optional[type],
+    scale: Union[float, List[float]],
+    offset: Union[float, List[float]],
+) -> None:
+    """Integration tests for reading with dtype conversion and normalization"""
+    with open_czi(czi_path) as czi_document:
+        plane_array = czi_document.read(dtype=dtype, scale=scale, offset=offset)
+
+    expected_dtype = np.float32 if dtype is None else dtype
+    assert plane_array.dtype == expected_dtype
+    np.testing.assert_allclose(
+        plane_array,
+        expected_plane.astype(expected_dtype) * np.asarray(scale, dtype=expected_dtype)
+        + np.asarray(offset, dtype=expected_dtype),
+        rtol=1e-6,
+    )
+
+
+def test_read_flatfield_corrected() -> None:
+    """Integration tests for reading with flat-field correction"""
+    flatfield = np.linspace(0.5, 1.5, EXPECTED_PLANE_TEST3.shape[0] * EXPECTED_PLANE_TEST3.shape[1]).reshape(
+        EXPECTED_PLANE_TEST3.shape[:2]
+    )
+    with open_czi(CZI_DOCUMENT_TEST3) as czi_document:
+        plane_array = czi_document.read(flatfield=flatfield)
+        with pytest.raises(ValueError):
+            czi_document.read(flatfield=flatfield[1:])
+
+    np.testing.assert_allclose(
+        plane_array, EXPECTED_PLANE_TEST3 / flatfield.astype(np.float32)[..., np.newaxis], rtol=1e-6
+    )
+
+
+@pytest.mark.parametrize(
+    "czi_path, factor",
+    [
+        (CZI_DOCUMENT_TEST1, 2),
+        (CZI_DOCUMENT_TEST2, 4),
+        (CZI_DOCUMENT_TEST3, 4),
+    ],
+)
+def test_read_area_resampled(czi_path: str, factor: int) -> None:
+    """Integration tests for reading with area-averaging downscaling"""
+    with open_czi(czi_path) as czi_document:
+        bounding_box = czi_document.total_bounding_rectangle
+        roi = (
+            bounding_box.x,
+            bounding_box.y,
+            bounding_box.w - bounding_box.w % factor,
+            bounding_box.h - bounding_box.h % factor,
+        )
+        plane_array = czi_document.read(roi=roi)
+        resampled_array = czi_document.read(roi=roi, zoom=1 / factor, resample="area")
+
+    expected_array = plane_array.reshape(roi[3] // factor, factor, roi[2] // factor, factor, -1).mean(axis=(1, 3))
+    assert resampled_array.dtype == plane_array.dtype
+    assert resampled_array.shape == expected_array.shape
+    np.testing.assert_allclose(resampled_array, expected_array, atol=0.5)
+
+
+def test_read_raises_error_on_incorrect_resample() -> None:
+    """Integration tests for the read function error message on unsupported resample methods"""
+    expected_error_message = "The resample method provided does not mach any supported methods"
+    with pytest.raises(ValueError, match=expected_error_message):
+        with open_czi(CZI_DOCUMENT_TEST3) as czi_document:
+            czi_document.read(zoom=0.5, resample="cubic")
+
+
+@pytest.mark.parametrize(
+    "czi_path, expected_plane",
+    [
+        (CZI_DOCUMENT_TEST1, EXPECTED_PLANE_TEST1),
+        (CZI_DOCUMENT_TEST2, EXPECTED_PLANE_TEST2),
+        (CZI_DOCUMENT_TEST3, EXPECTED_PLANE_TEST3),
+    ],
+)
+def test_read_many(czi_path: str, expected_plane: np.ndarray) -> None:
+    """Integration tests for reading many rois at once"""
+    rois = np.array([(100, 100, 50, 40), (0, 0, 50, 40), (10, 20, 50, 40), (100, 100, 50, 40)])
+    with open_czi(czi_path) as czi_document:
+        bounding_box = czi_document.total_bounding_rectangle
+        rois[:, :2] += (bounding_box.x, bounding_box.y)
+        many_array = czi_document.read_many(rois)
+        out = np.zeros_like(many_array)
+        assert czi_document.read_many(rois, out=out) is out
+
+    assert many_array.shape == (len(rois), 40, 50, expected_plane.shape[2])
+    for roi, roi_array in zip(rois, many_array):
+        x, y = roi[0] - bounding_box.x, roi[1] - bounding_box.y
+        np.testing.assert_array_equal(roi_array, expected_plane[y : y + 40, x : x + 50])
+    np.testing.assert_array_equal(out, many_array)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        np.arange(200 * 300, dtype=np.uint16).reshape(200, 300, 1),
+        np.random.default_rng(0).integers(0, 256, (200, 300, 3), dtype=np.uint8),
+        np.random.default_rng(0).normal(10, 2, (200, 300, 1)).astype(np.float32),
+    ],
+)
+def test_plane_statistics(data: np.ndarray) -> None:
+    """Integration tests for computing the statistics of a plane"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "statistics.czi")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(data[:100], location=(0, 0), plane={"C": 1})
+            czi_document.write(data[100:], location=(0, 100), plane={"C": 1})
+            czi_document.write(data[:100], location=(0, 0), plane={"C": 0})
+        with open_czi(czi_path) as czi_document:
+            statistics = czi_document.plane_statistics({"C": 1}, bins=32)
+            statistics_per_plane = czi_document.plane_statistics([{"C": 0}, {"C": 1}])
+
+    values = data.reshape(-1, data.shape[2]).astype(np.float64)
+    np.testing.assert_array_equal(statistics.count, len(values))
+    np.testing.assert_array_equal(statistics.min, values.min(axis=0))
+    np.testing.assert_array_equal(statistics.max, values.max(axis=0))
+    np.testing.assert_allclose(statistics.mean, values.mean(axis=0))
+    np.testing.assert_allclose(statistics.std, values.std(axis=0))
+    for channel in range(data.shape[2]):
+        histogram, _ = np.histogram(values[:, channel], bins=statistics.bin_edges)
+        np.testing.assert_array_equal(statistics.histogram[channel], histogram)
+    assert [statistics.count[0] for statistics in statistics_per_plane] == [len(values) // 2, len(values)]
+
+
+@pytest.mark.parametrize(
+    "stack",
+    [
+        np.random.default_rng(0).integers(0, 65536, (5, 200, 300, 1), dtype=np.uint16),
+        np.random.default_rng(0).integers(0, 256, (3, 200, 300, 3), dtype=np.uint8),
+    ],
+)
+@pytest.mark.parametrize("op, expected", [("max", np.max), ("sum", np.sum), ("mean", np.mean)])
+def test_project(stack: np.ndarray, op: str, expected: Callable) -> None:
+    """Integration tests for projecting a z-stack"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "stack.czi")
+        with create_czi(czi_path) as czi_document:
+            for z, z_plane in enumerate(stack):
+                czi_document.write(z_plane[:100], location=(0, 0), plane={"Z": z})
+                czi_document.write(z_plane[100:], location=(0, 100), plane={"Z": z})
+        with open_czi(czi_path) as czi_document:
+            projection = czi_document.project(op=op, max_workers=2)
+            roi_projection = czi_document.project((50, 80, 100, 40), op=op)
+
+    expected_projection = expected(stack.astype(np.float64), axis=0)
+    np.testing.assert_allclose(projection, expected_projection)
+    np.testing.assert_allclose(roi_projection, expected_projection[80:120, 50:150])
+    assert projection.dtype == (stack.dtype if op == "max" else np.float64)
+
+
+def test_profile_read() -> None:
+    """Integration tests for profiling reads with and without the subblock cache"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mosaic.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for y in range(2):
+                for x in range(2):
+                    czi_document.write(np.full((50, 60), x + 2 * y, dtype=np.uint16), location=(60 * x, 50 * y))
+        cache_options = CacheOptions(type=CacheType.Standard, max_memory_usage=10**8)
+        with open_czi(czi_path, cache_options=cache_options, profile=True) as czi_document:
+            czi_document.read()
+            czi_document.read(roi=(0, 0, 60, 50))
+            uncached_read, cached_read = czi_document.profiler.calls
+
+    assert uncached_read.subblocks_touched == uncached_read.subblocks_read == uncached_read.subblocks_decoded == 4
+    assert uncached_read.cache_hits == 0
+    assert uncached_read.bytes_read > 0
+    assert cached_read.subblocks_touched == cached_read.cache_hits == 1
+    assert cached_read.subblocks_read == cached_read.bytes_read == cached_read.io_operations == 0
+
+
+@pytest.mark.parametrize("cache_options", [None, CacheOptions(type=CacheType.Standard, max_memory_usage=10**8)])
+def test_read_many_decodes_shared_subblocks_once(cache_options: Optional[CacheOptions]) -> None:
+    """Integration tests for reading many rois sharing uncompressed subblocks, which the cache of the reader does not
+    keep"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mosaic.czi")
+        with create_czi(czi_path) as czi_document:
+            for y in range(2):
+                for x in range(2):
+                    czi_document.write(np.full((50, 60), x + 2 * y, dtype=np.uint16), location=(60 * x, 50 * y))
+        rois = [(x, y, 20, 20) for y in range(0, 80, 15) for x in range(0, 100, 15)]
+        with open_czi(czi_path, cache_options=cache_options, profile=True) as czi_document:
+            many_array = czi_document.read_many(rois)
+            (read_many_profile,) = czi_document.profiler.calls
+            plane = czi_document.read()
+
+    assert read_many_profile.subblocks_read == read_many_profile.subblocks_decoded == 4
+    for (x, y, w, h), roi_array in zip(rois, many_array):
+        np.testing.assert_array_equal(roi_array, plane[y : y + h, x : x + w])
+
+
+def test_trace_stream() -> None:
+    """Integration tests for the statistics and the trace of the reads from the stream"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mosaic.czi")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(np.ones((50, 60), dtype=np.uint8), location=(0, 0))
+            czi_document.write(np.ones((50, 60), dtype=np.uint8), location=(60, 0))
+        trace_path = os.path.join(temp_directory, "trace.csv")
+        with open_czi(czi_path) as czi_document:
+            reads_before = czi_document.stream_statistics().read_count
+            with czi_document.trace_stream(trace_path) as trace:
+                czi_document.read()
+            statistics = czi_document.stream_statistics()
+            with czi_document.trace_stream(max_reads=1) as truncated_trace:
+                czi_document.read()
+        saved_entries = np.loadtxt(trace_path, delimiter=",", skiprows=1, ndmin=2)
+
+    assert len(trace.entries) == statistics.read_count - reads_before > 0
+    assert trace.entries["bytes_read"].sum() >= 2 * 50 * 60
+    assert np.all(trace.entries["offset"] + trace.entries["bytes_read"] <= statistics.max_end)
+    assert statistics.latency_histogram.sum() == statistics.size_histogram.sum() == statistics.read_count
+    assert len(saved_entries) == len(trace.entries)
+    assert len(truncated_trace.entries) == 1
+    assert truncated_trace.dropped == len(trace.entries) - 1
+
+
+def test_record_and_replay_reads() -> None:
+    """Integration tests for recording reads and replaying them with and without a subblock cache"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "mosaic.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for x in range(2):
+                czi_document.write(np.full((50, 60), x + 1, dtype=np.uint16), location=(60 * x, 0))
+        trace_path = os.path.join(temp_directory, "trace.jsonl.gz")
+        with open_czi(czi_path) as czi_document:
+            with czi_document.record_reads(trace_path) as trace:
+                for x in range(0, 100, 10):
+                    czi_document.read(roi=(x, 0, 20, 20))
+            czi_document.read()
+        loaded_trace = ReadTrace.load(trace_path)
+        uncached, cached, cached_concurrently = replay_all(
+            czi_path,
+            loaded_trace,
+            [None, CacheOptions(type=CacheType.Standard, max_memory_usage=10**8)],
+            threads=[1],
+        ) + replay_all(czi_path, loaded_trace, [CacheOptions(type=CacheType.Standard)], threads=[2])
+
+    assert len(trace) == len(loaded_trace) == 10
+    assert loaded_trace.reads[0].roi == (0, 0, 20, 20)
+    assert loaded_trace.reads[0].pixel_type == "Gray16"
+    assert len(uncached.latencies) == len(cached.latencies) == len(cached_concurrently.latencies) == 10
+    assert np.isnan(uncached.cache_hit_rate)
+    assert cached.profile.subblocks_decoded == 2
+    assert cached.cache_hit_rate == (cached.profile.cache_lookups - 2) / cached.profile.cache_lookups
+    # The counters of reads running concurrently are counted once.
+    assert cached_concurrently.profile.cache_lookups == cached.profile.cache_lookups
+
+
+@pytest.mark.parametrize(
+    "channels, layout, zoom, resample",
+    [
+        ("all", "HWC", 1.0, "nearest"),
+        ([2, 0], "CHW", 1.0, "nearest"),
+        ("all", "CHW", 0.5, "area"),
+        ([1], "HWC", 0.5, "nearest"),
+    ],
+)
+def test_read_channels(channels: Union[str, List[int]], layout: str, zoom: float, resample: str) -> None:
+    """Integration tests for reading several channels into one array, compared to reading them one by one"""
+    data = np.random.default_rng(0).integers(0, 60000, (3, 80, 100), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "channels.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for channel in range(3):
+                czi_document.write(data[channel, :40], plane={"C": channel}, location=(0, 0))
+                czi_document.write(data[channel, 40:], plane={"C": channel}, location=(0, 40))
+        with open_czi(czi_path) as czi_document:
+            roi = (-10, 5, 100, 80)
+            pixel_data = czi_document.read(roi=roi, channels=channels, layout=layout, zoom=zoom, resample=resample)
+            expected = np.concatenate(
+                [
+                    czi_document.read(roi=roi, plane={"C": channel}, zoom=zoom, resample=resample)
+                    for channel in (range(3) if channels == "all" else channels)
+                ],
+                axis=2,
+            )
+
+    np.testing.assert_array_equal(pixel_data, expected if layout == "HWC" else expected.transpose(2, 0, 1))
+
+
+@pytest.mark.parametrize("layout", ["HWC", "CHW"])
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"zoom": 0.5, "resample": "area"}, {"dtype": np.float32, "scale": (1.0, 2.0, 4.0)}, {"channels": "all"}],
+)
+def test_read_rgb(layout: str, kwargs: Dict) -> None:
+    """Integration tests for reading rgb pixel types in RGB order, compared to reversing the BGR samples"""
+    data = np.random.default_rng(0).integers(0, 60000, (60, 70, 3), dtype=np.uint16)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "rgb.czi")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(data, location=(0, 0))
+        with open_czi(czi_path) as czi_document:
+            roi = (-5, 0, 70, 60)
+            pixel_data = czi_document.read(roi=roi, layout=layout, channel_order="RGB", **kwargs)
+            expected = czi_document.read(roi=roi, **kwargs)[..., ::-1]
+            if "scale" in kwargs:
+                expected = czi_document.read(roi=roi, **{**kwargs, "scale": kwargs["scale"][::-1]})[..., ::-1]
+
+    np.testing.assert_array_equal(pixel_data, expected if layout == "HWC" else expected.transpose(2, 0, 1))
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"plane": {"C": 1}}, {"channel_order": "RGB", "layout": "CHW"}])
+def test_read_exports_dlpack(kwargs: Dict) -> None:
+    """Integration tests for handing the pixel data over with DLPack without copying it, the bitmap staying alive
+    as long as the importing array"""
+    data = np.random.default_rng(0).integers(0, 255, (30, 35, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "dlpack.czi")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(data, plane={"C": 0}, location=(0, 0))
+            czi_document.write(data[..., 0], plane={"C": 1}, location=(0, 0))
+        with open_czi(czi_path) as czi_document:
+            pixel_data = czi_document.read(**kwargs)
+            expected = pixel_data.copy()
+            assert pixel_data.__dlpack_device__() == (1, 0)  # kDLCPU
+            imported = np.from_dlpack(pixel_data)
+
+    assert np.shares_memory(imported, pixel_data)
+    del pixel_data
+    np.testing.assert_array_equal(imported, expected)
+
+
+def test_read_with_buffer_pool() -> None:
+    """Integration tests for reading with a buffer pool, reusing the bitmaps of freed arrays"""
+    data = np.random.default_rng(0).integers(0, 60000, (80, 100), dtype=np.uint16)
+    buffer_pool = BufferPool(max_bytes=50 * 100 * 2)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "pool.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            czi_document.write(data, location=(0, 0))
+        with open_czi(czi_path, buffer_pool=buffer_pool) as czi_document:
+            for _ in range(3):
+                np.testing.assert_array_equal(czi_document.read(roi=(0, 0, 100, 50))[..., 0], data[:50])
+            stats = buffer_pool.stats
+            assert (stats.misses, stats.hits, stats.idle_buffers, stats.idle_bytes) == (1, 2, 1, 50 * 100 * 2)
+
+            # A bitmap is only reused once the arrays viewing it are freed.
+            first = czi_document.read(roi=(0, 0, 100, 50))
+            second = czi_document.read(roi=(0, 30, 100, 50))
+            np.testing.assert_array_equal(first[..., 0], data[:50])
+            np.testing.assert_array_equal(second[..., 0], data[30:])
+            assert buffer_pool.stats.misses == 2
+            del first, second
+            assert buffer_pool.stats.evictions == 1
+
+            # Intermediate bitmaps larger than the pool are not kept.
+            expected = czi_document.read(zoom=0.5, resample="area")
+            with open_czi(czi_path) as unpooled_document:
+                np.testing.assert_array_equal(expected, unpooled_document.read(zoom=0.5, resample="area"))
+            assert buffer_pool.stats.idle_bytes <= buffer_pool.max_bytes
+
+
+@pytest.mark.parametrize("file_name, channel_order", [("tiled.npy", "BGR"), ("tiled.raw", "RGB"), (None, "BGR")])
+def test_read_to_file(file_name: Optional[str], channel_order: str) -> None:
+    """Integration tests for reading a roi tile by tile into a memory-mapped file"""
+    data = np.random.default_rng(0).integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "tiled.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for y in range(0, 300, 100):
+                for x in range(0, 400, 100):
+                    czi_document.write(data[y : y + 100, x : x + 100], location=(x, y))
+        roi = (-20, 10, 380, 250)
+        with open_czi(czi_path) as czi_document:
+            expected = czi_document.read(roi=roi, channel_order=channel_order)
+            out_path = os.path.join(temp_directory, "out.raw" if file_name is None else file_name)
+            out: Union[str, np.memmap] = (
+                np.memmap(out_path, mode="w+", dtype=np.uint8, shape=(250, 380, 3)) if file_name is None else out_path
+            )
+            # A small memory budget forces many tiles.
+            tiled = czi_document.read_to_file(
+                out, roi=roi, channel_order=channel_order, max_memory=3 * 64 * 64, max_workers=2
+            )
+            np.testing.assert_array_equal(tiled, expected)
+            if file_name == "tiled.npy":
+                np.testing.assert_array_equal(np.load(out_path, mmap_mode="r"), expected)
+            del tiled
+
+
+def test_estimate() -> None:
+    """Integration tests for estimating reads, compared to the subblocks actually read"""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "estimate.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for y in range(0, 300, 100):
+                for x in range(0, 400, 100):
+                    czi_document.write(rng.integers(0, 256, (100, 100), dtype=np.uint16), location=(x, y))
+            # Drawn on top of (and thus hiding) the tiles it covers entirely.
+            czi_document.write(rng.integers(0, 256, (250, 250), dtype=np.uint16), location=(0, 0))
+        with open_czi(czi_path, profile=True) as czi_document:
+            for roi, subblocks in [((0, 0, 400, 300), 9), ((0, 0, 200, 200), 1), ((260, 0, 100, 100), 2)]:
+                estimate = czi_document.estimate(roi=roi)
+                before = czi_document.profiler.total
+                czi_document.read(roi=roi)
+                after = czi_document.profiler.total
+                assert estimate.subblocks == subblocks == after.subblocks_read - before.subblocks_read
+                assert estimate.compressed_bytes == pytest.approx(after.bytes_read - before.bytes_read, rel=0.05)
+                assert estimate.output_bytes == roi[2] * roi[3] * 2
+                assert estimate.peak_bytes == estimate.output_bytes + estimate.decode_bytes
+
+            assert czi_document.estimate(zoom=0.5, resample="area").peak_bytes > czi_document.estimate().peak_bytes
+
+        with open_czi(czi_path, max_read_bytes=300 * 1024) as czi_document:
+            np.testing.assert_array_equal(
+                czi_document.read(roi=(0, 0, 200, 200)),
+                czi_document.read_to_file(os.path.join(temp_directory, "small.npy"), roi=(0, 0, 200, 200)),
+            )
+            with pytest.raises(ValueError, match="more than max_read_bytes"):
+                czi_document.read()
+            assert czi_document.read_to_file(os.path.join(temp_directory, "tiled.npy")).shape == (300, 400, 1)
+
+
+def test_explain() -> None:
+    """Integration tests for explaining reads, with a subblock cache"""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "explain.czi")
+        with create_czi(czi_path, compression_options="zstd1:") as czi_document:
+            for y in range(0, 300, 100):
+                for x in range(0, 400, 100):
+                    czi_document.write(rng.integers(0, 256, (100, 100), dtype=np.uint16), location=(x, y))
+            czi_document.write(rng.integers(0, 256, (250, 250), dtype=np.uint16), location=(0, 0))
+        cache_options = CacheOptions(type=CacheType.Standard, max_memory_usage=100 * 1024**2)
+        with open_czi(czi_path, cache_options=cache_options) as czi_document:
+            plan = czi_document.explain(roi=(0, 0, 300, 100))
+            assert (plan.zoom, plan.output_size, plan.pyramid_layers) == (1.0, (300, 100), (1.0,))
+            # The tiles (0, 0) and (100, 0) are hidden by the subblock written last.
+            assert [(subblock.rect.x, subblock.rect.y, subblock.visible) for subblock in plan.subblocks] == [
+                (0, 0, False),
+                (100, 0, False),
+                (200, 0, True),
+                (0, 0, True),
+            ]
+            assert all(subblock.compression == "Zstd1" and not subblock.cached for subblock in plan.subblocks)
+            assert plan.file_bytes + plan.skipped_file_bytes == sum(subblock.file_bytes for subblock in plan.subblocks)
+            assert plan.file_bytes == czi_document.estimate(roi=(0, 0, 300, 100)).compressed_bytes
+            assert sorted(subblock.file_position for subblock in plan.subblocks)[0] > 0
+
+            czi_document.read(roi=(0, 0, 300, 100))
+            plan = czi_document.explain(roi=(0, 0, 300, 100))
+            assert [subblock.cached for subblock in plan.subblocks] == [False, False, True, True]
+            assert plan.read_subblocks == []
+
+
+def test_read_with_accessor_options() -> None:
+    """Integration tests for reads with accessor options"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "accessor_options.czi")
+        with create_czi(czi_path) as czi_document:
+            for y in range(0, 300, 100):
+                for x in range(0, 400, 100):
+                    czi_document.write(np.full((100, 100), 1, dtype=np.uint16), location=(x, y))
+            czi_document.write(np.full((250, 250), 2, dtype=np.uint16), location=(0, 0))
+        with open_czi(czi_path) as czi_document:
+            default = czi_document.read(roi=(0, 0, 300, 100))
+            assert (default[0, 0, 0], default[0, 299, 0]) == (2, 1)
+
+            # The subblock written last (with the highest M-index) is filtered out.
+            options = AccessorOptions(subblock_filter=lambda info: info.m_index != 12)
+            assert np.all(czi_document.read(roi=(0, 0, 300, 100), accessor_options=options) == 1)
+            plan = czi_document.explain(roi=(0, 0, 300, 100), accessor_options=options)
+            assert [(subblock.rect.x, subblock.visible) for subblock in plan.subblocks] == [
+                (0, True),
+                (100, True),
+                (200, True),
+            ]
+
+            options = AccessorOptions(visibility_check=False, fill_background=False)
+            assert np.array_equal(czi_document.read(roi=(0, 0, 300, 100), accessor_options=options), default)
+            plan = czi_document.explain(roi=(0, 0, 300, 100), accessor_options=options)
+            assert all(subblock.visible for subblock in plan.subblocks)
+            assert czi_document.estimate(roi=(0, 0, 300, 100), accessor_options=options).subblocks == 4
+
+            out = czi_document.read_to_file(
+                os.path.join(temp_directory, "out.npy"),
+                roi=(0, 0, 300, 100),
+                max_memory=100 * 100 * 2,
+                accessor_options=AccessorOptions(subblock_filter=lambda info: info.m_index != 12),
+            )
+            assert np.all(out == 1)
+            del out
+
+
+def test_read_with_target_shape() -> None:
+    """Integration tests for reads with a target shape"""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        czi_path = os.path.join(temp_directory, "target_shape.czi")
+        with create_czi(czi_path) as czi_document:
+            czi_document.write(rng.integers(0, 4000, (300, 400), dtype=np.uint16))
+        with open_czi(czi_path) as czi_document:
+            # Without a pyramid, the full resolution layer is read and resized.
+            thumbnail = czi_document.read(roi=(0, 0, 400, 300), target_shape=(75, 100), resample="area")
+            expected = czi_document.read(roi=(0, 0, 400, 300), zoom=0.25, resample="area")
+            assert thumbnail.shape == (75, 100, 1)
+            assert np.abs(thumbnail.astype(np.int32) - expected).max() <= 1
+
+            full = czi_document.read(roi=(0, 0, 400, 300))
+            nearest = czi_document.read(roi=(0, 0, 400, 300), target_shape=(150, 200), layout="CHW")
+            assert np.array_equal(nearest[0], full[1::2, 1::2, 0])
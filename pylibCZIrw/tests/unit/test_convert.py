@@ -0,0 +1,133 @@
+"""Module implementing unit tests for the convert module"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pylibCZIrw.convert import (
+    ZarrImageLayout,
+    _downsample_chunk,
+    _get_widest_pixel_type,
+    _has_pyramid,
+    _run_bounded,
+    create_array_metadata,
+    create_multiscales_attributes,
+)
+from pylibCZIrw.czi import Rectangle, SubBlockInfo
+
+
+def create_layout(pixel_type: str = "Gray16", levels: int = 3) -> ZarrImageLayout:
+    """Creates the layout of an image of 1000x600 pixels with chunks of 256x256 pixels."""
+    return ZarrImageLayout(
+        rectangle=Rectangle(-100, 50, 1000, 600),
+        sizes=(2, 3, 4),
+        pixel_type=pixel_type,
+        samples=3 if pixel_type.startswith("Bgr") else 1,
+        chunks=(256, 256),
+        levels=levels,
+        scene=None,
+        physical_sizes={"x": 0.5, "y": 0.5},
+    )
+
+
+@pytest.mark.parametrize(
+    "pixel_type, level, expected_shape, expected_grid",
+    [
+        ("Gray16", 0, (2, 3, 4, 600, 1000), (2, 3, 4, 3, 4)),
+        ("Gray16", 1, (2, 3, 4, 300, 500), (2, 3, 4, 2, 2)),
+        ("Gray16", 2, (2, 3, 4, 150, 250), (2, 3, 4, 1, 1)),
+        ("Bgr24", 0, (2, 9, 4, 600, 1000), (2, 3, 4, 3, 4)),
+    ],
+)
+def test_zarr_image_layout(
+    pixel_type: str,
+    level: int,
+    expected_shape: Tuple[int, ...],
+    expected_grid: Tuple[int, ...],
+) -> None:
+    """Unit tests for the shapes and chunk grids of the resolution levels"""
+    layout = create_layout(pixel_type)
+    assert layout.shape(level) == expected_shape
+    assert layout.chunk_grid(level) == expected_grid
+
+
+def test_zarr_image_layout_chunk_rectangle() -> None:
+    """Unit tests for the regions covered by chunks"""
+    layout = create_layout()
+    assert layout.chunk_rectangle(0, 1, 2) == Rectangle(412, 306, 256, 256)
+    assert layout.chunk_rectangle(2, 0, 1) == Rectangle(924, 50, 1024, 1024)
+
+
+def test_create_metadata() -> None:
+    """Unit tests for the OME-Zarr attributes and the array metadata"""
+    layout = create_layout()
+    datasets = create_multiscales_attributes(layout, "image")["multiscales"][0]["datasets"]
+    assert [dataset["path"] for dataset in datasets] == ["0", "1", "2"]
+    assert datasets[2]["coordinateTransformations"][0]["scale"] == [1.0, 1.0, 1.0, 2.0, 2.0]
+
+    array_metadata = create_array_metadata(layout, 1, compression_level=3)
+    assert array_metadata["shape"] == [2, 3, 4, 300, 500]
+    assert array_metadata["chunks"] == [1, 1, 1, 256, 256]
+    assert array_metadata["dtype"] == "<u2"
+    assert array_metadata["compressor"] == {"id": "zlib", "level": 3}
+    assert create_array_metadata(layout, 0)["compressor"] is None
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+def test_downsample_chunk(dtype: type) -> None:
+    """Unit tests for halving the size of chunk data by averaging"""
+    data: np.ndarray = np.array([[[0, 1, 10, 10], [2, 2, 20, 30]]], dtype=dtype)
+    expected = np.array([[[1.25, 17.5]]]) if dtype is np.float32 else np.array([[[1, 18]]])
+    downsampled = _downsample_chunk(data, np.dtype(dtype))
+    assert downsampled.dtype == dtype
+    np.testing.assert_array_equal(downsampled, expected)
+
+
+@pytest.mark.parametrize("size, expected", [((100, 50), False), ((50, 25), True)])
+def test_has_pyramid(size: Tuple[int, int], expected: bool) -> None:
+    """Unit tests for detecting subblocks on pyramid layers other than 0"""
+    reader = mock.Mock()
+    reader.subblock_directory.return_value = [SubBlockInfo(0, {}, Rectangle(0, 0, 100, 50), size, None, None)]
+    assert _has_pyramid(reader, 1) is expected
+    reader.subblock_directory.assert_called_once_with(1)
+
+
+@pytest.mark.parametrize(
+    "pixel_types, expected",
+    [
+        (["Gray16"], "Gray16"),
+        (["Gray8", "Gray16", "Gray8"], "Gray16"),
+        (["Gray16", "Gray32Float"], "Gray32Float"),
+        (["Bgr48", "Bgr24"], "Bgr48"),
+    ],
+)
+def test_get_widest_pixel_type(pixel_types: List[str], expected: str) -> None:
+    """Unit tests for the pixel type all channels of a document are converted with"""
+    assert _get_widest_pixel_type(pixel_types) == expected
+
+
+def test_get_widest_pixel_type_raises_error_on_gray_and_rgb() -> None:
+    """Unit tests for channels mixing gray and rgb pixel types"""
+    with pytest.raises(ValueError, match=r"The channels mix gray and rgb pixel types \(Bgr24, Gray8\)"):
+        _get_widest_pixel_type(["Gray8", "Bgr24"])
+
+
+def test_run_bounded() -> None:
+    """Unit tests for running tasks with a bounded number of pending tasks"""
+    results: List[int] = []
+
+    def append(value: int) -> Callable[[], None]:
+        return lambda: results.append(value)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        _run_bounded(executor, (append(i) for i in range(10)), max_pending=2)
+        assert sorted(results) == list(range(10))
+
+        def fail() -> None:
+            raise RuntimeError("failed")
+
+        with pytest.raises(RuntimeError, match="failed"):
+            _run_bounded(executor, [fail], max_pending=2)
@@ -1,6 +1,12 @@
 """Module implementing unit tests for the CziReader class"""
 
-from typing import Dict, NamedTuple, Optional, Tuple
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from unittest import mock
 
 import numpy as np
@@ -8,7 +14,22 @@ import pytest
 
 # pylint: disable=no-name-in-module
 from _pylibCZIrw import DimensionIndex, IntRect, PixelType, RgbFloatColor
-from pylibCZIrw.czi import Color, CziReader, Rectangle
+from pylibCZIrw.czi import (
+    AccessorOptions,
+    BufferPool,
+    BufferPoolStats,
+    CacheOptions,
+    CacheType,
+    Color,
+    CziReader,
+    PlaneCoordinates,
+    PlaneSpec,
+    PlaneStatistics,
+    PlannedSubBlock,
+    ReadEstimate,
+    Rectangle,
+    SubBlockInfo,
+)
 
 # testing static functions
 
@@ -495,6 +516,31 @@ def test_create_plane_coords(
     assert test_czi._create_plane_coords(plane) == expected
 
 
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "plane, expected",
+    [
+        ((1, 5, 0, 2, 3, 4, 1), {"Z": 1, "C": 5, "T": 0, "R": 2, "I": 3, "V": 4, "B": 1}),
+        ((np.int64(2),) * 7, {"Z": 2, "C": 2, "T": 2, "R": 2, "I": 2, "V": 2, "B": 2}),
+    ],
+)
+def test_create_plane_coords_from_tuple(plane: Tuple[int, ...], expected: Dict[str, int]) -> None:
+    """Unit tests for _create_plane_coords with the indices of the plane dimensions as a tuple"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    assert test_czi.plane_dimensions == ("Z", "C", "T", "R", "I", "V", "B")
+    assert test_czi._create_plane_coords(plane) == expected
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_create_plane_coords_raises_error_on_incorrect_tuple() -> None:
+    """Unit tests for _create_plane_coords with a tuple not matching the plane dimensions"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test2.get
+    with pytest.raises(ValueError, match=r"one index per plane dimension of the document: \(C, R, V\)"):
+        test_czi._create_plane_coords((1, 2))
+
+
 channel_pixel_types_test = {
     0: PixelType.Gray8,
     1: PixelType.Bgr48,
@@ -569,3 +615,820 @@ def test_array_shape() -> None:
     """Unit tests for checking the shape of the input pixel_data"""
     with pytest.raises(ValueError, match="Incorrect shape"):
         CziReader._get_array_from_bitmap(np.array([[0], [0], [0]]))
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.ConvertAndNormalize")
+def test_convert_bitmap_broadcasts_normalization(convert_mock: mock.Mock) -> None:
+    """Unit tests for the arguments _convert_bitmap passes to the native conversion"""
+    pixel_data = np.zeros((4, 5, 3), dtype=np.uint8)
+    converted = CziReader._convert_bitmap(pixel_data, None, [1.0, 2.0, 3.0], 10, np.ones((4, 5)))
+    assert converted.shape == (4, 5, 3)
+    assert converted.dtype == np.float32
+    _, dest, scale, offset, flatfield = convert_mock.call_args[0]
+    assert dest is converted
+    assert scale == [1.0, 2.0, 3.0]
+    assert offset == [10.0, 10.0, 10.0]
+    assert flatfield.shape == (4, 5, 3)
+    assert flatfield.dtype == np.float32
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.ConvertAndNormalize")
+def test_convert_bitmap_to_rgb_chw(convert_mock: mock.Mock) -> None:
+    """Unit tests for _convert_bitmap writing RGB planes through a reversed view in the order of the bitmap"""
+    pixel_data = np.zeros((4, 5, 3), dtype=np.uint8)
+    flatfield = np.arange(3, dtype=np.float32) * np.ones((4, 5, 1), dtype=np.float32)
+    converted = CziReader._convert_bitmap(pixel_data, np.float64, [1.0, 2.0, 3.0], None, flatfield, "CHW", "RGB")
+    assert converted.shape == (3, 4, 5)
+    assert converted.dtype == np.float64
+    _, dest, scale, offset, flatfield_libczi = convert_mock.call_args[0]
+    assert dest.shape == (4, 5, 3)
+    assert np.shares_memory(dest, converted)
+    dest[:, :, 0] = 7.0
+    assert np.all(converted[2] == 7.0)
+    assert scale == [3.0, 2.0, 1.0]
+    assert offset == [0.0, 0.0, 0.0]
+    assert flatfield_libczi[0, 0].tolist() == [2.0, 1.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    ["uint8", np.int16, "float16"],
+)
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.ConvertAndNormalize", mock.Mock())
+def test_convert_bitmap_raises_error_on_incorrect_dtype(dtype: Any) -> None:
+    """Unit tests for _convert_bitmap with unsupported destination types"""
+    with pytest.raises(ValueError, match="The dtype provided does not mach any supported floating point types"):
+        CziReader._convert_bitmap(np.zeros((4, 5, 1), dtype=np.uint8), dtype, None, None, None)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader")
+def test_pickle_reopens_lazily(czi_reader_mock: mock.Mock) -> None:
+    """Unit tests for pickling a CziReader: only the source is serialized and the reader is reopened on first use"""
+    cache_options = CacheOptions(type=CacheType.Standard, max_memory_usage=100)
+    test_czi = CziReader("filepath", cache_options=cache_options)
+    assert czi_reader_mock.call_count == 1
+
+    unpickled_czi = pickle.loads(pickle.dumps(test_czi))
+    assert czi_reader_mock.call_count == 1
+    assert unpickled_czi._czi_reader_handle is None
+    assert unpickled_czi._cache_options == cache_options
+
+    unpickled_czi._czi_reader.GetXmlMetadata()
+    assert czi_reader_mock.call_count == 2
+    assert czi_reader_mock.call_args[0][0] == "filepath"
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader")
+def test_reader_reopens_after_fork(czi_reader_mock: mock.Mock) -> None:
+    """Unit tests for a CziReader used from another process than the one which opened it"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetXmlMetadata()
+    assert czi_reader_mock.call_count == 1
+
+    with mock.patch("pylibCZIrw.czi.getpid", return_value=test_czi._pid + 1):
+        test_czi._czi_reader.GetXmlMetadata()
+        test_czi._czi_reader.GetXmlMetadata()
+    assert czi_reader_mock.call_count == 2
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader")
+def test_unpickled_reader_reopens_once_across_threads(czi_reader_mock: mock.Mock) -> None:
+    """Unit tests for threads sharing an unpickled CziReader: a single c++ reader is opened"""
+    unpickled_czi = pickle.loads(pickle.dumps(CziReader("filepath")))
+    barrier = threading.Barrier(4)
+
+    def open_slowly(*args: Any) -> mock.Mock:
+        time.sleep(0.05)
+        return mock.Mock()
+
+    czi_reader_mock.side_effect = open_slowly
+
+    def use_reader(_: int) -> Any:
+        barrier.wait()
+        return unpickled_czi._czi_reader
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        handles = list(executor.map(use_reader, range(4)))
+    assert czi_reader_mock.call_count == 2
+    assert all(handle is handles[0] for handle in handles)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "rois",
+    [
+        [(0, 0, 10, 10), (5, 5, 10, 11)],
+        [(0, 0, 0, 10)],
+    ],
+)
+def test_read_many_raises_error_on_incorrect_rois(rois: Any) -> None:
+    """Unit tests for read_many with rois of different or empty sizes"""
+    test_czi = CziReader("filepath")
+    with pytest.raises(ValueError, match="All rois must have the same positive width and height."):
+        test_czi.read_many(rois)
+    test_czi._czi_reader.ReadMany.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_many_passes_rois_as_array() -> None:
+    """Unit tests for handing the rois of read_many to the native reader as one (N, 4) array"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi.read_many([(0, 0, 20, 10), (5, 5, 20, 10)], pixel_type="Gray16")
+    rois = test_czi._czi_reader.ReadMany.call_args[0][1]
+    assert isinstance(rois, np.ndarray) and rois.dtype == np.int64
+    np.testing.assert_array_equal(rois, [[0, 0, 20, 10], [5, 5, 20, 10]])
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_many_raises_error_on_incorrect_out() -> None:
+    """Unit tests for read_many with an output array not matching the rois"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    with pytest.raises(ValueError, match=r"out must be an array of shape \(2, 10, 20, 1\) and dtype uint16."):
+        test_czi.read_many(
+            [(0, 0, 20, 10), (5, 5, 20, 10)], pixel_type="Gray16", out=np.empty((2, 10, 20, 1), dtype=np.uint8)
+        )
+    test_czi._czi_reader.ReadMany.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "roi, tile_width, tile_height, expected",
+    [
+        (Rectangle(0, 0, 10, 10), 10, 10, [(0, 0, 10, 10)]),
+        (Rectangle(0, 0, 10, 10), 20, 20, [(0, 0, 10, 10)]),
+        (
+            Rectangle(-5, 3, 10, 7),
+            4,
+            5,
+            [(-5, 3, 4, 5), (-1, 3, 4, 5), (3, 3, 2, 5), (-5, 8, 4, 2), (-1, 8, 4, 2), (3, 8, 2, 2)],
+        ),
+    ],
+)
+def test_create_tiles(
+    roi: Rectangle, tile_width: int, tile_height: int, expected: List[Tuple[int, int, int, int]]
+) -> None:
+    """Unit tests for splitting a roi into tiles"""
+    assert CziReader._create_tiles(roi, tile_width, tile_height) == [Rectangle(*tile) for tile in expected]
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_to_file_reads_tiles() -> None:
+    """Unit tests for read_to_file composing a roi tile by tile into the output array"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    out = np.zeros((10, 20, 1), dtype=np.uint16)
+    assert test_czi.read_to_file(out, roi=(5, 0, 20, 10), pixel_type="Gray16", max_memory=2 * 50, max_workers=1) is out
+
+    calls = test_czi._czi_reader.ReadPlanes.call_args_list
+    rois = [(call[0][1].x, call[0][1].y, call[0][1].w, call[0][1].h) for call in calls]
+    assert rois == [(5, 0, 7, 7), (12, 0, 7, 7), (19, 0, 6, 7), (5, 7, 7, 3), (12, 7, 7, 3), (19, 7, 6, 3)]
+    for call, (x, y, w, h) in zip(calls, rois):
+        (view,) = call[0][7]
+        assert view.shape == (h, w, 1)
+        assert np.shares_memory(view, out[y : y + h, x - 5 : x - 5 + w])
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_to_file_raises_error_on_incorrect_out() -> None:
+    """Unit tests for read_to_file with an output array not matching the roi"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    with pytest.raises(ValueError, match=r"out must be an array of shape \(10, 20, 1\) and dtype uint16."):
+        test_czi.read_to_file(np.empty((10, 20, 1), dtype=np.uint8), roi=(0, 0, 20, 10), pixel_type="Gray16")
+    with pytest.raises(ValueError, match="The channel order provided does not mach any supported channel orders"):
+        test_czi.read_to_file(np.empty((10, 20, 1), dtype=np.uint16), roi=(0, 0, 20, 10), channel_order="RGBA")
+    test_czi._czi_reader.ReadPlanes.assert_not_called()
+
+
+def create_read_plan_entry(w: int, h: int, segment_size: int, visible: bool) -> mock.Mock:
+    """Creates a mock of a ReadPlanEntry object of a Gray16 subblock."""
+    return mock.Mock(
+        subBlock=mock.Mock(physicalSize=mock.Mock(w=w, h=h), pixelType=PixelType.Gray16),
+        segmentSize=segment_size,
+        visible=visible,
+    )
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_estimate() -> None:
+    """Unit tests for estimating a read from its read plan"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=20, h=10)
+    test_czi._czi_reader.GetReadPlan.return_value = [
+        create_read_plan_entry(30, 30, 1000, False),
+        create_read_plan_entry(10, 10, 100, True),
+        create_read_plan_entry(20, 20, 300, True),
+    ]
+    estimate = test_czi.estimate(roi=(0, 0, 20, 10), pixel_type="Gray16")
+    assert estimate == ReadEstimate(
+        output_bytes=400, subblocks=2, compressed_bytes=400, decode_bytes=1100, peak_bytes=1500
+    )
+    assert test_czi._czi_reader.GetReadPlan.call_args[0][1] == 1.0
+
+    # With area resampling, the roi is composed at full resolution, band by band.
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=10, h=5)
+    with mock.patch.object(CziReader, "AREA_RESAMPLE_BAND_BYTES", 80):
+        estimate = test_czi.estimate(roi=(0, 0, 20, 10), pixel_type="Gray16", zoom=0.5, resample="area")
+    assert (estimate.output_bytes, estimate.peak_bytes) == (100, 100 + 80 + 1100)
+    assert test_czi._czi_reader.GetReadPlan.call_args[0][1] == 1.0
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_raises_error_above_max_read_bytes() -> None:
+    """Unit tests for reads which may need more memory than the max_read_bytes of the reader"""
+    test_czi = CziReader("filepath", max_read_bytes=1000)
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=20, h=10)
+    test_czi._czi_reader.GetReadPlan.return_value = [create_read_plan_entry(20, 20, 300, True)]
+    with pytest.raises(ValueError, match=r"The read may need 1500 bytes, more than max_read_bytes \(1000\)"):
+        test_czi.read(roi=(0, 0, 20, 10), pixel_type="Gray16")
+    with pytest.raises(ValueError, match=r"The read may need 2300 bytes"):
+        test_czi.read(roi=(0, 0, 20, 10), pixel_type="Gray16", dtype=np.float32)
+    # Scaled data is converted to float32 without a dtype as well.
+    with pytest.raises(ValueError, match=r"The read may need 2300 bytes"):
+        test_czi.read(roi=(0, 0, 20, 10), pixel_type="Gray16", scale=2.0)
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.assert_not_called()
+
+    test_czi._czi_reader.GetReadPlan.return_value = [create_read_plan_entry(10, 10, 100, True)]
+    with mock.patch.object(CziReader, "_get_array_from_bitmap"):
+        test_czi.read(roi=(0, 0, 20, 10), pixel_type="Gray16")
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.assert_called_once()
+
+    unpickled_czi = pickle.loads(pickle.dumps(test_czi))
+    assert unpickled_czi._max_read_bytes == 1000
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@mock.patch("pylibCZIrw.czi.cpu_count", mock.Mock(return_value=1))
+def test_read_channels_raises_error_above_max_read_bytes() -> None:
+    """Unit tests for multi-channel reads counting the output array in addition to the planes composed"""
+    test_czi = CziReader("filepath", max_read_bytes=2000)
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {"C": (0, 100)})
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=20, h=10)
+    test_czi._czi_reader.GetReadPlan.return_value = [create_read_plan_entry(20, 20, 300, True)]
+    with pytest.raises(ValueError, match=r"The read may need 2300 bytes, more than max_read_bytes \(2000\)"):
+        test_czi.read(roi=(0, 0, 20, 10), pixel_type="Gray16", channels=[0, 1])
+    test_czi._czi_reader.ReadPlanes.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_many_raises_error_above_max_read_bytes() -> None:
+    """Unit tests for read_many counting the output array, the decoded subblock and the temporary subblock cache"""
+    test_czi = CziReader("filepath", max_read_bytes=2500)
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=20, h=10)
+    test_czi._czi_reader.GetReadPlan.return_value = [create_read_plan_entry(20, 20, 300, True)]
+    rois = [(0, 0, 20, 10), (5, 5, 20, 10)]
+    with pytest.raises(ValueError, match=r"The read may need 3000 bytes, more than max_read_bytes \(2500\)"):
+        test_czi.read_many(rois, pixel_type="Gray16")
+    test_czi._czi_reader.ReadMany.assert_not_called()
+
+    test_czi.read_many(rois, pixel_type="Gray16", out=np.empty((2, 10, 20, 1), dtype=np.uint16))
+    test_czi._czi_reader.ReadMany.assert_called_once()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_project_raises_error_above_max_read_bytes() -> None:
+    """Unit tests for project counting the output array in addition to the planes composed"""
+    test_czi = CziReader("filepath", max_read_bytes=2000)
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=20, h=10)
+    test_czi._czi_reader.GetReadPlan.return_value = [create_read_plan_entry(20, 20, 300, True)]
+    with pytest.raises(ValueError, match=r"The read may need 3100 bytes, more than max_read_bytes \(2000\)"):
+        test_czi.project((0, 0, 20, 10), axis="R", op="sum", pixel_type="Gray16")
+    test_czi._czi_reader.ProjectSum.assert_not_called()
+
+    test_czi.project((0, 0, 20, 10), axis="R", op="max", pixel_type="Gray16")
+    test_czi._czi_reader.ProjectMax.assert_called_once()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_explain() -> None:
+    """Unit tests for converting the read plan of the c++ reader"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.GetChannelPixelType.return_value = PixelType.Gray16
+    test_czi._czi_reader.CalcSize.return_value = mock.Mock(w=5, h=2)
+    test_czi._czi_reader.GetReadPlan.return_value = [
+        mock.Mock(
+            subBlock=mock.Mock(
+                index=3,
+                logicalRect=create_rectangle(0, 0, 40, 20),
+                physicalSize=mock.Mock(w=10, h=5),
+                hasMIndex=False,
+                sceneIndex=-1,
+                filePosition=512,
+                compressionModeRaw=5,
+            ),
+            segmentSize=100,
+            cached=False,
+            visible=False,
+        ),
+        mock.Mock(
+            subBlock=mock.Mock(
+                index=7,
+                logicalRect=create_rectangle(0, 0, 20, 10),
+                physicalSize=mock.Mock(w=5, h=2),
+                mIndex=2,
+                hasMIndex=True,
+                sceneIndex=1,
+                filePosition=1024,
+                compressionModeRaw=9,
+            ),
+            segmentSize=200,
+            cached=True,
+            visible=True,
+        ),
+    ]
+    plan = test_czi.explain(roi=(0, 0, 20, 10), zoom=0.25, scene=1)
+
+    assert test_czi._czi_reader.GetReadPlan.call_args[0][1:4] == (0.25, "Z0 C0 T0 R0 I0 V0 B0", "1")
+    assert (plan.roi, plan.zoom, plan.output_size, plan.pyramid_layers) == (
+        Rectangle(0, 0, 20, 10),
+        0.25,
+        (5, 2),
+        (4.0,),
+    )
+    assert plan.subblocks == [
+        PlannedSubBlock(3, Rectangle(0, 0, 40, 20), (10, 5), 4.0, None, None, 512, 100, "Zstd0", False, False),
+        PlannedSubBlock(7, Rectangle(0, 0, 20, 10), (5, 2), 4.0, 2, 1, 1024, 200, "Unknown (9)", True, True),
+    ]
+    assert (plan.read_subblocks, plan.file_bytes) == ([], 0)
+    assert (plan.skipped_subblocks, plan.skipped_file_bytes) == (plan.subblocks[:1], 100)
+
+    # With area resampling, the roi is composed at full resolution.
+    assert test_czi.explain(roi=(0, 0, 20, 10), zoom=0.25, resample="area").zoom == 1.0
+    assert test_czi._czi_reader.GetReadPlan.call_args[0][1] == 1.0
+
+
+def create_subblock_entry(x: int, y: int, w: int, h: int) -> mock.Mock:
+    """Creates a mock of a SubBlockDirectoryEntry object."""
+    return mock.Mock(logicalRect=create_rectangle(x, y, w, h), physicalSize=mock.Mock(w=w, h=h))
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "subblocks, cell_size, expected",
+    [
+        ([], 50, np.zeros((2, 2), dtype=bool)),
+        ([create_subblock_entry(0, 0, 100, 100)], 50, np.ones((2, 2), dtype=bool)),
+        ([create_subblock_entry(0, 0, 10, 10), create_subblock_entry(60, 60, 10, 10)], 50, np.eye(2, dtype=bool)),
+        ([create_subblock_entry(40, 0, 20, 10)], 50, np.array([[True, True], [False, False]])),
+        (
+            [create_subblock_entry(-50, 90, 100, 100)],
+            30,
+            np.array([[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [1, 1, 0, 0]], dtype=bool),
+        ),
+    ],
+)
+def test_coverage_mask(subblocks: List[mock.Mock], cell_size: int, expected: np.ndarray) -> None:
+    """Unit tests for coverage_mask from the subblock layout"""
+    test_czi = CziReader("filepath")
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 100, 100), {})
+    test_czi._czi_reader.GetSubBlockDirectory = mock.Mock(return_value=subblocks)
+    np.testing.assert_array_equal(test_czi.coverage_mask(cell_size=cell_size), expected)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "plane, expected",
+    [
+        (None, ""),
+        ({"C": 1}, "C1"),
+        ((1, 0), "C1 T0"),
+        (PlaneSpec({"C": 2, "T": 1}, "Gray8", "C2 T1"), "C2 T1"),
+    ],
+)
+def test_coverage_mask_with_plane(plane: Optional[PlaneCoordinates], expected: str) -> None:
+    """Unit tests for the plane coordinates the subblocks of coverage_mask must match"""
+    test_czi = CziReader("filepath")
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 100, 100), {})
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: {DimensionIndex.C: 3, DimensionIndex.T: 2}.get(
+        dimension, 1
+    )
+    test_czi._czi_reader.GetChannelPixelType.return_value = PixelType.Gray8
+    test_czi._czi_reader.GetSubBlockDirectory = mock.Mock(return_value=[])
+    test_czi.coverage_mask(cell_size=50, plane=plane)
+    assert test_czi._czi_reader.GetSubBlockDirectory.call_args[0][0] == expected
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_subblock_directory() -> None:
+    """Unit tests for subblock_directory converting the entries of the subblock directory"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetSubBlockDirectory = mock.Mock(
+        return_value=[
+            mock.Mock(
+                index=3,
+                coordinate="C1T0",
+                logicalRect=create_rectangle(10, 20, 40, 30),
+                physicalSize=mock.Mock(w=20, h=15),
+                mIndex=7,
+                hasMIndex=True,
+                sceneIndex=2,
+            )
+        ]
+    )
+    assert test_czi.subblock_directory(scene=2, only_layer0=True) == [
+        SubBlockInfo(3, {"C": 1, "T": 0}, Rectangle(10, 20, 40, 30), (20, 15), 7, 2)
+    ]
+    assert test_czi._czi_reader.GetSubBlockDirectory.call_args[0] == ("", None, True, "2")
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_coverage_mask_raises_error_on_incorrect_cell_size() -> None:
+    """Unit tests for coverage_mask error messages"""
+    test_czi = CziReader("filepath")
+    with pytest.raises(ValueError, match="cell_size must be a positive number of pixels."):
+        test_czi.coverage_mask(cell_size=0)
+
+
+def create_pyramid_subblock_entry(index: int, w: int, physical_w: int) -> mock.Mock:
+    """Creates a mock of a SubBlockDirectoryEntry object on a pyramid layer."""
+    return mock.Mock(index=index, logicalRect=create_rectangle(0, 0, w, w), physicalSize=mock.Mock(w=physical_w))
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "pyramid_level, expected",
+    [
+        (0, [0, 3]),
+        (1, [1, 4]),
+        (2, [2]),
+    ],
+)
+def test_get_pyramid_level_subblocks(pyramid_level: int, expected: List[int]) -> None:
+    """Unit tests for _get_pyramid_level_subblocks"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetSubBlockDirectory = mock.Mock(
+        return_value=[
+            create_pyramid_subblock_entry(0, 1024, 1024),
+            create_pyramid_subblock_entry(1, 1024, 512),
+            create_pyramid_subblock_entry(2, 4096, 256),
+            create_pyramid_subblock_entry(3, 1000, 1000),
+            create_pyramid_subblock_entry(4, 1001, 500),
+        ]
+    )
+    assert test_czi._get_pyramid_level_subblocks({"C": 0}, None, pyramid_level) == expected
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_get_pyramid_level_subblocks_raises_error_on_incorrect_level() -> None:
+    """Unit tests for _get_pyramid_level_subblocks error messages"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetSubBlockDirectory = mock.Mock(return_value=[create_pyramid_subblock_entry(0, 10, 10)])
+    with pytest.raises(ValueError, match="The pyramid level provided does not exist, the plane has 1 pyramid levels."):
+        test_czi._get_pyramid_level_subblocks({"C": 0}, None, 1)
+
+
+def create_plane_statistics(count: int) -> PlaneStatistics:
+    """Creates the statistics of a gray plane with the given number of pixels."""
+    return PlaneStatistics(
+        count=np.array([count]),
+        min=np.zeros(1),
+        max=np.zeros(1),
+        mean=np.zeros(1),
+        std=np.zeros(1),
+        histogram=np.zeros((1, 1)),
+        bin_edges=np.zeros(2),
+    )
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_plane_statistics_of_several_planes() -> None:
+    """Unit tests for plane_statistics returning one result per plane"""
+    test_czi = CziReader("filepath")
+    with mock.patch.object(
+        CziReader, "_plane_statistics", side_effect=lambda plane, *args: create_plane_statistics(plane["C"])
+    ):
+        statistics = test_czi.plane_statistics([{"C": 0}, {"C": 2}, {"C": 1}], max_workers=2)
+    assert isinstance(statistics, list)
+    assert [int(plane_statistics.count[0]) for plane_statistics in statistics] == [0, 2, 1]
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "axis, op, expected_planes",
+    [
+        ("Z", "max", ["Z0 C2 T1", "Z1 C2 T1", "Z2 C2 T1"]),
+        ("T", "sum", ["Z1 C2 T0", "Z1 C2 T1"]),
+        ("H", "mean", ["Z1 C2 T1"]),
+    ],
+)
+def test_project(axis: str, op: str, expected_planes: List[str]) -> None:
+    """Unit tests for project enumerating the planes along the axis"""
+    test_czi = CziReader("filepath")
+    dimension_sizes = {DimensionIndex.Z: 3, DimensionIndex.C: 4, DimensionIndex.T: 2}
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: dimension_sizes.get(dimension, 0)
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    test_czi._czi_reader.CalcSize = mock.Mock(return_value=mock.Mock(w=20, h=10))
+    projection = test_czi.project((0, 0, 20, 10), axis=axis, op=op, plane={"Z": 1, "C": 2, "T": 1}, pixel_type="Gray16")
+
+    project = test_czi._czi_reader.ProjectMax if op == "max" else test_czi._czi_reader.ProjectSum
+    assert project.call_args[0][4] == expected_planes
+    assert projection.shape == (10, 20, 1)
+    assert projection.dtype == (np.uint16 if op == "max" else np.float64)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "axis, op, message",
+    [
+        ("S", "max", "The axis provided does not mach any supported dimensions"),
+        ("Z", "median", "The projection operation provided does not mach any supported operations"),
+    ],
+)
+def test_project_raises_error_on_incorrect_parameters(axis: str, op: str, message: str) -> None:
+    """Unit tests for project error messages"""
+    test_czi = CziReader("filepath")
+    with pytest.raises(ValueError, match=message):
+        test_czi.project(axis=axis, op=op)
+
+
+def test_import_is_lazy() -> None:
+    """Importing the module does not import the dependencies only needed for URLs and the metadata."""
+    code = "import sys, pylibCZIrw.czi; print(sorted({'validators', 'xmltodict'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "[]"
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_with_request() -> None:
+    """Unit tests for read with a request prepared once"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test2.get
+    test_czi._czi_reader.GetChannelPixelType = channel_pixel_types_test.get
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData = mock.Mock(
+        return_value=np.zeros((10, 20, 3), dtype=np.uint16)
+    )
+    plane_spec = test_czi.plane_spec((1, 2, 3))
+    assert plane_spec.plane == {"C": 1, "R": 2, "V": 3}
+    assert plane_spec.pixel_type == "Bgr48"
+    assert test_czi.plane_spec(plane_spec) is plane_spec
+
+    request = test_czi.prepare_read(roi=(0, 5, 20, 10), plane=plane_spec, scene=1, zoom=0.5)
+    assert request.roi == Rectangle(0, 5, 20, 10)
+    assert request.pixel_type == "Bgr48"
+    test_czi._czi_reader.GetDimensionSize = mock.Mock(side_effect=AssertionError("plane resolved again"))
+    test_czi._czi_reader.GetChannelPixelType = mock.Mock(side_effect=AssertionError("pixel type looked up again"))
+    for _ in range(2):
+        assert test_czi.read(request=request).shape == (10, 20, 3)
+
+    args = test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.call_args[0]
+    assert (args[0], args[3], args[4], args[5]) == (PixelType.Bgr48, 0.5, "C1 R2 V3", "1")
+    assert compare_rectangle(args[1], create_rectangle(0, 5, 20, 10))
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"roi": (0, 0, 1, 1)},
+        {"plane": {"C": 0}},
+        {"zoom": 0.5},
+        {"background_pixel": (1, 1, 1)},
+        {"resample": "area"},
+        {"accessor_options": AccessorOptions()},
+        {"target_shape": (10, 10)},
+    ],
+)
+def test_read_raises_error_on_request_with_parameters(kwargs: Dict[str, Any]) -> None:
+    """Unit tests for read with a request and parameters it replaces"""
+    test_czi = CziReader("filepath")
+    request = mock.Mock()
+    with pytest.raises(ValueError, match="must not be specified together with a request"):
+        test_czi.read(request=request, **kwargs)
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "channels, layout, expected_planes, expected_shape",
+    [
+        ("all", "HWC", ["Z1 C0", "Z1 C1", "Z1 C2", "Z1 C3"], (10, 20, 4)),
+        ([3, 1], "HWC", ["Z1 C3", "Z1 C1"], (10, 20, 2)),
+        ([2], "CHW", ["Z1 C2"], (1, 10, 20)),
+        (None, "CHW", ["Z1 C0"], (1, 10, 20)),
+    ],
+)
+def test_read_channels(
+    channels: Any, layout: str, expected_planes: List[str], expected_shape: Tuple[int, int, int]
+) -> None:
+    """Unit tests for read composing several channels into one array"""
+    test_czi = CziReader("filepath")
+    dimension_sizes = {DimensionIndex.Z: 2, DimensionIndex.C: 4}
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: dimension_sizes.get(dimension, 0)
+    test_czi._czi_reader.GetChannelPixelType = mock.Mock(return_value=PixelType.Gray16)
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    test_czi._czi_reader.CalcSize = mock.Mock(return_value=mock.Mock(w=20, h=10))
+    pixel_data = test_czi.read(plane={"Z": 1}, channels=channels, layout=layout)
+
+    args = test_czi._czi_reader.ReadPlanes.call_args[0]
+    assert args[5] == expected_planes
+    assert [view.shape for view in args[7]] == [(10, 20, 1)] * len(expected_planes)
+    assert pixel_data.shape == expected_shape
+    assert pixel_data.dtype == np.uint16
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_with_accessor_options() -> None:
+    """Unit tests for read with accessor options, selecting the subblocks of all channels read with the filter"""
+    test_czi = CziReader("filepath")
+    dimension_sizes = {DimensionIndex.Z: 2, DimensionIndex.C: 4}
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: dimension_sizes.get(dimension, 0)
+    test_czi._czi_reader.GetChannelPixelType = mock.Mock(return_value=PixelType.Gray16)
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    test_czi._czi_reader.CalcSize = mock.Mock(return_value=mock.Mock(w=20, h=10))
+    directory: Dict[str, List[Tuple[int, str, Optional[int]]]] = {
+        "Z1 C0": [(5, "C0Z1", 0), (1, "C0Z1", 1)],
+        "Z1 C2": [(9, "C2Z1", 0), (4, "C2Z1", None)],
+    }
+    test_czi._czi_reader.GetSubBlockDirectory = lambda plane, roi, only_layer0, scenes: [
+        mock.Mock(
+            index=index,
+            coordinate=coordinate,
+            logicalRect=create_rectangle(0, 0, 20, 10),
+            physicalSize=mock.Mock(w=20, h=10),
+            mIndex=0 if m_index is None else m_index,
+            hasMIndex=m_index is not None,
+            sceneIndex=-1,
+        )
+        for index, coordinate, m_index in directory[plane]
+    ]
+    infos: List[SubBlockInfo] = []
+
+    def subblock_filter(info: SubBlockInfo) -> bool:
+        infos.append(info)
+        return info.m_index != 0
+
+    accessor_options = AccessorOptions(
+        sort_by_m=False, visibility_check=False, fill_background=False, subblock_filter=subblock_filter
+    )
+    test_czi.read(plane={"Z": 1}, channels=[0, 2], accessor_options=accessor_options)
+
+    options = test_czi._czi_reader.ReadPlanes.call_args[0][9]
+    assert (options.sortByM, options.useVisibilityCheck, options.fillBackground) == (False, False, False)
+    assert options.filterSubBlocks
+    assert options.subBlockIndices == [1, 4]
+    assert len(infos) == 4
+    assert infos[-1] == SubBlockInfo(4, {"C": 2, "Z": 1}, Rectangle(0, 0, 20, 10), (20, 10), None, None)
+
+    # Without options, all subblocks are drawn as before.
+    test_czi.read(plane={"Z": 1}, channels=[0])
+    options = test_czi._czi_reader.ReadPlanes.call_args[0][9]
+    assert (options.sortByM, options.useVisibilityCheck, options.fillBackground) == (True, True, True)
+    assert not options.filterSubBlocks
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "target_shape, expected_zoom",
+    [((250, 200), np.float32(250) / np.float32(1001)), ((300, 300), 0.5), ((1000, 1000), 1.0), ((2000, 2000), 1.0)],
+)
+def test_read_with_target_shape(target_shape: Tuple[int, int], expected_zoom: float) -> None:
+    """Unit tests for read selecting the coarsest pyramid layer with the resolution of the target shape"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.GetChannelPixelType.return_value = PixelType.Gray16
+    test_czi._czi_reader.GetSubBlockDirectory.return_value = [
+        create_subblock_entry(0, 0, 1000, 1000),
+        mock.Mock(index=1, logicalRect=create_rectangle(0, 0, 1000, 1000), physicalSize=mock.Mock(w=500, h=500)),
+        # The size of the subblocks of a layer is rounded, e.g. 1001 pixels minified 4 times.
+        mock.Mock(index=2, logicalRect=create_rectangle(0, 0, 1001, 1001), physicalSize=mock.Mock(w=250, h=250)),
+        mock.Mock(index=3, logicalRect=create_rectangle(0, 0, 1000, 1000), physicalSize=mock.Mock(w=250, h=250)),
+    ]
+    with mock.patch.object(CziReader, "_get_array_from_bitmap", return_value=np.zeros((400, 300, 1), np.uint16)):
+        pixel_data = test_czi.read(roi=(0, 0, 1000, 1000), target_shape=target_shape)
+
+    args = test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.call_args[0]
+    assert args[3] == expected_zoom
+    assert pixel_data.shape == target_shape + (1,)
+    assert pixel_data.dtype == np.uint16
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "resample, get_bitmap", [("nearest", "GetSingleChannelScalingTileAccessorData"), ("area", "GetAreaResampledData")]
+)
+def test_read_with_target_shape_without_pyramid(resample: str, get_bitmap: str) -> None:
+    """Unit tests for read with a target shape much smaller than the roi of a document without a pyramid"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test3.get
+    test_czi._czi_reader.GetChannelPixelType.return_value = PixelType.Gray16
+    test_czi._czi_reader.GetSubBlockDirectory.return_value = [create_subblock_entry(0, 0, 4000, 4000)]
+    test_czi._czi_reader.CalcSize = lambda roi, zoom: mock.Mock(w=round(roi.w * zoom), h=round(roi.h * zoom))
+    with mock.patch.object(CziReader, "_get_array_from_bitmap", return_value=np.zeros((40, 40, 1), np.uint16)):
+        pixel_data = test_czi.read(roi=(0, 0, 4000, 4000), target_shape=(40, 40), resample=resample)
+
+    # The roi is read at the size of the target shape rather than at full resolution.
+    args = getattr(test_czi._czi_reader, get_bitmap).call_args[0]
+    assert args[3] == 0.01
+    size = test_czi._czi_reader.CalcSize(args[1], args[3])
+    assert (size.h, size.w) == (40, 40)
+    assert pixel_data.shape == (40, 40, 1)
+
+
+@pytest.mark.parametrize(
+    "shape, layout, resample, expected",
+    [
+        ((2, 2), "HWC", "area", [[2.5, 4.5], [10.5, 12.5]]),
+        ((2, 2), "CHW", "nearest", [[5, 7], [13, 15]]),
+        ((1, 3), "HWC", "area", [[6.25, 7.5, 8.75]]),
+        # Upscaled rows are picked, downscaled columns are averaged.
+        ((6, 2), "HWC", "area", [[0.5, 2.5], [4.5, 6.5], [4.5, 6.5], [8.5, 10.5], [12.5, 14.5], [12.5, 14.5]]),
+    ],
+)
+def test_resize(shape: Tuple[int, int], layout: str, resample: str, expected: List[List[float]]) -> None:
+    """Unit tests for resizing pixel data"""
+    data = np.arange(16, dtype=np.float32).reshape((4, 4, 1) if layout == "HWC" else (1, 4, 4))
+    resized = CziReader._resize(data, shape, layout, resample)
+    assert resized.dtype == np.float32
+    assert np.allclose(resized[..., 0] if layout == "HWC" else resized[0], expected)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"target_shape": (0, 10)}, "target_shape must be a"),
+        ({"target_shape": (10,)}, "target_shape must be a"),
+        ({"target_shape": (10, 10), "zoom": 0.5}, "zoom must not be specified together with target_shape"),
+        ({"target_shape": (10, 10), "dtype": np.float32}, "not supported together with target_shape"),
+    ],
+)
+def test_read_raises_error_on_incorrect_target_shape(kwargs: Dict[str, Any], message: str) -> None:
+    """Unit tests for read error messages on target shapes"""
+    test_czi = CziReader("filepath")
+    with pytest.raises(ValueError, match=message):
+        test_czi.read(**kwargs)
+    test_czi._czi_reader.GetSingleChannelScalingTileAccessorData.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"channels": [4]}, "The channels provided do not exist, the document has 4 channels."),
+        ({"channels": []}, "The channels provided do not exist"),
+        ({"channels": "some"}, 'channels must be "all" or a sequence of channel indices.'),
+        ({"channels": "all"}, "The channels have different pixel types"),
+        ({"layout": "YXC"}, "The layout provided does not mach any supported layouts"),
+        ({"channel_order": "BGRA"}, "The channel order provided does not mach any supported channel orders"),
+        ({"channels": "all", "dtype": np.float32}, "only supported for reads of a single channel"),
+    ],
+)
+def test_read_channels_raises_error_on_incorrect_parameters(kwargs: Dict[str, Any], message: str) -> None:
+    """Unit tests for read error messages on several channels"""
+    test_czi = CziReader("filepath")
+    dimension_sizes = {DimensionIndex.C: 4}
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: dimension_sizes.get(dimension, 0)
+    test_czi._czi_reader.GetChannelPixelType = channel_pixel_types_test.get
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    with pytest.raises(ValueError, match=message):
+        test_czi.read(**kwargs)
+    test_czi._czi_reader.ReadPlanes.assert_not_called()
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+@pytest.mark.parametrize("layout, expected_shape", [("HWC", (10, 20, 3)), ("CHW", (3, 10, 20))])
+def test_read_rgb(layout: str, expected_shape: Tuple[int, int, int]) -> None:
+    """Unit tests for read composing rgb pixel types with reversed samples"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetDimensionSize = dimension_sizes_test2.get
+    test_czi._czi_reader.GetChannelPixelType = channel_pixel_types_test.get
+    test_czi._stats = GetSubBlockStatsTest(create_rectangle(0, 0, 20, 10), {})
+    test_czi._czi_reader.CalcSize = mock.Mock(return_value=mock.Mock(w=20, h=10))
+    pixel_data = test_czi.read(plane={"C": 1}, layout=layout, channel_order="RGB")
+
+    (view,) = test_czi._czi_reader.ReadPlanes.call_args[0][7]
+    assert view.shape == (10, 20, 3)
+    assert view.strides[2] < 0
+    view[:, :, 2] = 1
+    assert pixel_data.shape == expected_shape
+    assert pixel_data.dtype == np.uint16
+    assert np.all(pixel_data[..., 0] == 1) if layout == "HWC" else np.all(pixel_data[0] == 1)
+
+
+def test_buffer_pool() -> None:
+    """Unit tests for the statistics and the pickling of a buffer pool"""
+    buffer_pool = BufferPool(max_bytes=1024)
+    assert buffer_pool.stats == BufferPoolStats(max_bytes=1024)
+    unpickled_pool = pickle.loads(pickle.dumps(buffer_pool))
+    assert unpickled_pool.max_bytes == 1024
+    assert unpickled_pool._pool is not buffer_pool._pool
+    with pytest.raises(ValueError, match="must not be negative"):
+        BufferPool(max_bytes=-1)
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader")
+def test_pickle_keeps_buffer_pool(czi_reader_mock: mock.Mock) -> None:
+    """Unit tests for pickling a CziReader with a buffer pool, which is attached to the reopened reader"""
+    test_czi = CziReader("filepath", buffer_pool=BufferPool(max_bytes=1024))
+    unpickled_czi = pickle.loads(pickle.dumps(test_czi))
+    assert unpickled_czi._buffer_pool.max_bytes == 1024
+    unpickled_czi._czi_reader.SetBufferPool.assert_called_with(unpickled_czi._buffer_pool._pool)
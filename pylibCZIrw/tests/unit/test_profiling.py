@@ -0,0 +1,170 @@
+"""Module implementing unit tests for the profiling module"""
+
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from pylibCZIrw.czi import CziReader
+from pylibCZIrw.profiling import (
+    STREAM_TRACE_COLUMNS,
+    Profiler,
+    ReadProfile,
+    StreamStatistics,
+    StreamTrace,
+    get_active_profilers,
+    measure,
+    profile,
+)
+
+COUNTER_NAMES = (
+    "ioOperations",
+    "bytesRead",
+    "ioNanoseconds",
+    "subBlocksRead",
+    "subBlocksDecoded",
+    "decodeNanoseconds",
+    "cacheLookups",
+    "cacheHits",
+    "pruneNanoseconds",
+)
+
+
+def create_counters(**counters: int) -> SimpleNamespace:
+    """Creates the counters of a c++ reader, zero unless specified"""
+    return SimpleNamespace(**{name: counters.get(name, 0) for name in COUNTER_NAMES})
+
+
+def test_read_profile_add() -> None:
+    """Unit tests for summing read profiles"""
+    first = ReadProfile(method="read", calls=1, bytes_read=10, io_seconds=0.5)
+    second = ReadProfile(method="read", calls=1, bytes_read=5, io_seconds=0.25)
+    assert first + second == ReadProfile(method="read", calls=2, bytes_read=15, io_seconds=0.75)
+    assert (first + ReadProfile(method="project", calls=1)).method == ""
+
+
+def test_profiler() -> None:
+    """Unit tests for recording profiles"""
+    profiler = Profiler(max_calls=2)
+    for method, bytes_read in [("read", 1), ("read_many", 2), ("read", 4)]:
+        profiler.add(ReadProfile(method=method, calls=1, bytes_read=bytes_read))
+
+    assert [call.bytes_read for call in profiler.calls] == [2, 4]
+    assert profiler.total == ReadProfile(calls=3, bytes_read=7)
+    assert profiler.by_method["read"] == ReadProfile(method="read", calls=2, bytes_read=5)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        path = os.path.join(temp_directory, "profile.json")
+        document = profiler.to_json(path)
+        with open(path, encoding="utf-8") as file:
+            assert file.read() == document
+    assert json.loads(document) == profiler.to_dict()
+    assert json.loads(document)["by_method"]["read_many"]["bytes_read"] == 2
+
+    profiler.clear()
+    assert not profiler.calls
+    assert profiler.total == ReadProfile()
+
+
+def test_profile_contexts_are_nested() -> None:
+    """Unit tests for activating profilers"""
+    assert get_active_profilers() == ()
+    with profile() as outer:
+        with profile() as inner:
+            assert get_active_profilers() == (outer, inner)
+        assert get_active_profilers() == (outer,)
+    assert get_active_profilers() == ()
+
+
+def test_measure() -> None:
+    """Unit tests for measuring a read operation from the counters of the c++ reader"""
+    czi_reader = mock.Mock()
+    czi_reader.GetProfile.side_effect = [
+        create_counters(bytesRead=100, subBlocksRead=2, cacheHits=1),
+        create_counters(ioOperations=3, bytesRead=400, subBlocksRead=4, cacheLookups=5, cacheHits=4),
+    ]
+    profiler = Profiler()
+    with measure(czi_reader, "read", (profiler,)) as read_profile:
+        read_profile.convert_seconds = 0.0
+
+    assert profiler.calls == [read_profile]
+    assert read_profile.method == "read"
+    assert read_profile.calls == 1
+    assert read_profile.io_operations == 3
+    assert read_profile.bytes_read == 300
+    assert read_profile.subblocks_read == 2
+    assert read_profile.cache_lookups == 5
+    assert read_profile.cache_hits == 3
+    assert read_profile.subblocks_touched == 5
+    assert read_profile.total_seconds >= read_profile.compose_seconds >= 0
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_reader_profiling() -> None:
+    """Unit tests for profiling the read operations of a reader"""
+    test_czi = CziReader("filepath", profile=True)
+    test_czi._czi_reader.GetProfile.return_value = create_counters()
+    test_czi._czi_reader.GetDimensionSize = lambda dimension: 0
+    test_czi.read_many(np.empty((0, 4)), plane={}, pixel_type="Gray8")
+    with profile() as profiler:
+        test_czi.read_many([(0, 0, 10, 10)], plane={}, pixel_type="Gray8")
+
+    assert [call.method for call in profiler.calls] == ["read_many"]
+    assert test_czi.profiler is not None
+    assert test_czi.profiler.calls == profiler.calls
+    assert CziReader("filepath").profiler is None
+
+
+@mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", mock.Mock())
+def test_read_counters() -> None:
+    """Unit tests for the difference of two snapshots of the counters of a reader"""
+    test_czi = CziReader("filepath")
+    test_czi._czi_reader.GetProfile.side_effect = [
+        create_counters(bytesRead=100, subBlocksRead=2, cacheHits=1, ioNanoseconds=10**9),
+        create_counters(bytesRead=400, subBlocksRead=4, cacheLookups=5, cacheHits=4, ioNanoseconds=3 * 10**9),
+    ]
+    start_counters = test_czi.read_counters()
+    counters = test_czi.read_counters() - start_counters
+
+    assert counters == ReadProfile(
+        bytes_read=300, subblocks_touched=5, subblocks_read=2, cache_lookups=5, cache_hits=3, io_seconds=2.0
+    )
+
+
+def test_stream_statistics_from_native() -> None:
+    """Unit tests for converting the stream statistics of the c++ reader"""
+    native_statistics = SimpleNamespace(
+        readCount=3,
+        bytesRead=600,
+        sequentialReads=1,
+        minOffset=10,
+        maxEnd=1000,
+        latencyHistogram=[0, 1, 2, 0],
+        sizeHistogram=[0, 0, 3],
+    )
+    statistics = StreamStatistics.from_native(native_statistics)
+
+    assert (statistics.read_count, statistics.bytes_read, statistics.sequential_reads) == (3, 600, 1)
+    np.testing.assert_array_equal(statistics.latency_histogram, [0, 1, 2, 0])
+    np.testing.assert_allclose(statistics.latency_bin_edges, [0, 1e-6, 2e-6, 4e-6, np.inf])
+    np.testing.assert_array_equal(statistics.size_bin_edges, [0, 1, 2, np.inf])
+
+
+def test_stream_trace() -> None:
+    """Unit tests for converting, saving and loading stream traces"""
+    native_trace = np.array([[0, 100, 100, 0, 2000], [100, 50, 20, 5000, 1000]], dtype=np.uint64)
+    trace = StreamTrace.from_native(native_trace, dropped=2)
+
+    assert trace.dropped == 2
+    np.testing.assert_array_equal(trace.entries["offset"], [0, 100])
+    np.testing.assert_array_equal(trace.entries["bytes_read"], [100, 20])
+    np.testing.assert_allclose(trace.entries["start"], [0, 5e-6])
+    np.testing.assert_allclose(trace.entries["duration"], [2e-6, 1e-6])
+    with tempfile.TemporaryDirectory() as temp_directory:
+        path = os.path.join(temp_directory, "trace.csv")
+        trace.save(path)
+        loaded_trace = StreamTrace.load(path)
+    for name in STREAM_TRACE_COLUMNS:
+        np.testing.assert_allclose(loaded_trace.entries[name], trace.entries[name])
@@ -0,0 +1,85 @@
+"""Module implementing unit tests for the read_trace and replay modules"""
+
+import os
+import tempfile
+from time import perf_counter
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pylibCZIrw.profiling import ReadProfile
+from pylibCZIrw.read_trace import ReadTrace, TracedRead
+from pylibCZIrw.czi import CacheOptions, CacheType
+from pylibCZIrw.replay import ReplayResult, main, replay
+
+
+@pytest.mark.parametrize("file_name", ["trace.jsonl", "trace.jsonl.gz"])
+def test_read_trace_save_and_load(file_name: str) -> None:
+    """Unit tests for writing and reading traces"""
+    trace = ReadTrace()
+    trace.add(perf_counter(), (0, 10, 20, 30), {"C": 1}, None, None, "Gray8", "nearest")
+    trace.add(perf_counter(), (5, 5, 10, 10), {}, 2, 0.5, "Bgr24", "area")
+    with tempfile.TemporaryDirectory() as temp_directory:
+        path = os.path.join(temp_directory, file_name)
+        trace.save(path)
+        loaded_trace = ReadTrace.load(path)
+
+    assert loaded_trace.reads == trace.reads
+    assert loaded_trace.reads[1].roi == (5, 5, 10, 10)
+    assert loaded_trace.reads[1].duration >= 0
+
+
+def test_read_trace_load_raises_error_on_incorrect_file() -> None:
+    """Unit tests for reading files which are not traces"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        path = os.path.join(temp_directory, "trace.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"version": 0}\n')
+        with pytest.raises(ValueError, match="is not a read trace"):
+            ReadTrace.load(path)
+
+
+def test_replay_result_to_dict() -> None:
+    """Unit tests for summarizing replays"""
+    result = ReplayResult(
+        cache_options=None,
+        threads=2,
+        latencies=np.array([0.1, 0.2, 0.3, 0.4]),
+        total_seconds=0.5,
+        profile=ReadProfile(calls=4, cache_lookups=8, cache_hits=6, bytes_read=100),
+    )
+    summary = result.to_dict()
+
+    assert summary["reads"] == 4
+    assert summary["reads_per_second"] == pytest.approx(8)
+    assert summary["p50_latency"] == pytest.approx(0.25)
+    assert summary["max_latency"] == pytest.approx(0.4)
+    assert summary["cache_hit_rate"] == pytest.approx(0.75)
+    assert summary["cache_max_memory_usage"] is None
+    assert np.isnan(ReplayResult(None, 1, np.empty(0), 0.0, ReadProfile()).to_dict()["mean_latency"])
+
+
+def test_replay_raises_error_on_incorrect_threads() -> None:
+    """Unit tests for replay error messages"""
+    with pytest.raises(ValueError, match="At least one thread is required."):
+        replay(
+            "filepath", ReadTrace([TracedRead(0.0, 0.0, (0, 0, 1, 1), {}, None, None, "Gray8", "nearest")]), threads=0
+        )
+
+
+def test_main_cache_options() -> None:
+    """Unit tests for the cache configurations of the command line, a memory of 0 with a subblock count limits the
+    cache by the number of subblocks only"""
+    with tempfile.TemporaryDirectory() as temp_directory:
+        trace_path = os.path.join(temp_directory, "trace.jsonl")
+        ReadTrace().save(trace_path)
+        with mock.patch(
+            "pylibCZIrw.replay.replay_all", return_value=[ReplayResult(None, 1, np.empty(0), 0.0, ReadProfile())] * 2
+        ) as replay_all:
+            main([trace_path, "image.czi", "--cache-memory", "0", "1", "--cache-subblocks", "5"])
+
+    assert replay_all.call_args[0][2] == [
+        CacheOptions(type=CacheType.Standard, max_memory_usage=None, max_sub_block_count=5),
+        CacheOptions(type=CacheType.Standard, max_memory_usage=1024**2, max_sub_block_count=5),
+    ]
@@ -0,0 +1,131 @@
+"""Module implementing unit tests for the ReaderPool class"""
+
+from unittest import mock
+
+import pytest
+
+from pylibCZIrw.czi import BufferPool, ReaderFileInputTypes, ReaderPool, ReaderPoolStats
+
+
+def create_czi_reader_mock(memory_usage: int = 0) -> mock.Mock:
+    """Creates a mock of the c++ reader class, returning a new reader object on each call."""
+
+    def create_reader(*args: object) -> mock.Mock:
+        reader = mock.Mock()
+        reader.GetCacheInfo.return_value.memory_usage = memory_usage
+        return reader
+
+    return mock.Mock(side_effect=create_reader)
+
+
+def test_reader_pool_reuses_open_readers() -> None:
+    """Unit tests for handing out the same reader for the same document"""
+    czi_reader_mock = create_czi_reader_mock()
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(max_open=2) as pool:
+        with pool.open_czi("file1") as first_reader:
+            pass
+        with pool.open_czi("file1") as second_reader:
+            assert second_reader is first_reader
+        assert czi_reader_mock.call_count == 1
+        assert pool.stats == ReaderPoolStats(open_readers=1, readers_in_use=0, hits=1, misses=1, evictions=0)
+
+
+def test_reader_pool_closes_least_recently_used_readers() -> None:
+    """Unit tests for closing the least-recently-used readers when exceeding max_open"""
+    czi_reader_mock = create_czi_reader_mock()
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(max_open=2) as pool:
+        with pool.open_czi("file1") as reader1, pool.open_czi("file2"):
+            pass
+        with pool.open_czi("file1"):
+            pass
+        with pool.open_czi("file3"):
+            pass
+        reader1._czi_reader.close.assert_not_called()
+        assert pool.stats.evictions == 1
+        assert pool.stats.open_readers == 2
+        with pool.open_czi("file2"):
+            pass
+        assert pool.stats.misses == 4
+
+
+def test_reader_pool_does_not_close_readers_in_use() -> None:
+    """Unit tests for keeping readers which are handed out open even when exceeding the limits"""
+    czi_reader_mock = create_czi_reader_mock()
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(max_open=1) as pool:
+        with pool.open_czi("file1") as reader1:
+            with pool.open_czi("file2", ReaderFileInputTypes.Standard) as reader2:
+                assert pool.stats.open_readers == 2
+                assert pool.stats.readers_in_use == 2
+            # file1 is the least recently used reader, but it is still in use
+            reader1._czi_reader.close.assert_not_called()
+            reader2._czi_reader.close.assert_called_once()
+        assert pool.stats.open_readers == 1
+
+
+def test_reader_pool_enforces_max_memory() -> None:
+    """Unit tests for closing idle readers when exceeding the memory limit"""
+    czi_reader_mock = create_czi_reader_mock(memory_usage=100)
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(
+        max_open=10, max_memory=250
+    ) as pool:
+        for filepath in ("file1", "file2", "file3"):
+            with pool.open_czi(filepath):
+                pass
+        assert pool.stats.open_readers == 2
+        assert pool.stats.memory_usage == 200
+        assert pool.stats.evictions == 1
+
+
+def test_reader_pool_raises_error_on_incorrect_max_open() -> None:
+    """Unit tests for the ReaderPool error message"""
+    with pytest.raises(ValueError, match="The pool must be allowed to keep at least one reader open."):
+        ReaderPool(max_open=0)
+
+
+def test_reader_pool_shares_buffer_pool() -> None:
+    """Unit tests for attaching the buffer pool of the reader pool to all of its readers"""
+    czi_reader_mock = create_czi_reader_mock()
+    buffer_pool = BufferPool(max_bytes=1024)
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(
+        buffer_pool=buffer_pool
+    ) as pool:
+        with pool.open_czi("file1") as reader1, pool.open_czi("file2") as reader2:
+            for reader in (reader1, reader2):
+                reader._czi_reader.SetBufferPool.assert_called_once_with(buffer_pool._pool)
+
+
+def test_reader_pool_close_keeps_readers_in_use_open() -> None:
+    """Unit tests for closing readers handed out only once they are returned to a closed pool"""
+    czi_reader_mock = create_czi_reader_mock()
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock):
+        pool = ReaderPool(max_open=2)
+        with pool.open_czi("file1") as reader1:
+            with pool.open_czi("file2") as reader2:
+                pass
+            pool.close()
+            reader1._czi_reader.close.assert_not_called()
+            reader2._czi_reader.close.assert_called_once()
+            assert pool.stats.open_readers == 1
+        reader1._czi_reader.close.assert_called_once()
+        assert pool.stats.open_readers == 0
+        with pytest.raises(ValueError, match="The reader pool is closed."):
+            with pool.open_czi("file1"):
+                pass
+
+
+def test_reader_pool_queries_cache_info_once_per_reader() -> None:
+    """Unit tests for querying the cache usage of each reader only once when enforcing max_memory"""
+    czi_reader_mock = create_czi_reader_mock(memory_usage=100)
+    with mock.patch("pylibCZIrw.czi._pylibCZIrw.czi_reader", czi_reader_mock), ReaderPool(
+        max_open=10, max_memory=150
+    ) as pool:
+        with pool.open_czi("file1") as reader1:
+            pass
+        reader1._czi_reader.GetCacheInfo.reset_mock()
+        with pool.open_czi("file2") as reader2:
+            # file1 is evicted on acquiring file2, querying the usage of both readers once
+            reader1._czi_reader.GetCacheInfo.assert_called_once()
+            reader2._czi_reader.GetCacheInfo.assert_called_once()
+        # releasing file2 queries its usage once more
+        assert reader2._czi_reader.GetCacheInfo.call_count == 2
+        assert pool.stats.evictions == 1
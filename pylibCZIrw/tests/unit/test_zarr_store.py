@@ -0,0 +1,103 @@
+"""Module implementing unit tests for the CziZarrStore class"""
+
+import json
+from typing import List, Tuple
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pylibCZIrw.czi import CziReader, Rectangle, SubBlockInfo
+from pylibCZIrw.tests.unit.test_convert import create_layout
+from pylibCZIrw.zarr_store import CziZarrStore
+
+
+def create_store(dimension_separator: str = "/", max_cache_bytes: int = 1024**3) -> CziZarrStore:
+    """Creates a store on a mocked document with the layout of test_convert.create_layout."""
+    with mock.patch("pylibCZIrw.zarr_store.create_zarr_image_layout", return_value=create_layout()):
+        return CziZarrStore(
+            mock.Mock(spec=CziReader),
+            chunks=(256, 256),
+            dimension_separator=dimension_separator,
+            max_cache_bytes=max_cache_bytes,
+        )
+
+
+@pytest.mark.parametrize(
+    "dimension_separator, key, expected",
+    [
+        ("/", ".zgroup", True),
+        ("/", "2/.zarray", True),
+        ("/", "3/.zarray", False),
+        ("/", "0/1/2/3/2/3", True),
+        ("/", "0/1/2/3/3/3", False),
+        ("/", "2/1/2/3/0/0", True),
+        ("/", "2/1/2/3/0/1", False),
+        ("/", "0/1.2.3.2.3", False),
+        (".", "0/1.2.3.2.3", True),
+        (".", "0/1/2/3/2/3", False),
+        (".", "0/1.2.3.2.-3", False),
+    ],
+)
+def test_contains(dimension_separator: str, key: str, expected: bool) -> None:
+    """Unit tests for the keys served by the store"""
+    store = create_store(dimension_separator)
+    assert (key in store) is expected
+
+
+def test_keys() -> None:
+    """Unit tests for listing the keys of the store"""
+    store = create_store(".")
+    keys = list(store)
+    assert len(keys) == len(store) == 5 + 2 * 3 * 4 * (12 + 4 + 1)
+    assert keys[:6] == [".zgroup", ".zattrs", "0/.zarray", "1/.zarray", "2/.zarray", "0/0.0.0.0.0"]
+    assert json.loads(store["1/.zarray"])["dimension_separator"] == "."
+
+
+def test_getitem_caches_chunks() -> None:
+    """Unit tests for reading and caching chunks"""
+    store = create_store(max_cache_bytes=2 * 256 * 256 * 2)
+    chunk = np.ones((1, 256, 256), dtype=np.uint16)
+    with mock.patch("pylibCZIrw.zarr_store.read_chunk", return_value=chunk) as read_chunk:
+        assert store["0/1/2/3/2/3"] == chunk.tobytes()
+        assert store["0/1/2/3/2/3"] == chunk.tobytes()
+        assert read_chunk.call_count == 1
+        read_chunk.assert_called_with(store._reader, store.layout, 0, 1, 2, 3, 2, 3)
+
+        # the cache holds two chunks, the least recently used one is evicted
+        store["0/0/0/0/0/0"]
+        store["0/0/0/0/0/1"]
+        store["0/1/2/3/2/3"]
+        assert read_chunk.call_count == 4
+
+    with pytest.raises(KeyError):
+        store["0/1/2/3/3/3"]
+
+
+@pytest.mark.parametrize(
+    "rects, expected",
+    [
+        ([], (1024, 1024)),
+        ([Rectangle(0, 0, 512, 256)], (256, 512)),
+        # overlapping tiles of 100x100 pixels with a pitch of 90 pixels (80 in y)
+        ([Rectangle(x, y, 100, 100) for x in (0, 90, 180, 270) for y in (0, 80, 160)], (80, 90)),
+        ([Rectangle(0, 0, 10000, 100), Rectangle(0, 5000, 10000, 100)], (4096, 4096)),
+        # tiles of 1000x1000 pixels with a pitch of 900 pixels, jittered by up to 2 pixels
+        (
+            [
+                Rectangle(x + dx, y + dy, 1000, 1000)
+                for x in (0, 900, 1800)
+                for y in (0, 900)
+                for dx, dy in ((0, 0), (2, 1))
+            ]
+            + [Rectangle(2701, 1, 1000, 1000)],
+            (900, 900),
+        ),
+    ],
+)
+def test_get_tile_pitch(rects: List[Rectangle], expected: Tuple[int, int]) -> None:
+    """Unit tests for the default chunk size, following the spacing between the tiles"""
+    reader = mock.Mock(spec=CziReader)
+    reader.subblock_directory.return_value = [SubBlockInfo(0, {}, rect, (rect.w, rect.h), None, None) for rect in rects]
+    assert CziZarrStore._get_tile_pitch(reader, 0) == expected
+    reader.subblock_directory.assert_called_once_with(0, True)
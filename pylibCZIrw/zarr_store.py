@@ -0,0 +1,215 @@
+"""Module implementing a read-only zarr store on a czi document
+
+CziZarrStore serves (one scene of) a czi document as an OME-Zarr multiscale image, reading the chunks on demand.
+"""
+
+import json
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pylibCZIrw.convert import (
+    ZarrImageLayout,
+    create_array_metadata,
+    create_multiscales_attributes,
+    create_zarr_image_layout,
+    read_chunk,
+)
+from pylibCZIrw.czi import CziReader
+
+
+class CziZarrStore(Mapping):
+    """CziZarrStore class.
+
+    Read-only zarr (v2) store serving (one scene of) a czi document as an OME-Zarr multiscale image (see
+    pylibCZIrw.convert for the layout), without any conversion: chunks are read from the document when requested
+    and the encoded chunks are kept in a least-recently-used cache. The store can be handed to zarr and to the
+    readers built on it (e.g. zarr.open(zarr.storage.KVStore(CziZarrStore(reader)), mode="r") with zarr 2), which
+    fetch chunks concurrently; reading releases the GIL.
+
+    The keys are ".zgroup", ".zattrs", "<level>/.zarray" and the chunk keys "<level>/<t>/<c>/<z>/<y>/<x>" (with
+    "." instead of "/" between the chunk indices if specified as dimension_separator).
+
+    _reader : CziReader
+        The czi document, which must stay open while the store is used.
+    _layout : ZarrImageLayout
+        The layout of the image.
+    _metadata : Dict[str, bytes]
+        The encoded group and array metadata, by key.
+    _cache : OrderedDict[str, bytes]
+        The encoded chunks, ordered from least to most recently used.
+    """
+
+    # The maximum chunk size (in y and x) derived from the subblock layout.
+    MAX_CHUNK_SIZE = 4096
+
+    def __init__(
+        self,
+        reader: CziReader,
+        scene: Optional[int] = None,
+        chunks: Optional[Tuple[int, int]] = None,
+        compression_level: Optional[int] = None,
+        dimension_separator: str = "/",
+        max_cache_bytes: int = 256 * 1024**2,
+        name: str = "image",
+    ) -> None:
+        """Creates a zarr store on a czi document.
+
+        Parameters
+        ----------
+        reader : CziReader
+            The czi document.
+        scene : Optional[int]
+            Scene index, or None for the whole document.
+        chunks : Optional[Tuple[int, int]]
+            The chunk size in y and x, defaults to the most common spacing between the subblocks on pyramid layer 0
+            (at most MAX_CHUNK_SIZE), so that the chunks of a regular mosaic are aligned with its tiles.
+        compression_level : Optional[int]
+            The zlib compression level of the chunks, or None for uncompressed chunks.
+        dimension_separator : str
+            The separator of the chunk indices in the chunk keys, "/" (as required by OME-Zarr 0.4) or ".".
+        max_cache_bytes : int
+            The maximum size of the cached chunks (in bytes), 0 to disable the cache.
+        name : str
+            The name of the image in the OME-Zarr attributes.
+        :raises ValueError: if the dimension separator is not supported, the chunk size is not positive or the
+            scene does not exist
+        """
+        if dimension_separator not in ("/", "."):
+            raise ValueError('dimension_separator must be "/" or ".".')
+        self._reader = reader
+        self._layout = create_zarr_image_layout(
+            reader, scene, self._get_tile_pitch(reader, scene) if chunks is None else chunks
+        )
+        self._compression_level = compression_level
+        self._dimension_separator = dimension_separator
+        self._max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self._metadata: Dict[str, bytes] = {
+            ".zgroup": self._encode_json({"zarr_format": 2}),
+            ".zattrs": self._encode_json(create_multiscales_attributes(self._layout, name)),
+        }
+        for level in range(self._layout.levels):
+            self._metadata[f"{level}/.zarray"] = self._encode_json(
+                create_array_metadata(self._layout, level, compression_level, dimension_separator)
+            )
+
+    @property
+    def layout(self) -> ZarrImageLayout:
+        """The layout of the image."""
+        return self._layout
+
+    @classmethod
+    def _get_tile_pitch(cls, reader: CziReader, scene: Optional[int]) -> Tuple[int, int]:
+        """Returns the most common spacing (h, w) between the origins of neighboring subblocks on pyramid layer 0,
+        at most MAX_CHUNK_SIZE. Tiles of a mosaic usually overlap, so that this pitch is smaller than the tile size,
+        and only chunks of the size of the pitch stay aligned with the tiles. Origins closer than half the most common
+        tile size (e.g. a row of tiles jittered by the stage) count as one, and along an axis with a single tile
+        origin the most common tile size is used instead.
+
+        Parameters
+        ----------
+        reader : CziReader
+            The czi document.
+        scene : Optional[int]
+            Scene index, or None for the whole document.
+        Returns
+        ----------
+        : Tuple[int, int]
+            The pitch, (1024, 1024) if the document has no subblocks.
+        """
+        rects = [subblock.rect for subblock in reader.subblock_directory(scene, True)]
+        if not rects:
+            return (1024, 1024)
+
+        def most_common_pitch(origins: List[int], sizes: List[int]) -> int:
+            tile_size = Counter(sizes).most_common(1)[0][0]
+            clustered_origins: List[int] = []
+            for origin in sorted(set(origins)):
+                if not clustered_origins or origin - clustered_origins[-1] > tile_size // 2:
+                    clustered_origins.append(origin)
+            spacings = Counter(b - a for a, b in zip(clustered_origins, clustered_origins[1:]))
+            pitch = spacings.most_common(1)[0][0] if spacings else tile_size
+            return min(pitch, cls.MAX_CHUNK_SIZE)
+
+        return (
+            most_common_pitch([rect.y for rect in rects], [rect.h for rect in rects]),
+            most_common_pitch([rect.x for rect in rects], [rect.w for rect in rects]),
+        )
+
+    @staticmethod
+    def _encode_json(content: Dict) -> bytes:
+        return json.dumps(content, indent=4).encode("utf-8")
+
+    def _parse_chunk_key(self, key: str) -> Optional[Tuple[int, int, int, int, int, int]]:
+        """Returns the level and the chunk indices (t, c, z, y, x) of a chunk key, or None if the key is not the key
+        of a chunk of the image."""
+        level, separator, chunk_key = key.partition("/")
+        indices = chunk_key.split(self._dimension_separator)
+        if not separator or len(indices) != 5 or not all(index.isdigit() for index in [level, *indices]):
+            return None
+        level_index = int(level)
+        chunk_indices = tuple(int(index) for index in indices)
+        if level_index >= self._layout.levels or any(
+            index >= size for index, size in zip(chunk_indices, self._layout.chunk_grid(level_index))
+        ):
+            return None
+        return (level_index,) + chunk_indices  # type: ignore[return-value]
+
+    def _chunk_key(self, level: int, t: int, c: int, z: int, y: int, x: int) -> str:
+        return f"{level}/" + self._dimension_separator.join(str(index) for index in (t, c, z, y, x))
+
+    def __getitem__(self, key: str) -> bytes:
+        metadata = self._metadata.get(key)
+        if metadata is not None:
+            return metadata
+        chunk_indices = self._parse_chunk_key(key)
+        if chunk_indices is None:
+            raise KeyError(key)
+
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+
+        # Reading is done without holding the lock, so that chunks are read concurrently.
+        data = read_chunk(self._reader, self._layout, *chunk_indices).tobytes()
+        if self._compression_level is not None:
+            data = zlib.compress(data, self._compression_level)
+        if len(data) <= self._max_cache_bytes:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = data
+                    self._cache_bytes += len(data)
+                while self._cache_bytes > self._max_cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted)
+        return data
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and (key in self._metadata or self._parse_chunk_key(key) is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._metadata
+        for level in range(self._layout.levels):
+            chunk_grid = self._layout.chunk_grid(level)
+            for t in range(chunk_grid[0]):
+                for c in range(chunk_grid[1]):
+                    for z in range(chunk_grid[2]):
+                        for y in range(chunk_grid[3]):
+                            for x in range(chunk_grid[4]):
+                                yield self._chunk_key(level, t, c, z, y, x)
+
+    def __len__(self) -> int:
+        chunk_count = 0
+        for level in range(self._layout.levels):
+            level_chunk_count = 1
+            for size in self._layout.chunk_grid(level):
+                level_chunk_count *= size
+            chunk_count += level_chunk_count
+        return len(self._metadata) + chunk_count
@@ -239,6 +239,12 @@ setup(
     packages=["pylibCZIrw"],
     cmdclass={"build_ext": CMakeBuild},
     install_requires=requirements,
+    entry_points={
+        "console_scripts": [
+            "czi2zarr = pylibCZIrw.convert:main",
+            "czireplay = pylibCZIrw.replay:main",
+        ]
+    },
     # we require at least python version 3.7
     python_requires=">=3.8,<3.14",
     license_files=["COPYING", "COPYING.LESSER", "NOTICE"],